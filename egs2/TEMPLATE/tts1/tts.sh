@@ -610,6 +610,7 @@ if ! "${skip_train}"; then
             ${python} -m espnet2.bin.tts_train \
                 --collect_stats true \
                 --write_collected_feats "${write_collected_feats}" \
+                --collected_feats_format packed \
                 --use_preprocessor true \
                 --token_type "${token_type}" \
                 --token_list "${token_list}" \
@@ -778,7 +779,12 @@ if ! "${skip_train}"; then
         # NOTE (kan-bayashi): Use dumped files of the target features as well?
         if [ -e "${tts_stats_dir}/train/collect_feats/pitch.scp" ]; then
             _scp=pitch.scp
-            _type=npy
+            # NOTE: The stats directory created before packed format uses npy
+            if head -n 1 "${tts_stats_dir}/train/collect_feats/${_scp}" | grep -q '\.npy$'; then
+                _type=npy
+            else
+                _type=packed
+            fi
             _train_collect_dir=${tts_stats_dir}/train/collect_feats
             _valid_collect_dir=${tts_stats_dir}/valid/collect_feats
             _opts+="--train_data_path_and_name_and_type ${_train_collect_dir}/${_scp},pitch,${_type} "
@@ -786,7 +792,12 @@ if ! "${skip_train}"; then
         fi
         if [ -e "${tts_stats_dir}/train/collect_feats/energy.scp" ]; then
             _scp=energy.scp
-            _type=npy
+            # NOTE: The stats directory created before packed format uses npy
+            if head -n 1 "${tts_stats_dir}/train/collect_feats/${_scp}" | grep -q '\.npy$'; then
+                _type=npy
+            else
+                _type=packed
+            fi
             _train_collect_dir=${tts_stats_dir}/train/collect_feats
             _valid_collect_dir=${tts_stats_dir}/valid/collect_feats
             _opts+="--train_data_path_and_name_and_type ${_train_collect_dir}/${_scp},energy,${_type} "
@@ -989,28 +1000,35 @@ if ! "${skip_eval}"; then
                     ${_opts} ${_ex_opts} ${inference_args}
 
             # 4. Concatenates the output files from each jobs
-            mkdir -p "${_dir}"/{norm,denorm,wav}
-            for i in $(seq "${_nj}"); do
-                 cat "${_logdir}/output.${i}/norm/feats.scp"
-            done | LC_ALL=C sort -k1 > "${_dir}/norm/feats.scp"
-            for i in $(seq "${_nj}"); do
-                 cat "${_logdir}/output.${i}/denorm/feats.scp"
-            done | LC_ALL=C sort -k1 > "${_dir}/denorm/feats.scp"
+            # NOTE: The outputs can be disabled by inference_args, e.g. --write_wav false
+            for _out in norm denorm; do
+                if [ -e "${_logdir}/output.${_nj}/${_out}" ]; then
+                    mkdir -p "${_dir}/${_out}"
+                    for i in $(seq "${_nj}"); do
+                         cat "${_logdir}/output.${i}/${_out}/feats.scp"
+                    done | LC_ALL=C sort -k1 > "${_dir}/${_out}/feats.scp"
+                fi
+            done
             for i in $(seq "${_nj}"); do
                  cat "${_logdir}/output.${i}/speech_shape/speech_shape"
             done | LC_ALL=C sort -k1 > "${_dir}/speech_shape"
-            for i in $(seq "${_nj}"); do
-                mv -u "${_logdir}/output.${i}"/wav/*.wav "${_dir}"/wav
-                rm -rf "${_logdir}/output.${i}"/wav
-            done
-            if [ -e "${_logdir}/output.${_nj}/att_ws" ]; then
-                mkdir -p "${_dir}"/att_ws
+            if [ -e "${_logdir}/output.${_nj}/wav" ]; then
+                mkdir -p "${_dir}"/wav
+                for i in $(seq "${_nj}"); do
+                    mv -u "${_logdir}/output.${i}"/wav/*.wav "${_dir}"/wav
+                    rm -rf "${_logdir}/output.${i}"/wav
+                done
+            fi
+            if [ -e "${_logdir}/output.${_nj}/durations" ]; then
                 for i in $(seq "${_nj}"); do
                      cat "${_logdir}/output.${i}/durations/durations"
                 done | LC_ALL=C sort -k1 > "${_dir}/durations"
                 for i in $(seq "${_nj}"); do
                      cat "${_logdir}/output.${i}/focus_rates/focus_rates"
                 done | LC_ALL=C sort -k1 > "${_dir}/focus_rates"
+            fi
+            if [ -e "${_logdir}/output.${_nj}/att_ws" ]; then
+                mkdir -p "${_dir}"/att_ws
                 for i in $(seq "${_nj}"); do
                     mv -u "${_logdir}/output.${i}"/att_ws/*.png "${_dir}"/att_ws
                     rm -rf "${_logdir}/output.${i}"/att_ws
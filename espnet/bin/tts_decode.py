@@ -93,6 +93,13 @@ def get_parser():
         default=3,
         help="Forward window size in the attention constraint",
     )
+    parser.add_argument(
+        "--windowed-att-constraint",
+        type=strtobool,
+        default=False,
+        help="Whether to compute the attention only inside the window "
+        "of the attention constraint",
+    )
     parser.add_argument(
         "--fastspeech-alpha",
         type=float,
@@ -813,6 +813,9 @@ class Tacotron2(TTSInterface, torch.nn.Module):
         )  # keep compatibility
         backward_window = inference_args.backward_window if use_att_constraint else 0
         forward_window = inference_args.forward_window if use_att_constraint else 0
+        windowed_att_constraint = getattr(
+            inference_args, "windowed_att_constraint", False
+        )  # keep compatibility
 
         # inference
         h = self.enc.inference(x)
@@ -827,6 +830,7 @@ class Tacotron2(TTSInterface, torch.nn.Module):
             use_att_constraint=use_att_constraint,
             backward_window=backward_window,
             forward_window=forward_window,
+            windowed_att_constraint=windowed_att_constraint,
         )
 
         if self.use_cbhg:
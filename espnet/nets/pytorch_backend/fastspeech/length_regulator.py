@@ -12,6 +12,7 @@ from distutils.version import LooseVersion
 
 import torch
 
+from espnet.nets.pytorch_backend.nets_utils import make_non_pad_mask
 from espnet.nets.pytorch_backend.nets_utils import pad_list
 
 is_torch_1_1_plus = LooseVersion(torch.__version__) >= LooseVersion("1.1")
@@ -40,42 +41,90 @@ class LengthRegulator(torch.nn.Module):
         """
         super(LengthRegulator, self).__init__()
         self.pad_value = pad_value
-        if is_torch_1_1_plus:
-            self.repeat_fn = self._repeat_one_sequence
-        else:
-            self.repeat_fn = self._legacy_repeat_one_sequence
 
-    def forward(self, xs, ds, alpha=1.0):
+    def forward(self, xs, ds, alpha=1.0, masks=None):
         """Calculate forward propagation.
 
         Args:
             xs (Tensor): Batch of sequences of char or phoneme embeddings (B, Tmax, D).
             ds (LongTensor): Batch of durations of each frame (B, T).
             alpha (float, optional): Alpha value to control speed of speech.
+            masks (BoolTensor, optional): Batch of masks of the padded part
+                of ds (B, T). See adjust_durations().
 
         Returns:
             Tensor: replicated input tensor based on durations (B, T*, D).
 
+        """
+        ds = self.adjust_durations(ds, alpha, masks)
+
+        if not is_torch_1_1_plus:
+            return pad_list(
+                [self._legacy_repeat_one_sequence(x, d) for x, d in zip(xs, ds)],
+                self.pad_value,
+            )
+        return self._repeat_batch(xs, ds)
+
+    def adjust_durations(self, ds, alpha=1.0, masks=None):
+        """Apply alpha to the durations and avoid all-0 durations.
+
+        Args:
+            ds (LongTensor): Batch of durations of each frame (B, T).
+            alpha (float, optional): Alpha value to control speed of speech.
+            masks (BoolTensor, optional): Batch of masks of the padded part
+                of ds (B, T). The padded part of an all-0 sequence is kept 0,
+                so that the padded frames are never repeated.
+
+        Returns:
+            LongTensor: Batch of durations used for the repetition (B, T).
+
         """
         if alpha != 1.0:
             assert alpha > 0
             ds = torch.round(ds.float() * alpha).long()
 
-        if ds.sum() == 0:
+        is_zero = ds.sum(dim=1, keepdim=True).eq(0)
+        if is_zero.any():
             logging.warning(
                 "predicted durations includes all 0 sequences. "
-                "fill the first element with 1."
+                "fill the durations with 1."
             )
             # NOTE(kan-bayashi): This case must not be happend in teacher forcing.
             #   It will be happened in inference with a bad duration predictor.
-            #   So we do not need to care the padded sequence case here.
-            ds[ds.sum(dim=1).eq(0)] = 1
+            if masks is not None:
+                is_zero = is_zero & ~masks
+            ds = ds.masked_fill(is_zero, 1)
+        return ds
+
+    def _repeat_batch(self, xs, ds):
+        """Repeat each frame of the whole batch according to duration at once.
 
-        return pad_list([self.repeat_fn(x, d) for x, d in zip(xs, ds)], self.pad_value)
+        The indices of the input frames for all the output frames are built
+        by a single repeat_interleave over the flattened batch,
+        and then the output is gathered from the inputs at once.
+        The padded part of the output refers to the extra frame of pad_value.
 
-    def _repeat_one_sequence(self, x, d):
-        """Repeat each frame according to duration for torch 1.1+."""
-        return torch.repeat_interleave(x, d, dim=0)
+        Examples:
+            >>> xs = torch.tensor([[[1], [2]], [[3], [0]]])
+            >>> ds = torch.tensor([[1, 2], [2, 0]])
+            >>> self._repeat_batch(xs, ds)
+            tensor([[[1],
+                     [2],
+                     [2]],
+                    [[3],
+                     [3],
+                     [0]]])
+
+        """
+        B, T, D = xs.size()
+        olens = ds.sum(dim=1)
+        non_pad_masks = make_non_pad_mask(olens).to(xs.device)  # (B, T*)
+        indices = torch.full_like(non_pad_masks, B * T, dtype=torch.long)
+        indices[non_pad_masks] = torch.repeat_interleave(
+            torch.arange(B * T, device=xs.device), ds.reshape(-1)
+        )
+        xs = torch.cat([xs.reshape(B * T, D), xs.new_full((1, D), self.pad_value)])
+        return xs[indices]
 
     def _legacy_repeat_one_sequence(self, x, d):
         """Repeat each frame according to duration for torch 1.0.
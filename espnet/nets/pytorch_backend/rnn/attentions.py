@@ -304,6 +304,7 @@ class AttLoc(torch.nn.Module):
         last_attended_idx=None,
         backward_window=1,
         forward_window=3,
+        windowed=False,
     ):
         """Calcualte AttLoc forward propagation.
 
@@ -317,6 +318,8 @@ class AttLoc(torch.nn.Module):
         :param int last_attended_idx: index of the inputs of the last attended
         :param int backward_window: backward window size in attention constraint
         :param int forward_window: forward window size in attetion constraint
+        :param bool windowed: compute the attention only inside the window
+            of the attention constraint. Valid if last_attended_idx is given.
         :return: attention weighted encoder state (B, D_enc)
         :rtype: torch.Tensor
         :return: previous attention weights (B x T_max)
@@ -343,6 +346,17 @@ class AttLoc(torch.nn.Module):
             )
             att_prev = att_prev / att_prev.new(enc_hs_len).unsqueeze(-1)
 
+        if windowed and last_attended_idx is not None:
+            return self._forward_window(
+                enc_hs_len,
+                dec_z,
+                att_prev,
+                scaling,
+                last_attended_idx,
+                backward_window,
+                forward_window,
+            )
+
         # att_prev: utt x frame -> utt x 1 x 1 x frame
         # -> utt x att_conv_chans x 1 x frame
         att_conv = self.loc_conv(att_prev.view(batch, 1, 1, self.h_length))
@@ -379,6 +393,67 @@ class AttLoc(torch.nn.Module):
 
         return c, w
 
+    def _forward_window(
+        self,
+        enc_hs_len,
+        dec_z,
+        att_prev,
+        scaling,
+        last_attended_idx,
+        backward_window,
+        forward_window,
+    ):
+        """Calculate the attention only inside the window of attention constraint.
+
+        The energies outside of the window are -inf in the constrained attention,
+        so that only the window, including the location convolution
+        over the previous attention weights, is computed.
+        The cost for a step doesn't depend on the length of the inputs.
+
+        :param list enc_hs_len: padded encoder hidden state length (1)
+        :param torch.Tensor dec_z: decoder hidden state (1 x D_dec)
+        :param torch.Tensor att_prev: previous attention weight (1 x T_max)
+        :param float scaling: scaling parameter before applying softmax
+        :param int last_attended_idx: index of the inputs of the last attended
+        :param int backward_window: backward window size in attention constraint
+        :param int forward_window: forward window size in attetion constraint
+        :return: attention weighted encoder state (1, D_enc)
+        :rtype: torch.Tensor
+        :return: attention weights, which are zero outside of the window (1 x T_max)
+        :rtype: torch.Tensor
+        """
+        if len(dec_z) != 1:
+            raise NotImplementedError(
+                "Batch attention constraining is not yet supported."
+            )
+        # The same window as _apply_attention_constraint() and the padding mask
+        start = max(last_attended_idx - backward_window, 0)
+        end = min(last_attended_idx + forward_window, int(enc_hs_len[0]))
+
+        # The previous attention weights for the convolution in the window:
+        # (1, end - start + 2 * aconv_filts) with the zero padding of loc_conv
+        pad = self.loc_conv.padding[1]
+        prev_start = max(start - pad, 0)
+        prev_end = min(end + pad, self.h_length)
+        att_prev = F.pad(
+            att_prev[:, prev_start:prev_end],
+            (pad - (start - prev_start), pad - (prev_end - end)),
+        )
+        # att_conv: 1 x att_conv_chans x 1 x window -> 1 x window x att_dim
+        att_conv = F.conv2d(att_prev.view(1, 1, 1, -1), self.loc_conv.weight)
+        att_conv = self.mlp_att(att_conv.squeeze(2).transpose(1, 2))
+
+        dec_z_tiled = self.mlp_dec(dec_z).view(1, 1, self.att_dim)
+        e = self.gvec(
+            torch.tanh(att_conv + self.pre_compute_enc_h[:, start:end] + dec_z_tiled)
+        ).squeeze(2)
+        w_window = F.softmax(scaling * e, dim=1)
+        c = torch.sum(self.enc_h[:, start:end] * w_window.unsqueeze(2), dim=1)
+
+        w = w_window.new_zeros(1, self.h_length)
+        w[:, start:end] = w_window
+        return c, w
+
 
 class AttCov(torch.nn.Module):
     """Coverage mechanism attention
@@ -12,6 +12,7 @@ import torch
 import torch.nn.functional as F
 
 from espnet.nets.pytorch_backend.rnn.attentions import AttForwardTA
+from espnet.nets.pytorch_backend.rnn.attentions import AttLoc
 
 
 def decoder_init(m):
@@ -488,6 +489,7 @@ class Decoder(torch.nn.Module):
         use_att_constraint=False,
         backward_window=None,
         forward_window=None,
+        windowed_att_constraint=False,
     ):
         """Generate the sequence of features given the sequences of characters.
 
@@ -504,6 +506,11 @@ class Decoder(torch.nn.Module):
                 Whether to apply attention constraint introduced in `Deep Voice 3`_.
             backward_window (int): Backward window size in attention constraint.
             forward_window (int): Forward window size in attention constraint.
+            windowed_att_constraint (bool): Whether to compute the attention
+                only inside the window of attention constraint. The outputs are
+                same as the masked attention, but the cost of a step doesn't depend
+                on the length of the inputs. Only location-sensitive attention
+                is supported.
 
         Returns:
             Tensor: Output sequence of features (L, odim).
@@ -540,6 +547,14 @@ class Decoder(torch.nn.Module):
             last_attended_idx = 0
         else:
             last_attended_idx = None
+        att_kwargs = {}
+        if use_att_constraint and windowed_att_constraint:
+            if not isinstance(self.att, AttLoc):
+                raise NotImplementedError(
+                    "windowed_att_constraint supports only location-sensitive "
+                    f"attention: {self.att.__class__.__name__}"
+                )
+            att_kwargs["windowed"] = True
 
         # loop for an output sequence
         idx = 0
@@ -559,6 +574,7 @@ class Decoder(torch.nn.Module):
                     last_attended_idx=last_attended_idx,
                     backward_window=backward_window,
                     forward_window=forward_window,
+                    **att_kwargs,
                 )
             else:
                 att_c, att_w = self.att(
@@ -569,6 +585,7 @@ class Decoder(torch.nn.Module):
                     last_attended_idx=last_attended_idx,
                     backward_window=backward_window,
                     forward_window=forward_window,
+                    **att_kwargs,
                 )
 
             att_ws += [att_w]
@@ -316,6 +316,57 @@ class Decoder(BatchScorerInterface, torch.nn.Module):
 
         return y, new_cache
 
+    def init_kv_cache(self, memory, maxlen):
+        """Initialize the key and value cache for forward_one_step_kv_cached().
+
+        Args:
+            memory (torch.Tensor): Encoded memory, float32 (#batch, maxlen_in, feat).
+            maxlen (int): The maximum number of the output frames.
+
+        Returns:
+            List[Dict[str, torch.Tensor]]: The cache of each decoder layer.
+
+        """
+        if self.selfattention_layer_type != "selfattn":
+            raise NotImplementedError(
+                "The key and value cache supports only self-attention: "
+                f"{self.selfattention_layer_type}"
+            )
+        return [decoder.init_kv_cache(memory, maxlen) for decoder in self.decoders]
+
+    def forward_one_step_kv_cached(self, tgt, offset, kv_cache, memory_mask=None):
+        """Forward one step with the key and value cache.
+
+        This is same as forward_one_step() given all the previous inputs,
+        but only the new input is processed using the keys and values
+        of the previous steps in the cache.
+
+        Args:
+            tgt (torch.Tensor): Input of this step, int64 (#batch, 1) if
+                input_layer == "embed". In the other case, (#batch, 1, odim).
+            offset (int): The number of the previous steps.
+            kv_cache (List[Dict[str, torch.Tensor]]): The cache given by
+                init_kv_cache(), which is updated in place.
+            memory_mask (torch.Tensor): Encoded memory mask (#batch, 1, maxlen_in).
+
+        Returns:
+            torch.Tensor: Output tensor (#batch, odim) or (#batch, attention_dim)
+                if use_output_layer is False.
+
+        """
+        # The positional encoding of this step
+        x = self.embed[-1](self.embed[:-1](tgt), offset=offset)
+        for c, decoder in zip(kv_cache, self.decoders):
+            x = decoder.forward_kv_cached(x, offset, c, memory_mask)
+
+        if self.normalize_before:
+            y = self.after_norm(x[:, -1])
+        else:
+            y = x[:, -1]
+        if self.output_layer is not None:
+            y = torch.log_softmax(self.output_layer(y), dim=-1)
+        return y
+
     # beam search API (see ScorerInterface)
     def score(self, ys, state, x):
         """Score."""
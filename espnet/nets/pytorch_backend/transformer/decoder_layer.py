@@ -10,6 +10,7 @@ import torch
 from torch import nn
 
 from espnet.nets.pytorch_backend.transformer.layer_norm import LayerNorm
+from espnet.nets.pytorch_backend.transformer.mask import subsequent_mask
 
 
 class DecoderLayer(nn.Module):
@@ -98,13 +99,99 @@ class DecoderLayer(nn.Module):
             if tgt_mask is not None:
                 tgt_q_mask = tgt_mask[:, -1:, :]
 
+        x = self._forward_blocks(
+            tgt_q,
+            residual,
+            lambda q: self.self_attn(q, tgt, tgt, tgt_q_mask),
+            lambda q: self.src_attn(q, memory, memory, memory_mask),
+        )
+
+        if cache is not None:
+            x = torch.cat([cache, x], dim=1)
+
+        return x, tgt_mask, memory, memory_mask
+
+    def init_kv_cache(self, memory, maxlen):
+        """Initialize the key and value cache for the incremental decoding.
+
+        Args:
+            memory (torch.Tensor): Encoded memory, float32 (#batch, maxlen_in, size).
+            maxlen (int): The maximum number of the output frames.
+
+        Returns:
+            Dict[str, torch.Tensor]: The buffers of the keys and values of the
+                self-attention (#batch, n_head, maxlen, d_k), and those of the
+                source attention computed from the memory
+                (#batch, n_head, maxlen_in, d_k).
+
+        """
+        src_k, src_v = self.src_attn.forward_kv(memory, memory)
+        size = (src_k.size(0), src_k.size(1), maxlen, src_k.size(3))
+        return dict(
+            k=src_k.new_zeros(size),
+            v=src_v.new_zeros(size),
+            src_k=src_k,
+            src_v=src_v,
+        )
+
+    def forward_kv_cached(self, tgt, offset, kv_cache, memory_mask=None):
+        """Compute decoded features of the new frames with the key and value cache.
+
+        This is same as forward() given all the frames up to the new ones
+        without any mask except for the subsequent mask, but only the new frames
+        are processed. Their keys and values are stored in the cache.
+
+        Args:
+            tgt (torch.Tensor): Input tensor of the new frames (#batch, time, size).
+            offset (int): The number of the previous frames.
+            kv_cache (Dict[str, torch.Tensor]): The cache given by init_kv_cache().
+            memory_mask (torch.Tensor): Encoded memory mask (#batch, 1, maxlen_in).
+
+        Returns:
+            torch.Tensor: Output tensor of the new frames (#batch, time, size).
+
+        """
+        end = offset + tgt.size(1)
+        residual = tgt
+        if self.normalize_before:
+            tgt = self.norm1(tgt)
+        k, v = self.self_attn.forward_kv(tgt, tgt)
+        kv_cache["k"][:, :, offset:end] = k
+        kv_cache["v"][:, :, offset:end] = v
+        tgt_mask = None
+        if tgt.size(1) > 1:
+            # (1, time, end)
+            tgt_mask = subsequent_mask(end, device=tgt.device)[offset:end].unsqueeze(0)
+
+        return self._forward_blocks(
+            tgt,
+            residual,
+            lambda q: self.self_attn.forward_with_kv(
+                q, kv_cache["k"][:, :, :end], kv_cache["v"][:, :, :end], tgt_mask
+            ),
+            lambda q: self.src_attn.forward_with_kv(
+                q, kv_cache["src_k"], kv_cache["src_v"], memory_mask
+            ),
+        )
+
+    def _forward_blocks(self, tgt_q, residual, self_attn, src_attn):
+        """Compute the residual blocks after the first normalization.
+
+        Args:
+            tgt_q (torch.Tensor): The normalized query frames (#batch, time, size).
+            residual (torch.Tensor): The residual of the query frames.
+            self_attn (Callable): The self-attention given the query.
+            src_attn (Callable): The source attention given the query.
+
+        Returns:
+            torch.Tensor: Output tensor (#batch, time, size).
+
+        """
         if self.concat_after:
-            tgt_concat = torch.cat(
-                (tgt_q, self.self_attn(tgt_q, tgt, tgt, tgt_q_mask)), dim=-1
-            )
+            tgt_concat = torch.cat((tgt_q, self_attn(tgt_q)), dim=-1)
             x = residual + self.concat_linear1(tgt_concat)
         else:
-            x = residual + self.dropout(self.self_attn(tgt_q, tgt, tgt, tgt_q_mask))
+            x = residual + self.dropout(self_attn(tgt_q))
         if not self.normalize_before:
             x = self.norm1(x)
 
@@ -112,12 +199,10 @@ class DecoderLayer(nn.Module):
         if self.normalize_before:
             x = self.norm2(x)
         if self.concat_after:
-            x_concat = torch.cat(
-                (x, self.src_attn(x, memory, memory, memory_mask)), dim=-1
-            )
+            x_concat = torch.cat((x, src_attn(x)), dim=-1)
             x = residual + self.concat_linear2(x_concat)
         else:
-            x = residual + self.dropout(self.src_attn(x, memory, memory, memory_mask))
+            x = residual + self.dropout(src_attn(x))
         if not self.normalize_before:
             x = self.norm2(x)
 
@@ -127,8 +212,4 @@ class DecoderLayer(nn.Module):
         x = residual + self.dropout(self.feed_forward(x))
         if not self.normalize_before:
             x = self.norm3(x)
-
-        if cache is not None:
-            x = torch.cat([cache, x], dim=1)
-
-        return x, tgt_mask, memory, memory_mask
+        return x
@@ -77,20 +77,28 @@ class PositionalEncoding(torch.nn.Module):
         pe = pe.unsqueeze(0)
         self.pe = pe.to(device=x.device, dtype=x.dtype)
 
-    def forward(self, x: torch.Tensor):
+    def forward(self, x: torch.Tensor, offset: int = 0):
         """Add positional encoding.
 
         Args:
             x (torch.Tensor): Input tensor (batch, time, `*`).
+            offset (int): The position of the first frame of x,
+                e.g. the number of the previous frames in the incremental decoding.
 
         Returns:
             torch.Tensor: Encoded tensor (batch, time, `*`).
 
         """
-        self.extend_pe(x)
-        x = x * self.xscale + self.pe[:, : x.size(1)]
+        self._extend_pe_with_offset(x, offset)
+        x = x * self.xscale + self.pe[:, offset : offset + x.size(1)]
         return self.dropout(x)
 
+    def _extend_pe_with_offset(self, x: torch.Tensor, offset: int):
+        if offset == 0:
+            self.extend_pe(x)
+        else:
+            self.extend_pe(x.new_zeros(()).expand(1, offset + x.size(1)))
+
 
 class ScaledPositionalEncoding(PositionalEncoding):
     """Scaled positional encoding module.
@@ -113,18 +121,20 @@ class ScaledPositionalEncoding(PositionalEncoding):
         """Reset parameters."""
         self.alpha.data = torch.tensor(1.0)
 
-    def forward(self, x):
+    def forward(self, x, offset=0):
         """Add positional encoding.
 
         Args:
             x (torch.Tensor): Input tensor (batch, time, `*`).
+            offset (int): The position of the first frame of x,
+                e.g. the number of the previous frames in the incremental decoding.
 
         Returns:
             torch.Tensor: Encoded tensor (batch, time, `*`).
 
         """
-        self.extend_pe(x)
-        x = x + self.alpha * self.pe[:, : x.size(1)]
+        self._extend_pe_with_offset(x, offset)
+        x = x + self.alpha * self.pe[:, offset : offset + x.size(1)]
         return self.dropout(x)
 
 
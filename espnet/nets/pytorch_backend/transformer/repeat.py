@@ -7,27 +7,121 @@
 """Repeat the same layer definition."""
 
 import torch
+import torch.utils.checkpoint
+
+
+def _flatten(args):
+    """Flatten nested tuples into a flat tuple and a structure description."""
+    flat = []
+    spec = []
+    for a in args:
+        if isinstance(a, tuple):
+            sub_flat, sub_spec = _flatten(a)
+            flat.extend(sub_flat)
+            spec.append(sub_spec)
+        else:
+            flat.append(a)
+            spec.append(None)
+    return tuple(flat), spec
+
+
+def _unflatten(flat, spec):
+    """Inverse of `_flatten`."""
+    args = []
+    idx = 0
+    for s in spec:
+        if s is None:
+            args.append(flat[idx])
+            idx += 1
+        else:
+            n = _num_leaves(s)
+            args.append(_unflatten(flat[idx : idx + n], s))
+            idx += n
+    return tuple(args)
+
+
+def _num_leaves(spec):
+    return sum(1 if s is None else _num_leaves(s) for s in spec)
+
+
+def checkpoint_forward(module, *args):
+    """Run the module with gradient checkpointing.
+
+    The intermediate activations of the module are not kept
+    and are recomputed in the backward pass.
+    Nested tuple arguments, e.g. (x, pos_emb) of Conformer layers,
+    are flattened so that the gradients flow into all of the tensors.
+
+    Args:
+        module (torch.nn.Module): Module to be run.
+        *args: Arguments of the module.
+
+    Returns:
+        Outputs of the module with the same structure as `module(*args)`.
+
+    """
+    flat_args, in_spec = _flatten(args)
+    out_spec = []
+
+    def run_function(*inputs):
+        outputs = module(*_unflatten(inputs, in_spec))
+        if not isinstance(outputs, tuple):
+            outputs = (outputs,)
+        flat_outputs, spec = _flatten(outputs)
+        out_spec[:] = spec
+        return flat_outputs
+
+    flat_outputs = torch.utils.checkpoint.checkpoint(run_function, *flat_args)
+    outputs = _unflatten(flat_outputs, out_spec)
+    if len(outputs) == 1:
+        return outputs[0]
+    return outputs
 
 
 class MultiSequential(torch.nn.Sequential):
-    """Multi-input multi-output torch.nn.Sequential."""
+    """Multi-input multi-output torch.nn.Sequential.
+
+    Args:
+        *args: Modules to be applied sequentially.
+        checkpoint_layers (Sequence[int]): Indices of the modules
+            to be run with gradient checkpointing in training.
+
+    """
+
+    def __init__(self, *args, checkpoint_layers=()):
+        """Construct a MultiSequential object."""
+        super().__init__(*args)
+        for idx in checkpoint_layers:
+            if not -len(self) <= idx < len(self):
+                raise ValueError(
+                    f"checkpoint_layers must be in [{-len(self)}, {len(self)}): {idx}"
+                )
+        self.checkpoint_layers = {idx % len(self) for idx in checkpoint_layers}
 
     def forward(self, *args):
         """Repeat."""
-        for m in self:
-            args = m(*args)
+        use_checkpoint = self.training and torch.is_grad_enabled()
+        for idx, m in enumerate(self):
+            if use_checkpoint and idx in self.checkpoint_layers:
+                args = checkpoint_forward(m, *args)
+            else:
+                args = m(*args)
         return args
 
 
-def repeat(N, fn):
+def repeat(N, fn, checkpoint_layers=()):
     """Repeat module N times.
 
     Args:
         N (int): Number of repeat time.
         fn (Callable): Function to generate module.
+        checkpoint_layers (Sequence[int]): Indices of the layers
+            to be run with gradient checkpointing in training.
 
     Returns:
         MultiSequential: Repeated model instance.
 
     """
-    return MultiSequential(*[fn(n) for n in range(N)])
+    return MultiSequential(
+        *[fn(n) for n in range(N)], checkpoint_layers=checkpoint_layers
+    )
@@ -48,6 +48,9 @@ class BaseTransformerDecoder(AbsDecoder, BatchScorerInterface):
             i.e. x -> x + linear(concat(x, att(x)))
             if False, no additional linear will be applied.
             i.e. x -> x + att(x)
+        checkpoint_layers: indices of decoder blocks to apply gradient checkpointing
+            in training, which recomputes their activations in backward
+            instead of storing them
     """
 
     def __init__(
@@ -241,6 +244,7 @@ class TransformerDecoder(BaseTransformerDecoder):
         pos_enc_class=PositionalEncoding,
         normalize_before: bool = True,
         concat_after: bool = False,
+        checkpoint_layers: Sequence[int] = (),
     ):
         assert check_argument_types()
         super().__init__(
@@ -270,6 +274,7 @@ class TransformerDecoder(BaseTransformerDecoder):
                 normalize_before,
                 concat_after,
             ),
+            checkpoint_layers=checkpoint_layers,
         )
 
 
@@ -293,6 +298,7 @@ class LightweightConvolutionTransformerDecoder(BaseTransformerDecoder):
         conv_wshare: int = 4,
         conv_kernel_length: Sequence[int] = (11, 11, 11, 11, 11, 11),
         conv_usebias: int = False,
+        checkpoint_layers: Sequence[int] = (),
     ):
         assert check_argument_types()
         if len(conv_kernel_length) != num_blocks:
@@ -333,6 +339,7 @@ class LightweightConvolutionTransformerDecoder(BaseTransformerDecoder):
                 normalize_before,
                 concat_after,
             ),
+            checkpoint_layers=checkpoint_layers,
         )
 
 
@@ -356,6 +363,7 @@ class LightweightConvolution2DTransformerDecoder(BaseTransformerDecoder):
         conv_wshare: int = 4,
         conv_kernel_length: Sequence[int] = (11, 11, 11, 11, 11, 11),
         conv_usebias: int = False,
+        checkpoint_layers: Sequence[int] = (),
     ):
         assert check_argument_types()
         if len(conv_kernel_length) != num_blocks:
@@ -396,6 +404,7 @@ class LightweightConvolution2DTransformerDecoder(BaseTransformerDecoder):
                 normalize_before,
                 concat_after,
             ),
+            checkpoint_layers=checkpoint_layers,
         )
 
 
@@ -419,6 +428,7 @@ class DynamicConvolutionTransformerDecoder(BaseTransformerDecoder):
         conv_wshare: int = 4,
         conv_kernel_length: Sequence[int] = (11, 11, 11, 11, 11, 11),
         conv_usebias: int = False,
+        checkpoint_layers: Sequence[int] = (),
     ):
         assert check_argument_types()
         if len(conv_kernel_length) != num_blocks:
@@ -459,6 +469,7 @@ class DynamicConvolutionTransformerDecoder(BaseTransformerDecoder):
                 normalize_before,
                 concat_after,
             ),
+            checkpoint_layers=checkpoint_layers,
         )
 
 
@@ -482,6 +493,7 @@ class DynamicConvolution2DTransformerDecoder(BaseTransformerDecoder):
         conv_wshare: int = 4,
         conv_kernel_length: Sequence[int] = (11, 11, 11, 11, 11, 11),
         conv_usebias: int = False,
+        checkpoint_layers: Sequence[int] = (),
     ):
         assert check_argument_types()
         if len(conv_kernel_length) != num_blocks:
@@ -522,4 +534,5 @@ class DynamicConvolution2DTransformerDecoder(BaseTransformerDecoder):
                 normalize_before,
                 concat_after,
             ),
+            checkpoint_layers=checkpoint_layers,
         )
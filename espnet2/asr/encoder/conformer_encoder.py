@@ -4,6 +4,7 @@
 """Conformer encoder definition."""
 
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
 
 import torch
@@ -65,6 +66,9 @@ class ConformerEncoder(AbsEncoder):
         use_cnn_module (bool): Whether to use convolution module.
         cnn_module_kernel (int): Kernerl size of convolution module.
         padding_idx (int): Padding idx for input_layer=embed.
+        checkpoint_layers (Sequence[int]): Indices of encoder blocks to apply
+            gradient checkpointing in training, which recomputes their activations
+            in backward instead of storing them.
 
     """
 
@@ -90,6 +94,7 @@ class ConformerEncoder(AbsEncoder):
         use_cnn_module: bool = True,
         cnn_module_kernel: int = 31,
         padding_idx: int = -1,
+        checkpoint_layers: Sequence[int] = (),
     ):
         assert check_argument_types()
         super().__init__()
@@ -211,6 +216,7 @@ class ConformerEncoder(AbsEncoder):
                 normalize_before,
                 concat_after,
             ),
+            checkpoint_layers=checkpoint_layers,
         )
         if self.normalize_before:
             self.after_norm = LayerNorm(output_size)
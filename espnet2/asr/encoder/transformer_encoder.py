@@ -3,6 +3,7 @@
 
 """Encoder definition."""
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
 
 import torch
@@ -50,6 +51,9 @@ class TransformerEncoder(AbsEncoder):
         positionwise_layer_type: linear of conv1d
         positionwise_conv_kernel_size: kernel size of positionwise conv1d layer
         padding_idx: padding_idx for input_layer=embed
+        checkpoint_layers: indices of encoder blocks to apply gradient checkpointing
+            in training, which recomputes their activations in backward
+            instead of storing them
     """
 
     def __init__(
@@ -69,6 +73,7 @@ class TransformerEncoder(AbsEncoder):
         positionwise_layer_type: str = "linear",
         positionwise_conv_kernel_size: int = 1,
         padding_idx: int = -1,
+        checkpoint_layers: Sequence[int] = (),
     ):
         assert check_argument_types()
         super().__init__()
@@ -137,6 +142,7 @@ class TransformerEncoder(AbsEncoder):
                 normalize_before,
                 concat_after,
             ),
+            checkpoint_layers=checkpoint_layers,
         )
         if self.normalize_before:
             self.after_norm = LayerNorm(output_size)
@@ -19,6 +19,7 @@ from espnet2.asr.ctc import CTC
 from espnet2.asr.decoder.abs_decoder import AbsDecoder
 from espnet2.asr.encoder.abs_encoder import AbsEncoder
 from espnet2.asr.frontend.abs_frontend import AbsFrontend
+from espnet2.asr.frontend.feats_cache import FeatsCache
 from espnet2.asr.preencoder.abs_preencoder import AbsPreEncoder
 from espnet2.asr.specaug.abs_specaug import AbsSpecAug
 from espnet2.layers.abs_normalize import AbsNormalize
@@ -96,12 +97,21 @@ class ESPnetASRModel(AbsESPnetModel):
         else:
             self.error_calculator = None
 
+        # The cache of the frontend outputs, which is set by ASRTask.build_model()
+        self.feats_cache: Optional[FeatsCache] = None
+
+    @property
+    def requires_utt_id(self) -> bool:
+        """If True, the trainer gives the utterance ids to forward()"""
+        return self.feats_cache is not None
+
     def forward(
         self,
         speech: torch.Tensor,
         speech_lengths: torch.Tensor,
         text: torch.Tensor,
         text_lengths: torch.Tensor,
+        utt_id: List[str] = None,
     ) -> Tuple[torch.Tensor, Dict[str, torch.Tensor], torch.Tensor]:
         """Frontend + Encoder + Decoder + Calc loss
 
@@ -110,6 +120,7 @@ class ESPnetASRModel(AbsESPnetModel):
             speech_lengths: (Batch, )
             text: (Batch, Length)
             text_lengths: (Batch,)
+            utt_id: The utterance ids used for the feature cache
         """
         assert text_lengths.dim() == 1, text_lengths.shape
         # Check that batch_size is unified
@@ -125,7 +136,7 @@ class ESPnetASRModel(AbsESPnetModel):
         text = text[:, : text_lengths.max()]
 
         # 1. Encoder
-        encoder_out, encoder_out_lens = self.encode(speech, speech_lengths)
+        encoder_out, encoder_out_lens = self.encode(speech, speech_lengths, utt_id)
 
         # 2a. Attention-decoder branch
         if self.ctc_weight == 1.0:
@@ -179,17 +190,21 @@ class ESPnetASRModel(AbsESPnetModel):
         return {"feats": feats, "feats_lengths": feats_lengths}
 
     def encode(
-        self, speech: torch.Tensor, speech_lengths: torch.Tensor
+        self,
+        speech: torch.Tensor,
+        speech_lengths: torch.Tensor,
+        utt_id: List[str] = None,
     ) -> Tuple[torch.Tensor, torch.Tensor]:
         """Frontend + Encoder. Note that this method is used by asr_inference.py
 
         Args:
             speech: (Batch, Length, ...)
             speech_lengths: (Batch, )
+            utt_id: The utterance ids used for the feature cache
         """
         with autocast(False):
             # 1. Extract feats
-            feats, feats_lengths = self._extract_feats(speech, speech_lengths)
+            feats, feats_lengths = self._extract_feats(speech, speech_lengths, utt_id)
 
             # 2. Data augmentation
             if self.specaug is not None and self.training:
@@ -220,14 +235,29 @@ class ESPnetASRModel(AbsESPnetModel):
         return encoder_out, encoder_out_lens
 
     def _extract_feats(
-        self, speech: torch.Tensor, speech_lengths: torch.Tensor
+        self,
+        speech: torch.Tensor,
+        speech_lengths: torch.Tensor,
+        utt_id: List[str] = None,
     ) -> Tuple[torch.Tensor, torch.Tensor]:
         assert speech_lengths.dim() == 1, speech_lengths.shape
 
         # for data-parallel
         speech = speech[:, : speech_lengths.max()]
 
-        if self.frontend is not None:
+        if (
+            self.frontend is not None
+            and self.feats_cache is not None
+            and utt_id is not None
+            # Multi-channel input is not cached
+            # because a channel is selected randomly in training
+            and speech.dim() == 2
+        ):
+            # Frontend with the cache of the outputs for each utterance
+            feats, feats_lengths = self.feats_cache(
+                self.frontend, speech, speech_lengths, utt_id
+            )
+        elif self.frontend is not None:
             # Frontend
             #  e.g. STFT and Feature extract
             #       data_loader may send time-domain signal in this case
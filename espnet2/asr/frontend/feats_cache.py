@@ -0,0 +1,204 @@
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import torch
+import torch.distributed
+from typeguard import check_argument_types
+
+from espnet.nets.pytorch_backend.nets_utils import pad_list
+from espnet2.asr.frontend.abs_frontend import AbsFrontend
+
+
+class FeatsCache:
+    """Cache the outputs of the frontend for each utterance on disk.
+
+    The features are appended to a binary file at the first time
+    and are read from it via memory-mapping after that.
+    The files are placed in "cache_dir/<fingerprint>", so that the cache
+    is invalidated if the fingerprint, e.g. the hash of the frontend
+    configuration, is changed. Each process of distributed training writes
+    only its own files, "feats.<rank>.bin" and "index.<rank>.txt", to avoid
+    the conflict of writing, but reads the files of all ranks, because
+    the utterances assigned to each rank are changed at every epoch.
+    The files of the other ranks are scanned again only when
+    the features of an utterance are not found.
+
+    Note that the features must be deterministic for each utterance id,
+    i.e. the frontend must not be trained and any augmentation
+    must not be applied to the input of the frontend. The last frames of
+    the cached features can be slightly different from those extracted
+    in another mini-batch, because the padding of the input affects
+    the edge of STFT.
+
+    Examples:
+        >>> cache = FeatsCache("exp/feats_cache", fingerprint)
+        >>> feats, feats_lengths = cache(frontend, speech, speech_lengths, utt_id)
+
+    """
+
+    def __init__(self, cache_dir: Union[Path, str], fingerprint: str):
+        assert check_argument_types()
+        self.cache_dir = Path(cache_dir)
+        self.fingerprint = fingerprint
+        self.rank = None
+        # utt_id -> (rank, offset, dtype, shape)
+        self.index: Optional[Dict[str, Tuple[int, int, str, Tuple[int, ...]]]] = None
+        # rank -> The position of index.<rank>.txt read so far
+        self.index_pos: Dict[int, int] = {}
+        # rank -> The memory-mapped feats.<rank>.bin
+        self.mmaps: Dict[int, np.memmap] = {}
+        self.data_fd = None
+        self.index_fd = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(cache_dir={self.cache_dir})"
+
+    def __getstate__(self):
+        # The files are opened again in the other process
+        state = self.__dict__.copy()
+        state.update(index=None, index_pos={}, mmaps={}, data_fd=None, index_fd=None)
+        return state
+
+    @property
+    def dir(self) -> Path:
+        return self.cache_dir / self.fingerprint
+
+    def _open(self):
+        # The files are opened lazily to avoid creating them in inference mode
+        if torch.distributed.is_available() and torch.distributed.is_initialized():
+            self.rank = torch.distributed.get_rank()
+        else:
+            self.rank = 0
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+        self.index = {}
+        self.index_pos = {}
+        self.mmaps = {}
+        self.data_fd = (self.dir / f"feats.{self.rank}.bin").open("ab")
+        data_size = self.data_fd.tell()
+        self._read_index(self.rank)
+        # Drop the entries which are not written to the data file,
+        # e.g. by an interruption
+        for utt_id, (_, offset, dtype, shape) in list(self.index.items()):
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            if offset + nbytes > data_size:
+                del self.index[utt_id]
+        self.index_fd = (self.dir / f"index.{self.rank}.txt").open(
+            "a", encoding="utf-8"
+        )
+        self._read_other_indices()
+
+    def _read_index(self, rank: int):
+        """Read the lines of index.<rank>.txt appended after the last reading"""
+        path = self.dir / f"index.{rank}.txt"
+        if not path.exists():
+            return
+        with path.open("rb") as f:
+            f.seek(self.index_pos.get(rank, 0))
+            data = f.read()
+        # The last line can be still being written by the other process
+        data = data[: data.rfind(b"\n") + 1]
+        self.index_pos[rank] = self.index_pos.get(rank, 0) + len(data)
+        for line in data.decode("utf-8").splitlines():
+            sps = line.split()
+            if len(sps) != 4:
+                # Ignore the broken line, e.g. by an interruption
+                continue
+            utt_id, offset, dtype, shape = sps
+            shape = tuple(map(int, shape.split(",")))
+            # Prefer the entry of this rank if written by the multiple ranks
+            if utt_id not in self.index or rank == self.rank:
+                self.index[utt_id] = (rank, int(offset), dtype, shape)
+
+    def _read_other_indices(self):
+        for path in self.dir.glob("index.*.txt"):
+            rank = int(path.name.split(".")[1])
+            if rank != self.rank:
+                self._read_index(rank)
+
+    def get(self, utt_id: str) -> Optional[np.ndarray]:
+        if self.index is None:
+            self._open()
+        if utt_id not in self.index:
+            return None
+        rank, offset, dtype, shape = self.index[utt_id]
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        mmap = self.mmaps.get(rank)
+        if mmap is None or len(mmap) < offset + nbytes:
+            # Map again to see the appended data
+            data_path = self.dir / f"feats.{rank}.bin"
+            if data_path.stat().st_size < offset + nbytes:
+                # The data of the other rank is not flushed yet
+                return None
+            mmap = np.memmap(data_path, dtype=np.uint8, mode="r")
+            self.mmaps[rank] = mmap
+        return mmap[offset : offset + nbytes].view(dtype).reshape(shape).copy()
+
+    def put(self, utt_id: str, feats: np.ndarray):
+        if self.index is None:
+            self._open()
+        feats = np.ascontiguousarray(feats)
+        offset = self.data_fd.tell()
+        self.data_fd.write(feats.tobytes())
+        shape = ",".join(map(str, feats.shape))
+        self.index_fd.write(f"{utt_id} {offset} {feats.dtype.str} {shape}\n")
+        self.index[utt_id] = (self.rank, offset, feats.dtype.str, feats.shape)
+
+    def flush(self):
+        if self.data_fd is not None:
+            self.data_fd.flush()
+            self.index_fd.flush()
+
+    def __call__(
+        self,
+        frontend: AbsFrontend,
+        speech: torch.Tensor,
+        speech_lengths: torch.Tensor,
+        utt_id: List[str],
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Apply the frontend only for the utterances which are not cached
+
+        Args:
+            frontend: The frontend module
+            speech: (Batch, NSamples)
+            speech_lengths: (Batch,)
+            utt_id: The utterance ids of the batch
+        Returns:
+            feats: (Batch, NFrames, Dim)
+            feats_lengths: (Batch,)
+        """
+        assert len(utt_id) == speech.size(0), (len(utt_id), speech.size(0))
+        feats_list = [self.get(u) for u in utt_id]
+        if any(f is None for f in feats_list):
+            # Look for the features written by the other ranks after the last scan
+            self._read_other_indices()
+            feats_list = [
+                self.get(u) if f is None else f for u, f in zip(utt_id, feats_list)
+            ]
+        feats_list = [
+            None if f is None else torch.from_numpy(f).to(speech.device)
+            for f in feats_list
+        ]
+
+        missing = [i for i, f in enumerate(feats_list) if f is None]
+        if len(missing) != 0:
+            indices = torch.tensor(missing, device=speech.device)
+            _speech = speech[indices]
+            _speech_lengths = speech_lengths[indices]
+            _speech = _speech[:, : _speech_lengths.max()]
+            with torch.no_grad():
+                feats, feats_lengths = frontend(_speech, _speech_lengths)
+            for i, f, lg in zip(missing, feats, feats_lengths.tolist()):
+                feats_list[i] = f[:lg]
+                self.put(utt_id[i], f[:lg].cpu().numpy())
+            self.flush()
+
+        feats_lengths = torch.tensor(
+            [len(f) for f in feats_list], dtype=torch.long, device=speech.device
+        )
+        return pad_list(feats_list, 0.0), feats_lengths
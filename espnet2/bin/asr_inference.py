@@ -196,24 +196,23 @@ class Speech2Text:
         )
         nbest_hyps = nbest_hyps[: self.nbest]
 
-        results = []
         for hyp in nbest_hyps:
             assert isinstance(hyp, Hypothesis), type(hyp)
 
-            # remove sos/eos and get results
-            token_int = hyp.yseq[1:-1].tolist()
+        # remove sos/eos and get results
+        token_ints = [hyp.yseq[1:-1].tolist() for hyp in nbest_hyps]
 
-            # remove blank symbol id, which is assumed to be 0
-            token_int = list(filter(lambda x: x != 0, token_int))
+        # remove blank symbol id, which is assumed to be 0
+        token_ints = [[x for x in token_int if x != 0] for token_int in token_ints]
 
-            # Change integer-ids to tokens
-            token = self.converter.ids2tokens(token_int)
+        # Change integer-ids to tokens for all hypotheses at once
+        tokens = self.converter.batch_ids2tokens(token_ints)
 
-            if self.tokenizer is not None:
-                text = self.tokenizer.tokens2text(token)
-            else:
-                text = None
-            results.append((text, token, token_int, hyp))
+        if self.tokenizer is not None:
+            texts = self.tokenizer.batch_tokens2text(tokens)
+        else:
+            texts = [None] * len(tokens)
+        results = list(zip(texts, tokens, token_ints, nbest_hyps))
 
         assert check_return_type(results)
         return results
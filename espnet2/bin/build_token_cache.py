@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+from pathlib import Path
+import sys
+from typing import Optional
+
+from typeguard import check_argument_types
+
+from espnet.utils.cli_utils import get_commandline_args
+from espnet2.train.preprocessor import CommonPreprocessor
+from espnet2.utils.types import str_or_none
+
+
+def build_token_cache(
+    input: str,
+    token_cache_path: str,
+    token_type: str,
+    token_list: str,
+    bpemodel: Optional[str],
+    non_linguistic_symbols: Optional[str],
+    cleaner: Optional[str],
+    g2p: Optional[str],
+    log_level: str,
+):
+    """Store the token ids of the text file to the database of --token_cache_path
+
+    The options of the text processing must be same as those given to
+    the training, e.g. asr_train.py, to share the cache.
+    """
+    assert check_argument_types()
+    logging.basicConfig(
+        level=log_level,
+        format="%(asctime)s (%(module)s:%(lineno)d) %(levelname)s: %(message)s",
+    )
+
+    preprocessor = CommonPreprocessor(
+        train=True,
+        token_type=token_type,
+        token_list=token_list,
+        bpemodel=bpemodel,
+        non_linguistic_symbols=non_linguistic_symbols,
+        text_cleaner=cleaner,
+        g2p_type=g2p,
+        token_cache_path=token_cache_path,
+    )
+
+    def _texts():
+        with Path(input).open("r", encoding="utf-8") as f:
+            for line in f:
+                # e.g. uttidA hello world -> hello world
+                sps = line.rstrip().split(maxsplit=1)
+                yield sps[1] if len(sps) == 2 else ""
+
+    count = preprocessor.precompute_token_cache(_texts())
+    logging.info(f"{count} texts are newly stored to {token_cache_path}")
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Precompute the token ids of texts for --token_cache_path",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--log_level",
+        type=lambda x: x.upper(),
+        default="INFO",
+        choices=("CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG", "NOTSET"),
+        help="The verbose level of logging",
+    )
+
+    parser.add_argument(
+        "--input", "-i", required=True, help="The text file, e.g. data/train/text"
+    )
+    parser.add_argument(
+        "--token_cache_path", required=True, help="The path of the database"
+    )
+    parser.add_argument(
+        "--token_type",
+        "-t",
+        default="char",
+        choices=["char", "bpe", "word", "phn"],
+        help="Token type",
+    )
+    parser.add_argument("--token_list", required=True, help="The token list file")
+    parser.add_argument("--bpemodel", type=str_or_none, help="The bpemodel file path")
+    parser.add_argument(
+        "--non_linguistic_symbols",
+        type=str_or_none,
+        help="non_linguistic_symbols file path",
+    )
+    parser.add_argument(
+        "--cleaner",
+        type=str_or_none,
+        choices=[None, "tacotron", "jaconv", "vietnamese"],
+        default=None,
+        help="Apply text cleaning",
+    )
+    parser.add_argument(
+        "--g2p",
+        type=str_or_none,
+        choices=[
+            None,
+            "g2p_en",
+            "g2p_en_no_space",
+            "pyopenjtalk",
+            "pyopenjtalk_kana",
+            "pyopenjtalk_accent",
+            "pyopenjtalk_accent_with_pause",
+            "pypinyin_g2p",
+            "pypinyin_g2p_phone",
+        ],
+        default=None,
+        help="Specify g2p method if --token_type=phn",
+    )
+    return parser
+
+
+def main(cmd=None):
+    print(get_commandline_args(), file=sys.stderr)
+    parser = get_parser()
+    args = parser.parse_args(cmd)
+    kwargs = vars(args)
+    build_token_cache(**kwargs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import sys
+from typing import Optional
+
+from typeguard import check_argument_types
+
+from espnet.utils.cli_utils import get_commandline_args
+from espnet2.bin.tokenize_text import open_text
+from espnet2.bin.tokenize_text import read_chunks
+from espnet2.fileio.token_corpus import TokenCorpusWriter
+from espnet2.train.preprocessor import CommonPreprocessor
+from espnet2.utils.types import str_or_none
+
+
+def build_token_corpus(
+    input: str,
+    output: str,
+    token_type: str,
+    token_list: str,
+    bpemodel: Optional[str],
+    non_linguistic_symbols: Optional[str],
+    cleaner: Optional[str],
+    g2p: Optional[str],
+    batch_size: int,
+    log_level: str,
+):
+    """Tokenize the text file and write the token ids as a binary corpus
+
+    The corpus is used for the packed language model training,
+    i.e. lm_train.py --iterator_type task.
+    """
+    assert check_argument_types()
+    logging.basicConfig(
+        level=log_level,
+        format="%(asctime)s (%(module)s:%(lineno)d) %(levelname)s: %(message)s",
+    )
+
+    preprocessor = CommonPreprocessor(
+        train=False,
+        token_type=token_type,
+        token_list=token_list,
+        bpemodel=bpemodel,
+        non_linguistic_symbols=non_linguistic_symbols,
+        text_cleaner=cleaner,
+        g2p_type=g2p,
+    )
+    vocab_size = preprocessor.token_id_converter.get_num_vocabulary_size()
+
+    with open_text(input) as fin, TokenCorpusWriter(output, vocab_size) as writer:
+        for lines in read_chunks(fin, batch_size):
+            # e.g. uttidA hello world -> hello world
+            texts = []
+            for line in lines:
+                sps = line.rstrip().split(maxsplit=1)
+                texts.append(sps[1] if len(sps) == 2 else "")
+            for ids in preprocessor.batch_text2ids(texts):
+                writer.write(ids)
+        logging.info(
+            f"{len(writer.offsets) - 1} sentences and {writer.num_tokens} tokens "
+            f"are written to {output}.bin"
+        )
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Write the token ids of texts as a binary corpus for LM",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--log_level",
+        type=lambda x: x.upper(),
+        default="INFO",
+        choices=("CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG", "NOTSET"),
+        help="The verbose level of logging",
+    )
+
+    parser.add_argument(
+        "--input",
+        "-i",
+        required=True,
+        help="The text file, e.g. data/train/text. - indicates sys.stdin. "
+        "The file compressed by gzip, bzip2, or xz is also accepted",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        required=True,
+        help="The prefix of the output files, "
+        "i.e. <output>.bin, <output>.offsets.npy, and <output>.yaml",
+    )
+    parser.add_argument(
+        "--token_type",
+        "-t",
+        default="bpe",
+        choices=["char", "bpe", "word", "phn"],
+        help="Token type",
+    )
+    parser.add_argument("--token_list", required=True, help="The token list file")
+    parser.add_argument("--bpemodel", type=str_or_none, help="The bpemodel file path")
+    parser.add_argument(
+        "--non_linguistic_symbols",
+        type=str_or_none,
+        help="non_linguistic_symbols file path",
+    )
+    parser.add_argument(
+        "--cleaner",
+        type=str_or_none,
+        choices=[None, "tacotron", "jaconv", "vietnamese"],
+        default=None,
+        help="Apply text cleaning",
+    )
+    parser.add_argument(
+        "--g2p",
+        type=str_or_none,
+        choices=[
+            None,
+            "g2p_en",
+            "g2p_en_no_space",
+            "pyopenjtalk",
+            "pyopenjtalk_kana",
+            "pyopenjtalk_accent",
+            "pyopenjtalk_accent_with_pause",
+            "pypinyin_g2p",
+            "pypinyin_g2p_phone",
+        ],
+        default=None,
+        help="Specify g2p method if --token_type=phn",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=1000,
+        help="The number of lines given to the tokenizer at once",
+    )
+    return parser
+
+
+def main(cmd=None):
+    print(get_commandline_args(), file=sys.stderr)
+    parser = get_parser()
+    args = parser.parse_args(cmd)
+    kwargs = vars(args)
+    build_token_corpus(**kwargs)
+
+
+if __name__ == "__main__":
+    main()
@@ -224,7 +224,9 @@ class Speech2Text:
         for idx, p in enumerate(perm):
             speech_spk = speech_pre[int(p)]
             # enc, _ = self.joint_model.encode(speech_spk, batch['speech_lengths'])
-            enc, _ = self.joint_model.asr_subclass.encode(speech_spk, speech_pre_lengths)
+            enc, _ = self.joint_model.asr_subclass.encode(
+                speech_spk, speech_pre_lengths
+            )
             assert len(enc) == 1, len(enc)
 
             # c. Passed the encoder result and the beam search
@@ -233,29 +235,33 @@ class Speech2Text:
             )
             nbest_hyps = nbest_hyps[: self.nbest]
 
-            results = []
             for hyp in nbest_hyps:
                 assert isinstance(hyp, Hypothesis), type(hyp)
 
-                # remove sos/eos and get results
-                token_int = hyp.yseq[1:-1].tolist()
+            # remove sos/eos and get results
+            token_ints = [hyp.yseq[1:-1].tolist() for hyp in nbest_hyps]
 
-                # remove blank symbol id, which is assumed to be 0
-                token_int = list(filter(lambda x: x != 0, token_int))
+            # remove blank symbol id, which is assumed to be 0
+            token_ints = [[x for x in t if x != 0] for t in token_ints]
 
-                # Change integer-ids to tokens
-                token = self.converter.ids2tokens(token_int)
+            # Change integer-ids to tokens for all hypotheses at once
+            tokens = self.converter.batch_ids2tokens(token_ints)
 
-                if self.tokenizer is not None:
-                    text = self.tokenizer.tokens2text(token)
-                else:
-                    text = None
-                if sdr is not None:
-                    sdr_rslt = float(sdr[idx])
-                else:
-                    sdr_rslt = None
+            if self.tokenizer is not None:
+                texts = self.tokenizer.batch_tokens2text(tokens)
+            else:
+                texts = [None] * len(tokens)
+            if sdr is not None:
+                sdr_rslt = float(sdr[idx])
+            else:
+                sdr_rslt = None
 
-                results.append((sdr_rslt, text, token, token_int, hyp))
+            results = [
+                (sdr_rslt, text, token, token_int, hyp)
+                for text, token, token_int, hyp in zip(
+                    texts, tokens, token_ints, nbest_hyps
+                )
+            ]
 
             results_list.append(results)
 
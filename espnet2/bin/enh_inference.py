@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 import argparse
+import contextlib
 import logging
 from pathlib import Path
 import sys
+from typing import Callable
+from typing import Iterator
 from typing import List
 from typing import Optional
 from typing import Sequence
@@ -11,11 +14,13 @@ from typing import Union
 
 import humanfriendly
 import numpy as np
+import soundfile
 import torch
 from tqdm import trange
 from typeguard import check_argument_types
 
 from espnet.utils.cli_utils import get_commandline_args
+from espnet2.fileio.read_text import read_2column_text
 from espnet2.fileio.sound_scp import SoundScpWriter
 from espnet2.tasks.enh import EnhancementTask
 from espnet2.torch_utils.device_funcs import to_device
@@ -53,6 +58,7 @@ class SeparateSpeech:
         normalize_output_wav: bool = False,
         device: str = "cpu",
         dtype: str = "float32",
+        segment_batch_size: int = 1,
     ):
         assert check_argument_types()
 
@@ -74,6 +80,8 @@ class SeparateSpeech:
         self.normalize_segment_scale = normalize_segment_scale
         self.normalize_output_wav = normalize_output_wav
         self.show_progressbar = show_progressbar
+        # The number of the segments processed at once
+        self.segment_batch_size = segment_batch_size
 
         self.num_spk = enh_model.num_spk
         task = "enhancement" if self.num_spk == 1 else "separation"
@@ -132,78 +140,15 @@ class SeparateSpeech:
 
         if self.segmenting and lengths[0] > self.segment_size * fs:
             # Segment-wise speech enhancement/separation
-            overlap_length = int(np.round(fs * (self.segment_size - self.hop_size)))
-            num_segments = int(
-                np.ceil((speech_mix.size(1) - overlap_length) / (self.hop_size * fs))
-            )
-            t = T = int(self.segment_size * fs)
-            pad_shape = speech_mix[:, :T].shape
-            enh_waves = []
-            range_ = trange if self.show_progressbar else range
-            for i in range_(num_segments):
-                st = int(i * self.hop_size * fs)
-                en = st + T
-                if en >= lengths[0]:
-                    # en - st < T (last segment)
-                    en = lengths[0]
-                    speech_seg = speech_mix.new_zeros(pad_shape)
-                    t = en - st
-                    speech_seg[:, :t] = speech_mix[:, st:en]
-                else:
-                    t = T
-                    speech_seg = speech_mix[:, st:en]  # B x T [x C]
-
-                lengths_seg = speech_mix.new_full(
-                    [batch_size], dtype=torch.long, fill_value=T
-                )
-                # b. Enhancement/Separation Forward
-                feats, f_lens = self.enh_model.encoder(speech_seg, lengths_seg)
-                feats, _, _ = self.enh_model.separator(feats, f_lens)
-                processed_wav = [
-                    self.enh_model.decoder(f, lengths_seg)[0] for f in feats
-                ]
-                if speech_seg.dim() > 2:
-                    # multi-channel speech
-                    speech_seg_ = speech_seg[:, self.ref_channel]
-                else:
-                    speech_seg_ = speech_seg
-
-                if self.normalize_segment_scale:
-                    # normalize the energy of each separated stream
-                    # to match the input energy
-                    processed_wav = [
-                        self.normalize_scale(w, speech_seg_) for w in processed_wav
-                    ]
-                # List[torch.Tensor(num_spk, B, T)]
-                enh_waves.append(torch.stack(processed_wav, dim=0))
-
-            # c. Stitch the enhanced segments together
-            waves = enh_waves[0]
-            for i in range(1, num_segments):
-                # permutation between separated streams in last and current segments
-                perm = self.cal_permumation(
-                    waves[:, :, -overlap_length:],
-                    enh_waves[i][:, :, :overlap_length],
-                    criterion="si_snr",
-                )
-                # repermute separated streams in current segment
-                for batch in range(batch_size):
-                    enh_waves[i][:, batch] = enh_waves[i][perm[batch], batch]
-
-                if i == num_segments - 1:
-                    enh_waves[i][:, :, t:] = 0
-                    enh_waves_res_i = enh_waves[i][:, :, overlap_length:t]
-                else:
-                    enh_waves_res_i = enh_waves[i][:, :, overlap_length:]
-
-                # overlap-and-add (average over the overlapped part)
-                waves[:, :, -overlap_length:] = (
-                    waves[:, :, -overlap_length:] + enh_waves[i][:, :, :overlap_length]
-                ) / 2
-                # concatenate the residual parts of the later segment
-                waves = torch.cat([waves, enh_waves_res_i], dim=2)
+            waves = speech_mix.new_zeros(self.num_spk, batch_size, speech_mix.size(1))
+            offset = 0
+            for block in self._iter_segment_wise(
+                lambda st, en: speech_mix[:, st:en], speech_mix.size(1), fs
+            ):
+                waves[:, :, offset : offset + block.size(2)] = block
+                offset += block.size(2)
             # ensure the stitched length is same as input
-            assert waves.size(2) == speech_mix.size(1), (waves.shape, speech_mix.shape)
+            assert offset == speech_mix.size(1), (offset, speech_mix.shape)
             waves = torch.unbind(waves, dim=0)
         else:
             # b. Enhancement/Separation Forward
@@ -223,6 +168,219 @@ class SeparateSpeech:
 
         return waves
 
+    @torch.no_grad()
+    def separate_blocks(
+        self,
+        read: Callable[[int, int], Union[torch.Tensor, np.ndarray]],
+        num_samples: int,
+        fs: int = 8000,
+    ) -> Iterator[List[np.ndarray]]:
+        """Perform segment-wise inference reading and yielding the blocks.
+
+        The input is read segment by segment and the separated signals are
+        yielded as soon as all the segments overlapping them are processed,
+        so that the memory doesn't depend on the length of the input,
+        e.g. for hour-long recordings.
+
+        Examples:
+            >>> with soundfile.SoundFile("long.wav") as f:
+            ...     def read(start, end):
+            ...         f.seek(start)
+            ...         return f.read(end - start)[None]
+            ...     for waves in separate_speech.separate_blocks(read, f.frames):
+            ...         play(waves[0][0])
+
+        Args:
+            read: Function returning the input samples in [start, end)
+                (Batch, end - start [, Channels]). "end" can exceed num_samples,
+                and then the samples until num_samples are returned.
+            num_samples: The number of the samples of the input
+            fs: sample rate
+        Yields:
+            [separated_audio1, separated_audio2, ...] following the previous block
+        """
+        assert check_argument_types()
+        if not self.segmenting:
+            raise RuntimeError("separate_blocks() requires segment_size and hop_size")
+        if self.normalize_output_wav:
+            raise RuntimeError(
+                "normalize_output_wav can't be used with separate_blocks(): "
+                "The maximum of the whole output is unknown"
+            )
+
+        def _read(start: int, end: int) -> torch.Tensor:
+            speech = torch.as_tensor(read(start, end))
+            speech = speech.to(getattr(torch, self.dtype))
+            return to_device(speech, device=self.device)
+
+        for block in self._iter_segment_wise(_read, num_samples, fs):
+            yield [w.cpu().numpy() for w in block]
+
+    def _iter_segment_wise(
+        self,
+        read: Callable[[int, int], torch.Tensor],
+        num_samples: int,
+        fs: int,
+    ) -> Iterator[torch.Tensor]:
+        """Separate the input segment by segment and yield the stitched outputs.
+
+        The segments are processed as mini-batches of "segment_batch_size",
+        and their outputs are overlap-added, i.e. averaged over the overlapped
+        segments, into the buffer spanning only the current mini-batch.
+        The permutation of the separated streams is aligned
+        between the adjacent segments of the mini-batch at once.
+
+        Args:
+            read: Function returning the input samples in [start, end)
+                (Batch, end - start [, Channels]) on the device
+            num_samples: The number of the samples of the input
+            fs: sample rate
+        Yields:
+            torch.Tensor: The separated samples (num_spk, Batch, n)
+                following the previous ones. The total length is num_samples.
+        """
+        segment_length = int(self.segment_size * fs)
+        overlap_length = int(np.round(fs * (self.segment_size - self.hop_size)))
+        hop_length = segment_length - overlap_length
+        num_segments = int(np.ceil((num_samples - overlap_length) / hop_length))
+
+        # The overlap-added outputs not yielded yet, from buffer_start:
+        # (num_spk, Batch, n), and the number of the added segments (n,)
+        buffer, counts, buffer_start = None, None, 0
+        # The raw outputs of the last segment and its permutation (Batch, num_spk)
+        prev_enh, prev_perm = None, None
+        range_ = trange if self.show_progressbar else range
+        for i in range_(0, num_segments, self.segment_batch_size):
+            starts = [
+                j * hop_length
+                for j in range(i, min(i + self.segment_batch_size, num_segments))
+            ]
+            segments = []
+            for st in starts:
+                speech_seg = read(st, min(st + segment_length, num_samples))
+                if speech_seg.size(1) < segment_length:
+                    # Pad the last segment with zeros
+                    pad_shape = list(speech_seg.shape)
+                    pad_shape[1] = segment_length - speech_seg.size(1)
+                    speech_seg = torch.cat(
+                        [speech_seg, speech_seg.new_zeros(pad_shape)], dim=1
+                    )
+                segments.append(speech_seg)
+            batch_size = segments[0].size(0)
+            # (n_seg * Batch, segment_length [, Channels])
+            speech_seg = torch.cat(segments, dim=0)
+            lengths_seg = speech_seg.new_full(
+                [speech_seg.size(0)], dtype=torch.long, fill_value=segment_length
+            )
+
+            # b. Enhancement/Separation Forward
+            feats, f_lens = self.enh_model.encoder(speech_seg, lengths_seg)
+            feats, _, _ = self.enh_model.separator(feats, f_lens)
+            processed_wav = [self.enh_model.decoder(f, lengths_seg)[0] for f in feats]
+            if self.normalize_segment_scale:
+                # normalize the energy of each separated stream
+                # to match the input energy
+                if speech_seg.dim() > 2:
+                    # multi-channel speech
+                    speech_seg = speech_seg[..., self.ref_channel]
+                processed_wav = [
+                    self.normalize_scale(w, speech_seg) for w in processed_wav
+                ]
+            # (num_spk, n_seg, Batch, segment_length)
+            enh = torch.stack(processed_wav, dim=0).view(
+                self.num_spk, len(starts), batch_size, segment_length
+            )
+
+            # c. Align the permutations of the segments
+            perms = self._align_permutations(
+                enh, prev_enh, prev_perm, hop_length, overlap_length
+            )
+            prev_enh, prev_perm = enh[:, -1], perms[-1]
+            # (num_spk, n_seg, Batch, segment_length)
+            index = perms.permute(2, 0, 1).unsqueeze(-1).expand_as(enh)
+            enh = enh.gather(0, index)
+
+            # d. Overlap-add into the buffer
+            end = min(starts[-1] + segment_length, num_samples)
+            new_buffer = enh.new_zeros(self.num_spk, batch_size, end - buffer_start)
+            new_counts = enh.new_zeros(end - buffer_start)
+            if buffer is not None:
+                new_buffer[:, :, : buffer.size(2)] = buffer
+                new_counts[: counts.size(0)] = counts
+            buffer, counts = new_buffer, new_counts
+            for k, st in enumerate(starts):
+                t = min(segment_length, num_samples - st)
+                buffer[:, :, st - buffer_start : st - buffer_start + t] += enh[
+                    :, k, :, :t
+                ]
+                counts[st - buffer_start : st - buffer_start + t] += 1
+
+            # e. Yield the samples which the following segments don't overlap
+            if i + len(starts) < num_segments:
+                n = starts[-1] + hop_length - buffer_start
+            else:
+                n = buffer.size(2)
+            yield buffer[:, :, :n] / counts[:n]
+            buffer, counts = buffer[:, :, n:], counts[n:]
+            buffer_start += n
+
+    def _align_permutations(
+        self,
+        enh: torch.Tensor,
+        prev_enh: Optional[torch.Tensor],
+        prev_perm: Optional[torch.Tensor],
+        hop_length: int,
+        overlap_length: int,
+    ) -> torch.Tensor:
+        """Calculate the permutations of the segments to align with the previous ones.
+
+        The permutations between all the adjacent segments are calculated
+        at once as a batch, and then composed from the first segment.
+
+        Args:
+            enh (torch.Tensor): The outputs of the segments
+                (num_spk, n_seg, Batch, segment_length)
+            prev_enh (torch.Tensor): The outputs of the previous segment
+                (num_spk, Batch, segment_length) or None for the first segment
+            prev_perm (torch.Tensor): The permutation of the previous segment
+                (Batch, num_spk) or None for the first segment
+        Returns:
+            perms (torch.Tensor): The permutations for the segments
+                (n_seg, Batch, num_spk), i.e. enh[perms[i, b, s], i, b]
+                is the s-th stream of the i-th segment.
+        """
+        num_spk, _, batch_size, _ = enh.shape
+        if prev_enh is None:
+            # The first segment is the reference
+            perm = torch.arange(num_spk, device=enh.device).repeat(batch_size, 1)
+            perms = [perm]
+        else:
+            perm = prev_perm
+            perms = []
+            enh = torch.cat([prev_enh.unsqueeze(1), enh], dim=1)
+        if enh.size(1) == 1:
+            return torch.stack(perms, dim=0)
+
+        if overlap_length > 0:
+            # permutation between separated streams in last and current segments:
+            # (num_spk, n_pair * Batch, overlap_length) -> (n_pair, Batch, num_spk)
+            tails = enh[:, :-1, :, hop_length:].reshape(num_spk, -1, overlap_length)
+            heads = enh[:, 1:, :, :overlap_length].reshape(num_spk, -1, overlap_length)
+            pair_perms = self.cal_permumation(
+                list(tails), list(heads), criterion="si_snr"
+            ).view(-1, batch_size, num_spk)
+        else:
+            # No overlapped part to compare
+            pair_perms = perm.new_tensor(range(num_spk)).expand(
+                enh.size(1) - 1, batch_size, num_spk
+            )
+        for pair_perm in pair_perms:
+            # The s-th stream of the previous segment is matched with
+            # the pair_perm[s]-th stream of the next segment
+            perm = torch.gather(pair_perm, 1, perm)
+            perms.append(perm)
+        return torch.stack(perms, dim=0)
+
     @staticmethod
     @torch.no_grad()
     def normalize_scale(enh_wav, ref_ch_wav):
@@ -288,10 +446,16 @@ def inference(
     show_progressbar: bool,
     ref_channel: Optional[int],
     normalize_output_wav: bool,
+    segment_batch_size: int = 1,
+    block_io: bool = False,
 ):
     assert check_argument_types()
     if batch_size > 1:
         raise NotImplementedError("batch decoding is not implemented")
+    if block_io and (segment_size is None or hop_size is None):
+        raise ValueError("--block_io requires --segment_size and --hop_size")
+    if block_io and normalize_output_wav:
+        raise ValueError("--block_io can't be used with --normalize_output_wav")
     if ngpu > 1:
         raise NotImplementedError("only single GPU decoding is supported")
 
@@ -320,8 +484,20 @@ def inference(
         normalize_output_wav=normalize_output_wav,
         device=device,
         dtype=dtype,
+        segment_batch_size=segment_batch_size,
     )
 
+    if block_io:
+        # 3-4. Read and write the recordings block by block
+        _inference_block_io(
+            separate_speech,
+            output_dir,
+            fs,
+            data_path_and_name_and_type,
+            key_file,
+        )
+        return
+
     # 3. Build data-iterator
     loader = EnhancementTask.build_streaming_iterator(
         data_path_and_name_and_type,
@@ -362,6 +538,58 @@ def inference(
         writer.close()
 
 
+def _inference_block_io(
+    separate_speech: SeparateSpeech,
+    output_dir: str,
+    fs: int,
+    data_path_and_name_and_type: Sequence[Tuple[str, str, str]],
+    key_file: Optional[str],
+):
+    """Separate the recordings reading and writing the wav files block by block.
+
+    The recordings longer than the segment are not loaded on memory at once,
+    so that the memory doesn't depend on their lengths.
+    """
+    for path, name, _type in data_path_and_name_and_type:
+        if name == "speech_mix":
+            if _type != "sound":
+                raise RuntimeError(f"--block_io supports only sound type: {_type}")
+            break
+    else:
+        raise RuntimeError("speech_mix is not given")
+    wav_scp = read_2column_text(path)
+    keys = list(read_2column_text(key_file)) if key_file is not None else wav_scp
+
+    writers = []
+    for i in range(separate_speech.num_spk):
+        writers.append(
+            SoundScpWriter(f"{output_dir}/wavs/{i + 1}", f"{output_dir}/spk{i + 1}.scp")
+        )
+
+    for key in keys:
+        with soundfile.SoundFile(wav_scp[key]) as f:
+            if f.frames <= separate_speech.segment_size * fs:
+                # NOTE: The audio signal is normalized to [-1,1] as the data-loader
+                speech_mix = f.read(dtype="float64")[None]
+                waves = separate_speech(speech_mix, fs=fs)
+                for (spk, w) in enumerate(waves):
+                    writers[spk][key] = fs, w[0]
+                continue
+
+            def read(start: int, end: int) -> np.ndarray:
+                f.seek(start)
+                return f.read(end - start, dtype="float64")[None]
+
+            with contextlib.ExitStack() as stack:
+                fouts = [stack.enter_context(w.open(key, fs)) for w in writers]
+                for waves in separate_speech.separate_blocks(read, f.frames, fs):
+                    for fout, w in zip(fouts, waves):
+                        fout.write(w[0])
+
+    for writer in writers:
+        writer.close()
+
+
 def get_parser():
     parser = config_argparse.ArgumentParser(
         description="Frontend inference",
@@ -457,6 +685,21 @@ def get_parser():
         help="Whether to show a progress bar when performing segment-wise speech "
         "enhancement/separation",
     )
+    group.add_argument(
+        "--segment_batch_size",
+        type=int,
+        default=1,
+        help="The number of the segments processed at once "
+        "in segment-wise speech enhancement/separation",
+    )
+    group.add_argument(
+        "--block_io",
+        type=str2bool,
+        default=False,
+        help="Whether to read and write the recordings longer than --segment_size "
+        "block by block instead of loading them at once. "
+        "Only the sound type is supported for speech_mix",
+    )
     group.add_argument(
         "--ref_channel",
         type=int,
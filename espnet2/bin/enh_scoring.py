@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 import logging
+import multiprocessing
 import sys
+from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Tuple
 from typing import Union
 
 from mir_eval.separation import bss_eval_sources
@@ -16,6 +21,90 @@ from espnet2.enh.espnet_model import ESPnetEnhancementModel
 from espnet2.fileio.datadir_writer import DatadirWriter
 from espnet2.fileio.sound_scp import SoundScpReader
 from espnet2.utils import config_argparse
+from espnet2.utils.ordered_map import ordered_map
+
+
+class ChunkScorer:
+    """Compute the scores of the chunks of the keys
+
+    Args:
+        ref_scp: The scp files of the references for each speaker
+        inf_scp: The scp files of the enhanced speech for each speaker
+        dtype: Data type
+        ref_channel: The channel used for the multi-channel audio
+    """
+
+    def __init__(
+        self, ref_scp: List[str], inf_scp: List[str], dtype: str, ref_channel: int
+    ):
+        assert check_argument_types()
+        assert len(ref_scp) == len(inf_scp), ref_scp
+        self.num_spk = len(ref_scp)
+        self.ref_channel = ref_channel
+        self.ref_readers = [
+            SoundScpReader(f, dtype=dtype, normalize=True) for f in ref_scp
+        ]
+        self.inf_readers = [
+            SoundScpReader(f, dtype=dtype, normalize=True) for f in inf_scp
+        ]
+
+    def __call__(self, keys: List[str]) -> List[Tuple[str, Dict[str, str]]]:
+        return [(key, self.score(key)) for key in keys]
+
+    def score(self, key: str) -> Dict[str, str]:
+        # Each file is read only once
+        ref_rates, ref_audios = zip(*[r[key] for r in self.ref_readers])
+        _, inf_audios = zip(*[r[key] for r in self.inf_readers])
+        sample_rate = ref_rates[0]
+        ref = np.array(ref_audios)
+        inf = np.array(inf_audios)
+        if ref.ndim > inf.ndim:
+            # multi-channel reference and single-channel output
+            ref = ref[..., self.ref_channel]
+            assert ref.shape == inf.shape, (ref.shape, inf.shape)
+        elif ref.ndim < inf.ndim:
+            # single-channel reference and multi-channel output
+            raise ValueError(
+                "Reference must be multi-channel when the \
+                network output is multi-channel."
+            )
+        elif ref.ndim == inf.ndim == 3:
+            # multi-channel reference and output
+            ref = ref[..., self.ref_channel]
+            inf = inf[..., self.ref_channel]
+
+        sdr, sir, sar, perm = bss_eval_sources(ref, inf, compute_permutation=True)
+        perm = [int(p) for p in perm]
+
+        # SI-SNR of all the speakers at once: (num_spk,)
+        si_snr = -ESPnetEnhancementModel.si_snr_loss(
+            torch.from_numpy(ref), torch.from_numpy(inf[perm])
+        )
+
+        scores = {}
+        for i in range(self.num_spk):
+            stoi_score = stoi(ref[i], inf[perm[i]], fs_sig=sample_rate)
+            scores[f"STOI_spk{i + 1}"] = str(stoi_score)
+            scores[f"SI_SNR_spk{i + 1}"] = str(float(si_snr[i]))
+            scores[f"SDR_spk{i + 1}"] = str(sdr[i])
+            scores[f"SAR_spk{i + 1}"] = str(sar[i])
+            scores[f"SIR_spk{i + 1}"] = str(sir[i])
+            # save permutation assigned script file
+            scores[f"wav_spk{i + 1}"] = self.inf_readers[perm[i]].data[key]
+        return scores
+
+
+# The instance of ChunkScorer in the worker process
+_chunk_scorer: Optional[ChunkScorer] = None
+
+
+def _init_worker(kwargs: dict):
+    global _chunk_scorer
+    _chunk_scorer = ChunkScorer(**kwargs)
+
+
+def _score_chunk(keys: List[str]) -> List[Tuple[str, Dict[str, str]]]:
+    return _chunk_scorer(keys)
 
 
 def scoring(
@@ -26,6 +115,8 @@ def scoring(
     ref_scp: List[str],
     inf_scp: List[str],
     ref_channel: int,
+    batch_size: int = 10,
+    nj: int = 1,
 ):
     assert check_argument_types()
 
@@ -35,60 +126,43 @@ def scoring(
     )
 
     assert len(ref_scp) == len(inf_scp), ref_scp
-    num_spk = len(ref_scp)
 
     keys = [
         line.rstrip().split(maxsplit=1)[0] for line in open(key_file, encoding="utf-8")
     ]
 
-    ref_readers = [SoundScpReader(f, dtype=dtype, normalize=True) for f in ref_scp]
-    inf_readers = [SoundScpReader(f, dtype=dtype, normalize=True) for f in inf_scp]
-
-    # get sample rate
-    sample_rate, _ = ref_readers[0][keys[0]]
+    kwargs = dict(
+        ref_scp=ref_scp, inf_scp=inf_scp, dtype=dtype, ref_channel=ref_channel
+    )
+    chunk_scorer = ChunkScorer(**kwargs)
 
     # check keys
-    for inf_reader, ref_reader in zip(inf_readers, ref_readers):
+    for inf_reader, ref_reader in zip(
+        chunk_scorer.inf_readers, chunk_scorer.ref_readers
+    ):
         assert inf_reader.keys() == ref_reader.keys()
 
+    chunks = [keys[i : i + batch_size] for i in range(0, len(keys), batch_size)]
     with DatadirWriter(output_dir) as writer:
-        for key in keys:
-            ref_audios = [ref_reader[key][1] for ref_reader in ref_readers]
-            inf_audios = [inf_reader[key][1] for inf_reader in inf_readers]
-            ref = np.array(ref_audios)
-            inf = np.array(inf_audios)
-            if ref.ndim > inf.ndim:
-                # multi-channel reference and single-channel output
-                ref = ref[..., ref_channel]
-                assert ref.shape == inf.shape, (ref.shape, inf.shape)
-            elif ref.ndim < inf.ndim:
-                # single-channel reference and multi-channel output
-                raise ValueError(
-                    "Reference must be multi-channel when the \
-                    network output is multi-channel."
-                )
-            elif ref.ndim == inf.ndim == 3:
-                # multi-channel reference and output
-                ref = ref[..., ref_channel]
-                inf = inf[..., ref_channel]
-
-            sdr, sir, sar, perm = bss_eval_sources(ref, inf, compute_permutation=True)
-
-            for i in range(num_spk):
-                stoi_score = stoi(ref[i], inf[int(perm[i])], fs_sig=sample_rate)
-                si_snr_score = -float(
-                    ESPnetEnhancementModel.si_snr_loss(
-                        torch.from_numpy(ref[i][None, ...]),
-                        torch.from_numpy(inf[int(perm[i])][None, ...]),
-                    )
-                )
-                writer[f"STOI_spk{i + 1}"][key] = str(stoi_score)
-                writer[f"SI_SNR_spk{i + 1}"][key] = str(si_snr_score)
-                writer[f"SDR_spk{i + 1}"][key] = str(sdr[i])
-                writer[f"SAR_spk{i + 1}"][key] = str(sar[i])
-                writer[f"SIR_spk{i + 1}"][key] = str(sir[i])
-                # save permutation assigned script file
-                writer[f"wav_spk{i + 1}"][key] = inf_readers[perm[i]].data[key]
+
+        def _write(results: List[Tuple[str, Dict[str, str]]]):
+            for key, scores in results:
+                for name, value in scores.items():
+                    writer[name][key] = value
+
+        if nj <= 1:
+            for chunk in chunks:
+                _write(chunk_scorer(chunk))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=nj,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(kwargs,),
+            ) as e:
+                # Keep the order of the keys
+                for results in ordered_map(e, _score_chunk, chunks, 2 * nj):
+                    _write(results)
 
 
 def get_parser():
@@ -133,6 +207,21 @@ def get_parser():
     group.add_argument("--key_file", type=str)
     group.add_argument("--ref_channel", type=int, default=0)
 
+    group = parser.add_argument_group("Parallel scoring related")
+    group.add_argument(
+        "--batch_size",
+        type=int,
+        default=10,
+        help="The number of the utterances given to a process at once",
+    )
+    group.add_argument(
+        "--nj",
+        type=int,
+        default=1,
+        help="The number of the processes to compute the scores in parallel. "
+        "The order of the keys is kept",
+    )
+
     return parser
 
 
@@ -1,17 +1,27 @@
 #!/usr/bin/env python3
 import argparse
+import bz2
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import gzip
 import logging
+import lzma
+import multiprocessing
 from pathlib import Path
 import sys
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import TextIO
+from typing import Union
 
 from typeguard import check_argument_types
 
 from espnet.utils.cli_utils import get_commandline_args
 from espnet2.text.build_tokenizer import build_tokenizer
 from espnet2.text.cleaner import TextCleaner
+from espnet2.utils.ordered_map import ordered_map
 from espnet2.utils.types import str2bool
 from espnet2.utils.types import str_or_none
 
@@ -60,6 +70,92 @@ def field2slice(field: Optional[str]) -> slice:
     return slic
 
 
+def open_text(path: str) -> TextIO:
+    """Open the text file for reading, which can be compressed by gzip/bz2/xz"""
+    if path == "-":
+        return sys.stdin
+    suffix = Path(path).suffix
+    if suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    elif suffix == ".bz2":
+        return bz2.open(path, "rt", encoding="utf-8")
+    elif suffix in (".xz", ".lzma"):
+        return lzma.open(path, "rt", encoding="utf-8")
+    else:
+        return Path(path).open("r", encoding="utf-8")
+
+
+def read_chunks(fin: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Yield the lines of the file by "chunk_size" lines"""
+    chunk = []
+    for line in fin:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if len(chunk) != 0:
+        yield chunk
+
+
+class ChunkTokenizer:
+    """Tokenize a chunk of the lines of the input text
+
+    Returns the tokenized text of the chunk, or the counts of the tokens
+    in the chunk if write_vocabulary=True.
+    """
+
+    def __init__(
+        self,
+        field: Optional[str],
+        delimiter: Optional[str],
+        write_vocabulary: bool,
+        cleaner: Optional[str],
+        **tokenizer_kwargs,
+    ):
+        self.field = field2slice(field) if field is not None else None
+        self.delimiter = delimiter
+        self.write_vocabulary = write_vocabulary
+        self.cleaner = TextCleaner(cleaner)
+        self.tokenizer = build_tokenizer(delimiter=delimiter, **tokenizer_kwargs)
+
+    def __call__(self, lines: List[str]) -> Union[str, Counter]:
+        texts = []
+        for line in lines:
+            line = line.rstrip()
+            if self.field is not None:
+                # e.g. field="2-"
+                # uttidA hello world!! -> hello world!!
+                tokens = line.split(self.delimiter)
+                tokens = tokens[self.field]
+                if self.delimiter is None:
+                    line = " ".join(tokens)
+                else:
+                    line = self.delimiter.join(tokens)
+            texts.append(self.cleaner(line))
+
+        tokens_list = self.tokenizer.batch_text2tokens(texts)
+        if self.write_vocabulary:
+            counter = Counter()
+            for tokens in tokens_list:
+                counter.update(tokens)
+            return counter
+        else:
+            return "".join(" ".join(tokens) + "\n" for tokens in tokens_list)
+
+
+# The instance of ChunkTokenizer in the worker process
+_chunk_tokenizer: Optional[ChunkTokenizer] = None
+
+
+def _init_worker(kwargs: dict):
+    global _chunk_tokenizer
+    _chunk_tokenizer = ChunkTokenizer(**kwargs)
+
+
+def _tokenize_chunk(lines: List[str]) -> Union[str, Counter]:
+    return _chunk_tokenizer(lines)
+
+
 def tokenize(
     input: str,
     output: str,
@@ -77,6 +173,8 @@ def tokenize(
     add_symbol: List[str],
     cleaner: Optional[str],
     g2p: Optional[str],
+    batch_size: int = 1000,
+    nj: int = 1,
 ):
     assert check_argument_types()
 
@@ -84,10 +182,7 @@ def tokenize(
         level=log_level,
         format="%(asctime)s (%(module)s:%(lineno)d) %(levelname)s: %(message)s",
     )
-    if input == "-":
-        fin = sys.stdin
-    else:
-        fin = Path(input).open("r", encoding="utf-8")
+    fin = open_text(input)
     if output == "-":
         fout = sys.stdout
     else:
@@ -95,40 +190,43 @@ def tokenize(
         p.parent.mkdir(parents=True, exist_ok=True)
         fout = p.open("w", encoding="utf-8")
 
-    cleaner = TextCleaner(cleaner)
-    tokenizer = build_tokenizer(
+    kwargs = dict(
+        field=field,
+        delimiter=delimiter,
+        write_vocabulary=write_vocabulary,
+        cleaner=cleaner,
         token_type=token_type,
         bpemodel=bpemodel,
-        delimiter=delimiter,
         space_symbol=space_symbol,
         non_linguistic_symbols=non_linguistic_symbols,
         remove_non_linguistic_symbols=remove_non_linguistic_symbols,
         g2p_type=g2p,
     )
-
     counter = Counter()
-    if field is not None:
-        field = field2slice(field)
-
-    for line in fin:
-        line = line.rstrip()
-        if field is not None:
-            # e.g. field="2-"
-            # uttidA hello world!! -> hello world!!
-            tokens = line.split(delimiter)
-            tokens = tokens[field]
-            if delimiter is None:
-                line = " ".join(tokens)
-            else:
-                line = delimiter.join(tokens)
 
-        line = cleaner(line)
-        tokens = tokenizer.text2tokens(line)
-        if not write_vocabulary:
-            fout.write(" ".join(tokens) + "\n")
+    def _write(result: Union[str, Counter]):
+        if write_vocabulary:
+            counter.update(result)
         else:
-            for t in tokens:
-                counter[t] += 1
+            fout.write(result)
+
+    chunks = read_chunks(fin, batch_size)
+    if nj <= 1:
+        chunk_tokenizer = ChunkTokenizer(**kwargs)
+        for chunk in chunks:
+            _write(chunk_tokenizer(chunk))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=nj,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(kwargs,),
+        ) as e:
+            # Keep the order of the outputs
+            for result in ordered_map(e, _tokenize_chunk, chunks, 2 * nj):
+                _write(result)
+    if fin is not sys.stdin:
+        fin.close()
 
     if not write_vocabulary:
         return
@@ -185,7 +283,12 @@ def get_parser() -> argparse.ArgumentParser:
     )
 
     parser.add_argument(
-        "--input", "-i", required=True, help="Input text. - indicates sys.stdin"
+        "--input",
+        "-i",
+        required=True,
+        help="Input text. - indicates sys.stdin. "
+        "The file compressed by gzip, bzip2, or xz is also accepted "
+        "according to the suffix, i.e. .gz, .bz2, or .xz",
     )
     parser.add_argument(
         "--output", "-o", required=True, help="Output text. - indicates sys.stdout"
@@ -240,6 +343,20 @@ def get_parser() -> argparse.ArgumentParser:
         default=None,
         help="Specify g2p method if --token_type=phn",
     )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=1000,
+        help="The number of lines given to the tokenizer at once. "
+        "This is also the unit of the work of the parallel jobs",
+    )
+    parser.add_argument(
+        "--nj",
+        type=int,
+        default=1,
+        help="The number of the processes to tokenize the chunks in parallel. "
+        "The order of the output lines is kept",
+    )
 
     group = parser.add_argument_group("write_vocabulary mode related")
     group.add_argument(
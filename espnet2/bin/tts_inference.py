@@ -3,36 +3,39 @@
 """TTS mode decoding."""
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import functools
+import itertools
 import logging
+import multiprocessing
 from pathlib import Path
 import shutil
 import sys
 import time
+from typing import Dict
+from typing import Iterator
+from typing import List
 from typing import Optional
 from typing import Sequence
 from typing import Tuple
 from typing import Union
 
-import matplotlib
 import numpy as np
 import soundfile as sf
 import torch
 from typeguard import check_argument_types
 
+from espnet.nets.pytorch_backend.nets_utils import pad_list
 from espnet.utils.cli_utils import get_commandline_args
-from espnet2.fileio.npy_scp import NpyScpWriter
 from espnet2.tasks.tts import TTSTask
 from espnet2.torch_utils.device_funcs import to_device
 from espnet2.torch_utils.set_all_random_seed import set_all_random_seed
-from espnet2.tts.duration_calculator import DurationCalculator
-from espnet2.tts.fastspeech import FastSpeech
-from espnet2.tts.fastspeech2 import FastSpeech2
-from espnet2.tts.tacotron2 import Tacotron2
-from espnet2.tts.transformer import Transformer
 from espnet2.utils import config_argparse
 from espnet2.utils.get_default_kwargs import get_default_kwargs
 from espnet2.utils.griffin_lim import Spectrogram2Waveform
 from espnet2.utils.nested_dict_action import NestedDictAction
+from espnet2.utils.ordered_map import ordered_map
 from espnet2.utils.types import str2bool
 from espnet2.utils.types import str2triple_str
 from espnet2.utils.types import str_or_none
@@ -60,12 +63,21 @@ class Text2Speech:
         use_att_constraint: bool = False,
         backward_window: int = 1,
         forward_window: int = 3,
+        windowed_att_constraint: bool = False,
         speed_control_alpha: float = 1.0,
         vocoder_conf: dict = None,
         dtype: str = "float32",
         device: str = "cpu",
+        return_att_ws: bool = True,
     ):
         assert check_argument_types()
+        # NOTE: Imported here not to import the models of the other types
+        # and their dependencies, e.g. matplotlib, before the model is built
+        from espnet2.tts.duration_calculator import DurationCalculator
+        from espnet2.tts.fastspeech import FastSpeech
+        from espnet2.tts.fastspeech2 import FastSpeech2
+        from espnet2.tts.tacotron2 import Tacotron2
+        from espnet2.tts.transformer import Transformer
 
         model, train_args = TTSTask.build_model_from_file(
             train_config, model_file, device
@@ -100,8 +112,12 @@ class Text2Speech:
                     "use_att_constraint": use_att_constraint,
                     "forward_window": forward_window,
                     "backward_window": backward_window,
+                    "windowed_att_constraint": windowed_att_constraint,
                 }
             )
+        if isinstance(self.tts, Transformer):
+            # NOTE: The attention weights are used for the durations as well
+            decode_config.update({"return_att_ws": return_att_ws})
         if isinstance(self.tts, (FastSpeech, FastSpeech2)):
             decode_config.update({"alpha": speed_control_alpha})
         decode_config.update({"use_teacher_forcing": use_teacher_forcing})
@@ -132,7 +148,59 @@ class Text2Speech:
         spembs: Union[torch.Tensor, np.ndarray] = None,
     ):
         assert check_argument_types()
+        batch = self._make_batch(text, speech, durations, spembs)
+        outs, outs_denorm, probs, att_ws = self.model.inference(
+            **batch, **self.decode_config
+        )
+
+        if att_ws is not None:
+            duration, focus_rate = self.duration_calculator(att_ws)
+        else:
+            duration, focus_rate = None, None
+
+        if self.spc2wav is not None:
+            wav = self.spc2wav(outs_denorm).cpu()
+        else:
+            wav = None
+
+        return wav, outs, outs_denorm, probs, att_ws, duration, focus_rate
+
+    @torch.no_grad()
+    def stream(
+        self,
+        text: Union[str, torch.Tensor, np.ndarray],
+        speech: Union[torch.Tensor, np.ndarray] = None,
+        durations: Union[torch.Tensor, np.ndarray] = None,
+        spembs: Union[torch.Tensor, np.ndarray] = None,
+        chunk_size: int = 20,
+    ) -> Iterator[torch.Tensor]:
+        """Synthesize the waveform and yield it chunk by chunk.
+
+        The features are converted to the waveform every "chunk_size" frames
+        by Spectrogram2Waveform.stream(), so that the playback can be started
+        before the whole waveform is generated.
 
+        Examples:
+            >>> text2speech = Text2Speech("config.yml", "model.pth")
+            >>> for wav in text2speech.stream("Hello World"):
+            ...     play(wav.numpy())
+
+        """
+        assert check_argument_types()
+        if self.spc2wav is None:
+            raise RuntimeError("stream() requires the vocoder")
+        batch = self._make_batch(text, speech, durations, spembs)
+        _, outs_denorm, _, _ = self.model.inference(**batch, **self.decode_config)
+        for wav in self.spc2wav.stream(outs_denorm.split(chunk_size)):
+            yield wav.cpu()
+
+    def _make_batch(
+        self,
+        text: Union[str, torch.Tensor, np.ndarray],
+        speech: Union[torch.Tensor, np.ndarray] = None,
+        durations: Union[torch.Tensor, np.ndarray] = None,
+        spembs: Union[torch.Tensor, np.ndarray] = None,
+    ) -> Dict[str, torch.Tensor]:
         if self.use_speech and speech is None:
             raise RuntimeError("missing required argument: 'speech'")
 
@@ -147,22 +215,79 @@ class Text2Speech:
         if spembs is not None:
             batch["spembs"] = spembs
 
+        return to_device(batch, self.device)
+
+    @torch.no_grad()
+    def batch(
+        self,
+        text: Sequence[Union[str, torch.Tensor, np.ndarray]],
+        speech: Sequence[Union[torch.Tensor, np.ndarray]] = None,
+        durations: Sequence[Union[torch.Tensor, np.ndarray]] = None,
+        spembs: Sequence[Union[torch.Tensor, np.ndarray]] = None,
+    ) -> List[tuple]:
+        """Synthesize the sentences as a mini-batch
+
+        The outputs are same as [self(t) for t in text],
+        but the sentences are synthesized at once if supports_batch is True.
+
+        Examples:
+            >>> text2speech = Text2Speech("config.yml", "model.pth")
+            >>> for wav, *_ in text2speech.batch(["Hello World", "Good morning"]):
+            ...     print(wav.shape)
+
+        """
+        assert check_argument_types()
+        if not self.supports_batch or len(text) == 1:
+            kwargs_list = [dict(text=t) for t in text]
+            for name, values in [
+                ("speech", speech),
+                ("durations", durations),
+                ("spembs", spembs),
+            ]:
+                if values is not None:
+                    for kwargs, v in zip(kwargs_list, values):
+                        kwargs[name] = v
+            return [self(**kwargs) for kwargs in kwargs_list]
+
+        texts = []
+        for t in text:
+            if isinstance(t, str):
+                # str -> np.ndarray
+                t = self.preprocess_fn("<dummy>", {"text": t})["text"]
+            texts.append(torch.as_tensor(t))
+        batch = {
+            "text": pad_list(texts, 0),
+            "text_lengths": torch.tensor([len(t) for t in texts]),
+        }
+        if spembs is not None:
+            batch["spembs"] = torch.stack([torch.as_tensor(s) for s in spembs])
+
         batch = to_device(batch, self.device)
-        outs, outs_denorm, probs, att_ws = self.model.inference(
+        outs, outs_denorm, outs_lengths = self.model.batch_inference(
             **batch, **self.decode_config
         )
 
-        if att_ws is not None:
-            duration, focus_rate = self.duration_calculator(att_ws)
-        else:
-            duration, focus_rate = None, None
-
+        outs_lengths = outs_lengths.tolist()
+        outs = [out[:length] for out, length in zip(outs, outs_lengths)]
+        outs_denorm = [out[:length] for out, length in zip(outs_denorm, outs_lengths)]
         if self.spc2wav is not None:
-            wav = torch.tensor(self.spc2wav(outs_denorm.cpu().numpy()))
+            wavs = [wav.cpu() for wav in self.spc2wav.batch(outs_denorm)]
         else:
-            wav = None
+            wavs = [None] * len(outs)
+        return [
+            (wav, out, out_denorm, None, None, None, None)
+            for wav, out, out_denorm in zip(wavs, outs, outs_denorm)
+        ]
 
-        return wav, outs, outs_denorm, probs, att_ws, duration, focus_rate
+    @property
+    def supports_batch(self) -> bool:
+        """Check whether to synthesize the sentences as a mini-batch in batch().
+
+        Returns:
+            bool: True if the model supports the batch inference.
+
+        """
+        return self.tts.supports_batch_inference and not self.use_speech
 
     @property
     def fs(self) -> Optional[int]:
@@ -182,6 +307,96 @@ class Text2Speech:
         return self.use_teacher_forcing or getattr(self.tts, "use_gst", False)
 
 
+def _plot_att_ws(path: Path, key: str, att_ws: np.ndarray):
+    # Lazy load to avoid the backend error
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import MaxNLocator
+
+    if att_ws.ndim == 2:
+        att_ws = att_ws[None][None]
+    elif att_ws.ndim != 4:
+        raise RuntimeError(f"Must be 2 or 4 dimension: {att_ws.ndim}")
+
+    w, h = plt.figaspect(att_ws.shape[0] / att_ws.shape[1])
+    fig = plt.Figure(
+        figsize=(
+            w * 1.3 * min(att_ws.shape[0], 2.5),
+            h * 1.3 * min(att_ws.shape[1], 2.5),
+        )
+    )
+    fig.suptitle(f"{key}")
+    axes = fig.subplots(att_ws.shape[0], att_ws.shape[1])
+    if len(att_ws) == 1:
+        axes = [[axes]]
+    for ax, att_w in zip(axes, att_ws):
+        for ax_, att_w_ in zip(ax, att_w):
+            ax_.imshow(att_w_.astype(np.float32), aspect="auto")
+            ax_.set_xlabel("Input")
+            ax_.set_ylabel("Output")
+            ax_.xaxis.set_major_locator(MaxNLocator(integer=True))
+            ax_.yaxis.set_major_locator(MaxNLocator(integer=True))
+
+    fig.set_tight_layout({"rect": [0, 0.03, 1, 0.95]})
+    fig.savefig(path)
+    fig.clf()
+
+
+def _plot_probs(path: Path, key: str, probs: np.ndarray):
+    # Lazy load to avoid the backend error
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig = plt.Figure()
+    ax = fig.add_subplot(1, 1, 1)
+    ax.plot(probs)
+    ax.set_title(f"{key}")
+    ax.set_xlabel("Output")
+    ax.set_ylabel("Stop probability")
+    ax.set_ylim(0, 1)
+    ax.grid(which="both")
+
+    fig.set_tight_layout(True)
+    fig.savefig(path)
+    fig.clf()
+
+
+def _write_outputs(
+    output_dir: Path,
+    key_and_outputs: Tuple[str, Dict[str, np.ndarray]],
+    fs: Optional[int],
+):
+    """Write the files of an utterance.
+
+    This function is executed in the sub-processes if num_writers > 0.
+
+    Args:
+        output_dir: The output directory of inference()
+        key_and_outputs: The utterance id and the outputs to be written,
+            i.e. a subset of "norm", "denorm", "wav", "att_ws", and "probs"
+        fs: The sampling rate of "wav"
+    """
+    key, outputs = key_and_outputs
+    for name, value in outputs.items():
+        if name in ("norm", "denorm"):
+            p = output_dir / name / f"{key}.npy"
+            p.parent.mkdir(parents=True, exist_ok=True)
+            np.save(str(p), value)
+        elif name == "wav":
+            # TODO(kamo): Write scp
+            sf.write(f"{output_dir}/wav/{key}.wav", value, fs, "PCM_16")
+        elif name == "att_ws":
+            _plot_att_ws(output_dir / f"att_ws/{key}.png", key, value)
+        elif name == "probs":
+            _plot_probs(output_dir / f"probs/{key}.png", key, value)
+        else:
+            raise RuntimeError(f"Unknown output: {name}")
+
+
 def inference(
     output_dir: str,
     batch_size: int,
@@ -201,14 +416,21 @@ def inference(
     use_att_constraint: bool,
     backward_window: int,
     forward_window: int,
+    windowed_att_constraint: bool,
     speed_control_alpha: float,
     allow_variable_data_keys: bool,
     vocoder_conf: dict,
+    bucket_window: int = 256,
+    write_norm_feats: bool = True,
+    write_denorm_feats: bool = True,
+    write_wav: bool = True,
+    write_durations: bool = True,
+    plot_att_ws: bool = True,
+    plot_probs: bool = True,
+    num_writers: int = 0,
 ):
     """Perform TTS model decoding."""
     assert check_argument_types()
-    if batch_size > 1:
-        raise NotImplementedError("batch decoding is not implemented")
     if ngpu > 1:
         raise NotImplementedError("only single GPU decoding is supported")
     logging.basicConfig(
@@ -235,10 +457,12 @@ def inference(
         use_att_constraint=use_att_constraint,
         backward_window=backward_window,
         forward_window=forward_window,
+        windowed_att_constraint=windowed_att_constraint,
         speed_control_alpha=speed_control_alpha,
         vocoder_conf=vocoder_conf,
         dtype=dtype,
         device=device,
+        return_att_ws=plot_att_ws or write_durations,
     )
 
     # 3. Build data-iterator
@@ -246,10 +470,17 @@ def inference(
         data_path_and_name_and_type = list(
             filter(lambda x: x[1] != "speech", data_path_and_name_and_type)
         )
+    if batch_size > 1 and not text2speech.supports_batch:
+        logging.warning(
+            f"{type(text2speech.tts).__name__} doesn't support the batch inference "
+            f"with the given options. The sentences are synthesized one by one."
+        )
+    # NOTE: The sentences are read one by one and made into mini-batches
+    #   after sorting by the length to reduce the padding
     loader = TTSTask.build_streaming_iterator(
         data_path_and_name_and_type,
         dtype=dtype,
-        batch_size=batch_size,
+        batch_size=1,
         key_file=key_file,
         num_workers=num_workers,
         preprocess_fn=TTSTask.build_preprocess_fn(text2speech.train_args, False),
@@ -258,132 +489,131 @@ def inference(
         inference=True,
     )
 
+    def _iter_outputs():
+        # Change to single sequence and remove *_length
+        items = (
+            (keys[0], {k: v[0] for k, v in batch.items() if not k.endswith("_lengths")})
+            for keys, batch in loader
+        )
+        while True:
+            window = list(itertools.islice(items, max(bucket_window, batch_size)))
+            if len(window) == 0:
+                break
+            # Make mini-batches of the sentences of similar lengths
+            order = sorted(range(len(window)), key=lambda i: len(window[i][1]["text"]))
+            outputs = [None] * len(window)
+            for start in range(0, len(order), batch_size):
+                indices = order[start : start + batch_size]
+                names = window[indices[0]][1]
+                start_time = time.perf_counter()
+                results = text2speech.batch(
+                    **{k: [window[i][1][k] for i in indices] for k in names}
+                )
+                elapsed = (time.perf_counter() - start_time) / len(indices)
+                for i, result in zip(indices, results):
+                    outputs[i] = result, elapsed
+            # Keep the order of the inputs
+            for (key, batch), (result, elapsed) in zip(window, outputs):
+                yield key, batch, result, elapsed
+
     # 6. Start for-loop
     output_dir = Path(output_dir)
-    (output_dir / "norm").mkdir(parents=True, exist_ok=True)
-    (output_dir / "denorm").mkdir(parents=True, exist_ok=True)
+    outputs_enabled = {
+        "norm": write_norm_feats,
+        "denorm": write_denorm_feats,
+        "wav": write_wav and text2speech.spc2wav is not None,
+        "att_ws": plot_att_ws,
+        "probs": plot_probs,
+    }
     (output_dir / "speech_shape").mkdir(parents=True, exist_ok=True)
-    (output_dir / "wav").mkdir(parents=True, exist_ok=True)
-    (output_dir / "att_ws").mkdir(parents=True, exist_ok=True)
-    (output_dir / "probs").mkdir(parents=True, exist_ok=True)
-    (output_dir / "durations").mkdir(parents=True, exist_ok=True)
-    (output_dir / "focus_rates").mkdir(parents=True, exist_ok=True)
-
-    # Lazy load to avoid the backend error
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
-    from matplotlib.ticker import MaxNLocator
-
-    with NpyScpWriter(
-        output_dir / "norm",
-        output_dir / "norm/feats.scp",
-    ) as norm_writer, NpyScpWriter(
-        output_dir / "denorm", output_dir / "denorm/feats.scp"
-    ) as denorm_writer, open(
-        output_dir / "speech_shape/speech_shape", "w"
-    ) as shape_writer, open(
-        output_dir / "durations/durations", "w"
-    ) as duration_writer, open(
-        output_dir / "focus_rates/focus_rates", "w"
-    ) as focus_rate_writer:
-        for idx, (keys, batch) in enumerate(loader, 1):
-            assert isinstance(batch, dict), type(batch)
-            assert all(isinstance(s, str) for s in keys), keys
-            _bs = len(next(iter(batch.values())))
-            assert _bs == 1, _bs
-
-            # Change to single sequence and remove *_length
-            # because inference() requires 1-seq, not mini-batch.
-            batch = {k: v[0] for k, v in batch.items() if not k.endswith("_lengths")}
-
-            start_time = time.perf_counter()
-            wav, outs, outs_denorm, probs, att_ws, duration, focus_rate = text2speech(
-                **batch
+    for name, enabled in outputs_enabled.items():
+        if enabled:
+            (output_dir / name).mkdir(parents=True, exist_ok=True)
+    if write_durations:
+        (output_dir / "durations").mkdir(parents=True, exist_ok=True)
+        (output_dir / "focus_rates").mkdir(parents=True, exist_ok=True)
+
+    with contextlib.ExitStack() as stack:
+        shape_writer = stack.enter_context(
+            open(output_dir / "speech_shape/speech_shape", "w")
+        )
+        scp_writers = {
+            name: stack.enter_context(open(output_dir / f"{name}/feats.scp", "w"))
+            for name in ["norm", "denorm"]
+            if outputs_enabled[name]
+        }
+        if write_durations:
+            duration_writer = stack.enter_context(
+                open(output_dir / "durations/durations", "w")
             )
-
-            key = keys[0]
-            insize = next(iter(batch.values())).size(0) + 1
-            logging.info(
-                "inference speed = {:.1f} frames / sec.".format(
-                    int(outs.size(0)) / (time.perf_counter() - start_time)
-                )
+            focus_rate_writer = stack.enter_context(
+                open(output_dir / "focus_rates/focus_rates", "w")
             )
-            logging.info(f"{key} (size:{insize}->{outs.size(0)})")
-            if outs.size(0) == insize * maxlenratio:
-                logging.warning(f"output length reaches maximum length ({key}).")
-
-            norm_writer[key] = outs.cpu().numpy()
-            shape_writer.write(f"{key} " + ",".join(map(str, outs.shape)) + "\n")
-
-            denorm_writer[key] = outs_denorm.cpu().numpy()
-
-            if duration is not None:
-                # Save duration and fucus rates
-                duration_writer.write(
-                    f"{key} " + " ".join(map(str, duration.cpu().numpy())) + "\n"
-                )
-                focus_rate_writer.write(f"{key} {float(focus_rate):.5f}\n")
-
-                # Plot attention weight
-                att_ws = att_ws.cpu().numpy()
-
-                if att_ws.ndim == 2:
-                    att_ws = att_ws[None][None]
-                elif att_ws.ndim != 4:
-                    raise RuntimeError(f"Must be 2 or 4 dimension: {att_ws.ndim}")
-
-                w, h = plt.figaspect(att_ws.shape[0] / att_ws.shape[1])
-                fig = plt.Figure(
-                    figsize=(
-                        w * 1.3 * min(att_ws.shape[0], 2.5),
-                        h * 1.3 * min(att_ws.shape[1], 2.5),
+        # Whether the attention weights and the stop probabilities are given
+        found = {"att_ws": False, "probs": False}
+
+        def _iter_outputs_to_write():
+            for key, batch, result, elapsed in _iter_outputs():
+                wav, outs, outs_denorm, probs, att_ws, duration, focus_rate = result
+                found["att_ws"] |= att_ws is not None
+                found["probs"] |= probs is not None
+
+                insize = next(iter(batch.values())).size(0) + 1
+                logging.info(
+                    "inference speed = {:.1f} frames / sec.".format(
+                        int(outs.size(0)) / elapsed
                     )
                 )
-                fig.suptitle(f"{key}")
-                axes = fig.subplots(att_ws.shape[0], att_ws.shape[1])
-                if len(att_ws) == 1:
-                    axes = [[axes]]
-                for ax, att_w in zip(axes, att_ws):
-                    for ax_, att_w_ in zip(ax, att_w):
-                        ax_.imshow(att_w_.astype(np.float32), aspect="auto")
-                        ax_.set_xlabel("Input")
-                        ax_.set_ylabel("Output")
-                        ax_.xaxis.set_major_locator(MaxNLocator(integer=True))
-                        ax_.yaxis.set_major_locator(MaxNLocator(integer=True))
-
-                fig.set_tight_layout({"rect": [0, 0.03, 1, 0.95]})
-                fig.savefig(output_dir / f"att_ws/{key}.png")
-                fig.clf()
-
-            if probs is not None:
-                # Plot stop token prediction
-                probs = probs.cpu().numpy()
-
-                fig = plt.Figure()
-                ax = fig.add_subplot(1, 1, 1)
-                ax.plot(probs)
-                ax.set_title(f"{key}")
-                ax.set_xlabel("Output")
-                ax.set_ylabel("Stop probability")
-                ax.set_ylim(0, 1)
-                ax.grid(which="both")
-
-                fig.set_tight_layout(True)
-                fig.savefig(output_dir / f"probs/{key}.png")
-                fig.clf()
-
-            # TODO(kamo): Write scp
-            if wav is not None:
-                sf.write(
-                    f"{output_dir}/wav/{key}.wav", wav.numpy(), text2speech.fs, "PCM_16"
+                logging.info(f"{key} (size:{insize}->{outs.size(0)})")
+                if outs.size(0) == insize * maxlenratio:
+                    logging.warning(f"output length reaches maximum length ({key}).")
+
+                shape_writer.write(f"{key} " + ",".join(map(str, outs.shape)) + "\n")
+                if duration is not None and write_durations:
+                    # Save duration and fucus rates
+                    duration_writer.write(
+                        f"{key} " + " ".join(map(str, duration.cpu().numpy())) + "\n"
+                    )
+                    focus_rate_writer.write(f"{key} {float(focus_rate):.5f}\n")
+
+                # The files of an utterance are written by _write_outputs()
+                outputs = {}
+                for name, value in [
+                    ("norm", outs),
+                    ("denorm", outs_denorm),
+                    ("wav", wav),
+                    ("att_ws", att_ws),
+                    ("probs", probs),
+                ]:
+                    if outputs_enabled[name] and value is not None:
+                        outputs[name] = value.cpu().numpy()
+                for name, writer in scp_writers.items():
+                    writer.write(f"{key} {output_dir / name / f'{key}.npy'}\n")
+                yield key, outputs
+
+        write_outputs = functools.partial(_write_outputs, output_dir, fs=text2speech.fs)
+        if num_writers > 0:
+            executor = stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=num_writers,
+                    mp_context=multiprocessing.get_context("spawn"),
                 )
+            )
+            # Bound the number of the outputs in memory
+            for _ in ordered_map(
+                executor, write_outputs, _iter_outputs_to_write(), 2 * num_writers
+            ):
+                pass
+        else:
+            for key_and_outputs in _iter_outputs_to_write():
+                write_outputs(key_and_outputs)
 
     # remove duration related files if attention is not provided
-    if att_ws is None:
-        shutil.rmtree(output_dir / "att_ws")
-        shutil.rmtree(output_dir / "durations")
-        shutil.rmtree(output_dir / "focus_rates")
-    if probs is None:
+    if not found["att_ws"]:
+        for name in ["att_ws", "durations", "focus_rates"]:
+            if (output_dir / name).exists():
+                shutil.rmtree(output_dir / name)
+    if not found["probs"] and (output_dir / "probs").exists():
         shutil.rmtree(output_dir / "probs")
 
 
@@ -440,6 +670,13 @@ def get_parser():
         default=1,
         help="The batch size for inference",
     )
+    parser.add_argument(
+        "--bucket_window",
+        type=int,
+        default=256,
+        help="The number of the sentences sorted by the length at once "
+        "to make the mini-batches of the similar lengths if --batch_size > 1",
+    )
 
     group = parser.add_argument_group("Input data related")
     group.add_argument(
@@ -507,6 +744,13 @@ def get_parser():
         default=3,
         help="Forward window value in attention constraint",
     )
+    group.add_argument(
+        "--windowed_att_constraint",
+        type=str2bool,
+        default=False,
+        help="Whether to compute the attention only inside the window "
+        "of attention constraint. The outputs are same, but faster for long inputs",
+    )
     group.add_argument(
         "--use_teacher_forcing",
         type=str2bool,
@@ -527,6 +771,51 @@ def get_parser():
         default=get_default_kwargs(Spectrogram2Waveform),
         help="The configuration for Grriffin-Lim",
     )
+
+    group = parser.add_argument_group("Output related")
+    group.add_argument(
+        "--write_norm_feats",
+        type=str2bool,
+        default=True,
+        help="Whether to write the normalized features, i.e. norm/feats.scp",
+    )
+    group.add_argument(
+        "--write_denorm_feats",
+        type=str2bool,
+        default=True,
+        help="Whether to write the denormalized features, i.e. denorm/feats.scp",
+    )
+    group.add_argument(
+        "--write_wav",
+        type=str2bool,
+        default=True,
+        help="Whether to write the waveforms if the vocoder is available",
+    )
+    group.add_argument(
+        "--write_durations",
+        type=str2bool,
+        default=True,
+        help="Whether to write the durations and the focus rates",
+    )
+    group.add_argument(
+        "--plot_att_ws",
+        type=str2bool,
+        default=True,
+        help="Whether to plot the attention weights",
+    )
+    group.add_argument(
+        "--plot_probs",
+        type=str2bool,
+        default=True,
+        help="Whether to plot the stop probabilities",
+    )
+    group.add_argument(
+        "--num_writers",
+        type=int,
+        default=0,
+        help="The number of the processes to plot the figures and write the files. "
+        "0 indicates writing them in the main process",
+    )
     return parser
 
 
@@ -5,6 +5,8 @@ from typing import Dict
 from typing import Optional
 from typing import Tuple
 
+import numpy as np
+from scipy.optimize import linear_sum_assignment
 import torch
 from torch_complex.tensor import ComplexTensor
 from typeguard import check_argument_types
@@ -31,6 +33,9 @@ ALL_LOSS_TYPES = (
     "si_snr",
 )
 EPS = torch.finfo(torch.get_default_dtype()).eps
+# The permutations are searched exhaustively up to this number of speakers
+# in permutation invariant training, otherwise by the Hungarian algorithm
+MAX_NUM_SPK_EXHAUSTIVE_PIT = 5
 
 
 class ESPnetEnhancementModel(AbsESPnetModel):
@@ -590,6 +595,10 @@ class ESPnetEnhancementModel(AbsESPnetModel):
     def _permutation_loss(ref, inf, criterion, perm=None):
         """The basic permutation loss function.
 
+        The losses of all the pairs of the references and the estimates
+        are computed once as a matrix (batch, num_spk, num_spk),
+        and the best permutation is searched on the matrix.
+
         Args:
             ref (List[torch.Tensor]): [(batch, ...), ...] x n_spk
             inf (List[torch.Tensor]): [(batch, ...), ...]
@@ -601,40 +610,49 @@ class ESPnetEnhancementModel(AbsESPnetModel):
                                  e.g. tensor([[1, 0, 2], [0, 1, 2]])
         """
         assert len(ref) == len(inf), (len(ref), len(inf))
-        num_spk = len(ref)
-
-        def pair_loss(permutation):
-            return sum(
-                [criterion(ref[s], inf[t]) for s, t in enumerate(permutation)]
-            ) / len(permutation)
 
+        # losses[b, s, t] = criterion(ref[s], inf[t])[b]: (batch, num_spk, num_spk)
+        losses = torch.stack(
+            [torch.stack([criterion(r, i) for i in inf], dim=1) for r in ref], dim=1
+        )
         if perm is None:
-            device = ref[0].device
-            all_permutations = list(permutations(range(num_spk)))
-            losses = torch.stack([pair_loss(p) for p in all_permutations], dim=1)
-            loss, perm = torch.min(losses, dim=1)
-            perm = torch.index_select(
-                torch.tensor(all_permutations, device=device, dtype=torch.long),
-                0,
-                perm,
-            )
-        else:
-            loss = torch.tensor(
-                [
-                    torch.tensor(
-                        [
-                            criterion(
-                                ref[s][batch].unsqueeze(0), inf[t][batch].unsqueeze(0)
-                            )
-                            for s, t in enumerate(p)
-                        ]
-                    ).mean()
-                    for batch, p in enumerate(perm)
-                ]
-            )
+            perm = ESPnetEnhancementModel._solve_permutation(losses)
+        # (batch, num_spk) -> (batch,)
+        loss = losses.gather(2, perm.unsqueeze(2)).squeeze(2).mean(dim=1)
 
         return loss.mean(), perm
 
+    @staticmethod
+    def _solve_permutation(losses: torch.Tensor) -> torch.Tensor:
+        """Find the permutations minimizing the sum of the pairwise losses.
+
+        All the permutations are evaluated at once as a batch
+        if num_spk <= MAX_NUM_SPK_EXHAUSTIVE_PIT,
+        otherwise the Hungarian algorithm is applied to each sample.
+
+        Args:
+            losses (torch.Tensor): pairwise losses (batch, num_spk, num_spk)
+        Returns:
+            perm (torch.Tensor): permutation for inf (batch, num_spk)
+        """
+        num_spk = losses.size(1)
+        if num_spk <= MAX_NUM_SPK_EXHAUSTIVE_PIT:
+            # (num_perm, num_spk)
+            all_permutations = torch.tensor(
+                list(permutations(range(num_spk))),
+                device=losses.device,
+                dtype=torch.long,
+            )
+            # (batch, num_perm, num_spk) -> (batch, num_perm)
+            perm_losses = losses[:, torch.arange(num_spk), all_permutations].sum(2)
+            return all_permutations[perm_losses.argmin(dim=1)]
+
+        losses_cpu = losses.detach().cpu().double().numpy()
+        # NOTE: linear_sum_assignment() doesn't accept nan and inf
+        losses_cpu = np.nan_to_num(losses_cpu, nan=1e100, posinf=1e100, neginf=-1e100)
+        perm = [linear_sum_assignment(b_loss)[1] for b_loss in losses_cpu]
+        return torch.as_tensor(np.stack(perm), dtype=torch.long, device=losses.device)
+
     def collect_feats(
         self, speech_mix: torch.Tensor, speech_mix_lengths: torch.Tensor, **kwargs
     ) -> Dict[str, torch.Tensor]:
@@ -0,0 +1,144 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Sequence
+from typing import Union
+
+import numpy as np
+import soundfile
+from typeguard import check_argument_types
+
+
+class AudioBank:
+    """A collection of audio files decoded into a single memory-mapped file.
+
+    This is intended for the signals used for data augmentation, e.g. noises
+    and RIRs, which are randomly accessed for every training sample.
+    The files are decoded only once and concatenated in "bank_dir/<hash>.npy",
+    so that the partial read at a random offset is just the slicing of
+    the memory-mapped array, and the pages are shared by
+    all DataLoader workers via the page cache.
+
+    Examples:
+        >>> bank = AudioBank(["a.wav", "b.wav"], "exp/noise_bank")
+        >>> len(bank)
+        2
+        >>> signal = bank[0]  # (Time, Nmic)
+        >>> segment = bank.read_segment(1, 16000)  # (16000, Nmic)
+
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[str],
+        bank_dir: Union[Path, str],
+        dtype: str = "float32",
+    ):
+        assert check_argument_types()
+        self.paths = list(paths)
+        self.dtype = dtype
+
+        # The bank is rebuilt if the list or the files are changed
+        h = hashlib.sha1(dtype.encode())
+        for p in self.paths:
+            st = os.stat(p)
+            h.update(f"{p} {st.st_size} {st.st_mtime_ns}\n".encode())
+        bank_dir = Path(bank_dir)
+        self.data_path = bank_dir / f"{h.hexdigest()}.npy"
+        self.index_path = bank_dir / f"{h.hexdigest()}.index.npy"
+        if not self.data_path.exists():
+            self._build()
+        # index: (N, 3), [offset, frames, channels] for each file
+        self.index = np.load(self.index_path)
+        self._data = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(num_files={len(self)}, {self.data_path})"
+
+    def __getstate__(self):
+        # Don't pickle the mapped data. It's mapped again in the other process.
+        state = self.__dict__.copy()
+        state["_data"] = None
+        return state
+
+    def _build(self):
+        self.data_path.parent.mkdir(parents=True, exist_ok=True)
+        index = np.zeros((len(self.paths), 3), dtype=np.int64)
+        offset = 0
+        for i, p in enumerate(self.paths):
+            info = soundfile.info(p)
+            index[i] = offset, info.frames, info.channels
+            offset += info.frames * info.channels
+
+        # Write to the temporary files and rename them at the end
+        # to avoid reading the incomplete bank from the other processes
+        suffix = f".{os.getpid()}.tmp"
+        tmp_index = self.index_path.with_name(self.index_path.name + suffix)
+        tmp_data = self.data_path.with_name(self.data_path.name + suffix)
+        data = np.lib.format.open_memmap(
+            tmp_data, mode="w+", dtype=self.dtype, shape=(max(offset, 1),)
+        )
+        for p, (offset, frames, channels) in zip(self.paths, index):
+            signal, _ = soundfile.read(p, dtype=self.dtype, always_2d=True)
+            if signal.shape != (frames, channels):
+                raise RuntimeError(f"Failed to read {p}: {signal.shape}")
+            data[offset : offset + frames * channels] = signal.reshape(-1)
+        data.flush()
+        del data
+        with tmp_index.open("wb") as f:
+            np.save(f, index)
+        os.replace(tmp_index, self.index_path)
+        os.replace(tmp_data, self.data_path)
+
+    @property
+    def data(self) -> np.ndarray:
+        if self._data is None:
+            self._data = np.load(self.data_path, mmap_mode="r")
+        return self._data
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def get_num_frames(self, idx: int) -> int:
+        return int(self.index[idx, 1])
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        """Return the read-only view of the signal: (Time, Nmic)"""
+        return self.read(idx)
+
+    def read(self, idx: int, start: int = 0, stop: int = None) -> np.ndarray:
+        """Read the frames [start, stop) of the signal: (Time, Nmic)"""
+        offset, frames, channels = (int(v) for v in self.index[idx])
+        if stop is None:
+            stop = frames
+        start, stop = max(start, 0), min(stop, frames)
+        return self.data[
+            offset + start * channels : offset + max(stop, start) * channels
+        ].reshape(-1, channels)
+
+    def read_segment(
+        self,
+        idx: int,
+        nsamples: int,
+        random_state: np.random.RandomState = np.random,
+    ) -> np.ndarray:
+        """Read a segment of the given length at a random offset.
+
+        The signal is repeated if it's shorter than the segment.
+
+        Returns:
+            segment: (nsamples, Nmic)
+        """
+        frames = self.get_num_frames(idx)
+        if frames == nsamples:
+            return self.read(idx)
+        elif frames < nsamples:
+            offset = random_state.randint(0, nsamples - frames)
+            return np.pad(
+                self.read(idx),
+                [(offset, nsamples - frames - offset), (0, 0)],
+                mode="wrap",
+            )
+        else:
+            offset = random_state.randint(0, frames - nsamples)
+            return self.read(idx, offset, offset + nsamples)
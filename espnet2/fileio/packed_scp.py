@@ -0,0 +1,130 @@
+import collections.abc
+from pathlib import Path
+from typing import Dict
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from typeguard import check_argument_types
+
+from espnet2.fileio.read_text import read_2column_text
+
+
+def _parse_entry(value: str) -> Tuple[str, int, str, Tuple[int, ...]]:
+    # e.g. /some/where/data.bin:1024:<f4:120,1 -> (path, offset, dtype, shape)
+    path, offset, dtype, shape = value.rsplit(":", 3)
+    shape = tuple(int(s) for s in shape.split(",")) if shape != "" else ()
+    return path, int(offset), dtype, shape
+
+
+class PackedScpWriter:
+    """Writer class for a scp file of the arrays packed in a binary file.
+
+    The arrays are appended to a single binary file instead of
+    creating a file for each key, and the scp file has the position,
+    the dtype, and the shape of each array.
+    The scp files written by the different writers can be concatenated.
+
+    Examples:
+        key1 /some/path/data.bin:0:<f4:120,1
+        key2 /some/path/data.bin:480:<f4:98,1
+        ...
+
+        >>> with PackedScpWriter('./data/pitch.bin', './data/pitch.scp') as writer:
+        ...     writer['aa'] = numpy_array
+        ...     writer['bb'] = numpy_array
+
+    """
+
+    def __init__(self, datafile: Union[Path, str], scpfile: Union[Path, str]):
+        assert check_argument_types()
+        self.datafile = Path(datafile)
+        self.datafile.parent.mkdir(parents=True, exist_ok=True)
+        scpfile = Path(scpfile)
+        scpfile.parent.mkdir(parents=True, exist_ok=True)
+        self.fdata = self.datafile.open("wb")
+        self.fscp = scpfile.open("w", encoding="utf-8")
+
+        self.data = {}
+
+    def get_path(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        assert isinstance(value, np.ndarray), type(value)
+        value = np.ascontiguousarray(value)
+        offset = self.fdata.tell()
+        self.fdata.write(value.tobytes())
+        shape = ",".join(map(str, value.shape))
+        p = f"{self.datafile}:{offset}:{value.dtype.str}:{shape}"
+        self.fscp.write(f"{key} {p}\n")
+
+        # Store the position
+        self.data[key] = p
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.fdata.close()
+        self.fscp.close()
+
+
+class PackedScpReader(collections.abc.Mapping):
+    """Reader class for a scp file of the arrays packed in binary files.
+
+    The binary files are memory-mapped, so that only the requested arrays
+    are read from the disk.
+
+    Examples:
+        key1 /some/path/data.bin:0:<f4:120,1
+        key2 /some/path/data.bin:480:<f4:98,1
+        ...
+
+        >>> reader = PackedScpReader('pitch.scp')
+        >>> array = reader['key1']
+
+    """
+
+    def __init__(self, fname: Union[Path, str]):
+        assert check_argument_types()
+        self.fname = Path(fname)
+        self.data = read_2column_text(fname)
+        # path -> The memory-mapped binary file
+        self.mmaps: Dict[str, np.memmap] = {}
+
+    def __getstate__(self):
+        # Don't pickle the mapped data. It's mapped again in the other process.
+        state = self.__dict__.copy()
+        state["mmaps"] = {}
+        return state
+
+    def get_path(self, key):
+        return self.data[key]
+
+    def __getitem__(self, key) -> np.ndarray:
+        path, offset, dtype, shape = _parse_entry(self.data[key])
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if nbytes == 0:
+            # An empty file can't be mapped
+            return np.empty(shape, dtype=dtype)
+        mmap = self.mmaps.get(path)
+        if mmap is None:
+            mmap = np.memmap(path, dtype=np.uint8, mode="r")
+            self.mmaps[path] = mmap
+        return mmap[offset : offset + nbytes].view(dtype).reshape(shape).copy()
+
+    def __contains__(self, item):
+        return item in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def keys(self):
+        return self.data.keys()
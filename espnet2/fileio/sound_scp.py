@@ -118,6 +118,25 @@ class SoundScpWriter:
         # Store the file path
         self.data[key] = str(wav)
 
+    def open(self, key: str, rate: int, channels: int = 1) -> soundfile.SoundFile:
+        """Open the file for the key to write the signal block by block.
+
+        Examples:
+            >>> with writer.open('aa', 16000) as f:
+            ...     for block in blocks:
+            ...         f.write(block)
+
+        """
+        wav = self.dir / f"{key}.{self.format}"
+        wav.parent.mkdir(parents=True, exist_ok=True)
+        f = soundfile.SoundFile(str(wav), "w", rate, channels)
+
+        self.fscp.write(f"{key} {wav}\n")
+
+        # Store the file path
+        self.data[key] = str(wav)
+        return f
+
     def get_path(self, key):
         return self.data[key]
 
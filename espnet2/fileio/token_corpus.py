@@ -0,0 +1,147 @@
+import os
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+from typeguard import check_argument_types
+import yaml
+
+
+def token_dtype(vocab_size: int) -> np.dtype:
+    """Return the smallest unsigned integer type to store the token ids"""
+    if vocab_size <= np.iinfo(np.uint16).max + 1:
+        return np.dtype(np.uint16)
+    else:
+        return np.dtype(np.uint32)
+
+
+class TokenCorpusWriter:
+    """Write the token ids of the sentences to a flat binary file.
+
+    The sentences are concatenated with <sos/eos> as the separator,
+    i.e. "<sos/eos> w1 w2 <sos/eos> w3 w4 w5 <sos/eos> ...",
+    so that any sub-array of the corpus can be used for the packed
+    language model training as it is.
+
+    The following files are created:
+
+    - <prefix>.bin: The token ids as uint16 or uint32 depending on vocab_size
+    - <prefix>.offsets.npy: The start positions of the sentences: (N + 1,)
+    - <prefix>.yaml: The meta information, e.g. vocab_size and dtype
+
+    Examples:
+        >>> with TokenCorpusWriter("dump/lm_train", vocab_size=5000) as writer:
+        ...     writer.write([2, 3, 4])
+        >>> corpus = TokenCorpus("dump/lm_train")
+
+    """
+
+    def __init__(self, prefix: Union[Path, str], vocab_size: int, eos: int = None):
+        assert check_argument_types()
+        self.prefix = Path(prefix)
+        self.vocab_size = vocab_size
+        # Assume the last id is <sos/eos> as ESPnetLanguageModel
+        self.eos = vocab_size - 1 if eos is None else eos
+        self.dtype = token_dtype(vocab_size)
+
+        self.prefix.parent.mkdir(parents=True, exist_ok=True)
+        # Write to the temporary file and rename it at the end
+        # not to leave the incomplete corpus
+        self.tmp_path = Path(f"{self.prefix}.bin.{os.getpid()}.tmp")
+        self.fd = self.tmp_path.open("wb")
+        self.fd.write(np.array([self.eos], dtype=self.dtype).tobytes())
+        self.num_tokens = 1
+        self.offsets = [1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.fd.close()
+            self.tmp_path.unlink()
+
+    def write(self, token_ids: Union[np.ndarray, list]):
+        token_ids = np.asarray(token_ids)
+        if len(token_ids) != 0 and (
+            token_ids.min() < 0 or token_ids.max() >= self.vocab_size
+        ):
+            raise ValueError(f"Token id is out of the vocabulary: {token_ids}")
+        data = np.append(token_ids, self.eos).astype(self.dtype)
+        self.fd.write(data.tobytes())
+        self.num_tokens += len(data)
+        self.offsets.append(self.num_tokens)
+
+    def close(self):
+        self.fd.close()
+        np.save(f"{self.prefix}.offsets.npy", np.array(self.offsets, dtype=np.int64))
+        with Path(f"{self.prefix}.yaml").open("w", encoding="utf-8") as f:
+            yaml.safe_dump(
+                dict(
+                    vocab_size=self.vocab_size,
+                    eos=self.eos,
+                    dtype=self.dtype.name,
+                    num_sentences=len(self.offsets) - 1,
+                    num_tokens=self.num_tokens,
+                ),
+                f,
+            )
+        os.replace(self.tmp_path, f"{self.prefix}.bin")
+
+
+class TokenCorpus:
+    """Read the corpus written by TokenCorpusWriter via memory-mapping
+
+    Examples:
+        >>> corpus = TokenCorpus("dump/lm_train")
+        >>> corpus[0]  # The token ids of the first sentence
+        array([2, 3, 4], dtype=uint16)
+        >>> corpus.tokens[:5]  # The token ids with the separators
+        array([4999, 2, 3, 4, 4999], dtype=uint16)
+
+    """
+
+    def __init__(self, prefix: Union[Path, str]):
+        assert check_argument_types()
+        self.prefix = Path(prefix)
+        with Path(f"{self.prefix}.yaml").open("r", encoding="utf-8") as f:
+            meta = yaml.safe_load(f)
+        self.vocab_size = meta["vocab_size"]
+        self.eos = meta["eos"]
+        self.dtype = np.dtype(meta["dtype"])
+        self.num_tokens = meta["num_tokens"]
+        self.offsets = np.load(f"{self.prefix}.offsets.npy", mmap_mode="r")
+        self._tokens = None
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(prefix={self.prefix}, "
+            f"num_sentences={len(self)}, num_tokens={self.num_tokens})"
+        )
+
+    def __getstate__(self):
+        # Don't pickle the mapped data. It's mapped again in the other process.
+        state = self.__dict__.copy()
+        state["_tokens"] = None
+        return state
+
+    @property
+    def tokens(self) -> np.ndarray:
+        """The flat array of all token ids including the separators"""
+        if self._tokens is None:
+            self._tokens = np.memmap(
+                f"{self.prefix}.bin",
+                dtype=self.dtype,
+                mode="r",
+                shape=(self.num_tokens,),
+            )
+        return self._tokens
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        # -1 to exclude the separator
+        return self.tokens[self.offsets[idx] : self.offsets[idx + 1] - 1]
@@ -1,13 +1,20 @@
+from distutils.version import LooseVersion
+import logging
+import queue
+import threading
 from typing import Any
+from typing import Iterable
 from typing import Sequence
 from typing import Union
 
 import numpy as np
+import torch
 from torch.utils.data import DataLoader
 from typeguard import check_argument_types
 
 from espnet2.iterators.abs_iter_factory import AbsIterFactory
 from espnet2.samplers.abs_sampler import AbsSampler
+from espnet2.torch_utils.device_funcs import to_device
 
 
 class RawSampler(AbsSampler):
@@ -24,6 +31,137 @@ class RawSampler(AbsSampler):
         return list(self.batches)
 
 
+class EpochBatchSampler:
+    """The batch_sampler given to the persistent DataLoader.
+
+    The mini-batches are replaced at every epoch by set_batches(),
+    while the DataLoader and its worker processes are kept alive.
+    Note that the indices are sent to the workers from the main process,
+    so the workers don't need to know the batch list of the epoch.
+    """
+
+    def __init__(self):
+        self.batches = []
+
+    def set_batches(self, batches):
+        self.batches = batches
+
+    def __len__(self):
+        return len(self.batches)
+
+    def __iter__(self):
+        return iter(self.batches)
+
+
+def _record_stream(data, stream: "torch.cuda.Stream"):
+    """Mark the tensors as used by the stream for the caching allocator"""
+    if isinstance(data, dict):
+        for v in data.values():
+            _record_stream(v, stream)
+    elif isinstance(data, (list, tuple)):
+        for v in data:
+            _record_stream(v, stream)
+    elif isinstance(data, torch.Tensor) and data.is_cuda:
+        data.record_stream(stream)
+
+
+class BackgroundIterator:
+    """Iterate the given iterable in a background thread.
+
+    The next mini-batches are prepared, i.e. loaded, collated,
+    and pinned to memory, while the current mini-batch is used for training.
+    If "device" is a CUDA device, the mini-batches are also copied
+    to the device in the background thread using a side CUDA stream,
+    so that the host to device copy is overlapped with the computation.
+
+    Args:
+        iterable: The iterable object, e.g. DataLoader
+        num_prefetch: The maximum number of the prepared mini-batches
+        device: The device to which the mini-batches are sent.
+            If None, the mini-batches are returned as they are.
+    """
+
+    _end = object()
+
+    def __init__(
+        self,
+        iterable: Iterable,
+        num_prefetch: int = 1,
+        device: Union[str, torch.device] = None,
+    ):
+        assert check_argument_types()
+        if num_prefetch <= 0:
+            raise ValueError(f"num_prefetch must be positive: {num_prefetch}")
+        self.iterable = iterable
+        self.num_prefetch = num_prefetch
+        self.device = torch.device(device) if device is not None else None
+
+    def __len__(self):
+        return len(self.iterable)
+
+    def __iter__(self):
+        que = queue.Queue(self.num_prefetch)
+        stop = threading.Event()
+
+        device = self.device
+        if device is not None and device.type == "cuda":
+            # NOTE: The current device is thread local, so derive it here
+            if device.index is None:
+                device = torch.device("cuda", torch.cuda.current_device())
+            stream = torch.cuda.Stream(device)
+        else:
+            stream = None
+
+        def transfer(item):
+            if device is None:
+                return item, None
+            elif stream is None:
+                return to_device(item, device), None
+            with torch.cuda.device(device), torch.cuda.stream(stream):
+                item = to_device(item, device, non_blocking=True)
+                event = torch.cuda.Event()
+                event.record(stream)
+            return item, event
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    que.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def worker():
+            try:
+                for item in self.iterable:
+                    if not put(transfer(item) + (None,)):
+                        return
+            except Exception as e:
+                put((None, None, e))
+            put((self._end, None, None))
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item, event, exc = que.get()
+                if exc is not None:
+                    raise exc
+                if item is self._end:
+                    break
+                if event is not None:
+                    # Wait for the copy on the side stream
+                    current_stream = torch.cuda.current_stream(device)
+                    current_stream.wait_event(event)
+                    _record_stream(item, current_stream)
+                yield item
+        finally:
+            # Stop the worker thread if the iteration is aborted
+            stop.set()
+            thread.join()
+
+
 class SequenceIterFactory(AbsIterFactory):
     """Build iterator for each epoch.
 
@@ -32,6 +170,13 @@ class SequenceIterFactory(AbsIterFactory):
       guarantees reproducibility when resuming from middle of training process.
     - Enable to restrict the number of samples for one epoch. This features
       controls the interval number between training and evaluation.
+    - If persistent_workers is True, the DataLoader and its worker processes,
+      including the loaders and the caches of the dataset, are kept alive
+      across epochs, and only the mini-batch list is replaced at each epoch.
+    - If num_prefetch_batches > 0, the next mini-batches are prepared
+      in a background thread while the current one is used for training.
+      If prefetch_device is also given, they are sent to the device
+      in the background thread.
 
     """
 
@@ -45,6 +190,9 @@ class SequenceIterFactory(AbsIterFactory):
         num_workers: int = 0,
         collate_fn=None,
         pin_memory: bool = False,
+        persistent_workers: bool = False,
+        num_prefetch_batches: int = 0,
+        prefetch_device: Union[str, torch.device] = None,
     ):
         assert check_argument_types()
 
@@ -61,6 +209,20 @@ class SequenceIterFactory(AbsIterFactory):
         self.collate_fn = collate_fn
         # https://discuss.pytorch.org/t/what-is-the-disadvantage-of-using-pin-memory/1702
         self.pin_memory = pin_memory
+        self.num_prefetch_batches = num_prefetch_batches
+        self.prefetch_device = prefetch_device
+
+        if persistent_workers and num_workers == 0:
+            logging.warning("persistent_workers requires num_workers > 0. Ignored.")
+            persistent_workers = False
+        if persistent_workers and LooseVersion(torch.__version__) < LooseVersion(
+            "1.7.0"
+        ):
+            raise RuntimeError("Require torch>=1.7.0 for persistent_workers")
+        self.persistent_workers = persistent_workers
+        # The persistent DataLoader is built at the first build_iter()
+        self.epoch_batch_sampler = None
+        self.loader = None
 
     def build_iter(self, epoch: int, shuffle: bool = None) -> DataLoader:
         if shuffle is None:
@@ -134,10 +296,31 @@ class SequenceIterFactory(AbsIterFactory):
         else:
             kwargs = {}
 
-        return DataLoader(
-            dataset=self.dataset,
-            batch_sampler=batches,
-            num_workers=self.num_workers,
-            pin_memory=self.pin_memory,
-            **kwargs,
-        )
+        if self.persistent_workers:
+            if self.loader is None:
+                self.epoch_batch_sampler = EpochBatchSampler()
+                self.loader = DataLoader(
+                    dataset=self.dataset,
+                    batch_sampler=self.epoch_batch_sampler,
+                    num_workers=self.num_workers,
+                    pin_memory=self.pin_memory,
+                    persistent_workers=True,
+                    **kwargs,
+                )
+            self.epoch_batch_sampler.set_batches(batches)
+            loader = self.loader
+        else:
+            loader = DataLoader(
+                dataset=self.dataset,
+                batch_sampler=batches,
+                num_workers=self.num_workers,
+                pin_memory=self.pin_memory,
+                **kwargs,
+            )
+
+        if self.num_prefetch_batches > 0:
+            return BackgroundIterator(
+                loader, self.num_prefetch_batches, device=self.prefetch_device
+            )
+        else:
+            return loader
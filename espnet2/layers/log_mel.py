@@ -1,4 +1,3 @@
-import librosa
 import torch
 from typing import Tuple
 
@@ -45,6 +44,9 @@ class LogMel(torch.nn.Module):
         self.mel_options = _mel_options
         self.log_base = log_base
 
+        # NOTE: librosa is imported here because it takes long time to import
+        import librosa
+
         # Note(kamo): The mel matrix of librosa is different from kaldi.
         melmat = librosa.filters.mel(**_mel_options)
         # melmat: (D2, D1) -> (D1, D2)
@@ -7,6 +7,7 @@ from typeguard import check_argument_types
 
 from espnet.nets.pytorch_backend.nets_utils import make_pad_mask
 from espnet2.lm.abs_model import AbsLM
+from espnet2.lm.transformer_lm import TransformerLM
 from espnet2.torch_utils.device_funcs import force_gatherable
 from espnet2.train.abs_espnet_model import AbsESPnetModel
 
@@ -50,11 +51,56 @@ class ESPnetLanguageModel(AbsESPnetModel):
         nll = nll.view(batch_size, -1)
         return nll, x_lengths
 
+    def nll_packed(self, packed_text: torch.Tensor) -> torch.Tensor:
+        """Compute the negative log likelihood of the packed sentences
+
+        The sentences are concatenated with <sos/eos> as the separator,
+        e.g. "w1 w2 <sos/eos> w3 w4 <sos/eos> w5", and the block is cut out
+        at any position. For TransformerLM, the attention is masked
+        not to see the previous sentences in the block. For the other LMs,
+        e.g. RNN, the state is carried over the boundaries of the sentences,
+        and the model learns to reset the context at <sos/eos>.
+
+        Args:
+            packed_text: (Batch, Length + 1)
+        Returns:
+            nll: (Batch, Length)
+        """
+        batch_size = packed_text.size(0)
+        x = packed_text[:, :-1]
+        t = packed_text[:, 1:]
+        if isinstance(self.lm, TransformerLM):
+            # segments: (Batch, Length), the index of the sentence in the block
+            segments = (x == self.eos).cumsum(dim=-1)
+            y, _ = self.lm(x, None, segments=segments)
+        else:
+            y, _ = self.lm(x, None)
+        nll = F.cross_entropy(
+            y.reshape(-1, y.shape[-1]), t.reshape(-1), reduction="none"
+        )
+        return nll.view(batch_size, -1)
+
     def forward(
-        self, text: torch.Tensor, text_lengths: torch.Tensor
+        self,
+        text: torch.Tensor = None,
+        text_lengths: torch.Tensor = None,
+        packed_text: torch.Tensor = None,
     ) -> Tuple[torch.Tensor, Dict[str, torch.Tensor], torch.Tensor]:
-        nll, y_lengths = self.nll(text, text_lengths)
-        ntokens = y_lengths.sum()
+        """Calc loss
+
+        Args:
+            text: (Batch, Length)
+            text_lengths: (Batch,)
+            packed_text: (Batch, Length + 1), the fixed-length blocks of
+                the packed sentences, which are given instead of "text".
+                See also PackedTokenDataset.
+        """
+        if packed_text is not None:
+            nll = self.nll_packed(packed_text)
+            ntokens = torch.tensor(nll.numel(), device=nll.device)
+        else:
+            nll, y_lengths = self.nll(text, text_lengths)
+            ntokens = y_lengths.sum()
         loss = nll.sum() / ntokens
         stats = dict(loss=loss.detach())
 
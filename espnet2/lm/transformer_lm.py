@@ -52,16 +52,23 @@ class TransformerLM(AbsLM):
         m = subsequent_mask(ys_mask.size(-1), device=ys_mask.device).unsqueeze(0)
         return ys_mask.unsqueeze(-2) & m
 
-    def forward(self, input: torch.Tensor, hidden: None) -> Tuple[torch.Tensor, None]:
+    def forward(
+        self, input: torch.Tensor, hidden: None, segments: torch.Tensor = None
+    ) -> Tuple[torch.Tensor, None]:
         """Compute LM loss value from buffer sequences.
 
         Args:
             input (torch.Tensor): Input ids. (batch, len)
             hidden (torch.Tensor): Target ids. (batch, len)
+            segments (torch.Tensor): The indices of the sentences
+                packed in the input. (batch, len)
+                The attention across the sentences is masked if given.
 
         """
         x = self.embed(input)
         mask = self._target_mask(input)
+        if segments is not None:
+            mask = mask & (segments.unsqueeze(-1) == segments.unsqueeze(-2))
         h, _ = self.encoder(x, mask)
         y = self.decoder(h)
         return y, None
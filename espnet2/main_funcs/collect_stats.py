@@ -1,11 +1,22 @@
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
 import logging
+import multiprocessing
+import os
 from pathlib import Path
+import pickle
+import shutil
+import sqlite3
+from typing import Callable
+from typing import Collection
 from typing import Dict
 from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
+from typing import Union
 
 import numpy as np
 import torch
@@ -13,13 +24,211 @@ from torch.nn.parallel import data_parallel
 from torch.utils.data import DataLoader
 from typeguard import check_argument_types
 
-from espnet2.fileio.datadir_writer import DatadirWriter
+from espnet2.bin.aggregate_stats_dirs import aggregate_stats_dirs
 from espnet2.fileio.npy_scp import NpyScpWriter
+from espnet2.fileio.packed_scp import PackedScpWriter
 from espnet2.torch_utils.device_funcs import to_device
 from espnet2.torch_utils.forward_adaptor import ForwardAdaptor
 from espnet2.train.abs_espnet_model import AbsESPnetModel
 
 
+class CollectStatsCache:
+    """Keyed cache of the per-utterance results of collect_stats.
+
+    The shapes and the statistics, i.e. the sum, the square sum, and the count,
+    of each utterance are stored in a sqlite database with the hash of
+    its input entries, so that a rerun processes only the new or changed
+    utterances and rebuilds "*_shape" and "*_stats.npz" from the cache.
+    All entries are discarded when the fingerprint of the configuration
+    is changed.
+
+    Examples:
+        >>> cache = CollectStatsCache("stats_cache.db", fingerprint)
+        >>> cache.set_utt2hash("train", compute_utt2hash(data_path_and_name_and_type))
+        >>> keys = cache.missing_keys("train")
+
+    """
+
+    def __init__(self, path: Union[Path, str], fingerprint: str):
+        assert check_argument_types()
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.utt2hash = {"train": {}, "valid": {}}
+        self._conn = None
+
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE name = 'fingerprint'"
+        ).fetchone()
+        if row is None or row[0] != fingerprint:
+            if row is not None:
+                logging.warning(
+                    f"The configuration is changed. Discard the cache: {self.path}"
+                )
+            self.conn.execute("DELETE FROM entries")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (fingerprint,)
+            )
+            self.conn.commit()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # The database can be written by the parallel jobs at the same time
+            self._conn = sqlite3.connect(str(self.path), timeout=600)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "mode TEXT, key TEXT, hash TEXT, value BLOB, PRIMARY KEY (mode, key))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def __getstate__(self):
+        # The connection can't be pickled and is opened again in the sub-process
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        return state
+
+    def set_utt2hash(self, mode: str, utt2hash: Dict[str, str]):
+        """Set the keys and their hashes to be collected for the mode"""
+        self.utt2hash[mode] = utt2hash
+
+    def subset(self, keys: Dict[str, Collection[str]]) -> "CollectStatsCache":
+        """Return a cache restricted to the given keys of each mode"""
+        retval = pickle.loads(pickle.dumps(self))
+        for mode, _keys in keys.items():
+            retval.utt2hash[mode] = {k: self.utt2hash[mode][k] for k in _keys}
+        return retval
+
+    def missing_keys(self, mode: str) -> List[str]:
+        """Return the keys which are not cached or whose hashes are changed"""
+        cached = dict(
+            self.conn.execute("SELECT key, hash FROM entries WHERE mode = ?", (mode,))
+        )
+        return [k for k, h in self.utt2hash[mode].items() if cached.get(k) != h]
+
+    def put(
+        self,
+        mode: str,
+        key: str,
+        shapes: Dict[str, Tuple[int, ...]],
+        stats: Dict[str, Tuple[np.ndarray, np.ndarray, int]],
+    ):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+            (
+                mode,
+                key,
+                self.utt2hash[mode][key],
+                pickle.dumps(dict(shapes=shapes, stats=stats)),
+            ),
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def write_outputs(self, mode: str, output_dir: Path) -> Tuple[List[str], List[str]]:
+        """Write "*_shape" and "*_stats.npz" of the keys from the cache
+
+        Returns:
+            batch_keys: The names of the shape files
+            stats_keys: The names of the stats files
+        """
+        utt2hash = self.utt2hash[mode]
+        output_dir.mkdir(parents=True, exist_ok=True)
+        shape_files = {}
+        sum_dict = defaultdict(lambda: 0)
+        sq_dict = defaultdict(lambda: 0)
+        count_dict = defaultdict(lambda: 0)
+        num_found = 0
+        try:
+            # The lines of shape files are sorted by the keys
+            # as same as aggregate_stats_dirs.py
+            for key, h, value in self.conn.execute(
+                "SELECT key, hash, value FROM entries WHERE mode = ? ORDER BY key",
+                (mode,),
+            ):
+                if utt2hash.get(key) != h:
+                    continue
+                num_found += 1
+                value = pickle.loads(value)
+                for name, shape in value["shapes"].items():
+                    if name not in shape_files:
+                        shape_files[name] = (output_dir / f"{name}_shape").open(
+                            "w", encoding="utf-8"
+                        )
+                    shape_files[name].write(f"{key} {','.join(map(str, shape))}\n")
+                for name, (_sum, _sq, _count) in value["stats"].items():
+                    sum_dict[name] += _sum
+                    sq_dict[name] += _sq
+                    count_dict[name] += _count
+        finally:
+            for f in shape_files.values():
+                f.close()
+        if num_found != len(utt2hash):
+            raise RuntimeError(
+                f"{len(utt2hash) - num_found} utterances are not found in {self.path}"
+            )
+
+        for name in sum_dict:
+            np.savez(
+                output_dir / f"{name}_stats.npz",
+                count=count_dict[name],
+                sum=sum_dict[name],
+                sum_square=sq_dict[name],
+            )
+        return list(shape_files), list(sum_dict)
+
+
+def compute_utt2hash(
+    data_path_and_name_and_type: Sequence[Tuple[str, str, str]],
+    key_file: str = None,
+) -> Dict[str, str]:
+    """Derive the hash of the input entries for each key
+
+    The hash is computed from the lines of the data files, e.g. wav.scp and text,
+    and the size and the modification time if the entry points out a file.
+
+    Args:
+        data_path_and_name_and_type:
+        key_file: The file which has the keys at the first column.
+            If omitted, the first data file is used.
+    Returns:
+        utt2hash: The keys are ordered as the key file
+    """
+    if key_file is None:
+        key_file = data_path_and_name_and_type[0][0]
+    entries = {}
+    with open(key_file, encoding="utf-8") as f:
+        for line in f:
+            if line.strip() != "":
+                entries[line.split(maxsplit=1)[0]] = []
+
+    for path, name, _type in data_path_and_name_and_type:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                sps = line.rstrip().split(maxsplit=1)
+                if len(sps) != 2 or sps[0] not in entries:
+                    continue
+                key, value = sps
+                entry = f"{name},{_type},{value}"
+                # e.g. "/some/where/a.wav" or "/some/where/a.ark:123"
+                for p in [value, value.rsplit(":", 1)[0]]:
+                    if os.path.isfile(p):
+                        stat = os.stat(p)
+                        entry += f",{stat.st_size},{stat.st_mtime_ns}"
+                        break
+                entries[key].append(entry)
+
+    return {
+        k: hashlib.sha1("\n".join(v).encode("utf-8")).hexdigest()
+        for k, v in entries.items()
+    }
+
+
 @torch.no_grad()
 def collect_stats(
     model: AbsESPnetModel,
@@ -29,6 +238,8 @@ def collect_stats(
     ngpu: Optional[int],
     log_interval: Optional[int],
     write_collected_feats: bool,
+    cache: Optional[CollectStatsCache] = None,
+    collected_feats_format: str = "npy",
 ) -> None:
     """Perform on collect_stats mode.
 
@@ -36,8 +247,23 @@ def collect_stats(
     and gathering statistics.
     This method is used before executing train().
 
+    If "cache" is given, the results of each utterance are stored in the cache
+    and the outputs are written from the cache for all keys of the cache,
+    so the iterators need to yield only the utterances missing in the cache.
+
+    If "write_collected_feats" is True, the features are written to
+    "output_dir/<mode>/collect_feats/<name>.scp" as a npy file for each utterance
+    if "collected_feats_format" is "npy", or as a packed binary file
+    "data_<name>.bin" if "packed", which is read via memory-mapping.
+
     """
     assert check_argument_types()
+    if cache is not None and write_collected_feats:
+        raise RuntimeError("write_collected_feats can't be used with the cache")
+    if collected_feats_format not in ("npy", "packed"):
+        raise ValueError(
+            f"collected_feats_format must be npy or packed: {collected_feats_format}"
+        )
 
     npy_scp_writers = {}
     for itr, mode in zip([train_iter, valid_iter], ["train", "valid"]):
@@ -51,21 +277,30 @@ def collect_stats(
         sq_dict = defaultdict(lambda: 0)
         count_dict = defaultdict(lambda: 0)
 
-        with DatadirWriter(output_dir / mode) as datadir_writer:
+        (output_dir / mode).mkdir(parents=True, exist_ok=True)
+        shape_files = {}
+        batch_keys = []
+        try:
             for iiter, (keys, batch) in enumerate(itr, 1):
                 batch = to_device(batch, "cuda" if ngpu > 0 else "cpu")
+                batch_keys = [k for k in batch if not k.endswith("_lengths")]
 
                 # 1. Write shape file
-                for name in batch:
-                    if name.endswith("_lengths"):
+                for name in batch_keys:
+                    if cache is not None:
+                        # Shape files are written from the cache at the end
                         continue
-                    for i, (key, data) in enumerate(zip(keys, batch[name])):
-                        if f"{name}_lengths" in batch:
-                            lg = int(batch[f"{name}_lengths"][i])
-                            data = data[:lg]
-                        datadir_writer[f"{name}_shape"][key] = ",".join(
-                            map(str, data.shape)
+                    if name not in shape_files:
+                        shape_files[name] = (output_dir / mode / f"{name}_shape").open(
+                            "w", encoding="utf-8"
+                        )
+                    # Write the lines of the mini-batch at once
+                    shape_files[name].write(
+                        "".join(
+                            f"{key} {','.join(map(str, shape))}\n"
+                            for key, shape in zip(keys, _get_shapes(batch, name))
                         )
+                    )
 
                 # 2. Extract feats
                 if ngpu <= 1:
@@ -80,47 +315,283 @@ def collect_stats(
                     )
 
                 # 3. Calculate sum and square sum
+                utt_stats = {}
                 for key, v in data.items():
-                    for i, (uttid, seq) in enumerate(zip(keys, v.cpu().numpy())):
-                        # Truncate zero-padding region
-                        if f"{key}_lengths" in data:
-                            length = data[f"{key}_lengths"][i]
-                            # seq: (Length, Dim, ...)
-                            seq = seq[:length]
-                        else:
-                            # seq: (Dim, ...) -> (1, Dim, ...)
-                            seq = seq[None]
-                        # Accumulate value, its square, and count
-                        sum_dict[key] += seq.sum(0)
-                        sq_dict[key] += (seq ** 2).sum(0)
-                        count_dict[key] += len(seq)
-
-                        # 4. [Option] Write derived features as npy format file.
-                        if write_collected_feats:
-                            # Instantiate NpyScpWriter for the first iteration
+                    if cache is not None:
+                        # Keep the results of each utterance for the cache
+                        utt_stats[key] = _masked_stats(
+                            v, data.get(f"{key}_lengths"), reduce=False
+                        )
+                        continue
+                    # Accumulate value, its square, and count over the mini-batch
+                    _sum, _sq, _count = _masked_stats(v, data.get(f"{key}_lengths"))
+                    sum_dict[key] += _sum
+                    sq_dict[key] += _sq
+                    count_dict[key] += _count
+
+                    # 4. [Option] Write derived features as npy format file.
+                    if write_collected_feats:
+                        for i, (uttid, seq) in enumerate(zip(keys, v.cpu().numpy())):
+                            # Truncate zero-padding region
+                            if f"{key}_lengths" in data:
+                                length = data[f"{key}_lengths"][i]
+                                # seq: (Length, Dim, ...)
+                                seq = seq[:length]
+                            else:
+                                # seq: (Dim, ...) -> (1, Dim, ...)
+                                seq = seq[None]
+                            # Instantiate the writer for the first iteration
                             if (key, mode) not in npy_scp_writers:
                                 p = output_dir / mode / "collect_feats"
-                                npy_scp_writers[(key, mode)] = NpyScpWriter(
-                                    p / f"data_{key}", p / f"{key}.scp"
-                                )
+                                if collected_feats_format == "packed":
+                                    writer = PackedScpWriter(
+                                        p / f"data_{key}.bin", p / f"{key}.scp"
+                                    )
+                                else:
+                                    writer = NpyScpWriter(
+                                        p / f"data_{key}", p / f"{key}.scp"
+                                    )
+                                npy_scp_writers[(key, mode)] = writer
                             # Save array as npy file
                             npy_scp_writers[(key, mode)][uttid] = seq
 
+                if cache is not None:
+                    shapes = {name: _get_shapes(batch, name) for name in batch_keys}
+                    for i, uttid in enumerate(keys):
+                        cache.put(
+                            mode,
+                            uttid,
+                            shapes={name: v[i] for name, v in shapes.items()},
+                            stats={
+                                k: (v[0][i], v[1][i], int(v[2][i]))
+                                for k, v in utt_stats.items()
+                            },
+                        )
+                    cache.commit()
+
                 if iiter % log_interval == 0:
                     logging.info(f"Niter: {iiter}")
+        finally:
+            for f in shape_files.values():
+                f.close()
+            for (_, _mode), writer in npy_scp_writers.items():
+                if _mode == mode:
+                    writer.close()
 
-        for key in sum_dict:
-            np.savez(
-                output_dir / mode / f"{key}_stats.npz",
-                count=count_dict[key],
-                sum=sum_dict[key],
-                sum_square=sq_dict[key],
+        if cache is not None:
+            batch_keys, stats_keys = cache.write_outputs(mode, output_dir / mode)
+        else:
+            for key in sum_dict:
+                np.savez(
+                    output_dir / mode / f"{key}_stats.npz",
+                    count=count_dict[key],
+                    sum=sum_dict[key],
+                    sum_square=sq_dict[key],
+                )
+            stats_keys = list(sum_dict)
+        _write_keys(output_dir / mode, batch_keys, stats_keys)
+
+
+def _write_keys(output_dir: Path, batch_keys: List[str], stats_keys: List[str]):
+    # batch_keys and stats_keys are used by aggregate_stats_dirs.py
+    with (output_dir / "batch_keys").open("w", encoding="utf-8") as f:
+        f.write("\n".join(batch_keys) + "\n")
+    with (output_dir / "stats_keys").open("w", encoding="utf-8") as f:
+        f.write("\n".join(stats_keys) + "\n")
+
+
+def _get_shapes(batch: Dict[str, torch.Tensor], name: str) -> List[Tuple[int, ...]]:
+    """Derive the shape of each sample without the padded region"""
+    shape = tuple(batch[name].shape[1:])
+    if f"{name}_lengths" in batch:
+        return [(lg,) + shape[1:] for lg in batch[f"{name}_lengths"].tolist()]
+    else:
+        return [shape] * len(batch[name])
+
+
+def _write_outputs_from_cache(cache: CollectStatsCache, output_dir: Path):
+    for mode in ["train", "valid"]:
+        batch_keys, stats_keys = cache.write_outputs(mode, output_dir / mode)
+        _write_keys(output_dir / mode, batch_keys, stats_keys)
+
+
+def _masked_stats(
+    v: torch.Tensor, lengths: Optional[torch.Tensor], reduce: bool = True
+) -> Tuple[np.ndarray, np.ndarray, Union[int, np.ndarray]]:
+    """Calculate the sum, the square sum, and the count over the mini-batch
+
+    The padded region is excluded using "lengths" and
+    the values are accumulated with float64 to avoid the loss of precision.
+
+    Args:
+        v: (Batch, Length, Dim, ...) if lengths is given else (Batch, Dim, ...)
+        lengths: (Batch,)
+        reduce: If False, return the results for each sample
+    Returns:
+        sum: (Dim, ...) or (Batch, Dim, ...)
+        square_sum: (Dim, ...) or (Batch, Dim, ...)
+        count: The number of frames or (Batch,)
+    """
+    v = v.to(torch.float64)
+    if lengths is not None:
+        lengths = lengths.to(v.device).clamp(max=v.size(1))
+        # mask: (Batch, Length, 1, ...)
+        mask = torch.arange(v.size(1), device=v.device)[None] < lengths[:, None]
+        mask = mask.view(mask.shape + (1,) * (v.dim() - 2))
+        v = v.masked_fill(~mask, 0.0)
+        sums = v.sum(1)
+        square_sums = (v ** 2).sum(1)
+        counts = lengths
+    else:
+        sums = v
+        square_sums = v ** 2
+        counts = torch.ones(len(v), dtype=torch.long)
+
+    if reduce:
+        return (
+            sums.sum(0).cpu().numpy(),
+            square_sums.sum(0).cpu().numpy(),
+            int(counts.sum()),
+        )
+    else:
+        return sums.cpu().numpy(), square_sums.cpu().numpy(), counts.cpu().numpy()
+
+
+def _collect_stats_job(
+    model: AbsESPnetModel,
+    build_iters: Callable[[str, str], Tuple[Iterable, Iterable]],
+    train_key_file: str,
+    valid_key_file: str,
+    output_dir: Path,
+    ngpu: Optional[int],
+    log_interval: Optional[int],
+    write_collected_feats: bool,
+    log_level: int,
+    cache: Optional[CollectStatsCache],
+    collected_feats_format: str,
+):
+    logging.basicConfig(
+        level=log_level,
+        format="%(asctime)s (%(module)s:%(lineno)d) %(levelname)s: %(message)s",
+    )
+    train_iter, valid_iter = build_iters(train_key_file, valid_key_file)
+    collect_stats(
+        model=model,
+        train_iter=train_iter,
+        valid_iter=valid_iter,
+        output_dir=output_dir,
+        ngpu=ngpu,
+        log_interval=log_interval,
+        write_collected_feats=write_collected_feats,
+        cache=cache,
+        collected_feats_format=collected_feats_format,
+    )
+
+
+def collect_stats_sharded(
+    model: AbsESPnetModel,
+    build_iters: Callable[[str, str], Tuple[Iterable, Iterable]],
+    train_key_file: str,
+    valid_key_file: str,
+    output_dir: Path,
+    ngpu: Optional[int],
+    log_interval: Optional[int],
+    write_collected_feats: bool,
+    num_jobs: int,
+    cache: Optional[CollectStatsCache] = None,
+    collected_feats_format: str = "npy",
+) -> None:
+    """Perform collect_stats() with parallel jobs over disjoint key shards.
+
+    The keys are split into "num_jobs" shards and collect_stats() is
+    performed for each shard in a sub-process. The results are written in
+    "output_dir/shards/shard.{i}" and merged into "output_dir" as same as
+    aggregate_stats_dirs.py does. If "cache" is given, the key files should have
+    only the keys missing in the cache, and the outputs are written from the cache.
+
+    Args:
+        build_iters: A picklable function to build the iterators
+            for the train and valid data from the given key files.
+        train_key_file: The file which has the keys at the first column
+        valid_key_file: The file which has the keys at the first column
+    """
+    assert check_argument_types()
+
+    key_lines = {}
+    for mode, key_file in [("train", train_key_file), ("valid", valid_key_file)]:
+        with open(key_file, encoding="utf-8") as f:
+            key_lines[mode] = [line for line in f if line.strip() != ""]
+    if cache is None:
+        num_jobs = min(num_jobs, len(key_lines["train"]), len(key_lines["valid"]))
+        if num_jobs <= 1:
+            # e.g. A key file has only one line or is empty
+            train_iter, valid_iter = build_iters(train_key_file, valid_key_file)
+            collect_stats(
+                model=model,
+                train_iter=train_iter,
+                valid_iter=valid_iter,
+                output_dir=output_dir,
+                ngpu=ngpu,
+                log_interval=log_interval,
+                write_collected_feats=write_collected_feats,
+                collected_feats_format=collected_feats_format,
             )
+            return
+    else:
+        # A shard can be empty with the cache
+        num_jobs = min(num_jobs, max(len(v) for v in key_lines.values()))
+        if num_jobs == 0:
+            # All utterances are cached
+            _write_outputs_from_cache(cache, output_dir)
+            return
+
+    shard_dirs = [output_dir / "shards" / f"shard.{i}" for i in range(num_jobs)]
+    shard_keys = [{} for _ in shard_dirs]
+    for mode, lines in key_lines.items():
+        for i, shard_dir in enumerate(shard_dirs):
+            shard_dir.mkdir(parents=True, exist_ok=True)
+            # Split the keys into contiguous shards to keep the order
+            start = len(lines) * i // num_jobs
+            end = len(lines) * (i + 1) // num_jobs
+            with (shard_dir / f"{mode}.keys").open("w", encoding="utf-8") as f:
+                f.writelines(lines[start:end])
+            shard_keys[i][mode] = [line.split()[0] for line in lines[start:end]]
 
-        # batch_keys and stats_keys are used by aggregate_stats_dirs.py
-        with (output_dir / mode / "batch_keys").open("w", encoding="utf-8") as f:
-            f.write(
-                "\n".join(filter(lambda x: not x.endswith("_lengths"), batch)) + "\n"
+    log_level = logging.getLogger().level
+    # NOTE(kamo): Use "spawn" because CUDA can't be used in the forked processes
+    with ProcessPoolExecutor(
+        max_workers=num_jobs, mp_context=multiprocessing.get_context("spawn")
+    ) as e:
+        futures = [
+            e.submit(
+                _collect_stats_job,
+                model,
+                build_iters,
+                str(shard_dir / "train.keys"),
+                str(shard_dir / "valid.keys"),
+                shard_dir,
+                ngpu,
+                log_interval,
+                write_collected_feats,
+                log_level,
+                None if cache is None else cache.subset(keys),
+                collected_feats_format,
             )
-        with (output_dir / mode / "stats_keys").open("w", encoding="utf-8") as f:
-            f.write("\n".join(sum_dict) + "\n")
+            for shard_dir, keys in zip(shard_dirs, shard_keys)
+        ]
+        for f in futures:
+            f.result()
+
+    if cache is not None:
+        _write_outputs_from_cache(cache, output_dir)
+        return
+
+    aggregate_stats_dirs(
+        input_dir=shard_dirs,
+        output_dir=output_dir,
+        log_level=logging.getLevelName(log_level),
+        skip_sum_stats=False,
+    )
+    for mode in ["train", "valid"]:
+        for name in ["batch_keys", "stats_keys"]:
+            shutil.copyfile(shard_dirs[0] / mode / name, output_dir / mode / name)
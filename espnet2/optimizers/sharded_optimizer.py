@@ -0,0 +1,184 @@
+from collections import defaultdict
+from distutils.version import LooseVersion
+import pickle
+from typing import Any
+from typing import Dict
+from typing import List
+
+import numpy as np
+import torch
+import torch.distributed
+from torch._utils import _flatten_dense_tensors
+from torch._utils import _unflatten_dense_tensors
+from typeguard import check_argument_types
+
+from espnet2.torch_utils.device_funcs import to_device
+
+
+class ShardedOptimizer(torch.optim.Optimizer):
+    """Shard the optimizer states across the data-parallel ranks (ZeRO stage-1)
+
+    Each rank holds the states, e.g. the moments of Adam, only for its own
+    partition of the parameters and updates only them at step().
+    The updated parameters are broadcasted from the owner rank to the others.
+    The gradients must be synchronized before step(), e.g. by
+    DistributedDataParallel.
+
+    state_dict() gathers the states of all ranks to rank 0 and returns
+    the same format as "optim_class(params).state_dict()",
+    so that it can be loaded by both of ShardedOptimizer and the original
+    optimizer class. The other ranks return only the param_groups
+    with empty "state". Note that state_dict() is a collective operation
+    and must be invoked by all ranks.
+
+    >>> optim = ShardedOptimizer(model.parameters(), torch.optim.Adam, lr=0.001)
+
+    """
+
+    def __init__(self, params, optim_class: type, **kwargs):
+        assert check_argument_types()
+        if LooseVersion(torch.__version__) < LooseVersion("1.8.0"):
+            raise RuntimeError("Require torch>=1.8.0 for ShardedOptimizer")
+        if not torch.distributed.is_initialized():
+            raise RuntimeError("torch.distributed is not initialized")
+        super().__init__(params, kwargs)
+        self.optim_class = optim_class
+        self.rank = torch.distributed.get_rank()
+        self.world_size = torch.distributed.get_world_size()
+
+        # 1. Partition the parameters to balance the number of elements
+        numels = [0] * self.world_size
+        self.param_to_rank = {}
+        for group in self.param_groups:
+            for p in group["params"]:
+                rank = numels.index(min(numels))
+                self.param_to_rank[p] = rank
+                numels[rank] += p.numel()
+
+        # 2. Build the optimizer for the local partition
+        local_groups = []
+        for group in self.param_groups:
+            local_group = {k: v for k, v in group.items() if k != "params"}
+            local_group["params"] = [
+                p for p in group["params"] if self.param_to_rank[p] == self.rank
+            ]
+            local_groups.append(local_group)
+        self.optim = optim_class(local_groups, **kwargs)
+
+        # Fill the default values of optim_class to the global param_groups
+        for group, local_group in zip(self.param_groups, self.optim.param_groups):
+            for k, v in local_group.items():
+                group.setdefault(k, v)
+
+    def _sync_param_groups(self):
+        # The hyper parameters, e.g. lr, may be changed by lr schedulers
+        for group, local_group in zip(self.param_groups, self.optim.param_groups):
+            for k, v in group.items():
+                if k != "params":
+                    local_group[k] = v
+
+    @torch.no_grad()
+    def _broadcast_params(self):
+        params_per_rank = defaultdict(list)
+        for group in self.param_groups:
+            for p in group["params"]:
+                if p.requires_grad:
+                    params_per_rank[self.param_to_rank[p], p.dtype].append(p)
+
+        for (rank, _), params in params_per_rank.items():
+            flat = _flatten_dense_tensors([p.data for p in params])
+            torch.distributed.broadcast(flat, src=rank)
+            if rank != self.rank:
+                for p, synced in zip(params, _unflatten_dense_tensors(flat, params)):
+                    p.data.copy_(synced)
+
+    def step(self, closure=None):
+        self._sync_param_groups()
+        loss = self.optim.step(closure)
+        self._broadcast_params()
+        return loss
+
+    def _global_index(self) -> Dict[torch.Tensor, int]:
+        index = {}
+        for group in self.param_groups:
+            for p in group["params"]:
+                index.setdefault(p, len(index))
+        return index
+
+    def _object_device(self) -> torch.device:
+        # NCCL communicates only the tensors in GPU
+        if torch.distributed.get_backend() == torch.distributed.Backend.NCCL:
+            return torch.device("cuda", torch.cuda.current_device())
+        return torch.device("cpu")
+
+    def _send_object(self, obj: Any, dst: int):
+        data = np.frombuffer(pickle.dumps(obj), dtype=np.uint8)
+        tensor = torch.from_numpy(data.copy()).to(self._object_device())
+        size = torch.tensor([tensor.numel()], device=tensor.device)
+        torch.distributed.send(size, dst=dst)
+        torch.distributed.send(tensor, dst=dst)
+
+    def _recv_object(self, src: int) -> Any:
+        device = self._object_device()
+        size = torch.zeros(1, dtype=torch.long, device=device)
+        torch.distributed.recv(size, src=src)
+        tensor = torch.empty(int(size), dtype=torch.uint8, device=device)
+        torch.distributed.recv(tensor, src=src)
+        return pickle.loads(tensor.cpu().numpy().tobytes())
+
+    def state_dict(self) -> Dict[str, Any]:
+        self._sync_param_groups()
+        index = self._global_index()
+
+        # 1. Derive the states of the local partition with global indices
+        local_state = {
+            index[p]: to_device(s, "cpu") for p, s in self.optim.state.items()
+        }
+
+        # 2. Gather the states to rank 0 one by one.
+        #   The other ranks don't receive the states of the other partitions.
+        #   NOTE: gather_object() is not supported by NCCL in torch<1.11,
+        #   so the pickled states are sent by send()/recv().
+        state = {}
+        if self.rank == 0:
+            state.update(local_state)
+            for src in range(1, self.world_size):
+                state.update(self._recv_object(src))
+            state = {k: state[k] for k in sorted(state)}
+        else:
+            self._send_object(local_state, dst=0)
+
+        param_groups = []
+        for group in self.param_groups:
+            packed = {k: v for k, v in group.items() if k != "params"}
+            packed["params"] = [index[p] for p in group["params"]]
+            param_groups.append(packed)
+        return {"state": state, "param_groups": param_groups}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        saved_groups = state_dict["param_groups"]
+        if len(saved_groups) != len(self.param_groups):
+            raise ValueError(
+                "loaded state dict has a different number of parameter groups"
+            )
+
+        local_state = {}
+        local_groups: List[Dict[str, Any]] = []
+        for group, saved_group in zip(self.param_groups, saved_groups):
+            if len(group["params"]) != len(saved_group["params"]):
+                raise ValueError(
+                    "loaded state dict contains a parameter group "
+                    "that doesn't match the size of optimizer's group"
+                )
+            group.update({k: v for k, v in saved_group.items() if k != "params"})
+
+            local_group = {k: v for k, v in saved_group.items() if k != "params"}
+            local_group["params"] = []
+            for p, idx in zip(group["params"], saved_group["params"]):
+                if self.param_to_rank[p] == self.rank:
+                    local_group["params"].append(idx)
+                    if idx in state_dict["state"]:
+                        local_state[idx] = state_dict["state"][idx]
+            local_groups.append(local_group)
+
+        self.optim.load_state_dict({"state": local_state, "param_groups": local_groups})
@@ -0,0 +1,91 @@
+from typing import Iterator
+from typing import List
+
+import numpy as np
+from typeguard import check_argument_types
+
+from espnet2.samplers.abs_sampler import AbsSampler
+
+
+class PackedBlockSampler(AbsSampler):
+    """BatchSampler of the fixed-length blocks of a flat token array.
+
+    The token array, e.g. TokenCorpus.tokens, is split into the blocks
+    of "block_length + 1" tokens, which overlap by one token
+    for the input and the target of the language model, and
+    the sentences are packed into the blocks across their boundaries.
+    The i-th block is tokens[i * block_length : (i + 1) * block_length + 1],
+    so that a mini-batch is given as the indices of the blocks
+    without any table of the samples.
+
+    Args:
+        num_tokens: The length of the token array
+        block_length: The number of the input tokens in a block
+        batch_size: The number of the blocks in a mini-batch
+        shuffle: Shuffle the blocks with the seed given to generate()
+        world_size: The number of the processes of distributed training.
+            Each mini-batch is split among them.
+        rank: The rank of this process
+    """
+
+    def __init__(
+        self,
+        num_tokens: int,
+        block_length: int,
+        batch_size: int,
+        shuffle: bool = False,
+        world_size: int = 1,
+        rank: int = 0,
+    ):
+        assert check_argument_types()
+        assert block_length > 0, block_length
+        assert batch_size > 0, batch_size
+        self.num_tokens = num_tokens
+        self.block_length = block_length
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.world_size = world_size
+        self.rank = rank
+        if batch_size < world_size:
+            raise RuntimeError(
+                f"batch_size must be equal or more than world_size: "
+                f"{batch_size} < {world_size}"
+            )
+
+        self.num_blocks = (num_tokens - 1) // block_length
+        if self.num_blocks == 0:
+            raise RuntimeError(
+                f"The corpus is shorter than a block: {num_tokens} <= {block_length}"
+            )
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}("
+            f"N-batch={len(self)}, "
+            f"N-block={self.num_blocks}, "
+            f"block_length={self.block_length}, "
+            f"batch_size={self.batch_size}, "
+            f"shuffle={self.shuffle})"
+        )
+
+    def __len__(self):
+        num_batches, remainder = divmod(self.num_blocks, self.batch_size)
+        # The last mini-batch is dropped if it can't be split among the processes
+        if remainder >= self.world_size:
+            num_batches += 1
+        return num_batches
+
+    def generate(self, seed: int) -> List[List[int]]:
+        if self.shuffle:
+            blocks = np.random.RandomState(seed).permutation(self.num_blocks)
+        else:
+            blocks = np.arange(self.num_blocks)
+        # The list of int is smaller than the list of ndarray
+        blocks = blocks.tolist()
+        return [
+            blocks[i : i + self.batch_size][self.rank :: self.world_size]
+            for i in range(0, self.batch_size * len(self), self.batch_size)
+        ]
+
+    def __iter__(self) -> Iterator[List[int]]:
+        return iter(self.generate(0))
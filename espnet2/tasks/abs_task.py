@@ -2,9 +2,11 @@ from abc import ABC
 from abc import abstractmethod
 import argparse
 from contextlib import contextmanager
+import copy
 from dataclasses import dataclass
 from distutils.version import LooseVersion
 import functools
+import hashlib
 import logging
 import os
 from pathlib import Path
@@ -12,6 +14,7 @@ import sys
 from typing import Any
 from typing import Callable
 from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
 from typing import Sequence
@@ -27,7 +30,6 @@ import torch.optim
 from torch.utils.data import DataLoader
 from typeguard import check_argument_types
 from typeguard import check_return_type
-import wandb
 import yaml
 
 from espnet import __version__
@@ -38,7 +40,11 @@ from espnet2.iterators.multiple_iter_factory import MultipleIterFactory
 from espnet2.iterators.sequence_iter_factory import SequenceIterFactory
 from espnet2.main_funcs.average_nbest_models import average_nbest_models
 from espnet2.main_funcs.collect_stats import collect_stats
+from espnet2.main_funcs.collect_stats import collect_stats_sharded
+from espnet2.main_funcs.collect_stats import CollectStatsCache
+from espnet2.main_funcs.collect_stats import compute_utt2hash
 from espnet2.optimizers.sgd import SGD
+from espnet2.optimizers.sharded_optimizer import ShardedOptimizer
 from espnet2.samplers.build_batch_sampler import BATCH_TYPES
 from espnet2.samplers.build_batch_sampler import build_batch_sampler
 from espnet2.samplers.unsorted_batch_sampler import UnsortedBatchSampler
@@ -51,6 +57,8 @@ from espnet2.torch_utils.pytorch_version import pytorch_cudnn_version
 from espnet2.torch_utils.set_all_random_seed import set_all_random_seed
 from espnet2.train.abs_espnet_model import AbsESPnetModel
 from espnet2.train.class_choices import ClassChoices
+from espnet2.train.collate_fn import BufferPool
+from espnet2.train.collate_fn import CommonCollateFn
 from espnet2.train.dataset import AbsDataset
 from espnet2.train.dataset import DATA_TYPES
 from espnet2.train.dataset import ESPnetDataset
@@ -188,6 +196,10 @@ class AbsTask(ABC):
     num_optimizers: int = 1
     trainer = Trainer
     class_choices_list: List[ClassChoices] = []
+    # The task options only for the speed up, e.g. the caches, which don't change
+    # the results. They don't invalidate the cache of collect_stats mode.
+    # Extend this where such an option is added in add_task_arguments().
+    speed_only_options: Tuple[str, ...] = ()
 
     def __init__(self):
         raise RuntimeError("This class can't be instantiated.")
@@ -329,6 +341,29 @@ class AbsTask(ABC):
             default=1,
             help="The number of workers used for DataLoader",
         )
+        group.add_argument(
+            "--persistent_workers",
+            type=str2bool,
+            default=False,
+            help="Keep the worker processes of DataLoader alive across epochs "
+            "to avoid the re-spawning and the re-opening of data files "
+            "at every epoch. This option requires pytorch>=1.7",
+        )
+        group.add_argument(
+            "--num_prefetch_batches",
+            type=int,
+            default=0,
+            help="The number of mini-batches prepared in a background thread "
+            "while training with the current mini-batch. 0 indicates no prefetch. "
+            "If --ngpu > 0, they are also copied to GPU in the thread",
+        )
+        group.add_argument(
+            "--reuse_collate_buffers",
+            type=str2bool,
+            default=False,
+            help="Reuse the memory of the padded tensors among mini-batches. "
+            "This is valid only for --num_workers 0",
+        )
         group.add_argument(
             "--num_att_plot",
             type=int,
@@ -435,6 +470,33 @@ class AbsTask(ABC):
             default=False,
             help='Write the output features from the model when "collect stats" mode',
         )
+        group.add_argument(
+            "--collected_feats_format",
+            type=str,
+            default="npy",
+            choices=["npy", "packed"],
+            help="The format of the features written by --write_collected_feats. "
+            '"npy" writes a npy file for each utterance and "packed" appends '
+            "them to a binary file, which is loaded as the file type of "
+            '"packed" via memory-mapping',
+        )
+        group.add_argument(
+            "--collect_stats_num_jobs",
+            type=int,
+            default=1,
+            help='The number of parallel jobs in "collect stats" mode. '
+            "The keys are split into the shards for each job "
+            "and the results are merged at the end",
+        )
+        group.add_argument(
+            "--collect_stats_cache",
+            type=str_or_none,
+            default=None,
+            help='The cache file of the per-utterance results in "collect stats" '
+            "mode. If given, only the new or changed utterances are processed "
+            "and the outputs are rebuilt from the cache. "
+            "The cache is discarded when the configuration is changed",
+        )
 
         group = parser.add_argument_group("Trainer related")
         group.add_argument(
@@ -771,6 +833,14 @@ class AbsTask(ABC):
         )
 
         group = parser.add_argument_group("Optimizer related")
+        group.add_argument(
+            "--shard_optimizer_state",
+            type=str2bool,
+            default=False,
+            help="Shard the optimizer states across the ranks "
+            "in distributed training (ZeRO stage-1). This feature requires "
+            "pytorch>=1.8",
+        )
         for i in range(1, cls.num_optimizers + 1):
             suf = "" if i == 1 else str(i)
             group.add_argument(
@@ -820,7 +890,10 @@ class AbsTask(ABC):
         optim_class = optim_classes.get(args.optim)
         if optim_class is None:
             raise ValueError(f"must be one of {list(optim_classes)}: {args.optim}")
-        optim = optim_class(model.parameters(), **args.optim_conf)
+        if args.shard_optimizer_state and args.distributed:
+            optim = ShardedOptimizer(model.parameters(), optim_class, **args.optim_conf)
+        else:
+            optim = optim_class(model.parameters(), **args.optim_conf)
         optimizers = [optim]
         return optimizers
 
@@ -1194,41 +1267,68 @@ class AbsTask(ABC):
             if len(args.train_shape_file) != 0:
                 train_key_file = args.train_shape_file[0]
             else:
-                train_key_file = None
+                train_key_file = args.train_data_path_and_name_and_type[0][0]
             if len(args.valid_shape_file) != 0:
                 valid_key_file = args.valid_shape_file[0]
             else:
-                valid_key_file = None
-
-            collect_stats(
-                model=model,
-                train_iter=cls.build_streaming_iterator(
-                    data_path_and_name_and_type=args.train_data_path_and_name_and_type,
-                    key_file=train_key_file,
-                    batch_size=args.batch_size,
-                    dtype=args.train_dtype,
-                    num_workers=args.num_workers,
-                    allow_variable_data_keys=args.allow_variable_data_keys,
+                valid_key_file = args.valid_data_path_and_name_and_type[0][0]
+
+            if args.collect_stats_cache is not None:
+                # Process only the utterances which are not cached
+                cache = cls.build_collect_stats_cache(args)
+                for mode, data_path_and_name_and_type, key_file in [
+                    ("train", args.train_data_path_and_name_and_type, train_key_file),
+                    ("valid", args.valid_data_path_and_name_and_type, valid_key_file),
+                ]:
+                    cache.set_utt2hash(
+                        mode, compute_utt2hash(data_path_and_name_and_type, key_file)
+                    )
+                    keys = cache.missing_keys(mode)
+                    logging.info(
+                        f"[{mode}] {len(keys)}/{len(cache.utt2hash[mode])} "
+                        f"utterances are not found in {args.collect_stats_cache}"
+                    )
+                    key_file = output_dir / f"{mode}_uncached_keys"
+                    with key_file.open("w", encoding="utf-8") as f:
+                        f.writelines(f"{k}\n" for k in keys)
+                    if mode == "train":
+                        train_key_file = str(key_file)
+                    else:
+                        valid_key_file = str(key_file)
+            else:
+                cache = None
+
+            if args.collect_stats_num_jobs > 1:
+                collect_stats_sharded(
+                    model=model,
+                    build_iters=functools.partial(
+                        cls.build_collect_stats_iterators, args
+                    ),
+                    train_key_file=train_key_file,
+                    valid_key_file=valid_key_file,
+                    output_dir=output_dir,
                     ngpu=args.ngpu,
-                    preprocess_fn=cls.build_preprocess_fn(args, train=False),
-                    collate_fn=cls.build_collate_fn(args, train=False),
-                ),
-                valid_iter=cls.build_streaming_iterator(
-                    data_path_and_name_and_type=args.valid_data_path_and_name_and_type,
-                    key_file=valid_key_file,
-                    batch_size=args.valid_batch_size,
-                    dtype=args.train_dtype,
-                    num_workers=args.num_workers,
-                    allow_variable_data_keys=args.allow_variable_data_keys,
+                    log_interval=args.log_interval,
+                    write_collected_feats=args.write_collected_feats,
+                    num_jobs=args.collect_stats_num_jobs,
+                    cache=cache,
+                    collected_feats_format=args.collected_feats_format,
+                )
+            else:
+                train_iter, valid_iter = cls.build_collect_stats_iterators(
+                    args, train_key_file, valid_key_file
+                )
+                collect_stats(
+                    model=model,
+                    train_iter=train_iter,
+                    valid_iter=valid_iter,
+                    output_dir=output_dir,
                     ngpu=args.ngpu,
-                    preprocess_fn=cls.build_preprocess_fn(args, train=False),
-                    collate_fn=cls.build_collate_fn(args, train=False),
-                ),
-                output_dir=output_dir,
-                ngpu=args.ngpu,
-                log_interval=args.log_interval,
-                write_collected_feats=args.write_collected_feats,
-            )
+                    log_interval=args.log_interval,
+                    write_collected_feats=args.write_collected_feats,
+                    cache=cache,
+                    collected_feats_format=args.collected_feats_format,
+                )
         else:
 
             # 8. Build iterator factories
@@ -1285,6 +1385,9 @@ class AbsTask(ABC):
                     else:
                         wandb_id = args.wandb_id
 
+                    # NOTE: Imported here because it takes long time to import
+                    import wandb
+
                     wandb.init(
                         project=project,
                         dir=output_dir,
@@ -1546,6 +1649,24 @@ class AbsTask(ABC):
                     )
             batches = [batch[rank::world_size] for batch in batches]
 
+        collate_fn = iter_options.collate_fn
+        if getattr(args, "reuse_collate_buffers", False) and isinstance(
+            collate_fn, CommonCollateFn
+        ):
+            if args.num_workers > 0:
+                logging.warning(
+                    "--reuse_collate_buffers requires --num_workers 0. Ignored."
+                )
+            else:
+                collate_fn = copy.copy(collate_fn)
+                # The buffers for the mini-batch in training, the prefetched ones,
+                # and the one being collated.
+                # The buffers are pinned here, so that DataLoader(pin_memory=True)
+                # doesn't copy them into new pinned tensors.
+                collate_fn.buffer_pool = BufferPool(
+                    args.num_prefetch_batches + 2, pin_memory=args.ngpu > 0
+                )
+
         return SequenceIterFactory(
             dataset=dataset,
             batches=batches,
@@ -1553,8 +1674,12 @@ class AbsTask(ABC):
             num_iters_per_epoch=iter_options.num_iters_per_epoch,
             shuffle=iter_options.train,
             num_workers=args.num_workers,
-            collate_fn=iter_options.collate_fn,
+            collate_fn=collate_fn,
             pin_memory=args.ngpu > 0,
+            # The iterator for plotting is used only for a few mini-batches
+            persistent_workers=args.persistent_workers and mode != "plot_att",
+            num_prefetch_batches=args.num_prefetch_batches,
+            prefetch_device="cuda" if args.ngpu > 0 else None,
         )
 
     @classmethod
@@ -1749,6 +1874,74 @@ class AbsTask(ABC):
             build_funcs=build_funcs, shuffle=iter_options.train, seed=args.seed
         )
 
+    @classmethod
+    def build_collect_stats_cache(cls, args: argparse.Namespace) -> CollectStatsCache:
+        """Build the cache for collect_stats mode
+
+        The fingerprint of the cache is derived from the task specific options,
+        i.e. the model, the frontend, and the preprocessing, and "train_dtype",
+        which can change the results of collect_feats(), so that the options
+        only for training, e.g. the optimizer, don't invalidate the cache.
+        """
+        assert check_argument_types()
+        if args.write_collected_feats:
+            raise RuntimeError(
+                "--collect_stats_cache can't be used with --write_collected_feats"
+            )
+        # The options of add_task_arguments() and the class choices
+        parser = argparse.ArgumentParser()
+        parser.set_defaults(required=[])
+        cls.add_task_arguments(parser)
+        names = {a.dest for a in parser._actions if a.dest != "help"}
+        # The options only for the speed up don't change the results
+        names -= set(cls.speed_only_options)
+        names.add("train_dtype")
+        config = {k: v for k, v in vars(args).items() if k in names}
+        fingerprint = hashlib.sha1(
+            yaml_no_alias_safe_dump(config, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        return CollectStatsCache(args.collect_stats_cache, fingerprint)
+
+    @classmethod
+    def build_collect_stats_iterators(
+        cls,
+        args: argparse.Namespace,
+        train_key_file: Optional[str],
+        valid_key_file: Optional[str],
+    ) -> Tuple[Iterable, Iterable]:
+        """Build the iterators of train and valid data for collect_stats mode"""
+        assert check_argument_types()
+        # An empty key file can be given if all utterances are cached
+        if train_key_file is not None and os.path.getsize(train_key_file) == 0:
+            train_iter = []
+        else:
+            train_iter = cls.build_streaming_iterator(
+                data_path_and_name_and_type=args.train_data_path_and_name_and_type,
+                key_file=train_key_file,
+                batch_size=args.batch_size,
+                dtype=args.train_dtype,
+                num_workers=args.num_workers,
+                allow_variable_data_keys=args.allow_variable_data_keys,
+                ngpu=args.ngpu,
+                preprocess_fn=cls.build_preprocess_fn(args, train=False),
+                collate_fn=cls.build_collate_fn(args, train=False),
+            )
+        if valid_key_file is not None and os.path.getsize(valid_key_file) == 0:
+            valid_iter = []
+        else:
+            valid_iter = cls.build_streaming_iterator(
+                data_path_and_name_and_type=args.valid_data_path_and_name_and_type,
+                key_file=valid_key_file,
+                batch_size=args.valid_batch_size,
+                dtype=args.train_dtype,
+                num_workers=args.num_workers,
+                allow_variable_data_keys=args.allow_variable_data_keys,
+                ngpu=args.ngpu,
+                preprocess_fn=cls.build_preprocess_fn(args, train=False),
+                collate_fn=cls.build_collate_fn(args, train=False),
+            )
+        return train_iter, valid_iter
+
     @classmethod
     def build_streaming_iterator(
         cls,
@@ -1,4 +1,5 @@
 import argparse
+import hashlib
 import logging
 from typing import Callable
 from typing import Collection
@@ -14,38 +15,19 @@ from typeguard import check_return_type
 
 from espnet2.asr.ctc import CTC
 from espnet2.asr.decoder.abs_decoder import AbsDecoder
-from espnet2.asr.decoder.rnn_decoder import RNNDecoder
-from espnet2.asr.decoder.transformer_decoder import (
-    DynamicConvolution2DTransformerDecoder,  # noqa: H301
-)
-from espnet2.asr.decoder.transformer_decoder import DynamicConvolutionTransformerDecoder
-from espnet2.asr.decoder.transformer_decoder import (
-    LightweightConvolution2DTransformerDecoder,  # noqa: H301
-)
-from espnet2.asr.decoder.transformer_decoder import (
-    LightweightConvolutionTransformerDecoder,  # noqa: H301
-)
-from espnet2.asr.decoder.transformer_decoder import TransformerDecoder
 from espnet2.asr.encoder.abs_encoder import AbsEncoder
-from espnet2.asr.encoder.conformer_encoder import ConformerEncoder
-from espnet2.asr.encoder.rnn_encoder import RNNEncoder
-from espnet2.asr.encoder.transformer_encoder import TransformerEncoder
-from espnet2.asr.encoder.vgg_rnn_encoder import VGGRNNEncoder
 from espnet2.asr.espnet_model import ESPnetASRModel
 from espnet2.asr.frontend.abs_frontend import AbsFrontend
-from espnet2.asr.frontend.default import DefaultFrontend
-from espnet2.asr.frontend.windowing import SlidingWindow
+from espnet2.asr.frontend.feats_cache import FeatsCache
 from espnet2.asr.preencoder.abs_preencoder import AbsPreEncoder
-from espnet2.asr.preencoder.sinc import LightweightSincConvs
 from espnet2.asr.specaug.abs_specaug import AbsSpecAug
-from espnet2.asr.specaug.specaug import SpecAug
 from espnet2.layers.abs_normalize import AbsNormalize
-from espnet2.layers.global_mvn import GlobalMVN
-from espnet2.layers.utterance_mvn import UtteranceMVN
 from espnet2.tasks.abs_task import AbsTask
+from espnet2.tasks.abs_task import IteratorOptions
 from espnet2.torch_utils.initialize import initialize
 from espnet2.train.class_choices import ClassChoices
 from espnet2.train.collate_fn import CommonCollateFn
+from espnet2.train.distributed_utils import DistributedOption
 from espnet2.train.preprocessor import CommonPreprocessor
 from espnet2.train.trainer import Trainer
 from espnet2.utils.get_default_kwargs import get_default_kwargs
@@ -54,16 +36,20 @@ from espnet2.utils.types import float_or_none
 from espnet2.utils.types import int_or_none
 from espnet2.utils.types import str2bool
 from espnet2.utils.types import str_or_none
+from espnet2.utils.yaml_no_alias_safe_dump import yaml_no_alias_safe_dump
 
 frontend_choices = ClassChoices(
     name="frontend",
-    classes=dict(default=DefaultFrontend, sliding_window=SlidingWindow),
+    classes=dict(
+        default="espnet2.asr.frontend.default:DefaultFrontend",
+        sliding_window="espnet2.asr.frontend.windowing:SlidingWindow",
+    ),
     type_check=AbsFrontend,
     default="default",
 )
 specaug_choices = ClassChoices(
     name="specaug",
-    classes=dict(specaug=SpecAug),
+    classes=dict(specaug="espnet2.asr.specaug.specaug:SpecAug"),
     type_check=AbsSpecAug,
     default=None,
     optional=True,
@@ -71,8 +57,8 @@ specaug_choices = ClassChoices(
 normalize_choices = ClassChoices(
     "normalize",
     classes=dict(
-        global_mvn=GlobalMVN,
-        utterance_mvn=UtteranceMVN,
+        global_mvn="espnet2.layers.global_mvn:GlobalMVN",
+        utterance_mvn="espnet2.layers.utterance_mvn:UtteranceMVN",
     ),
     type_check=AbsNormalize,
     default="utterance_mvn",
@@ -81,7 +67,7 @@ normalize_choices = ClassChoices(
 preencoder_choices = ClassChoices(
     name="preencoder",
     classes=dict(
-        sinc=LightweightSincConvs,
+        sinc="espnet2.asr.preencoder.sinc:LightweightSincConvs",
     ),
     type_check=AbsPreEncoder,
     default=None,
@@ -90,10 +76,10 @@ preencoder_choices = ClassChoices(
 encoder_choices = ClassChoices(
     "encoder",
     classes=dict(
-        conformer=ConformerEncoder,
-        transformer=TransformerEncoder,
-        vgg_rnn=VGGRNNEncoder,
-        rnn=RNNEncoder,
+        conformer="espnet2.asr.encoder.conformer_encoder:ConformerEncoder",
+        transformer="espnet2.asr.encoder.transformer_encoder:TransformerEncoder",
+        vgg_rnn="espnet2.asr.encoder.vgg_rnn_encoder:VGGRNNEncoder",
+        rnn="espnet2.asr.encoder.rnn_encoder:RNNEncoder",
     ),
     type_check=AbsEncoder,
     default="rnn",
@@ -101,12 +87,12 @@ encoder_choices = ClassChoices(
 decoder_choices = ClassChoices(
     "decoder",
     classes=dict(
-        transformer=TransformerDecoder,
-        lightweight_conv=LightweightConvolutionTransformerDecoder,
-        lightweight_conv2d=LightweightConvolution2DTransformerDecoder,
-        dynamic_conv=DynamicConvolutionTransformerDecoder,
-        dynamic_conv2d=DynamicConvolution2DTransformerDecoder,
-        rnn=RNNDecoder,
+        transformer="espnet2.asr.decoder.transformer_decoder:TransformerDecoder",
+        lightweight_conv="espnet2.asr.decoder.transformer_decoder:LightweightConvolutionTransformerDecoder",  # noqa: E501
+        lightweight_conv2d="espnet2.asr.decoder.transformer_decoder:LightweightConvolution2DTransformerDecoder",  # noqa: E501
+        dynamic_conv="espnet2.asr.decoder.transformer_decoder:DynamicConvolutionTransformerDecoder",  # noqa: E501
+        dynamic_conv2d="espnet2.asr.decoder.transformer_decoder:DynamicConvolution2DTransformerDecoder",  # noqa: E501
+        rnn="espnet2.asr.decoder.rnn_decoder:RNNDecoder",
     ),
     type_check=AbsDecoder,
     default="rnn",
@@ -133,6 +119,15 @@ class ASRTask(AbsTask):
         decoder_choices,
     ]
 
+    # The options which don't change the results of collect_stats mode
+    speed_only_options = (
+        "feats_cache_dir",
+        "token_cache_size",
+        "token_cache_path",
+        "augmentation_bank_dir",
+        "rir_cache_size",
+    )
+
     # If you need to modify train() or eval() procedures, change Trainer class here
     trainer = Trainer
 
@@ -179,6 +174,19 @@ class ASRTask(AbsTask):
             default=get_default_kwargs(CTC),
             help="The keyword arguments for CTC class.",
         )
+        group.add_argument(
+            "--feats_cache_dir",
+            type=str_or_none,
+            default=None,
+            help="The directory to cache the outputs of the frontend for each "
+            "utterance. The features are extracted at the first epoch and "
+            "are read from the cache after that. Specaug and normalization "
+            "are still applied on the fly. The cache is invalidated if the "
+            "frontend configuration is changed, but not if the data is changed "
+            "with the same utterance ids. In distributed training, each rank "
+            "writes its own files and reads those of the other ranks, so the "
+            "directory should be on a filesystem shared by the nodes",
+        )
         group.add_argument(
             "--model_conf",
             action=NestedDictAction,
@@ -225,6 +233,19 @@ class ASRTask(AbsTask):
             default=None,
             help="Specify g2p method if --token_type=phn",
         )
+        parser.add_argument(
+            "--token_cache_size",
+            type=int,
+            default=0,
+            help="The number of the token ids of texts cached in each process",
+        )
+        parser.add_argument(
+            "--token_cache_path",
+            type=str_or_none,
+            default=None,
+            help="The path of the database to store the token ids of texts. "
+            "It can be filled beforehand by espnet2.bin.build_token_cache",
+        )
         parser.add_argument(
             "--speech_volume_normalize",
             type=float_or_none,
@@ -261,6 +282,31 @@ class ASRTask(AbsTask):
             default="13_15",
             help="The range of noise decibel level.",
         )
+        parser.add_argument(
+            "--augmentation_bank_dir",
+            type=str_or_none,
+            default=None,
+            help="If specified, the files of --rir_scp and --noise_scp are "
+            "decoded once into the memory-mapped files in this directory "
+            "and the noises are read from them at random offsets",
+        )
+        parser.add_argument(
+            "--rir_cache_size",
+            type=int,
+            default=32,
+            help="The number of the RIR spectra cached in each DataLoader worker. "
+            "A spectrum takes 256KB per channel for the RIR up to 16384 samples",
+        )
+        parser.add_argument(
+            "--speed_perturb_factors",
+            type=float,
+            nargs="+",
+            default=None,
+            help="Apply the speed perturbation on the fly with the factor "
+            "randomly chosen for each utterance, e.g. 0.9 1.0 1.1. "
+            "--batch_bins is reduced by the minimum factor to keep "
+            "the number of elements in a mini-batch within it",
+        )
 
         for class_choices in cls.class_choices_list:
             # Append --<name> and --<name>_conf.
@@ -275,8 +321,32 @@ class ASRTask(AbsTask):
         Tuple[List[str], Dict[str, torch.Tensor]],
     ]:
         assert check_argument_types()
+        if (
+            train
+            and getattr(args, "speed_perturb_factors", None) is not None
+            and args.sort_in_batch == "descending"
+        ):
+            # The lengths of speech are changed by the speed perturbation
+            sort_key = "speech"
+        else:
+            sort_key = None
         # NOTE(kamo): int value = 0 is reserved by CTC-blank symbol
-        return CommonCollateFn(float_pad_value=0.0, int_pad_value=-1)
+        return CommonCollateFn(float_pad_value=0.0, int_pad_value=-1, sort_key=sort_key)
+
+    @classmethod
+    def build_iter_options(
+        cls,
+        args: argparse.Namespace,
+        distributed_option: DistributedOption,
+        mode: str,
+    ) -> IteratorOptions:
+        iter_options = super().build_iter_options(args, distributed_option, mode)
+        factors = getattr(args, "speed_perturb_factors", None)
+        if iter_options.train and factors is not None and min(factors) < 1.0:
+            # NOTE: The shape files are the lengths before the speed perturbation.
+            # The utterances can be longer by 1 / min(factors) at most.
+            iter_options.batch_bins = int(iter_options.batch_bins * min(factors))
+        return iter_options
 
     @classmethod
     def build_preprocess_fn(
@@ -307,6 +377,11 @@ class ASRTask(AbsTask):
                 speech_volume_normalize=args.speech_volume_normalize
                 if hasattr(args, "rir_scp")
                 else None,
+                augmentation_bank_dir=getattr(args, "augmentation_bank_dir", None),
+                rir_cache_size=getattr(args, "rir_cache_size", 32),
+                speed_perturb_factors=getattr(args, "speed_perturb_factors", None),
+                token_cache_size=getattr(args, "token_cache_size", 0),
+                token_cache_path=getattr(args, "token_cache_path", None),
             )
         else:
             retval = None
@@ -332,6 +407,39 @@ class ASRTask(AbsTask):
         assert check_return_type(retval)
         return retval
 
+    @classmethod
+    def build_feats_cache(
+        cls, args: argparse.Namespace, frontend: Optional[AbsFrontend]
+    ) -> FeatsCache:
+        assert check_argument_types()
+        if frontend is None:
+            raise RuntimeError("--feats_cache_dir requires the frontend")
+        if any(p.requires_grad for p in frontend.parameters()):
+            raise RuntimeError(
+                "--feats_cache_dir can't be used with the trainable frontend"
+            )
+        if (
+            getattr(args, "rir_scp", None) is not None
+            or getattr(args, "noise_scp", None) is not None
+            or getattr(args, "speed_perturb_factors", None) is not None
+        ):
+            raise RuntimeError(
+                "--feats_cache_dir can't be used with the data augmentation "
+                "before the frontend, i.e. --rir_scp, --noise_scp, "
+                "and --speed_perturb_factors"
+            )
+        # The features depend on the frontend and the input waveform
+        config = dict(
+            frontend=repr(frontend),
+            frontend_conf=args.frontend_conf,
+            speech_volume_normalize=getattr(args, "speech_volume_normalize", None),
+            train_dtype=args.train_dtype,
+        )
+        fingerprint = hashlib.sha1(
+            yaml_no_alias_safe_dump(config, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        return FeatsCache(args.feats_cache_dir, fingerprint)
+
     @classmethod
     def build_model(cls, args: argparse.Namespace) -> ESPnetASRModel:
         assert check_argument_types()
@@ -425,5 +533,9 @@ class ASRTask(AbsTask):
         if args.init is not None:
             initialize(model, args.init)
 
+        # 10. [Option] Feature cache
+        if getattr(args, "feats_cache_dir", None) is not None:
+            model.feats_cache = cls.build_feats_cache(args, frontend)
+
         assert check_return_type(model)
         return model
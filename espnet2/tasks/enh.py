@@ -12,18 +12,9 @@ from typeguard import check_argument_types
 from typeguard import check_return_type
 
 from espnet2.enh.decoder.abs_decoder import AbsDecoder
-from espnet2.enh.decoder.conv_decoder import ConvDecoder
-from espnet2.enh.decoder.stft_decoder import STFTDecoder
 from espnet2.enh.encoder.abs_encoder import AbsEncoder
-from espnet2.enh.encoder.conv_encoder import ConvEncoder
-from espnet2.enh.encoder.stft_encoder import STFTEncoder
 from espnet2.enh.espnet_model import ESPnetEnhancementModel
 from espnet2.enh.separator.abs_separator import AbsSeparator
-from espnet2.enh.separator.dprnn_separator import DPRNNSeparator
-from espnet2.enh.separator.neural_beamformer import NeuralBeamformer
-from espnet2.enh.separator.rnn_separator import RNNSeparator
-from espnet2.enh.separator.tcn_separator import TCNSeparator
-from espnet2.enh.separator.transformer_separator import TransformerSeparator
 from espnet2.tasks.abs_task import AbsTask
 from espnet2.torch_utils.initialize import initialize
 from espnet2.train.class_choices import ClassChoices
@@ -36,7 +27,10 @@ from espnet2.utils.types import str_or_none
 
 encoder_choices = ClassChoices(
     name="encoder",
-    classes=dict(stft=STFTEncoder, conv=ConvEncoder),
+    classes=dict(
+        stft="espnet2.enh.encoder.stft_encoder:STFTEncoder",
+        conv="espnet2.enh.encoder.conv_encoder:ConvEncoder",
+    ),
     type_check=AbsEncoder,
     default="stft",
 )
@@ -44,11 +38,11 @@ encoder_choices = ClassChoices(
 separator_choices = ClassChoices(
     name="separator",
     classes=dict(
-        rnn=RNNSeparator,
-        tcn=TCNSeparator,
-        dprnn=DPRNNSeparator,
-        transformer=TransformerSeparator,
-        wpe_beamformer=NeuralBeamformer,
+        rnn="espnet2.enh.separator.rnn_separator:RNNSeparator",
+        tcn="espnet2.enh.separator.tcn_separator:TCNSeparator",
+        dprnn="espnet2.enh.separator.dprnn_separator:DPRNNSeparator",
+        transformer="espnet2.enh.separator.transformer_separator:TransformerSeparator",
+        wpe_beamformer="espnet2.enh.separator.neural_beamformer:NeuralBeamformer",
     ),
     type_check=AbsSeparator,
     default="rnn",
@@ -56,7 +50,10 @@ separator_choices = ClassChoices(
 
 decoder_choices = ClassChoices(
     name="decoder",
-    classes=dict(stft=STFTDecoder, conv=ConvDecoder),
+    classes=dict(
+        stft="espnet2.enh.decoder.stft_decoder:STFTDecoder",
+        conv="espnet2.enh.decoder.conv_decoder:ConvDecoder",
+    ),
     type_check=AbsDecoder,
     default="stft",
 )
@@ -14,22 +14,13 @@ from typeguard import check_return_type
 
 from espnet2.asr.ctc import CTC
 from espnet2.asr.decoder.abs_decoder import AbsDecoder
-from espnet2.asr.decoder.rnn_decoder import RNNDecoder
-from espnet2.asr.decoder.transformer_decoder import TransformerDecoder
 from espnet2.asr.encoder.abs_encoder import AbsEncoder
-from espnet2.asr.encoder.rnn_encoder import RNNEncoder
-from espnet2.asr.encoder.transformer_encoder import TransformerEncoder
-from espnet2.asr.encoder.vgg_rnn_encoder import VGGRNNEncoder
 from espnet2.asr.espnet_enh_asr_model import ESPnetEnhASRModel
 from espnet2.asr.espnet_model import ESPnetASRModel
 from espnet2.asr.frontend.abs_frontend import AbsFrontend
-from espnet2.asr.frontend.default import DefaultFrontend
 from espnet2.asr.specaug.abs_specaug import AbsSpecAug
-from espnet2.asr.specaug.specaug import SpecAug
 from espnet2.enh.espnet_model import ESPnetEnhancementModel
 from espnet2.layers.abs_normalize import AbsNormalize
-from espnet2.layers.global_mvn import GlobalMVN
-from espnet2.layers.utterance_mvn import UtteranceMVN
 from espnet2.tasks.abs_task import AbsTask
 from espnet2.tasks.enh import encoder_choices as enh_encoder_choices
 from espnet2.tasks.enh import decoder_choices as enh_decoder_choices
@@ -51,13 +42,13 @@ enh_separator_choices.name = "enh_separator"
 
 frontend_choices = ClassChoices(
     name="frontend",
-    classes=dict(default=DefaultFrontend),
+    classes=dict(default="espnet2.asr.frontend.default:DefaultFrontend"),
     type_check=AbsFrontend,
     default="default",
 )
 specaug_choices = ClassChoices(
     name="specaug",
-    classes=dict(specaug=SpecAug),
+    classes=dict(specaug="espnet2.asr.specaug.specaug:SpecAug"),
     type_check=AbsSpecAug,
     default=None,
     optional=True,
@@ -65,8 +56,8 @@ specaug_choices = ClassChoices(
 normalize_choices = ClassChoices(
     "normalize",
     classes=dict(
-        global_mvn=GlobalMVN,
-        utterance_mvn=UtteranceMVN,
+        global_mvn="espnet2.layers.global_mvn:GlobalMVN",
+        utterance_mvn="espnet2.layers.utterance_mvn:UtteranceMVN",
     ),
     type_check=AbsNormalize,
     default="utterance_mvn",
@@ -75,16 +66,19 @@ normalize_choices = ClassChoices(
 encoder_choices = ClassChoices(
     "encoder",
     classes=dict(
-        transformer=TransformerEncoder,
-        vgg_rnn=VGGRNNEncoder,
-        rnn=RNNEncoder,
+        transformer="espnet2.asr.encoder.transformer_encoder:TransformerEncoder",
+        vgg_rnn="espnet2.asr.encoder.vgg_rnn_encoder:VGGRNNEncoder",
+        rnn="espnet2.asr.encoder.rnn_encoder:RNNEncoder",
     ),
     type_check=AbsEncoder,
     default="rnn",
 )
 decoder_choices = ClassChoices(
     "decoder",
-    classes=dict(transformer=TransformerDecoder, rnn=RNNDecoder),
+    classes=dict(
+        transformer="espnet2.asr.decoder.transformer_decoder:TransformerDecoder",
+        rnn="espnet2.asr.decoder.rnn_decoder:RNNDecoder",
+    ),
     type_check=AbsDecoder,
     default="rnn",
 )
@@ -12,14 +12,17 @@ import torch
 from typeguard import check_argument_types
 from typeguard import check_return_type
 
+from espnet2.iterators.abs_iter_factory import AbsIterFactory
+from espnet2.iterators.sequence_iter_factory import SequenceIterFactory
 from espnet2.lm.abs_model import AbsLM
 from espnet2.lm.espnet_model import ESPnetLanguageModel
-from espnet2.lm.seq_rnn_lm import SequentialRNNLM
-from espnet2.lm.transformer_lm import TransformerLM
+from espnet2.samplers.packed_block_sampler import PackedBlockSampler
 from espnet2.tasks.abs_task import AbsTask
+from espnet2.tasks.abs_task import IteratorOptions
 from espnet2.torch_utils.initialize import initialize
 from espnet2.train.class_choices import ClassChoices
 from espnet2.train.collate_fn import CommonCollateFn
+from espnet2.train.dataset import PackedTokenDataset
 from espnet2.train.preprocessor import CommonPreprocessor
 from espnet2.train.trainer import Trainer
 from espnet2.utils.get_default_kwargs import get_default_kwargs
@@ -31,8 +34,8 @@ from espnet2.utils.types import str_or_none
 lm_choices = ClassChoices(
     "lm",
     classes=dict(
-        seq_rnn=SequentialRNNLM,
-        transformer=TransformerLM,
+        seq_rnn="espnet2.lm.seq_rnn_lm:SequentialRNNLM",
+        transformer="espnet2.lm.transformer_lm:TransformerLM",
     ),
     type_check=AbsLM,
     default="seq_rnn",
@@ -46,6 +49,9 @@ class LMTask(AbsTask):
     # Add variable objects configurations
     class_choices_list = [lm_choices]
 
+    # The options which don't change the results of collect_stats mode
+    speed_only_options = ("token_cache_size", "token_cache_path")
+
     # If you need to modify train() or eval() procedures, change Trainer class here
     trainer = Trainer
 
@@ -126,6 +132,31 @@ class LMTask(AbsTask):
             default=None,
             help="Specify g2p method if --token_type=phn",
         )
+        parser.add_argument(
+            "--token_cache_size",
+            type=int,
+            default=0,
+            help="The number of the token ids of texts cached in each process",
+        )
+        parser.add_argument(
+            "--token_cache_path",
+            type=str_or_none,
+            default=None,
+            help="The path of the database to store the token ids of texts. "
+            "It can be filled beforehand by espnet2.bin.build_token_cache",
+        )
+        parser.add_argument(
+            "--packed_block_length",
+            type=int,
+            default=256,
+            help="The number of the tokens in a block for --iterator_type task. "
+            "In this mode, the data is given as the binary token corpus "
+            "created by espnet2.bin.build_token_corpus, "
+            "e.g. --train_data_path_and_name_and_type "
+            "dump/lm_train,packed_text,token_corpus, and the sentences are "
+            "packed into the fixed-length blocks without the padding. "
+            "--batch_size is the number of the blocks in a mini-batch",
+        )
 
         for class_choices in cls.class_choices_list:
             # Append --<name> and --<name>_conf.
@@ -159,6 +190,8 @@ class LMTask(AbsTask):
                 text_cleaner=args.cleaner,
                 g2p_type=args.g2p,
                 non_linguistic_symbols=args.non_linguistic_symbols,
+                token_cache_size=getattr(args, "token_cache_size", 0),
+                token_cache_path=getattr(args, "token_cache_path", None),
             )
         else:
             retval = None
@@ -179,6 +212,65 @@ class LMTask(AbsTask):
         retval = ()
         return retval
 
+    @classmethod
+    def build_task_iter_factory(
+        cls,
+        args: argparse.Namespace,
+        iter_options: IteratorOptions,
+        mode: str,
+    ) -> AbsIterFactory:
+        """Build the iterator of the packed blocks of the binary token corpus"""
+        assert check_argument_types()
+        if len(iter_options.data_path_and_name_and_type) != 1 or (
+            iter_options.data_path_and_name_and_type[0][2] != "token_corpus"
+        ):
+            raise RuntimeError(
+                "--iterator_type task requires a single token corpus, e.g. "
+                "--train_data_path_and_name_and_type "
+                "dump/lm_train,packed_text,token_corpus: "
+                f"{iter_options.data_path_and_name_and_type}"
+            )
+        path, name, _ = iter_options.data_path_and_name_and_type[0]
+        dataset = PackedTokenDataset(
+            path, block_length=args.packed_block_length, name=name
+        )
+
+        if iter_options.distributed:
+            world_size = torch.distributed.get_world_size()
+            rank = torch.distributed.get_rank()
+        else:
+            world_size = 1
+            rank = 0
+        batch_sampler = PackedBlockSampler(
+            num_tokens=dataset.corpus.num_tokens,
+            block_length=args.packed_block_length,
+            batch_size=iter_options.batch_size,
+            shuffle=iter_options.train,
+            world_size=world_size,
+            rank=rank,
+        )
+        logging.info(f"[{mode}] dataset:\n{dataset}")
+        logging.info(f"[{mode}] Batch sampler: {batch_sampler}")
+        if iter_options.num_batches is not None:
+            batches = batch_sampler.generate(args.seed)[: iter_options.num_batches]
+        else:
+            batches = batch_sampler
+
+        return SequenceIterFactory(
+            dataset=dataset,
+            batches=batches,
+            seed=args.seed,
+            num_iters_per_epoch=iter_options.num_iters_per_epoch,
+            shuffle=iter_options.train,
+            num_workers=args.num_workers,
+            # All blocks have the same length and no "_lengths" is required
+            collate_fn=CommonCollateFn(not_sequence=[name]),
+            pin_memory=args.ngpu > 0,
+            persistent_workers=args.persistent_workers and mode != "plot_att",
+            num_prefetch_batches=args.num_prefetch_batches,
+            prefetch_device="cuda" if args.ngpu > 0 else None,
+        )
+
     @classmethod
     def build_model(cls, args: argparse.Namespace) -> ESPnetLanguageModel:
         assert check_argument_types()
@@ -13,7 +13,6 @@ from typeguard import check_argument_types
 from typeguard import check_return_type
 
 from espnet2.layers.abs_normalize import AbsNormalize
-from espnet2.layers.global_mvn import GlobalMVN
 from espnet2.tasks.abs_task import AbsTask
 from espnet2.train.class_choices import ClassChoices
 from espnet2.train.collate_fn import CommonCollateFn
@@ -21,15 +20,7 @@ from espnet2.train.preprocessor import CommonPreprocessor
 from espnet2.train.trainer import Trainer
 from espnet2.tts.abs_tts import AbsTTS
 from espnet2.tts.espnet_model import ESPnetTTSModel
-from espnet2.tts.fastspeech import FastSpeech
-from espnet2.tts.fastspeech2 import FastSpeech2
 from espnet2.tts.feats_extract.abs_feats_extract import AbsFeatsExtract
-from espnet2.tts.feats_extract.dio import Dio
-from espnet2.tts.feats_extract.energy import Energy
-from espnet2.tts.feats_extract.log_mel_fbank import LogMelFbank
-from espnet2.tts.feats_extract.log_spectrogram import LogSpectrogram
-from espnet2.tts.tacotron2 import Tacotron2
-from espnet2.tts.transformer import Transformer
 from espnet2.utils.get_default_kwargs import get_default_kwargs
 from espnet2.utils.nested_dict_action import NestedDictAction
 from espnet2.utils.types import int_or_none
@@ -38,41 +29,44 @@ from espnet2.utils.types import str_or_none
 
 feats_extractor_choices = ClassChoices(
     "feats_extract",
-    classes=dict(fbank=LogMelFbank, spectrogram=LogSpectrogram),
+    classes=dict(
+        fbank="espnet2.tts.feats_extract.log_mel_fbank:LogMelFbank",
+        spectrogram="espnet2.tts.feats_extract.log_spectrogram:LogSpectrogram",
+    ),
     type_check=AbsFeatsExtract,
     default="fbank",
 )
 pitch_extractor_choices = ClassChoices(
     "pitch_extract",
-    classes=dict(dio=Dio),
+    classes=dict(dio="espnet2.tts.feats_extract.dio:Dio"),
     type_check=AbsFeatsExtract,
     default=None,
     optional=True,
 )
 energy_extractor_choices = ClassChoices(
     "energy_extract",
-    classes=dict(energy=Energy),
+    classes=dict(energy="espnet2.tts.feats_extract.energy:Energy"),
     type_check=AbsFeatsExtract,
     default=None,
     optional=True,
 )
 normalize_choices = ClassChoices(
     "normalize",
-    classes=dict(global_mvn=GlobalMVN),
+    classes=dict(global_mvn="espnet2.layers.global_mvn:GlobalMVN"),
     type_check=AbsNormalize,
     default="global_mvn",
     optional=True,
 )
 pitch_normalize_choices = ClassChoices(
     "pitch_normalize",
-    classes=dict(global_mvn=GlobalMVN),
+    classes=dict(global_mvn="espnet2.layers.global_mvn:GlobalMVN"),
     type_check=AbsNormalize,
     default=None,
     optional=True,
 )
 energy_normalize_choices = ClassChoices(
     "energy_normalize",
-    classes=dict(global_mvn=GlobalMVN),
+    classes=dict(global_mvn="espnet2.layers.global_mvn:GlobalMVN"),
     type_check=AbsNormalize,
     default=None,
     optional=True,
@@ -80,10 +74,10 @@ energy_normalize_choices = ClassChoices(
 tts_choices = ClassChoices(
     "tts",
     classes=dict(
-        tacotron2=Tacotron2,
-        transformer=Transformer,
-        fastspeech=FastSpeech,
-        fastspeech2=FastSpeech2,
+        tacotron2="espnet2.tts.tacotron2:Tacotron2",
+        transformer="espnet2.tts.transformer:Transformer",
+        fastspeech="espnet2.tts.fastspeech:FastSpeech",
+        fastspeech2="espnet2.tts.fastspeech2:FastSpeech2",
     ),
     type_check=AbsTTS,
     default="tacotron2",
@@ -112,6 +106,9 @@ class TTSTask(AbsTask):
         energy_normalize_choices,
     ]
 
+    # The options which don't change the results of collect_stats mode
+    speed_only_options = ("token_cache_size", "token_cache_path")
+
     # If you need to modify train() or eval() procedures, change Trainer class here
     trainer = Trainer
 
@@ -194,6 +191,19 @@ class TTSTask(AbsTask):
             default=None,
             help="Specify g2p method if --token_type=phn",
         )
+        parser.add_argument(
+            "--token_cache_size",
+            type=int,
+            default=0,
+            help="The number of the token ids of texts cached in each process",
+        )
+        parser.add_argument(
+            "--token_cache_path",
+            type=str_or_none,
+            default=None,
+            help="The path of the database to store the token ids of texts. "
+            "It can be filled beforehand by espnet2.bin.build_token_cache",
+        )
 
         for class_choices in cls.class_choices_list:
             # Append --<name> and --<name>_conf.
@@ -226,6 +236,8 @@ class TTSTask(AbsTask):
                 non_linguistic_symbols=args.non_linguistic_symbols,
                 text_cleaner=args.cleaner,
                 g2p_type=args.g2p,
+                token_cache_size=getattr(args, "token_cache_size", 0),
+                token_cache_path=getattr(args, "token_cache_path", None),
             )
         else:
             retval = None
@@ -12,3 +12,14 @@ class AbsTokenizer(ABC):
     @abstractmethod
     def tokens2text(self, tokens: Iterable[str]) -> str:
         raise NotImplementedError
+
+    def batch_text2tokens(self, lines: Iterable[str]) -> List[List[str]]:
+        """Tokenize the multiple lines at once
+
+        The derived class can override this to process the batch
+        in the backend library.
+        """
+        return [self.text2tokens(line) for line in lines]
+
+    def batch_tokens2text(self, tokens_list: Iterable[Iterable[str]]) -> List[str]:
+        return [self.tokens2text(tokens) for tokens in tokens_list]
@@ -1,7 +1,6 @@
 from typing import Collection
 
 from jaconv import jaconv
-import tacotron_cleaner.cleaners
 from typeguard import check_argument_types
 
 try:
@@ -33,6 +32,9 @@ class TextCleaner:
     def __call__(self, text: str) -> str:
         for t in self.cleaner_types:
             if t == "tacotron":
+                # NOTE: Imported here because it takes long time to import
+                import tacotron_cleaner.cleaners
+
                 text = tacotron_cleaner.cleaners.custom_english_cleaners(text)
             elif t == "jaconv":
                 text = jaconv.normalize(text)
@@ -3,7 +3,6 @@ from typing import Iterable
 from typing import List
 from typing import Union
 
-import g2p_en
 from typeguard import check_argument_types
 
 from espnet2.text.abs_tokenizer import AbsTokenizer
@@ -97,6 +96,9 @@ class G2p_en:
 
     def __call__(self, text) -> List[str]:
         if self.g2p is None:
+            # NOTE: Imported here because it takes long time to import
+            import g2p_en
+
             self.g2p = g2p_en.G2p()
 
         phones = self.g2p(text)
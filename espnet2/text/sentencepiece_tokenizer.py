@@ -36,3 +36,24 @@ class SentencepiecesTokenizer(AbsTokenizer):
     def tokens2text(self, tokens: Iterable[str]) -> str:
         self._build_sentence_piece_processor()
         return self.sp.DecodePieces(list(tokens))
+
+    def batch_text2tokens(self, lines: Iterable[str]) -> List[List[str]]:
+        self._build_sentence_piece_processor()
+        lines = list(lines)
+        if len(lines) == 0:
+            return []
+        elif hasattr(self.sp, "encode"):
+            # sentencepiece>=0.1.91 encodes the list in C++ at once
+            return self.sp.encode(lines, out_type=str)
+        else:
+            return [self.sp.EncodeAsPieces(line) for line in lines]
+
+    def batch_tokens2text(self, tokens_list: Iterable[Iterable[str]]) -> List[str]:
+        self._build_sentence_piece_processor()
+        tokens_list = [list(tokens) for tokens in tokens_list]
+        if len(tokens_list) == 0:
+            return []
+        elif hasattr(self.sp, "decode"):
+            return self.sp.decode(tokens_list)
+        else:
+            return [self.sp.DecodePieces(tokens) for tokens in tokens_list]
@@ -0,0 +1,178 @@
+from collections import OrderedDict
+import hashlib
+from pathlib import Path
+import sqlite3
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Union
+
+import numpy as np
+from typeguard import check_argument_types
+
+
+class TokenCache:
+    """Two-level cache of the token ids converted from the text.
+
+    The first level is an LRU dict in the process, and the second level is
+    an optional sqlite database on disk, which is shared by the processes,
+    e.g. DataLoader workers, and reused by the later runs.
+    The entries are keyed by the hash of the text and the fingerprint of
+    the text processing, e.g. the hash of the tokenizer configuration and
+    the token list, so that a database can hold the entries
+    of several configurations.
+
+    The new entries are buffered in memory and written every
+    "commit_interval" entries in a short transaction, so that the lock of
+    the database is never held while the other processes are waiting for it.
+
+    Examples:
+        >>> cache = TokenCache(fingerprint, "exp/token_cache.db", max_size=10000)
+        >>> ids = cache("hello world", text2ids)
+
+    """
+
+    def __init__(
+        self,
+        fingerprint: str,
+        path: Union[Path, str] = None,
+        max_size: int = 10000,
+        commit_interval: int = 100,
+    ):
+        assert check_argument_types()
+        self.fingerprint = fingerprint
+        self.path = Path(path) if path is not None else None
+        self.max_size = max_size
+        self.commit_interval = commit_interval
+        self.lru = OrderedDict()
+        # key -> value, which are not written to the database yet
+        self.pending = {}
+        self._conn = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(path={self.path}, max_size={self.max_size})"
+
+    def __getstate__(self):
+        # The connection can't be pickled and is opened again in the sub-process
+        state = self.__dict__.copy()
+        state.update(_conn=None, lru=OrderedDict(), pending={})
+        return state
+
+    @property
+    def conn(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # The database can be written by the DataLoader workers at the same time.
+            # Use the autocommit mode not to keep a transaction open implicitly.
+            self._conn = sqlite3.connect(
+                str(self.path), timeout=600, isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB)"
+            )
+        return self._conn
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.fingerprint}\n{text}".encode("utf-8")).hexdigest()
+
+    def _put_lru(self, text: str, ids: np.ndarray):
+        if self.max_size <= 0:
+            return
+        self.lru[text] = ids
+        if len(self.lru) > self.max_size:
+            self.lru.popitem(last=False)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        if text in self.lru:
+            self.lru.move_to_end(text)
+            return self.lru[text].copy()
+        if self.conn is None:
+            return None
+        key = self._key(text)
+        if key in self.pending:
+            value = self.pending[key]
+        else:
+            row = self.conn.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value = row[0]
+        ids = np.frombuffer(value, dtype=np.int32).astype(np.int64)
+        self._put_lru(text, ids)
+        return ids.copy()
+
+    def put(self, text: str, ids: np.ndarray):
+        ids = np.asarray(ids, dtype=np.int64)
+        self._put_lru(text, ids.copy())
+        if self.conn is not None:
+            self.pending[self._key(text)] = ids.astype(np.int32).tobytes()
+            if len(self.pending) >= self.commit_interval:
+                self.commit()
+
+    def commit(self):
+        """Write the pending entries to the database"""
+        if len(self.pending) == 0:
+            return
+        # Take the write lock only while inserting the buffered entries
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO entries VALUES (?, ?)", self.pending.items()
+            )
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        self.pending = {}
+
+    def __call__(self, text: str, text2ids: Callable[[str], np.ndarray]) -> np.ndarray:
+        """Return the cached token ids or compute them by "text2ids" """
+        ids = self.get(text)
+        if ids is None:
+            ids = np.asarray(text2ids(text), dtype=np.int64)
+            self.put(text, ids)
+        return ids
+
+    def precompute(
+        self,
+        texts: Iterable[str],
+        batch_text2ids: Callable[[List[str]], List[np.ndarray]],
+        batch_size: int = 1000,
+    ) -> int:
+        """Store the token ids of the texts in the database ahead of training
+
+        Args:
+            texts: The texts to be converted
+            batch_text2ids: The function to convert the list of texts at once
+            batch_size: The number of the texts given to "batch_text2ids"
+        Returns:
+            The number of the texts newly converted
+        """
+        if self.conn is None:
+            raise RuntimeError("precompute() requires the path of the database")
+        count = 0
+        # Use dict as an ordered set to skip the duplicated texts in a batch
+        batch = {}
+        for text in texts:
+            if text not in batch and self.get(text) is None:
+                batch[text] = None
+            if len(batch) >= batch_size:
+                count += self._put_batch(list(batch), batch_text2ids)
+                batch = {}
+        count += self._put_batch(list(batch), batch_text2ids)
+        self.commit()
+        return count
+
+    def _put_batch(
+        self,
+        texts: List[str],
+        batch_text2ids: Callable[[List[str]], List[np.ndarray]],
+    ) -> int:
+        if len(texts) == 0:
+            return 0
+        for text, ids in zip(texts, batch_text2ids(texts)):
+            self.put(text, ids)
+        return len(texts)
@@ -47,6 +47,8 @@ class TokenIDConverter:
                 f"Unknown symbol '{unk_symbol}' doesn't exist in the token_list"
             )
         self.unk_id = self.token2id[self.unk_symbol]
+        # For the vectorized lookup of ids2tokens
+        self.token_array = np.array(self.token_list, dtype=object)
 
     def get_num_vocabulary_size(self) -> int:
         return len(self.token_list)
@@ -54,7 +56,32 @@ class TokenIDConverter:
     def ids2tokens(self, integers: Union[np.ndarray, Iterable[int]]) -> List[str]:
         if isinstance(integers, np.ndarray) and integers.ndim != 1:
             raise ValueError(f"Must be 1 dim ndarray, but got {integers.ndim}")
-        return [self.token_list[i] for i in integers]
+        if not isinstance(integers, np.ndarray):
+            integers = np.array(list(integers), dtype=np.int64)
+        return self.token_array[integers.astype(np.int64, copy=False)].tolist()
 
     def tokens2ids(self, tokens: Iterable[str]) -> List[int]:
         return [self.token2id.get(i, self.unk_id) for i in tokens]
+
+    def batch_ids2tokens(
+        self, integers_list: Iterable[Union[np.ndarray, Iterable[int]]]
+    ) -> List[List[str]]:
+        """Convert the multiple sequences by a single lookup of the token array"""
+        arrays = []
+        for integers in integers_list:
+            if isinstance(integers, np.ndarray):
+                if integers.ndim != 1:
+                    raise ValueError(f"Must be 1 dim ndarray, but got {integers.ndim}")
+                arrays.append(integers.astype(np.int64, copy=False))
+            else:
+                arrays.append(np.array(list(integers), dtype=np.int64))
+        if len(arrays) == 0:
+            return []
+        tokens = self.token_array[np.concatenate(arrays)].tolist()
+        offsets = np.cumsum([0] + [len(a) for a in arrays]).tolist()
+        return [tokens[s:e] for s, e in zip(offsets[:-1], offsets[1:])]
+
+    def batch_tokens2ids(self, tokens_list: Iterable[Iterable[str]]) -> List[List[int]]:
+        token2id = self.token2id
+        unk_id = self.unk_id
+        return [[token2id.get(t, unk_id) for t in tokens] for tokens in tokens_list]
@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+from typing import Iterator
+from typing import Optional
+from typing import Sequence
+
+import torch
+
+from espnet.nets.pytorch_backend.nets_utils import make_pad_mask
+
+
+@contextmanager
+def mask_conv_inputs(
+    modules: Sequence[Optional[torch.nn.Module]], lengths: Optional[torch.Tensor]
+) -> Iterator[None]:
+    """Fill the padded frames of the inputs of Conv1d with zero
+
+    A convolution over the padded batch mixes the padded frames
+    into the last frames of the shorter sequences,
+    while a single sequence is padded with zeros by the convolution itself.
+    Filling the padded frames of every Conv1d input with zero
+    makes the outputs of the padded batch same as those of the single sequences.
+
+    Examples:
+        >>> with mask_conv_inputs([encoder, duration_predictor], ilens):
+        ...     hs, _ = encoder(xs, x_masks)
+
+    Args:
+        modules: The modules including Conv1d. None is ignored.
+        lengths: The lengths of the sequences (B,).
+            Nothing is done if None is given.
+    """
+    if lengths is None:
+        yield
+        return
+
+    def hook(module, inputs):
+        # x: (B, C, T)
+        x = inputs[0]
+        masks = make_pad_mask(lengths, x).to(x.device)
+        return (x.masked_fill(masks, 0.0),) + inputs[1:]
+
+    handles = []
+    try:
+        for module in modules:
+            if module is None:
+                continue
+            for m in module.modules():
+                if isinstance(m, torch.nn.Conv1d):
+                    handles.append(m.register_forward_pre_hook(hook))
+        yield
+    finally:
+        for handle in handles:
+            handle.remove()
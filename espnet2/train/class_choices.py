@@ -1,6 +1,8 @@
+import importlib
 from typing import Mapping
 from typing import Optional
 from typing import Tuple
+from typing import Union
 
 from typeguard import check_argument_types
 from typeguard import check_return_type
@@ -30,12 +32,25 @@ class ClassChoices:
     >>> class_obj = choices.get_class(args.var)
     >>> a_object = class_obj(**args.var_conf)
 
+    A class can be also given as "<module>:<class name>",
+    which is imported when it's used first,
+    so that the module of the unused choices is never imported.
+
+    >>> choices = ClassChoices(
+    ...     "encoder",
+    ...     dict(rnn="espnet2.asr.encoder.rnn_encoder:RNNEncoder"),
+    ...     type_check=AbsEncoder,
+    ...     default="rnn",
+    ... )
+    >>> choices.get_class("rnn")
+    <class 'espnet2.asr.encoder.rnn_encoder.RNNEncoder'>
+
     """
 
     def __init__(
         self,
         name: str,
-        classes: Mapping[str, type],
+        classes: Mapping[str, Union[type, str]],
         type_check: type = None,
         default: str = None,
         optional: bool = False,
@@ -46,16 +61,32 @@ class ClassChoices:
         self.classes = {k.lower(): v for k, v in classes.items()}
         if "none" in self.classes or "nil" in self.classes or "null" in self.classes:
             raise ValueError('"none", "nil", and "null" are reserved.')
-        if type_check is not None:
-            for v in self.classes.values():
-                if not issubclass(v, type_check):
-                    raise ValueError(f"must be {type_check.__name__}, but got {v}")
+        for v in self.classes.values():
+            if isinstance(v, str):
+                if v.count(":") != 1:
+                    raise ValueError(f'must be "<module>:<class name>", but got {v}')
+            else:
+                self._check_type(v)
 
         self.optional = optional
         self.default = default
         if default is None:
             self.optional = True
 
+    def _check_type(self, class_obj: type):
+        if self.base_type is not None and not issubclass(class_obj, self.base_type):
+            raise ValueError(f"must be {self.base_type.__name__}, but got {class_obj}")
+
+    def _resolve(self, name: str) -> type:
+        class_obj = self.classes[name]
+        if isinstance(class_obj, str):
+            module_name, class_name = class_obj.split(":")
+            class_obj = getattr(importlib.import_module(module_name), class_name)
+            self._check_type(class_obj)
+            # Cache the imported class
+            self.classes[name] = class_obj
+        return class_obj
+
     def choices(self) -> Tuple[Optional[str], ...]:
         retval = tuple(self.classes)
         if self.optional:
@@ -68,7 +99,7 @@ class ClassChoices:
         if name is None or (self.optional and name.lower() == ("none", "null", "nil")):
             retval = None
         elif name.lower() in self.classes:
-            class_obj = self.classes[name]
+            class_obj = self._resolve(name.lower())
             assert check_return_type(class_obj)
             retval = class_obj
         else:
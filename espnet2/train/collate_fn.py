@@ -1,6 +1,8 @@
 from typing import Collection
 from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Sequence
 from typing import Tuple
 from typing import Union
 
@@ -9,7 +11,57 @@ import torch
 from typeguard import check_argument_types
 from typeguard import check_return_type
 
-from espnet.nets.pytorch_backend.nets_utils import pad_list
+
+class BufferPool:
+    """Reuse the memory of the padded tensors among mini-batches.
+
+    A ring of "num_buffers" flat buffers is kept for each key
+    and the padded tensor is given as a contiguous view of the buffer,
+    which grows only when a larger mini-batch comes.
+
+    Note that a returned tensor is overwritten after "num_buffers" calls
+    for the same key, so "num_buffers" must be larger than the number of
+    mini-batches alive at the same time, e.g. the prefetched mini-batches.
+    The pool is used only in the main process, i.e. it's ignored
+    in the DataLoader workers.
+
+    Args:
+        num_buffers: The number of buffers for each key
+        pin_memory: Allocate the buffers in page-locked memory.
+            This is valid only in the main process, i.e. num_workers=0.
+    """
+
+    def __init__(self, num_buffers: int = 2, pin_memory: bool = False):
+        assert check_argument_types()
+        if num_buffers <= 0:
+            raise ValueError(f"num_buffers must be positive: {num_buffers}")
+        self.num_buffers = num_buffers
+        self.pin_memory = pin_memory
+        self.buffers = {}
+        self.indices = {}
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(num_buffers={self.num_buffers}, "
+            f"pin_memory={self.pin_memory})"
+        )
+
+    def __getstate__(self):
+        # The buffers are not shared with the worker processes
+        state = self.__dict__.copy()
+        state["buffers"] = {}
+        state["indices"] = {}
+        return state
+
+    def get(self, name: str, shape: Sequence[int], dtype: torch.dtype) -> torch.Tensor:
+        numel = int(np.prod(shape))
+        buffers = self.buffers.setdefault((name, dtype), [None] * self.num_buffers)
+        idx = self.indices.get((name, dtype), 0)
+        self.indices[(name, dtype)] = (idx + 1) % self.num_buffers
+
+        if buffers[idx] is None or buffers[idx].numel() < numel:
+            buffers[idx] = torch.empty(numel, dtype=dtype, pin_memory=self.pin_memory)
+        return buffers[idx][:numel].view(*shape)
 
 
 class CommonCollateFn:
@@ -20,11 +72,19 @@ class CommonCollateFn:
         float_pad_value: Union[float, int] = 0.0,
         int_pad_value: int = -32768,
         not_sequence: Collection[str] = (),
+        num_buffers: int = 0,
+        pin_memory: bool = False,
+        sort_key: str = None,
     ):
         assert check_argument_types()
         self.float_pad_value = float_pad_value
         self.int_pad_value = int_pad_value
         self.not_sequence = set(not_sequence)
+        self.sort_key = sort_key
+        if num_buffers > 0:
+            self.buffer_pool = BufferPool(num_buffers, pin_memory=pin_memory)
+        else:
+            self.buffer_pool = None
 
     def __repr__(self):
         return (
@@ -35,22 +95,73 @@ class CommonCollateFn:
     def __call__(
         self, data: Collection[Tuple[str, Dict[str, np.ndarray]]]
     ) -> Tuple[List[str], Dict[str, torch.Tensor]]:
+        if torch.utils.data.get_worker_info() is None:
+            buffer_pool = self.buffer_pool
+        else:
+            # NOTE: The buffers can't be reused in the DataLoader workers,
+            # because the tensors sent to the main process share the memory
+            # with them and the workers prepare the next batches in advance.
+            buffer_pool = None
         return common_collate_fn(
             data,
             float_pad_value=self.float_pad_value,
             int_pad_value=self.int_pad_value,
             not_sequence=self.not_sequence,
+            buffer_pool=buffer_pool,
+            sort_key=self.sort_key,
         )
 
 
+def pad_arrays(
+    array_list: Sequence[np.ndarray],
+    pad_value: Union[float, int],
+    buffer: torch.Tensor = None,
+) -> torch.Tensor:
+    """Pad the list of ndarrays into a tensor without intermediate tensors.
+
+    The padded tensor is allocated once, or given as "buffer",
+    and each array is copied to it directly.
+
+    Args:
+        array_list: Batch x (Length, ...)
+        pad_value: The value for padding
+        buffer: The tensor to be written. (Batch, MaxLength, ...)
+    Returns:
+        tensor: (Batch, MaxLength, ...)
+    """
+    shape = (len(array_list), max(a.shape[0] for a in array_list))
+    shape += array_list[0].shape[1:]
+    if buffer is None:
+        array = np.empty(shape, dtype=array_list[0].dtype)
+        tensor = torch.from_numpy(array)
+    else:
+        assert tuple(buffer.shape) == shape, (buffer.shape, shape)
+        tensor = buffer
+        array = buffer.numpy()
+
+    for i, a in enumerate(array_list):
+        array[i, : a.shape[0]] = a
+        # Fill only the padded region
+        array[i, a.shape[0] :] = pad_value
+    return tensor
+
+
 def common_collate_fn(
     data: Collection[Tuple[str, Dict[str, np.ndarray]]],
     float_pad_value: Union[float, int] = 0.0,
     int_pad_value: int = -32768,
     not_sequence: Collection[str] = (),
+    buffer_pool: Optional[BufferPool] = None,
+    sort_key: str = None,
 ) -> Tuple[List[str], Dict[str, torch.Tensor]]:
     """Concatenate ndarray-list to an array and convert to torch.Tensor.
 
+    The ndarrays are copied into the padded tensor directly.
+    If "buffer_pool" is given, the padded tensors reuse its memory.
+    If "sort_key" is given, the samples are sorted in descending order
+    of the length of the key, e.g. when the lengths are changed
+    by the preprocessing after the batch sampler sorted them.
+
     Examples:
         >>> from espnet2.samplers.constant_batch_sampler import ConstantBatchSampler,
         >>> import espnet2.tasks.abs_task
@@ -67,6 +178,8 @@ def common_collate_fn(
 
     """
     assert check_argument_types()
+    if sort_key is not None:
+        data = sorted(data, key=lambda x: -x[1][sort_key].shape[0])
     uttids = [u for u, _ in data]
     data = [d for _, d in data]
 
@@ -85,13 +198,20 @@ def common_collate_fn(
         else:
             pad_value = float_pad_value
 
+        # Assume the first axis is length:
+        # array_list: Batch x (Length, ...)
         array_list = [d[key] for d in data]
 
-        # Assume the first axis is length:
-        # tensor_list: Batch x (Length, ...)
-        tensor_list = [torch.from_numpy(a) for a in array_list]
+        if buffer_pool is not None:
+            shape = (len(array_list), max(a.shape[0] for a in array_list))
+            shape += array_list[0].shape[1:]
+            # Derive the torch dtype corresponding to the numpy dtype
+            dtype = torch.from_numpy(np.empty(0, dtype=array_list[0].dtype)).dtype
+            buffer = buffer_pool.get(key, shape, dtype)
+        else:
+            buffer = None
         # tensor: (Batch, Length, ...)
-        tensor = pad_list(tensor_list, pad_value)
+        tensor = pad_arrays(array_list, pad_value, buffer)
         output[key] = tensor
 
         # lens: (Batch,)
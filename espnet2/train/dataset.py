@@ -14,7 +14,6 @@ from typing import Mapping
 from typing import Tuple
 from typing import Union
 
-import h5py
 import humanfriendly
 import kaldiio
 import numpy as np
@@ -24,11 +23,13 @@ from typeguard import check_argument_types
 from typeguard import check_return_type
 
 from espnet2.fileio.npy_scp import NpyScpReader
+from espnet2.fileio.packed_scp import PackedScpReader
 from espnet2.fileio.rand_gen_dataset import FloatRandomGenerateDataset
 from espnet2.fileio.rand_gen_dataset import IntRandomGenerateDataset
 from espnet2.fileio.read_text import load_num_sequence_text
 from espnet2.fileio.read_text import read_2column_text
 from espnet2.fileio.sound_scp import SoundScpReader
+from espnet2.fileio.token_corpus import TokenCorpus
 from espnet2.utils.sized_dict import SizedDict
 
 
@@ -87,6 +88,8 @@ class AdapterForSoundScpReader(collections.abc.Mapping):
 
 class H5FileWrapper:
     def __init__(self, path: str):
+        import h5py
+
         self.path = path
         self.h5_file = h5py.File(path, "r")
 
@@ -161,6 +164,17 @@ DATA_TYPES = {
         "   utterance_id_B /some/where/b.npy\n"
         "   ...",
     ),
+    "packed": dict(
+        func=PackedScpReader,
+        kwargs=[],
+        help="The arrays packed in binary files, "
+        "e.g. written by collect_stats mode with --collected_feats_format packed. "
+        "The binary files are memory-mapped."
+        "\n\n"
+        "   utterance_id_A /some/where/data.bin:0:<f4:120,1\n"
+        "   utterance_id_B /some/where/data.bin:480:<f4:98,1\n"
+        "   ...",
+    ),
     "text_int": dict(
         func=functools.partial(load_num_sequence_text, loader_type="text_int"),
         kwargs=[],
@@ -439,3 +453,53 @@ class ESPnetDataset(AbsDataset):
         retval = uid, data
         assert check_return_type(retval)
         return retval
+
+
+class PackedTokenDataset(AbsDataset):
+    """Dataset of the fixed-length blocks of a TokenCorpus for LM
+
+    The index of a block is given instead of the utterance id,
+    e.g. by PackedBlockSampler, and the block of "block_length + 1" tokens
+    is returned, i.e. the input and the target of the language model
+    are packed_text[:-1] and packed_text[1:].
+
+    Examples:
+        >>> dataset = PackedTokenDataset("dump/lm_train", block_length=256)
+        >>> key, data = dataset[10]
+        >>> data["packed_text"].shape
+        (257,)
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        block_length: int,
+        name: str = "packed_text",
+        int_dtype: str = "long",
+    ):
+        assert check_argument_types()
+        self.corpus = TokenCorpus(prefix)
+        self.block_length = block_length
+        self.name = name
+        self.int_dtype = int_dtype
+
+    def has_name(self, name) -> bool:
+        return name == self.name
+
+    def names(self) -> Tuple[str, ...]:
+        return (self.name,)
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}({self.corpus}, "
+            f"block_length={self.block_length})"
+        )
+
+    def __len__(self) -> int:
+        return (self.corpus.num_tokens - 1) // self.block_length
+
+    def __getitem__(self, uid: Union[str, int]) -> Tuple[str, Dict[str, np.ndarray]]:
+        idx = int(uid)
+        start = idx * self.block_length
+        block = self.corpus.tokens[start : start + self.block_length + 1]
+        return str(idx), {self.name: block.astype(self.int_dtype)}
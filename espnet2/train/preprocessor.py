@@ -1,19 +1,29 @@
 from abc import ABC
 from abc import abstractmethod
+from collections import OrderedDict
+from fractions import Fraction
+import hashlib
 from pathlib import Path
+from typing import Any
 from typing import Collection
 from typing import Dict
 from typing import Iterable
+from typing import List
+from typing import Sequence
+from typing import Tuple
 from typing import Union
 
 import numpy as np
-import scipy.signal
+import scipy.fft
 import soundfile
 from typeguard import check_argument_types
 from typeguard import check_return_type
+import yaml
 
+from espnet2.fileio.audio_bank import AudioBank
 from espnet2.text.build_tokenizer import build_tokenizer
 from espnet2.text.cleaner import TextCleaner
+from espnet2.text.token_cache import TokenCache
 from espnet2.text.token_id_converter import TokenIDConverter
 
 
@@ -92,6 +102,10 @@ def detect_non_silence(
     if x.shape[-1] < frame_length:
         return np.full(x.shape, fill_value=True, dtype=np.bool)
 
+    # NOTE: scipy.signal is imported in the functions
+    # because it takes long time to import
+    import scipy.signal
+
     if x.dtype.kind == "i":
         x = x.astype(np.float64)
     # framed_w: (C, T, F)
@@ -125,6 +139,121 @@ def detect_non_silence(
     )
 
 
+def rir_spectrum(rir: np.ndarray, min_nfft: int = 32768) -> np.ndarray:
+    """Compute the spectrum of RIR for overlap_add_convolve()
+
+    The FFT size is the power of 2 not less than twice of the RIR length
+    and "min_nfft". The larger FFT size reduces the overhead of
+    the overlapped blocks for the long input.
+
+    Args:
+        rir: (..., Time)
+        min_nfft: The minimum FFT size
+    Returns:
+        spectrum: (..., NFFT // 2 + 1)
+    """
+    nfft = max(2 ** int(np.ceil(np.log2(2 * max(rir.shape[-1], 1)))), min_nfft)
+    return scipy.fft.rfft(rir, n=nfft)
+
+
+def overlap_add_convolve(
+    x: np.ndarray, rir_spec: np.ndarray, rir_length: int
+) -> np.ndarray:
+    """Convolve RIR using FFT with overlap-add method.
+
+    This is equivalent to "np.convolve(x, rir, mode='full')[..., :len(x)]".
+    The input is split into the blocks of fixed size, so that
+    the spectrum of RIR can be computed once and reused for any input.
+
+    Args:
+        x: (..., Time)
+        rir_spec: (..., NFFT // 2 + 1), the output of rir_spectrum()
+        rir_length: The length of RIR
+    Returns:
+        y: (..., Time), broadcasted between x and RIR
+
+    >>> x, rir = np.random.randn(1, 1000), np.random.randn(1, 100)
+    >>> y = overlap_add_convolve(x, rir_spectrum(rir), rir.shape[-1])
+    >>> np.testing.assert_allclose(y, scipy.signal.convolve(x, rir)[:, :1000])
+
+    """
+    nfft = 2 * (rir_spec.shape[-1] - 1)
+    block = nfft - rir_length + 1
+    # The tail of a block overlaps only with the next block if NFFT >= 2 * RIR
+    assert nfft - block <= block, (nfft, rir_length)
+    length = x.shape[-1]
+    nblocks = max(-(-length // block), 1)
+
+    # x: (..., NBlocks, Block)
+    x = np.pad(x, [(0, 0)] * (x.ndim - 1) + [(0, nblocks * block - length)])
+    x = x.reshape(x.shape[:-1] + (nblocks, block))
+    # y: (..., NBlocks, NFFT)
+    y = scipy.fft.irfft(scipy.fft.rfft(x, n=nfft) * rir_spec[..., None, :], n=nfft)
+
+    out = np.zeros(y.shape[:-2] + ((nblocks + 1) * block,), dtype=y.dtype)
+    out[..., : nblocks * block] = y[..., :block].reshape(y.shape[:-2] + (-1,))
+    # Add the tail of each block to the head of the next block
+    tail = np.zeros(y.shape[:-1] + (block,), dtype=y.dtype)
+    tail[..., : nfft - block] = y[..., block:]
+    out[..., block:] += tail.reshape(y.shape[:-2] + (-1,))
+    return out[..., :length]
+
+
+def speed_perturb_kernel(factor: float) -> Tuple[int, int, np.ndarray]:
+    """Design the polyphase filter to change the speed by resampling.
+
+    The filter is same as the default one of scipy.signal.resample_poly().
+    The signal becomes shorter if factor > 1, e.g. factor=1.1 -> up=10, down=11.
+
+    Returns:
+        up: The upsampling factor
+        down: The downsampling factor
+        h: The FIR filter for scipy.signal.resample_poly(window=h)
+    """
+    import scipy.signal
+
+    fraction = Fraction(factor).limit_denominator(100)
+    up, down = fraction.denominator, fraction.numerator
+    if up == down:
+        # No resampling
+        return up, down, np.ones(1)
+    max_rate = max(up, down)
+    h = scipy.signal.firwin(
+        2 * 10 * max_rate + 1, 1.0 / max_rate, window=("kaiser", 5.0)
+    )
+    return up, down, h
+
+
+def speed_perturb(
+    x: np.ndarray, kernel: Tuple[int, int, np.ndarray], axis: int = 0
+) -> np.ndarray:
+    """Change the speed of the signal using the output of speed_perturb_kernel()
+
+    >>> kernel = speed_perturb_kernel(0.9)
+    >>> speed_perturb(np.random.randn(900), kernel).shape
+    (1000,)
+
+    """
+    import scipy.signal
+
+    up, down, h = kernel
+    if up == down:
+        return x
+    return scipy.signal.resample_poly(x, up, down, axis=axis, window=h)
+
+
+def _fingerprint_value(value: Any) -> Any:
+    """Convert the file path to the hash of the file for the fingerprint"""
+    if isinstance(value, (Path, str)) and Path(value).is_file():
+        return hashlib.sha1(Path(value).read_bytes()).hexdigest()
+    elif isinstance(value, Path):
+        return str(value)
+    elif isinstance(value, Iterable) and not isinstance(value, str):
+        return list(value)
+    else:
+        return value
+
+
 class CommonPreprocessor(AbsPreprocessor):
     def __init__(
         self,
@@ -146,6 +275,11 @@ class CommonPreprocessor(AbsPreprocessor):
         speech_volume_normalize: float = None,
         speech_name: str = "speech",
         text_name: str = "text",
+        augmentation_bank_dir: Union[Path, str] = None,
+        rir_cache_size: int = 32,
+        speed_perturb_factors: Sequence[float] = None,
+        token_cache_size: int = 0,
+        token_cache_path: Union[Path, str] = None,
     ):
         super().__init__(train)
         self.train = train
@@ -154,6 +288,27 @@ class CommonPreprocessor(AbsPreprocessor):
         self.speech_volume_normalize = speech_volume_normalize
         self.rir_apply_prob = rir_apply_prob
         self.noise_apply_prob = noise_apply_prob
+        # Memory-mapped banks of RIRs and noises, or None to read each file
+        self.rir_bank = None
+        self.noise_bank = None
+        # RIR index -> (spectrum, length)
+        # NOTE: A spectrum takes 256KB per channel for the RIR up to 16384 samples
+        self.rir_cache = OrderedDict()
+        self.rir_cache_size = rir_cache_size
+
+        if train and speed_perturb_factors is not None:
+            if any(f <= 0 for f in speed_perturb_factors):
+                raise ValueError(
+                    f"speed_perturb_factors must be positive: {speed_perturb_factors}"
+                )
+            self.speed_perturb_factors = list(speed_perturb_factors)
+            # The filters are designed once for each factor
+            self.speed_perturb_kernels = {
+                f: speed_perturb_kernel(f) for f in self.speed_perturb_factors
+            }
+        else:
+            self.speed_perturb_factors = None
+            self.speed_perturb_kernels = None
 
         if token_type is not None:
             if token_list is None:
@@ -177,6 +332,32 @@ class CommonPreprocessor(AbsPreprocessor):
             self.tokenizer = None
             self.token_id_converter = None
 
+        if self.tokenizer is not None and (
+            token_cache_size > 0 or token_cache_path is not None
+        ):
+            # The cached token ids are valid only for the same text processing
+            config = dict(
+                token_type=token_type,
+                tokenizer=repr(self.tokenizer),
+                token_list=self.token_id_converter.token_list,
+                bpemodel=bpemodel,
+                text_cleaner=self.text_cleaner.cleaner_types,
+                g2p_type=g2p_type,
+                unk_symbol=unk_symbol,
+                space_symbol=space_symbol,
+                non_linguistic_symbols=non_linguistic_symbols,
+                delimiter=delimiter,
+            )
+            config = {k: _fingerprint_value(v) for k, v in config.items()}
+            fingerprint = hashlib.sha1(
+                yaml.safe_dump(config, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+            self.token_cache = TokenCache(
+                fingerprint, token_cache_path, max_size=token_cache_size
+            )
+        else:
+            self.token_cache = None
+
         if train and rir_scp is not None:
             self.rirs = []
             with open(rir_scp, "r", encoding="utf-8") as f:
@@ -186,6 +367,10 @@ class CommonPreprocessor(AbsPreprocessor):
                         self.rirs.append(sps[0])
                     else:
                         self.rirs.append(sps[1])
+            if augmentation_bank_dir is not None:
+                self.rir_bank = AudioBank(
+                    self.rirs, Path(augmentation_bank_dir) / "rir", dtype="float64"
+                )
         else:
             self.rirs = None
 
@@ -207,15 +392,74 @@ class CommonPreprocessor(AbsPreprocessor):
                 raise ValueError(
                     "Format error: '{noise_db_range}' e.g. -3_4 -> [-3db,4db]"
                 )
+            if augmentation_bank_dir is not None:
+                self.noise_bank = AudioBank(
+                    self.noises, Path(augmentation_bank_dir) / "noise"
+                )
         else:
             self.noises = None
 
+    def _get_rir(self, idx: int) -> Tuple[np.ndarray, int]:
+        """Return the spectrum and the length of RIR with LRU caching"""
+        if idx in self.rir_cache:
+            self.rir_cache.move_to_end(idx)
+            return self.rir_cache[idx]
+
+        if self.rir_bank is not None:
+            rir = self.rir_bank[idx]
+        else:
+            rir, _ = soundfile.read(self.rirs[idx], dtype=np.float64, always_2d=True)
+        # rir: (Nmic, Time)
+        rir = rir.T
+        retval = rir_spectrum(rir), rir.shape[1]
+        self.rir_cache[idx] = retval
+        if len(self.rir_cache) > self.rir_cache_size:
+            self.rir_cache.popitem(last=False)
+        return retval
+
+    def _read_noise(self, idx: int, nsamples: int) -> np.ndarray:
+        """Read the noise at a random offset: (Time, Nmic)"""
+        if self.noise_bank is not None:
+            return self.noise_bank.read_segment(idx, nsamples).astype(np.float64)
+
+        noise_path = self.noises[idx]
+        with soundfile.SoundFile(noise_path) as f:
+            if f.frames == nsamples:
+                noise = f.read(dtype=np.float64, always_2d=True)
+            elif f.frames < nsamples:
+                offset = np.random.randint(0, nsamples - f.frames)
+                # noise: (Time, Nmic)
+                noise = f.read(dtype=np.float64, always_2d=True)
+                # Repeat noise
+                noise = np.pad(
+                    noise,
+                    [(offset, nsamples - f.frames - offset), (0, 0)],
+                    mode="wrap",
+                )
+            else:
+                offset = np.random.randint(0, f.frames - nsamples)
+                f.seek(offset)
+                # noise: (Time, Nmic)
+                noise = f.read(nsamples, dtype=np.float64, always_2d=True)
+                if len(noise) != nsamples:
+                    raise RuntimeError(f"Something wrong: {noise_path}")
+        return noise
+
     def __call__(
         self, uid: str, data: Dict[str, Union[str, np.ndarray]]
     ) -> Dict[str, np.ndarray]:
         assert check_argument_types()
 
         if self.speech_name in data:
+            if self.train and self.speed_perturb_factors is not None:
+                factor = self.speed_perturb_factors[
+                    np.random.randint(len(self.speed_perturb_factors))
+                ]
+                # speech: (Time,) or (Time, Nmic)
+                data[self.speech_name] = speed_perturb(
+                    data[self.speech_name], self.speed_perturb_kernels[factor]
+                )
+
             if self.train and self.rirs is not None and self.noises is not None:
                 speech = data[self.speech_name]
                 nsamples = len(speech)
@@ -230,66 +474,42 @@ class CommonPreprocessor(AbsPreprocessor):
 
                 # 1. Convolve RIR
                 if self.rirs is not None and self.rir_apply_prob >= np.random.random():
-                    rir_path = np.random.choice(self.rirs)
-                    if rir_path is not None:
-                        rir, _ = soundfile.read(
-                            rir_path, dtype=np.float64, always_2d=True
-                        )
-
-                        # rir: (Nmic, Time)
-                        rir = rir.T
-
+                    rir_spec, rir_length = self._get_rir(
+                        np.random.randint(len(self.rirs))
+                    )
+                    if speech.shape[0] > 1 and rir_spec.shape[0] > 1:
+                        # NOTE: Keep the behaviour of 2-dimensional convolution
+                        import scipy.signal
+
+                        rir = scipy.fft.irfft(rir_spec)[:, :rir_length]
+                        speech = scipy.signal.fftconvolve(speech, rir)
+                    else:
                         # speech: (Nmic, Time)
-                        # Note that this operation doesn't change the signal length
-                        speech = scipy.signal.convolve(speech, rir, mode="full")[
-                            :, : speech.shape[1]
-                        ]
-                        # Reverse mean power to the original power
-                        power2 = (speech[detect_non_silence(speech)] ** 2).mean()
-                        speech = np.sqrt(power / max(power2, 1e-10)) * speech
+                        speech = overlap_add_convolve(speech, rir_spec, rir_length)
+                    # Note that this operation doesn't change the signal length
+                    speech = speech[:, :nsamples]
+                    # Reverse mean power to the original power
+                    power2 = (speech[detect_non_silence(speech)] ** 2).mean()
+                    speech = np.sqrt(power / max(power2, 1e-10)) * speech
 
                 # 2. Add Noise
                 if (
                     self.noises is not None
                     and self.rir_apply_prob >= np.random.random()
                 ):
-                    noise_path = np.random.choice(self.noises)
-                    if noise_path is not None:
-                        noise_db = np.random.uniform(
-                            self.noise_db_low, self.noise_db_high
-                        )
-                        with soundfile.SoundFile(noise_path) as f:
-                            if f.frames == nsamples:
-                                noise = f.read(dtype=np.float64, always_2d=True)
-                            elif f.frames < nsamples:
-                                offset = np.random.randint(0, nsamples - f.frames)
-                                # noise: (Time, Nmic)
-                                noise = f.read(dtype=np.float64, always_2d=True)
-                                # Repeat noise
-                                noise = np.pad(
-                                    noise,
-                                    [(offset, nsamples - f.frames - offset), (0, 0)],
-                                    mode="wrap",
-                                )
-                            else:
-                                offset = np.random.randint(0, f.frames - nsamples)
-                                f.seek(offset)
-                                # noise: (Time, Nmic)
-                                noise = f.read(
-                                    nsamples, dtype=np.float64, always_2d=True
-                                )
-                                if len(noise) != nsamples:
-                                    raise RuntimeError(f"Something wrong: {noise_path}")
-                        # noise: (Nmic, Time)
-                        noise = noise.T
-
-                        noise_power = (noise ** 2).mean()
-                        scale = (
-                            10 ** (-noise_db / 20)
-                            * np.sqrt(power)
-                            / np.sqrt(max(noise_power, 1e-10))
-                        )
-                        speech = speech + scale * noise
+                    noise_db = np.random.uniform(self.noise_db_low, self.noise_db_high)
+                    # noise: (Nmic, Time)
+                    noise = self._read_noise(
+                        np.random.randint(len(self.noises)), nsamples
+                    ).T
+
+                    noise_power = (noise ** 2).mean()
+                    scale = (
+                        10 ** (-noise_db / 20)
+                        * np.sqrt(power)
+                        / np.sqrt(max(noise_power, 1e-10))
+                    )
+                    speech = speech + scale * noise
 
                 speech = speech.T
                 ma = np.max(np.abs(speech))
@@ -304,13 +524,37 @@ class CommonPreprocessor(AbsPreprocessor):
 
         if self.text_name in data and self.tokenizer is not None:
             text = data[self.text_name]
-            text = self.text_cleaner(text)
-            tokens = self.tokenizer.text2tokens(text)
-            text_ints = self.token_id_converter.tokens2ids(tokens)
-            data[self.text_name] = np.array(text_ints, dtype=np.int64)
+            if self.token_cache is not None:
+                data[self.text_name] = self.token_cache(text, self.text2ids)
+            else:
+                data[self.text_name] = self.text2ids(text)
         assert check_return_type(data)
         return data
 
+    def text2ids(self, text: str) -> np.ndarray:
+        text = self.text_cleaner(text)
+        tokens = self.tokenizer.text2tokens(text)
+        text_ints = self.token_id_converter.tokens2ids(tokens)
+        return np.array(text_ints, dtype=np.int64)
+
+    def batch_text2ids(self, texts: List[str]) -> List[np.ndarray]:
+        texts = [self.text_cleaner(text) for text in texts]
+        tokens_list = self.tokenizer.batch_text2tokens(texts)
+        return [
+            np.array(text_ints, dtype=np.int64)
+            for text_ints in self.token_id_converter.batch_tokens2ids(tokens_list)
+        ]
+
+    def precompute_token_cache(self, texts: Iterable[str]) -> int:
+        """Store the token ids of the texts in the cache on disk beforehand
+
+        Returns:
+            The number of the texts newly converted
+        """
+        if self.token_cache is None:
+            raise RuntimeError("token_cache_path is required for precomputing")
+        return self.token_cache.precompute(texts, self.batch_text2ids)
+
 
 class CommonPreprocessor_multi(AbsPreprocessor):
     def __init__(
@@ -368,12 +612,13 @@ class CommonPreprocessor_multi(AbsPreprocessor):
             # - Data augmentation
             pass
 
-        for text_n in self.text_name:
-            if text_n in data and self.tokenizer is not None:
-                text = data[text_n]
-                text = self.text_cleaner(text)
-                tokens = self.tokenizer.text2tokens(text)
-                text_ints = self.token_id_converter.tokens2ids(tokens)
+        if self.tokenizer is not None:
+            # Tokenize all texts of the sample at once
+            text_names = [n for n in self.text_name if n in data]
+            texts = [self.text_cleaner(data[n]) for n in text_names]
+            tokens_list = self.tokenizer.batch_text2tokens(texts)
+            ids_list = self.token_id_converter.batch_tokens2ids(tokens_list)
+            for text_n, text_ints in zip(text_names, ids_list):
                 data[text_n] = np.array(text_ints, dtype=np.int64)
         assert check_return_type(data)
         return data
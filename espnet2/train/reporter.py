@@ -20,7 +20,6 @@ import numpy as np
 import torch
 from typeguard import check_argument_types
 from typeguard import check_return_type
-import wandb
 
 if LooseVersion(torch.__version__) >= LooseVersion("1.1.0"):
     from torch.utils.tensorboard import SummaryWriter
@@ -247,6 +246,9 @@ class SubReporter:
             v = aggregate(values)
             d[key2] = v
         d["iteration"] = self.total_count
+        # NOTE: Imported here because it takes long time to import
+        import wandb
+
         wandb.log(d, commit=commit)
 
     def finished(self) -> None:
@@ -260,14 +262,18 @@ class SubReporter:
         self.register({name: t})
 
     def measure_iter_time(self, iterable, name: str):
+        # NOTE(kamo): The time to start the iteration, e.g. spawning the workers
+        #   of DataLoader, is included in the time of the first iteration,
+        #   so that the stall at the epoch boundary is also reported.
+        start = time.perf_counter()
         iterator = iter(iterable)
         while True:
             try:
-                start = time.perf_counter()
                 retval = next(iterator)
                 t = time.perf_counter() - start
                 self.register({name: t})
                 yield retval
+                start = time.perf_counter()
             except StopIteration:
                 break
 
@@ -553,6 +559,9 @@ class Reporter:
                     continue
                 d[f"{key1}_{key2}_epoch"] = self.stats[epoch][key1][key2]
         d["epoch"] = epoch
+        # NOTE: Imported here because it takes long time to import
+        import wandb
+
         wandb.log(d, commit=commit)
 
     def state_dict(self):
@@ -1,5 +1,6 @@
 import argparse
 from contextlib import contextmanager
+from contextlib import ExitStack
 import dataclasses
 from dataclasses import is_dataclass
 from distutils.version import LooseVersion
@@ -245,6 +246,10 @@ class Trainer:
                 elif isinstance(scheduler, AbsEpochStepScheduler):
                     scheduler.step()
 
+            # NOTE: state_dict() of ShardedOptimizer is a collective operation,
+            #   so it must be invoked by all ranks.
+            optimizer_states = [o.state_dict() for o in optimizers]
+
             if not distributed_option.distributed or distributed_option.dist_rank == 0:
                 # 3. Report the results
                 logging.info(reporter.log_message())
@@ -259,7 +264,7 @@ class Trainer:
                     {
                         "model": model.state_dict(),
                         "reporter": reporter.state_dict(),
-                        "optimizers": [o.state_dict() for o in optimizers],
+                        "optimizers": optimizer_states,
                         "schedulers": [
                             s.state_dict() if s is not None else None
                             for s in schedulers
@@ -373,8 +378,9 @@ class Trainer:
         # processes, send stop-flag to the other processes if iterator is finished
         iterator_stop = torch.tensor(0).to("cuda" if ngpu > 0 else "cpu")
 
+        pass_utt_id = _requires_utt_id(model)
         start_time = time.perf_counter()
-        for iiter, (_, batch) in enumerate(
+        for iiter, (utt_id, batch) in enumerate(
             reporter.measure_iter_time(iterator, "iter_time"), 1
         ):
             assert isinstance(batch, dict), type(batch)
@@ -385,42 +391,52 @@ class Trainer:
                     break
 
             batch = to_device(batch, "cuda" if ngpu > 0 else "cpu")
+            if pass_utt_id:
+                batch["utt_id"] = utt_id
             if no_forward_run:
                 all_steps_are_invalid = False
                 continue
 
-            with autocast(scaler is not None):
-                with reporter.measure_time("forward_time"):
-                    loss, stats, weight = model(**batch)
-                stats = {k: v for k, v in stats.items() if v is not None}
-                if ngpu > 1 or distributed:
-                    # Apply weighted averaging for loss and stats
-                    loss = (loss * weight.type(loss.dtype)).sum()
-
-                    # if distributed, this method can also apply all_reduce()
-                    stats, weight = recursive_average(stats, weight, distributed)
-
-                    # Now weight is summation over all workers
-                    loss /= weight
-                if distributed:
-                    # NOTE(kamo): Multiply world_size because DistributedDataParallel
-                    # automatically normalizes the gradient by world_size.
-                    loss *= torch.distributed.get_world_size()
-
-                loss /= accum_grad
-
-            reporter.register(stats, weight)
-
-            with reporter.measure_time("backward_time"):
-                if scaler is not None:
-                    # Scales loss.  Calls backward() on scaled loss
-                    # to create scaled gradients.
-                    # Backward passes under autocast are not recommended.
-                    # Backward ops run in the same dtype autocast chose
-                    # for corresponding forward ops.
-                    scaler.scale(loss).backward()
-                else:
-                    loss.backward()
+            with ExitStack() as sync_context:
+                if distributed and iiter % accum_grad != 0:
+                    # NOTE: Gradients are accumulated locally and all-reduced
+                    # only at the last micro-batch of accum_grad.
+                    # no_sync() must cover both of forward and backward.
+                    sync_context.enter_context(model.no_sync())
+
+                with autocast(scaler is not None):
+                    with reporter.measure_time("forward_time"):
+                        loss, stats, weight = model(**batch)
+                    stats = {k: v for k, v in stats.items() if v is not None}
+                    if ngpu > 1 or distributed:
+                        # Apply weighted averaging for loss and stats
+                        loss = (loss * weight.type(loss.dtype)).sum()
+
+                        # if distributed, this method can also apply all_reduce()
+                        stats, weight = recursive_average(stats, weight, distributed)
+
+                        # Now weight is summation over all workers
+                        loss /= weight
+                    if distributed:
+                        # NOTE(kamo): Multiply world_size because
+                        # DistributedDataParallel automatically normalizes the gradient
+                        # by world_size.
+                        loss *= torch.distributed.get_world_size()
+
+                    loss /= accum_grad
+
+                reporter.register(stats, weight)
+
+                with reporter.measure_time("backward_time"):
+                    if scaler is not None:
+                        # Scales loss.  Calls backward() on scaled loss
+                        # to create scaled gradients.
+                        # Backward passes under autocast are not recommended.
+                        # Backward ops run in the same dtype autocast chose
+                        # for corresponding forward ops.
+                        scaler.scale(loss).backward()
+                    else:
+                        loss.backward()
 
             if iiter % accum_grad == 0:
                 if scaler is not None:
@@ -526,7 +542,8 @@ class Trainer:
         # [For distributed] Because iteration counts are not always equals between
         # processes, send stop-flag to the other processes if iterator is finished
         iterator_stop = torch.tensor(0).to("cuda" if ngpu > 0 else "cpu")
-        for (_, batch) in iterator:
+        pass_utt_id = _requires_utt_id(model)
+        for (utt_id, batch) in iterator:
             assert isinstance(batch, dict), type(batch)
             if distributed:
                 torch.distributed.all_reduce(iterator_stop, ReduceOp.SUM)
@@ -534,6 +551,8 @@ class Trainer:
                     break
 
             batch = to_device(batch, "cuda" if ngpu > 0 else "cpu")
+            if pass_utt_id:
+                batch["utt_id"] = utt_id
             if no_forward_run:
                 continue
 
@@ -624,3 +643,17 @@ class Trainer:
                             f"{k}_{id_}", fig, reporter.get_epoch()
                         )
             reporter.next()
+
+
+def _requires_utt_id(model: torch.nn.Module) -> bool:
+    """Whether the utterance ids should be given to the model, e.g. for caching"""
+    if isinstance(model, torch.nn.DataParallel):
+        if getattr(model.module, "requires_utt_id", False):
+            raise RuntimeError(
+                "The utterance ids can't be scattered by DataParallel. "
+                "Use DistributedDataParallel instead"
+            )
+        return False
+    if isinstance(model, torch.nn.parallel.DistributedDataParallel):
+        model = model.module
+    return getattr(model, "requires_utt_id", False)
@@ -28,3 +28,18 @@ class AbsTTS(torch.nn.Module, ABC):
         **kwargs,
     ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         raise NotImplementedError
+
+    @property
+    def supports_batch_inference(self) -> bool:
+        """Whether batch_inference() is available."""
+        return False
+
+    def batch_inference(
+        self,
+        text: torch.Tensor,
+        text_lengths: torch.Tensor,
+        spembs: torch.Tensor = None,
+        **kwargs,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Generate the padded batch of features and their lengths."""
+        raise NotImplementedError
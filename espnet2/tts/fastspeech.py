@@ -25,6 +25,7 @@ from espnet.nets.pytorch_backend.nets_utils import make_non_pad_mask
 from espnet.nets.pytorch_backend.nets_utils import make_pad_mask
 from espnet.nets.pytorch_backend.tacotron2.decoder import Postnet
 from espnet.nets.pytorch_backend.transformer.embedding import PositionalEncoding
+from espnet.nets.pytorch_backend.transformer.embedding import RelPositionalEncoding
 from espnet.nets.pytorch_backend.transformer.embedding import ScaledPositionalEncoding
 from espnet.nets.pytorch_backend.transformer.encoder import (
     Encoder as TransformerEncoder,  # noqa: H301
@@ -32,11 +33,79 @@ from espnet.nets.pytorch_backend.transformer.encoder import (
 
 from espnet2.torch_utils.device_funcs import force_gatherable
 from espnet2.torch_utils.initialize import initialize
+from espnet2.torch_utils.mask_conv_inputs import mask_conv_inputs
 from espnet2.tts.abs_tts import AbsTTS
 from espnet2.tts.gst.style_encoder import StyleEncoder
 
 
-class FastSpeech(AbsTTS):
+class FastSpeechBatchInferenceMixin:
+    """Batch inference shared by FastSpeech and FastSpeech2.
+
+    The model must have "use_gst", "padding_idx", "eos", "reduction_factor",
+    and "_forward()" returning (before_outs, after_outs, d_outs, ...),
+    where d_outs are the durations given to the length regulator.
+
+    """
+
+    @property
+    def supports_batch_inference(self) -> bool:
+        """Whether batch_inference() generates the same outputs as inference().
+
+        GST and the relative positional encoding of the conformer
+        depend on the padded length, so that they are not supported.
+
+        """
+        return not self.use_gst and not any(
+            isinstance(m, RelPositionalEncoding) for m in self.modules()
+        )
+
+    def batch_inference(
+        self,
+        text: torch.Tensor,
+        text_lengths: torch.Tensor,
+        spembs: torch.Tensor = None,
+        alpha: float = 1.0,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Generate the sequences of features given the batch of characters.
+
+        The outputs are same as those of inference() for each sequence.
+
+        Args:
+            text (LongTensor): Batch of padded character ids (B, Tmax).
+            text_lengths (LongTensor): Batch of lengths of each input (B,).
+            spembs (Tensor, optional): Batch of speaker embeddings (B, spk_embed_dim).
+            alpha (float, optional): Alpha to control the speed.
+
+        Returns:
+            Tensor: Batch of padded output sequences of features (B, Lmax, odim).
+            LongTensor: Batch of lengths of each output (B,).
+
+        """
+        if not self.supports_batch_inference:
+            raise NotImplementedError(
+                "batch_inference() doesn't support GST and "
+                "the relative positional encoding"
+            )
+        text = text[:, : text_lengths.max()]
+
+        # add eos at the last of sequence
+        xs = F.pad(text, [0, 1], "constant", self.padding_idx)
+        xs[torch.arange(xs.size(0), device=xs.device), text_lengths] = self.eos
+        ilens = text_lengths + 1
+
+        _, outs, d_outs, *_ = self._forward(
+            xs,
+            ilens,
+            spembs=spembs,
+            is_inference=True,
+            alpha=alpha,
+        )  # (B, L, odim)
+        olens = d_outs.sum(dim=1) * self.reduction_factor
+
+        return outs, olens
+
+
+class FastSpeech(FastSpeechBatchInferenceMixin, AbsTTS):
     """FastSpeech module for end-to-end text-to-speech.
 
     This is a module of FastSpeech, feed-forward Transformer with duration predictor
@@ -361,9 +430,14 @@ class FastSpeech(AbsTTS):
         is_inference: bool = False,
         alpha: float = 1.0,
     ) -> Sequence[torch.Tensor]:
+        # NOTE: The padded frames are masked in the convolutions only in the
+        #   batch inference to make its outputs same as those of the single sequence
+        batch_inference = is_inference and xs.size(0) > 1
+
         # forward encoder
         x_masks = self._source_mask(ilens)
-        hs, _ = self.encoder(xs, x_masks)  # (B, Tmax, adim)
+        with mask_conv_inputs([self.encoder], ilens if batch_inference else None):
+            hs, _ = self.encoder(xs, x_masks)  # (B, Tmax, adim)
 
         # integrate with GST
         if self.use_gst:
@@ -377,8 +451,13 @@ class FastSpeech(AbsTTS):
         # forward duration predictor and length regulator
         d_masks = make_pad_mask(ilens).to(xs.device)
         if is_inference:
-            d_outs = self.duration_predictor.inference(hs, d_masks)  # (B, Tmax)
-            hs = self.length_regulator(hs, d_outs, alpha)  # (B, Lmax, adim)
+            with mask_conv_inputs(
+                [self.duration_predictor], ilens if batch_inference else None
+            ):
+                d_outs = self.duration_predictor.inference(hs, d_masks)  # (B, Tmax)
+            # The durations given to the length regulator are returned
+            d_outs = self.length_regulator.adjust_durations(d_outs, alpha, d_masks)
+            hs = self.length_regulator(hs, d_outs)  # (B, Lmax, adim)
         else:
             d_outs = self.duration_predictor(hs, d_masks)  # (B, Tmax)
             hs = self.length_regulator(hs, ds)  # (B, Lmax, adim)
@@ -390,9 +469,13 @@ class FastSpeech(AbsTTS):
             else:
                 olens_in = olens
             h_masks = self._source_mask(olens_in)
+        elif is_inference:
+            olens_in = d_outs.sum(dim=1)
+            h_masks = self._source_mask(olens_in)
         else:
             h_masks = None
-        zs, _ = self.decoder(hs, h_masks)  # (B, Lmax, adim)
+        with mask_conv_inputs([self.decoder], olens_in if batch_inference else None):
+            zs, _ = self.decoder(hs, h_masks)  # (B, Lmax, adim)
         before_outs = self.feat_out(zs).view(
             zs.size(0), -1, self.odim
         )  # (B, Lmax, odim)
@@ -401,9 +484,13 @@ class FastSpeech(AbsTTS):
         if self.postnet is None:
             after_outs = before_outs
         else:
-            after_outs = before_outs + self.postnet(
-                before_outs.transpose(1, 2)
-            ).transpose(1, 2)
+            with mask_conv_inputs(
+                [self.postnet],
+                olens_in * self.reduction_factor if batch_inference else None,
+            ):
+                after_outs = before_outs + self.postnet(
+                    before_outs.transpose(1, 2)
+                ).transpose(1, 2)
 
         return before_outs, after_outs, d_outs
 
@@ -31,12 +31,14 @@ from espnet.nets.pytorch_backend.transformer.encoder import (
 
 from espnet2.torch_utils.device_funcs import force_gatherable
 from espnet2.torch_utils.initialize import initialize
+from espnet2.torch_utils.mask_conv_inputs import mask_conv_inputs
 from espnet2.tts.abs_tts import AbsTTS
+from espnet2.tts.fastspeech import FastSpeechBatchInferenceMixin
 from espnet2.tts.gst.style_encoder import StyleEncoder
 from espnet2.tts.variance_predictor import VariancePredictor
 
 
-class FastSpeech2(AbsTTS):
+class FastSpeech2(FastSpeechBatchInferenceMixin, AbsTTS):
     """FastSpeech2 module.
 
     This is a module of FastSpeech2 described in `FastSpeech 2: Fast and
@@ -469,9 +471,14 @@ class FastSpeech2(AbsTTS):
         is_inference: bool = False,
         alpha: float = 1.0,
     ) -> Sequence[torch.Tensor]:
+        # NOTE: The padded frames are masked in the convolutions only in the
+        #   batch inference to make its outputs same as those of the single sequence
+        batch_inference = is_inference and xs.size(0) > 1
+
         # forward encoder
         x_masks = self._source_mask(ilens)
-        hs, _ = self.encoder(xs, x_masks)  # (B, Tmax, adim)
+        with mask_conv_inputs([self.encoder], ilens if batch_inference else None):
+            hs, _ = self.encoder(xs, x_masks)  # (B, Tmax, adim)
 
         # integrate with GST
         if self.use_gst:
@@ -485,22 +492,32 @@ class FastSpeech2(AbsTTS):
         # forward duration predictor and variance predictors
         d_masks = make_pad_mask(ilens).to(xs.device)
 
-        if self.stop_gradient_from_pitch_predictor:
-            p_outs = self.pitch_predictor(hs.detach(), d_masks.unsqueeze(-1))
-        else:
-            p_outs = self.pitch_predictor(hs, d_masks.unsqueeze(-1))
-        if self.stop_gradient_from_energy_predictor:
-            e_outs = self.energy_predictor(hs.detach(), d_masks.unsqueeze(-1))
-        else:
-            e_outs = self.energy_predictor(hs, d_masks.unsqueeze(-1))
+        with mask_conv_inputs(
+            [self.pitch_predictor, self.energy_predictor],
+            ilens if batch_inference else None,
+        ):
+            if self.stop_gradient_from_pitch_predictor:
+                p_outs = self.pitch_predictor(hs.detach(), d_masks.unsqueeze(-1))
+            else:
+                p_outs = self.pitch_predictor(hs, d_masks.unsqueeze(-1))
+            if self.stop_gradient_from_energy_predictor:
+                e_outs = self.energy_predictor(hs.detach(), d_masks.unsqueeze(-1))
+            else:
+                e_outs = self.energy_predictor(hs, d_masks.unsqueeze(-1))
 
         if is_inference:
-            d_outs = self.duration_predictor.inference(hs, d_masks)  # (B, Tmax)
-            # use prediction in inference
-            p_embs = self.pitch_embed(p_outs.transpose(1, 2)).transpose(1, 2)
-            e_embs = self.energy_embed(e_outs.transpose(1, 2)).transpose(1, 2)
+            with mask_conv_inputs(
+                [self.duration_predictor, self.pitch_embed, self.energy_embed],
+                ilens if batch_inference else None,
+            ):
+                d_outs = self.duration_predictor.inference(hs, d_masks)  # (B, Tmax)
+                # use prediction in inference
+                p_embs = self.pitch_embed(p_outs.transpose(1, 2)).transpose(1, 2)
+                e_embs = self.energy_embed(e_outs.transpose(1, 2)).transpose(1, 2)
             hs = hs + e_embs + p_embs
-            hs = self.length_regulator(hs, d_outs, alpha)  # (B, Lmax, adim)
+            # The durations given to the length regulator are returned
+            d_outs = self.length_regulator.adjust_durations(d_outs, alpha, d_masks)
+            hs = self.length_regulator(hs, d_outs)  # (B, Lmax, adim)
         else:
             d_outs = self.duration_predictor(hs, d_masks)
             # use groundtruth in training
@@ -516,9 +533,13 @@ class FastSpeech2(AbsTTS):
             else:
                 olens_in = olens
             h_masks = self._source_mask(olens_in)
+        elif is_inference:
+            olens_in = d_outs.sum(dim=1)
+            h_masks = self._source_mask(olens_in)
         else:
             h_masks = None
-        zs, _ = self.decoder(hs, h_masks)  # (B, Lmax, adim)
+        with mask_conv_inputs([self.decoder], olens_in if batch_inference else None):
+            zs, _ = self.decoder(hs, h_masks)  # (B, Lmax, adim)
         before_outs = self.feat_out(zs).view(
             zs.size(0), -1, self.odim
         )  # (B, Lmax, odim)
@@ -527,9 +548,13 @@ class FastSpeech2(AbsTTS):
         if self.postnet is None:
             after_outs = before_outs
         else:
-            after_outs = before_outs + self.postnet(
-                before_outs.transpose(1, 2)
-            ).transpose(1, 2)
+            with mask_conv_inputs(
+                [self.postnet],
+                olens_in * self.reduction_factor if batch_inference else None,
+            ):
+                after_outs = before_outs + self.postnet(
+                    before_outs.transpose(1, 2)
+                ).transpose(1, 2)
 
         return before_outs, after_outs, d_outs, p_outs, e_outs
 
@@ -375,6 +375,7 @@ class Tacotron2(AbsTTS):
         backward_window: int = 1,
         forward_window: int = 3,
         use_teacher_forcing: bool = False,
+        windowed_att_constraint: bool = False,
     ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         """Generate the sequence of features given the sequences of characters.
 
@@ -389,6 +390,8 @@ class Tacotron2(AbsTTS):
             backward_window (int, optional): Backward window in attention constraint.
             forward_window (int, optional): Forward window in attention constraint.
             use_teacher_forcing (bool, optional): Whether to use teacher forcing.
+            windowed_att_constraint (bool, optional): Whether to compute
+                the attention only inside the window of attention constraint.
 
         Returns:
             Tensor: Output sequence of features (L, odim).
@@ -431,6 +434,7 @@ class Tacotron2(AbsTTS):
             use_att_constraint=use_att_constraint,
             backward_window=backward_window,
             forward_window=forward_window,
+            windowed_att_constraint=windowed_att_constraint,
         )
 
         return outs, probs, att_ws
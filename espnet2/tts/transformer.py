@@ -18,7 +18,6 @@ from espnet.nets.pytorch_backend.nets_utils import make_pad_mask
 from espnet.nets.pytorch_backend.tacotron2.decoder import Postnet
 from espnet.nets.pytorch_backend.tacotron2.decoder import Prenet as DecoderPrenet
 from espnet.nets.pytorch_backend.tacotron2.encoder import Encoder as EncoderPrenet
-from espnet.nets.pytorch_backend.transformer.attention import MultiHeadedAttention
 from espnet.nets.pytorch_backend.transformer.decoder import Decoder
 from espnet.nets.pytorch_backend.transformer.embedding import PositionalEncoding
 from espnet.nets.pytorch_backend.transformer.embedding import ScaledPositionalEncoding
@@ -570,6 +569,7 @@ class Transformer(AbsTTS):
         minlenratio: float = 0.0,
         maxlenratio: float = 10.0,
         use_teacher_forcing: bool = False,
+        return_att_ws: bool = True,
     ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         """Generate the sequence of features given the sequences of characters.
 
@@ -581,11 +581,13 @@ class Transformer(AbsTTS):
             minlenratio (float, optional): Minimum length ratio in inference.
             maxlenratio (float, optional): Maximum length ratio in inference.
             use_teacher_forcing (bool, optional): Whether to use teacher forcing.
+            return_att_ws (bool, optional): Whether to return the attention weights.
 
         Returns:
             Tensor: Output sequence of features (L, odim).
             Tensor: Output sequence of stop probabilities (L,).
             Tensor: Encoder-decoder (source) attention weights (#layers, #heads, L, T).
+                None if return_att_ws is False.
 
         """
         x = text
@@ -605,6 +607,8 @@ class Transformer(AbsTTS):
             ilens = x.new_tensor([xs.size(1)]).long()
             olens = y.new_tensor([ys.size(1)]).long()
             outs, *_ = self._forward(xs, ilens, ys, olens, spembs)
+            if not return_att_ws:
+                return outs[0], None, None
 
             # get attention weights
             att_ws = []
@@ -633,61 +637,58 @@ class Transformer(AbsTTS):
         minlen = int(hs.size(1) * minlenratio / self.reduction_factor)
 
         # initialize
-        idx = 0
-        ys = hs.new_zeros(1, 1, self.odim)
-        outs, probs = [], []
+        # NOTE: The buffers are allocated for the longest output in advance
+        #   instead of growing them at every step
+        bufsize = max(maxlen, minlen, 1)
+        outs = hs.new_zeros(bufsize, self.reduction_factor, self.odim)
+        probs = hs.new_zeros(bufsize, self.reduction_factor)
+        if return_att_ws:
+            att_ws = hs.new_zeros(
+                len(self.decoder.decoders),
+                self.decoder.decoders[0].src_attn.h,
+                bufsize,
+                hs.size(1),
+            )
+        else:
+            att_ws = None
+        # The keys and values of the previous steps are cached in the decoder layers
+        kv_cache = self.decoder.init_kv_cache(hs, bufsize)
+        y = hs.new_zeros(1, 1, self.odim)
 
         # forward decoder step-by-step
-        z_cache = self.decoder.init_state(x)
+        idx = 0
         while True:
-            # update index
-            idx += 1
-
             # calculate output and stop prob at idx-th step
-            y_masks = subsequent_mask(idx).unsqueeze(0).to(x.device)
-            z, z_cache = self.decoder.forward_one_step(
-                ys, y_masks, hs, cache=z_cache
-            )  # (B, adim)
-            outs += [
-                self.feat_out(z).view(self.reduction_factor, self.odim)
-            ]  # [(r, odim), ...]
-            probs += [torch.sigmoid(self.prob_out(z))[0]]  # [(r), ...]
+            z = self.decoder.forward_one_step_kv_cached(y, idx, kv_cache)  # (1, adim)
+            outs[idx] = self.feat_out(z).view(self.reduction_factor, self.odim)
+            probs[idx] = torch.sigmoid(self.prob_out(z))[0]
+            if att_ws is not None:
+                for i, layer in enumerate(self.decoder.decoders):
+                    att_ws[i, :, idx] = layer.src_attn.attn[0, :, -1]
 
             # update next inputs
-            ys = torch.cat(
-                (ys, outs[-1][-1].view(1, 1, self.odim)), dim=1
-            )  # (1, idx + 1, odim)
+            y = outs[idx, -1].view(1, 1, self.odim)
 
-            # get attention weights
-            att_ws_ = []
-            for name, m in self.named_modules():
-                if isinstance(m, MultiHeadedAttention) and "src" in name:
-                    att_ws_ += [m.attn[0, :, -1].unsqueeze(1)]  # [(#heads, 1, T),...]
-            if idx == 1:
-                att_ws = att_ws_
-            else:
-                # [(#heads, l, T), ...]
-                att_ws = [
-                    torch.cat([att_w, att_w_], dim=1)
-                    for att_w, att_w_ in zip(att_ws, att_ws_)
-                ]
+            # update index
+            idx += 1
 
             # check whether to finish generation
-            if int(sum(probs[-1] >= threshold)) > 0 or idx >= maxlen:
+            if int(sum(probs[idx - 1] >= threshold)) > 0 or idx >= maxlen:
                 # check mininum length
                 if idx < minlen:
                     continue
                 outs = (
-                    torch.cat(outs, dim=0).unsqueeze(0).transpose(1, 2)
+                    outs[:idx].view(1, -1, self.odim).transpose(1, 2)
                 )  # (L, odim) -> (1, L, odim) -> (1, odim, L)
                 if self.postnet is not None:
                     outs = outs + self.postnet(outs)  # (1, odim, L)
                 outs = outs.transpose(2, 1).squeeze(0)  # (L, odim)
-                probs = torch.cat(probs, dim=0)
+                probs = probs[:idx].view(-1)
                 break
 
-        # concatenate attention weights -> (#layers, #heads, L, T)
-        att_ws = torch.stack(att_ws, dim=0)
+        if att_ws is not None:
+            # (#layers, #heads, L, T)
+            att_ws = att_ws[:, :, :idx]
 
         return outs, probs, att_ws
 
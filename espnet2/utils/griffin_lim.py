@@ -5,18 +5,61 @@
 # Copyright 2019 Tomoki Hayashi
 #  Apache 2.0  (http://www.apache.org/licenses/LICENSE-2.0)
 
+import itertools
 import logging
+import math
 
 from distutils.version import LooseVersion
+from functools import lru_cache
 from functools import partial
 from typeguard import check_argument_types
+from typing import Iterable
+from typing import Iterator
+from typing import List
 from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
 
-import librosa
 import numpy as np
+import torch
+
+from espnet.nets.pytorch_backend.nets_utils import make_pad_mask
+from espnet.nets.pytorch_backend.nets_utils import pad_list
 
 EPS = 1e-10
 
+is_torch_1_7_plus = LooseVersion(torch.__version__) >= LooseVersion("1.7")
+
+
+@lru_cache(maxsize=8)
+def inv_mel_basis(
+    fs: int, n_fft: int, n_mels: int, fmin: float, fmax: float
+) -> np.ndarray:
+    """Calculate the pseudo-inverse of Mel basis.
+
+    The result is cached because it takes much longer than the conversion itself.
+
+    Args:
+        fs: Sampling frequency.
+        n_fft: The number of FFT points.
+        n_mels: The number of mel basis.
+        fmin: Minimum frequency to analyze.
+        fmax: Maximum frequency to analyze.
+
+    Returns:
+        Pseudo-inverse of Mel basis (n_fft // 2 + 1, n_mels).
+
+    """
+    # NOTE: librosa is imported in the functions because it takes long time to import
+    import librosa
+
+    mel_basis = librosa.filters.mel(fs, n_fft, n_mels, fmin, fmax)
+    inv = np.linalg.pinv(mel_basis)
+    # Don't let the cached array be modified
+    inv.flags.writeable = False
+    return inv
+
 
 def logmel2linear(
     lmspc: np.ndarray,
@@ -44,9 +87,8 @@ def logmel2linear(
     fmin = 0 if fmin is None else fmin
     fmax = fs / 2 if fmax is None else fmax
     mspc = np.power(10.0, lmspc)
-    mel_basis = librosa.filters.mel(fs, n_fft, n_mels, fmin, fmax)
-    inv_mel_basis = np.linalg.pinv(mel_basis)
-    return np.maximum(EPS, np.dot(inv_mel_basis, mspc.T).T)
+    inv = inv_mel_basis(fs, n_fft, n_mels, fmin, fmax)
+    return np.maximum(EPS, np.dot(inv, mspc.T).T)
 
 
 def griffin_lim(
@@ -71,6 +113,8 @@ def griffin_lim(
         Reconstructed waveform (N,).
 
     """
+    import librosa
+
     # assert the size of input linear spectrogram
     assert spc.shape[1] == n_fft // 2 + 1
 
@@ -105,9 +149,263 @@ def griffin_lim(
     return y
 
 
-# TODO(kan-bayashi): write as torch.nn.Module
+class GriffinLim(torch.nn.Module):
+    """Fast Griffin-Lim algorithm for a batch of spectrograms in torch.
+
+    This is the same algorithm as librosa.griffinlim, i.e. the fast Griffin-Lim
+    with the momentum, but a mini-batch of the spectrograms is converted
+    at once on any device. The pseudo-inverse of Mel basis and
+    the window are created once and kept as the buffers.
+
+    Examples:
+        >>> griffin_lim = GriffinLim(n_fft=1024, n_shift=256, fs=22050, n_mels=80)
+        >>> wavs, wav_lengths = griffin_lim(lmspcs, lmspc_lengths)
+        >>> for wav in griffin_lim.stream(lmspc.split(20)):
+        ...     play(wav)
+
+    """
+
+    def __init__(
+        self,
+        n_fft: int,
+        n_shift: int,
+        fs: int = None,
+        n_mels: int = None,
+        win_length: int = None,
+        window: str = "hann",
+        fmin: int = None,
+        fmax: int = None,
+        n_iter: int = 32,
+        momentum: float = 0.99,
+    ):
+        """Initialize module.
+
+        Args:
+            n_fft: The number of FFT points.
+            n_shift: Shift size in points.
+            fs: Sampling frequency.
+            n_mels: The number of mel basis.
+                If None, the input is regarded as linear spectrogram.
+            win_length: Window length in points.
+            window: Window function type.
+            fmin: Minimum frequency to analyze.
+            fmax: Maximum frequency to analyze.
+            n_iter: The number of iterations.
+            momentum: The momentum of fast Griffin-Lim. 0 gives original Griffin-Lim.
+
+        """
+        assert check_argument_types()
+        super().__init__()
+        if not is_torch_1_7_plus:
+            raise RuntimeError("GriffinLim requires torch>=1.7")
+        if not hasattr(torch, f"{window}_window"):
+            raise ValueError(f"{window} window is not implemented")
+        self.n_fft = n_fft
+        self.n_shift = n_shift
+        self.win_length = n_fft if win_length is None else win_length
+        self.n_iter = n_iter
+        self.momentum = momentum
+        self.register_buffer(
+            "window", getattr(torch, f"{window}_window")(self.win_length)
+        )
+        if n_mels is not None:
+            fmin = 0 if fmin is None else fmin
+            fmax = fs / 2 if fmax is None else fmax
+            self.register_buffer(
+                "inv_mel_basis",
+                torch.tensor(inv_mel_basis(fs, n_fft, n_mels, fmin, fmax)),
+            )
+        else:
+            self.inv_mel_basis = None
+
+    def extra_repr(self):
+        return (
+            f"n_fft={self.n_fft}, "
+            f"n_shift={self.n_shift}, "
+            f"win_length={self.win_length}, "
+            f"n_iter={self.n_iter}, "
+            f"momentum={self.momentum}"
+        )
+
+    def forward(
+        self, spcs: torch.Tensor, spcs_lengths: torch.Tensor = None
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Convert a batch of spectrograms to waveforms.
+
+        Args:
+            spcs: Batch of log Mel filterbanks (B, T, n_mels)
+                or linear spectrograms (B, T, n_fft // 2 + 1).
+            spcs_lengths: Batch of the numbers of frames (B,).
+
+        Returns:
+            Tensor: Batch of reconstructed waveforms (B, N).
+            Tensor: Batch of the lengths of the waveforms (B,),
+                i.e. (spcs_lengths - 1) * n_shift.
+
+        """
+        mags = self.spc2mag(spcs)
+        if spcs_lengths is not None:
+            # The padded frames are regarded as silence
+            mags = mags.masked_fill(make_pad_mask(spcs_lengths, mags), 0.0)
+        else:
+            spcs_lengths = spcs.new_full(
+                (spcs.size(0),), spcs.size(1), dtype=torch.long
+            )
+        wavs, _ = self.griffin_lim(mags)
+        wav_lengths = (spcs_lengths - 1).clamp(min=0) * self.n_shift
+        return wavs, wav_lengths
+
+    def spc2mag(self, spcs: torch.Tensor) -> torch.Tensor:
+        """Convert the spectrograms to the magnitude of STFT.
+
+        Args:
+            spcs: Log Mel filterbanks (..., T, n_mels)
+                or linear spectrograms (..., T, n_fft // 2 + 1).
+
+        Returns:
+            Tensor: Magnitude (..., n_fft // 2 + 1, T).
+
+        """
+        if self.inv_mel_basis is None:
+            assert spcs.size(-1) == self.n_fft // 2 + 1, spcs.shape
+            return spcs.transpose(-1, -2).abs()
+        assert spcs.size(-1) == self.inv_mel_basis.size(1), spcs.shape
+        mspcs = torch.pow(10.0, spcs).transpose(-1, -2)
+        return torch.matmul(self.inv_mel_basis.to(spcs.dtype), mspcs).clamp(min=EPS)
+
+    def griffin_lim(
+        self,
+        mags: torch.Tensor,
+        angles: torch.Tensor = None,
+        n_fixed: int = 0,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Estimate the phase and reconstruct the waveforms.
+
+        Args:
+            mags: Magnitude of STFT (B, n_fft // 2 + 1, T).
+            angles: Initial phase as complex numbers with the absolute value of 1
+                (B, n_fft // 2 + 1, T') where T' <= T.
+                The phase of the remaining frames is initialized randomly.
+            n_fixed: The number of the first frames whose phase is kept
+                as the given angles during the iterations.
+
+        Returns:
+            Tensor: Reconstructed waveforms (B, (T - 1) * n_shift).
+            Tensor: Estimated phase (B, n_fft // 2 + 1, T).
+
+        """
+        window = self.window.to(mags.dtype)
+        stft_kwargs = dict(
+            n_fft=self.n_fft,
+            hop_length=self.n_shift,
+            win_length=self.win_length,
+            window=window,
+            center=True,
+        )
+        random_angles = torch.exp(
+            2j * math.pi * torch.rand(mags.size(), device=mags.device)
+        )
+        if angles is None:
+            angles = random_angles
+        else:
+            angles = torch.cat([angles, random_angles[..., angles.size(-1) :]], dim=-1)
+        fixed_angles = angles[..., :n_fixed]
+
+        length = (mags.size(-1) - 1) * self.n_shift
+        if length <= 0:
+            # No sample is given at the center of the only frame
+            return mags.new_zeros(mags.size(0), 0), angles
+        # NOTE: The reflection padding requires the longer signal than the padding
+        pad_mode = "reflect" if length > self.n_fft // 2 else "constant"
+        rebuilt = 0.0
+        for _ in range(self.n_iter):
+            tprev = rebuilt
+            wavs = torch.istft(mags * angles, length=length, **stft_kwargs)
+            rebuilt = torch.stft(
+                wavs, pad_mode=pad_mode, return_complex=True, **stft_kwargs
+            )
+            angles = rebuilt - (self.momentum / (1 + self.momentum)) * tprev
+            angles = angles / (angles.abs() + 1e-16)
+            angles[..., :n_fixed] = fixed_angles
+        wavs = torch.istft(mags * angles, length=length, **stft_kwargs)
+        return wavs, angles
+
+    def stream(
+        self, spcs: Iterable[torch.Tensor], n_context: int = None
+    ) -> Iterator[torch.Tensor]:
+        """Convert the chunks of a spectrogram to waveform as they arrive.
+
+        Each time a chunk arrives, the phase of the chunk is estimated
+        together with the last frames of the previous chunks as the context,
+        and the samples which are no longer affected by the following frames
+        are yielded. The phase of the context frames used for the yielded samples
+        is kept, so that the waveform is continuous between the chunks.
+        The concatenation of the outputs has (T - 1) * n_shift samples
+        as forward().
+
+        Args:
+            spcs: The chunks of a log Mel filterbank (T_chunk, n_mels)
+                or a linear spectrogram (T_chunk, n_fft // 2 + 1).
+            n_context: The number of frames of the context. Defaults to
+                twice the number of the frames overlapping with a window.
+
+        Returns:
+            Iterator[Tensor]: The waveform of the chunks (N_chunk,).
+
+        """
+        # The number of frames on each side overlapping with the window of a frame
+        n_overlap = math.ceil(self.n_fft / 2 / self.n_shift)
+        if n_context is None:
+            n_context = 4 * n_overlap
+        n_context = max(2 * n_overlap + 1, n_context)
+
+        mags, angles, wavs = None, None, None
+        # The index of the first frame of "mags" and the number of emitted samples
+        offset, n_emitted = 0, 0
+        for spc in spcs:
+            mag = self.spc2mag(spc.unsqueeze(0))
+            if mags is None:
+                mags = mag
+            else:
+                # Drop the old frames except for the context, but keep the frames
+                # overlapping with the samples not emitted yet
+                n_drop = min(
+                    mags.size(-1) - n_context,
+                    n_emitted // self.n_shift - n_overlap - offset,
+                )
+                n_drop = max(n_drop, 0)
+                mags = torch.cat([mags[..., n_drop:], mag], dim=-1)
+                angles = angles[..., n_drop:]
+                offset += n_drop
+            # The phase of the frames whose windows include the emitted samples
+            # is fixed. They are included in the previous chunks.
+            if n_emitted > 0:
+                n_fixed = n_emitted // self.n_shift + n_overlap - offset
+            else:
+                n_fixed = 0
+            wavs, angles = self.griffin_lim(mags, angles, n_fixed)
+
+            # The samples before the window of the last frame are determined
+            end = (offset + mags.size(-1) - 1 - n_overlap) * self.n_shift
+            if end > n_emitted:
+                yield wavs[
+                    0, n_emitted - offset * self.n_shift : end - offset * self.n_shift
+                ]
+                n_emitted = end
+
+        if wavs is not None and wavs.size(1) > n_emitted - offset * self.n_shift:
+            yield wavs[0, n_emitted - offset * self.n_shift :]
+
+
 class Spectrogram2Waveform(object):
-    """Spectrogram to waveform conversion module."""
+    """Spectrogram to waveform conversion module.
+
+    The spectrogram is converted by the torch implementation, i.e. GriffinLim,
+    if backend is "torch", otherwise by librosa.griffinlim.
+    The input can be either np.ndarray or torch.Tensor and
+    the output is given as the same type as the input.
+
+    """
 
     def __init__(
         self,
@@ -120,6 +418,8 @@ class Spectrogram2Waveform(object):
         fmin: int = None,
         fmax: int = None,
         griffin_lim_iters: Optional[int] = 32,
+        griffin_lim_momentum: float = 0.99,
+        backend: str = "torch",
     ):
         """Initialize module.
 
@@ -133,10 +433,32 @@ class Spectrogram2Waveform(object):
             f_min: Minimum frequency to analyze.
             f_max: Maximum frequency to analyze.
             griffin_lim_iters: The number of iterations.
+            griffin_lim_momentum: The momentum of fast Griffin-Lim.
+                This is used only for the torch backend.
+            backend: "torch" or "librosa".
 
         """
         assert check_argument_types()
+        if backend not in ("torch", "librosa"):
+            raise ValueError(f"backend must be torch or librosa: {backend}")
+        if backend == "torch" and not is_torch_1_7_plus:
+            logging.warning("torch>=1.7 is required for torch backend. Use librosa.")
+            backend = "librosa"
         self.fs = fs
+        self.backend = backend
+        if backend == "torch":
+            self.griffin_lim_module = GriffinLim(
+                n_fft=n_fft,
+                n_shift=n_shift,
+                fs=fs,
+                n_mels=n_mels,
+                win_length=win_length,
+                window=window,
+                fmin=fmin,
+                fmax=fmax,
+                n_iter=griffin_lim_iters,
+                momentum=griffin_lim_momentum,
+            )
         self.logmel2linear = (
             partial(
                 logmel2linear, fs=fs, n_fft=n_fft, n_mels=n_mels, fmin=fmin, fmax=fmax
@@ -161,6 +483,9 @@ class Spectrogram2Waveform(object):
         )
         if n_mels is not None:
             self.params.update(fs=fs, n_mels=n_mels, fmin=fmin, fmax=fmax)
+        if backend == "torch":
+            self.params.update(momentum=griffin_lim_momentum)
+        self.params.update(backend=backend)
 
     def __repr__(self):
         retval = f"{self.__class__.__name__}("
@@ -169,7 +494,9 @@ class Spectrogram2Waveform(object):
         retval += ")"
         return retval
 
-    def __call__(self, spc):
+    def __call__(
+        self, spc: Union[np.ndarray, torch.Tensor]
+    ) -> Union[np.ndarray, torch.Tensor]:
         """Convert spectrogram to waveform.
 
         Args:
@@ -180,6 +507,105 @@ class Spectrogram2Waveform(object):
             Reconstructed waveform (N,).
 
         """
+        return self.batch([spc])[0]
+
+    def batch(
+        self, spcs: Sequence[Union[np.ndarray, torch.Tensor]]
+    ) -> List[Union[np.ndarray, torch.Tensor]]:
+        """Convert spectrograms to waveforms.
+
+        The spectrograms are converted as a padded mini-batch on GPU.
+
+        Args:
+            spcs: Log Mel filterbanks (T_i, n_mels)
+                or linear spectrograms (T_i, n_fft // 2 + 1).
+
+        Returns:
+            Reconstructed waveforms (N_i,).
+
+        """
+        if self.backend == "librosa":
+            return [self._librosa_griffin_lim(spc) for spc in spcs]
+
+        tensors = [torch.as_tensor(spc) for spc in spcs]
+        device = tensors[0].device
+        module = self.griffin_lim_module.to(device)
+        if device.type == "cpu":
+            # NOTE: The batched FFTs are not faster than the sequential ones on CPU,
+            #   while the padded frames take extra time
+            with torch.no_grad():
+                outputs = [module(t.unsqueeze(0)) for t in tensors]
+            wavs = [wav[0] for wav, _ in outputs]
+            wav_lengths = torch.cat([length for _, length in outputs])
+        else:
+            with torch.no_grad():
+                wavs, wav_lengths = module(
+                    pad_list(tensors, 0.0),
+                    torch.tensor([len(t) for t in tensors], device=device),
+                )
+        return [
+            self._as_input_type(wav[:length], spc)
+            for wav, length, spc in zip(wavs, wav_lengths.tolist(), spcs)
+        ]
+
+    def stream(
+        self, spcs: Iterable[Union[np.ndarray, torch.Tensor]], n_context: int = None
+    ) -> Iterator[Union[np.ndarray, torch.Tensor]]:
+        """Convert the chunks of a spectrogram to waveform as they arrive.
+
+        See GriffinLim.stream() for the details. The librosa backend
+        yields the whole waveform after all the chunks arrive.
+
+        Examples:
+            >>> for wav in spc2wav.stream(chunk for chunk in generate_frames()):
+            ...     play(wav)
+
+        Args:
+            spcs: The chunks of a log Mel filterbank (T_chunk, n_mels)
+                or a linear spectrogram (T_chunk, n_fft // 2 + 1).
+            n_context: The number of frames of the context.
+
+        Returns:
+            Iterator: The waveform of the chunks (N_chunk,).
+
+        """
+        if self.backend == "librosa":
+            spcs = list(spcs)
+            if len(spcs) > 0:
+                if isinstance(spcs[0], torch.Tensor):
+                    spc = torch.cat(spcs)
+                else:
+                    spc = np.concatenate(spcs)
+                yield self._librosa_griffin_lim(spc)
+            return
+
+        spcs = iter(spcs)
+        first = next(spcs, None)
+        if first is None:
+            return
+        device = first.device if isinstance(first, torch.Tensor) else "cpu"
+        module = self.griffin_lim_module.to(device)
+        # NOTE: detach() instead of torch.no_grad() not to change the grad mode
+        #   of the caller while the generator is suspended
+        tensors = (
+            torch.as_tensor(spc, device=device).detach()
+            for spc in itertools.chain([first], spcs)
+        )
+        for wav in module.stream(tensors, n_context):
+            yield self._as_input_type(wav, first)
+
+    def _librosa_griffin_lim(
+        self, spc: Union[np.ndarray, torch.Tensor]
+    ) -> Union[np.ndarray, torch.Tensor]:
+        spc_np = spc.cpu().numpy() if isinstance(spc, torch.Tensor) else spc
         if self.logmel2linear is not None:
-            spc = self.logmel2linear(spc)
-        return self.griffin_lim(spc)
+            spc_np = self.logmel2linear(spc_np)
+        return self._as_input_type(torch.as_tensor(self.griffin_lim(spc_np)), spc)
+
+    @staticmethod
+    def _as_input_type(
+        wav: torch.Tensor, spc: Union[np.ndarray, torch.Tensor]
+    ) -> Union[np.ndarray, torch.Tensor]:
+        if isinstance(spc, torch.Tensor):
+            return wav.to(spc.device)
+        return wav.cpu().numpy()
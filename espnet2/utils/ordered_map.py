@@ -0,0 +1,39 @@
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+
+
+def ordered_map(
+    executor: Executor, fn: Callable, iterable: Iterable, max_pending: int
+) -> Iterator[Any]:
+    """Apply fn to the items by the executor and yield the results in order.
+
+    Unlike Executor.map(), which submits all the items at first,
+    the items are submitted lazily and at most "max_pending" results
+    are kept in memory by waiting for the oldest one.
+
+    Examples:
+        >>> with ProcessPoolExecutor(nj) as e:
+        ...     for result in ordered_map(e, func, chunks, 2 * nj):
+        ...         write(result)
+
+    Args:
+        executor: The executor, e.g. ProcessPoolExecutor
+        fn: The function applied to each item.
+            It must be picklable for ProcessPoolExecutor.
+        iterable: The items given to fn
+        max_pending: The maximum number of the submitted items
+            whose results are not yielded yet
+    """
+    if max_pending <= 0:
+        raise ValueError(f"max_pending must be positive: {max_pending}")
+    futures = deque()
+    for item in iterable:
+        futures.append(executor.submit(fn, item))
+        if len(futures) >= max_pending:
+            yield futures.popleft().result()
+    while len(futures) != 0:
+        yield futures.popleft().result()
@@ -182,3 +182,38 @@ def test_TransformerDecoder_batch_beam_search(
             maxlenratio=0.0,
             minlenratio=0.0,
         )
+
+
+@pytest.mark.parametrize(
+    "decoder_class",
+    [
+        TransformerDecoder,
+        LightweightConvolutionTransformerDecoder,
+        LightweightConvolution2DTransformerDecoder,
+        DynamicConvolutionTransformerDecoder,
+        DynamicConvolution2DTransformerDecoder,
+    ],
+)
+def test_TransformerDecoder_checkpoint_layers(decoder_class):
+    torch.manual_seed(0)
+    decoder = decoder_class(10, 12, linear_units=10)
+    decoder_ckpt = decoder_class(10, 12, linear_units=10, checkpoint_layers=[1, -1])
+    decoder_ckpt.load_state_dict(decoder.state_dict())
+    x = torch.randn(2, 9, 12, requires_grad=True)
+    x_lens = torch.tensor([9, 7], dtype=torch.long)
+    t = torch.randint(0, 10, [2, 4], dtype=torch.long)
+    t_lens = torch.tensor([4, 3], dtype=torch.long)
+
+    torch.manual_seed(1)
+    z_all, _ = decoder(x, x_lens, t, t_lens)
+    z_all.sum().backward()
+    x_grad = x.grad.clone()
+    x.grad = None
+    torch.manual_seed(1)
+    z_all_ckpt, _ = decoder_ckpt(x, x_lens, t, t_lens)
+    z_all_ckpt.sum().backward()
+
+    torch.testing.assert_allclose(z_all, z_all_ckpt)
+    torch.testing.assert_allclose(x_grad, x.grad)
+    for p, p_ckpt in zip(decoder.parameters(), decoder_ckpt.parameters()):
+        torch.testing.assert_allclose(p.grad, p_ckpt.grad)
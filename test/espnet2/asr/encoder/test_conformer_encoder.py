@@ -47,3 +47,36 @@ def test_encoder_output_size():
 def test_encoder_invalid_type():
     with pytest.raises(ValueError):
         ConformerEncoder(20, input_layer="fff")
+
+
+@pytest.mark.parametrize(
+    "pos_enc_layer_type, selfattention_layer_type",
+    [("abs_pos", "selfattn"), ("rel_pos", "rel_selfattn")],
+)
+def test_encoder_checkpoint_layers(pos_enc_layer_type, selfattention_layer_type):
+    kwargs = dict(
+        output_size=4,
+        attention_heads=2,
+        linear_units=4,
+        num_blocks=2,
+        pos_enc_layer_type=pos_enc_layer_type,
+        selfattention_layer_type=selfattention_layer_type,
+        cnn_module_kernel=3,
+    )
+    torch.manual_seed(0)
+    encoder = ConformerEncoder(20, **kwargs)
+    encoder_ckpt = ConformerEncoder(20, checkpoint_layers=[0, 1], **kwargs)
+    encoder_ckpt.load_state_dict(encoder.state_dict())
+    x = torch.randn(2, 32, 20)
+    x_lens = torch.LongTensor([32, 28])
+
+    torch.manual_seed(1)
+    y, _, _ = encoder(x, x_lens)
+    y.sum().backward()
+    torch.manual_seed(1)
+    y_ckpt, _, _ = encoder_ckpt(x, x_lens)
+    y_ckpt.sum().backward()
+
+    torch.testing.assert_allclose(y, y_ckpt)
+    for p, p_ckpt in zip(encoder.parameters(), encoder_ckpt.parameters()):
+        torch.testing.assert_allclose(p.grad, p_ckpt.grad)
@@ -32,3 +32,30 @@ def test_Encoder_output_size():
 def test_Encoder_invalid_type():
     with pytest.raises(ValueError):
         TransformerEncoder(20, input_layer="fff")
+
+
+def test_Encoder_checkpoint_layers():
+    torch.manual_seed(0)
+    encoder = TransformerEncoder(20, output_size=40, linear_units=8, num_blocks=3)
+    encoder_ckpt = TransformerEncoder(
+        20, output_size=40, linear_units=8, num_blocks=3, checkpoint_layers=[0, 2]
+    )
+    encoder_ckpt.load_state_dict(encoder.state_dict())
+    x = torch.randn(2, 10, 20)
+    x_lens = torch.LongTensor([10, 8])
+
+    torch.manual_seed(1)
+    y, _, _ = encoder(x, x_lens)
+    y.sum().backward()
+    torch.manual_seed(1)
+    y_ckpt, _, _ = encoder_ckpt(x, x_lens)
+    y_ckpt.sum().backward()
+
+    torch.testing.assert_allclose(y, y_ckpt)
+    for p, p_ckpt in zip(encoder.parameters(), encoder_ckpt.parameters()):
+        torch.testing.assert_allclose(p.grad, p_ckpt.grad)
+
+
+def test_Encoder_invalid_checkpoint_layers():
+    with pytest.raises(ValueError):
+        TransformerEncoder(20, num_blocks=2, checkpoint_layers=[2])
@@ -0,0 +1,112 @@
+import pickle
+
+import pytest
+import torch
+
+from espnet2.asr.frontend.default import DefaultFrontend
+from espnet2.asr.frontend.feats_cache import FeatsCache
+
+
+class CountingFrontend(DefaultFrontend):
+    def __init__(self):
+        super().__init__(n_fft=32, hop_length=8, n_mels=10)
+        self.num_inputs = 0
+
+    def forward(self, input, input_lengths):
+        self.num_inputs += len(input)
+        return super().forward(input, input_lengths)
+
+
+def _get_data():
+    torch.manual_seed(0)
+    speech = torch.randn(3, 200)
+    speech_lengths = torch.tensor([200, 150, 100])
+    return speech, speech_lengths
+
+
+def test_FeatsCache(tmp_path):
+    frontend = CountingFrontend()
+    speech, speech_lengths = _get_data()
+    feats, feats_lengths = frontend(speech, speech_lengths)
+
+    cache = FeatsCache(tmp_path, "foo")
+    for utt_id, num_inputs in [(["a", "b", "c"], 3), (["a", "b", "c"], 3)]:
+        frontend.num_inputs = 0
+        cached, cached_lengths = cache(frontend, speech, speech_lengths, utt_id)
+        torch.testing.assert_allclose(cached, feats)
+        torch.testing.assert_allclose(cached_lengths, feats_lengths)
+    # The frontend is not applied at the second time
+    assert frontend.num_inputs == 0
+
+
+def test_FeatsCache_partially_cached(tmp_path):
+    frontend = CountingFrontend()
+    speech, _ = _get_data()
+    # NOTE: Use the same lengths because the last frames of the padded
+    # utterance can be changed by the padding of the other utterances
+    speech_lengths = torch.tensor([200, 200, 200])
+    feats, feats_lengths = frontend(speech, speech_lengths)
+
+    cache = FeatsCache(tmp_path, "foo")
+    cache(frontend, speech[1:2], speech_lengths[1:2], ["b"])
+    frontend.num_inputs = 0
+    cached, cached_lengths = cache(frontend, speech, speech_lengths, ["a", "b", "c"])
+    assert frontend.num_inputs == 2
+    torch.testing.assert_allclose(cached, feats)
+    torch.testing.assert_allclose(cached_lengths, feats_lengths)
+
+
+def test_FeatsCache_reopen(tmp_path):
+    frontend = CountingFrontend()
+    speech, speech_lengths = _get_data()
+    feats, _ = frontend(speech, speech_lengths)
+    FeatsCache(tmp_path, "foo")(frontend, speech, speech_lengths, ["a", "b", "c"])
+
+    # Append a broken line, e.g. interrupted while writing
+    with (tmp_path / "foo" / "index.0.txt").open("a") as f:
+        f.write("d 100")
+
+    # The cache on disk is reused by a new instance, e.g. at resuming
+    cache = pickle.loads(pickle.dumps(FeatsCache(tmp_path, "foo")))
+    frontend.num_inputs = 0
+    cached, _ = cache(frontend, speech, speech_lengths, ["a", "b", "c"])
+    assert frontend.num_inputs == 0
+    torch.testing.assert_allclose(cached, feats)
+    assert cache.get("d") is None
+
+    # The cache is not used if the fingerprint is changed
+    cache = FeatsCache(tmp_path, "bar")
+    cache(frontend, speech, speech_lengths, ["a", "b", "c"])
+    assert frontend.num_inputs == 3
+
+
+def test_FeatsCache_mismatch_utt_id(tmp_path):
+    speech, speech_lengths = _get_data()
+    with pytest.raises(AssertionError):
+        FeatsCache(tmp_path, "foo")(CountingFrontend(), speech, speech_lengths, ["a"])
+
+
+def test_FeatsCache_read_other_ranks(tmp_path, monkeypatch):
+    frontend = CountingFrontend()
+    speech, _ = _get_data()
+    speech_lengths = torch.tensor([200, 200, 200])
+    feats, _ = frontend(speech, speech_lengths)
+
+    monkeypatch.setattr(torch.distributed, "is_initialized", lambda: True)
+    monkeypatch.setattr(torch.distributed, "get_rank", lambda: 0)
+    cache0 = FeatsCache(tmp_path, "foo")
+    cache0(frontend, speech[:1], speech_lengths[:1], ["a"])
+
+    # The rank 1 writes its own files after the rank 0 opened the cache
+    monkeypatch.setattr(torch.distributed, "get_rank", lambda: 1)
+    cache1 = FeatsCache(tmp_path, "foo")
+    cache1(frontend, speech, speech_lengths, ["a", "b", "c"])
+    assert (tmp_path / "foo" / "index.1.txt").exists()
+
+    # The features written by the rank 1 are read by the rank 0
+    frontend.num_inputs = 0
+    cached, _ = cache0(frontend, speech, speech_lengths, ["a", "b", "c"])
+    assert frontend.num_inputs == 0
+    torch.testing.assert_allclose(cached, feats)
+    assert cache0.index["a"][0] == 0
+    assert cache0.index["b"][0] == 1
@@ -0,0 +1,45 @@
+from argparse import ArgumentParser
+
+import numpy as np
+import pytest
+
+from espnet2.bin.build_token_cache import get_parser
+from espnet2.bin.build_token_cache import main
+from espnet2.text.token_cache import TokenCache
+from espnet2.train.preprocessor import CommonPreprocessor
+
+
+def test_get_parser():
+    assert isinstance(get_parser(), ArgumentParser)
+
+
+def test_main():
+    with pytest.raises(SystemExit):
+        main()
+
+
+def test_build_token_cache(tmp_path):
+    with (tmp_path / "text").open("w") as f:
+        f.write("utt1 abc\nutt2 bcd\nutt3\n")
+    with (tmp_path / "tokens.txt").open("w") as f:
+        f.write("<blank>\n<unk>\na\nb\nc\n")
+    main(
+        [
+            "--input",
+            str(tmp_path / "text"),
+            "--token_cache_path",
+            str(tmp_path / "cache.db"),
+            "--token_list",
+            str(tmp_path / "tokens.txt"),
+        ]
+    )
+
+    # The cache is shared by the preprocessor with the same configuration
+    preprocessor = CommonPreprocessor(
+        train=True,
+        token_type="char",
+        token_list=str(tmp_path / "tokens.txt"),
+        token_cache_path=tmp_path / "cache.db",
+    )
+    assert isinstance(preprocessor.token_cache, TokenCache)
+    np.testing.assert_array_equal(preprocessor.token_cache.get("bcd"), [3, 4, 1])
@@ -0,0 +1,43 @@
+from argparse import ArgumentParser
+import gzip
+
+import numpy as np
+import pytest
+
+from espnet2.bin.build_token_corpus import get_parser
+from espnet2.bin.build_token_corpus import main
+from espnet2.fileio.token_corpus import TokenCorpus
+
+
+def test_get_parser():
+    assert isinstance(get_parser(), ArgumentParser)
+
+
+def test_main():
+    with pytest.raises(SystemExit):
+        main()
+
+
+def test_build_token_corpus(tmp_path):
+    with gzip.open(tmp_path / "text.gz", "wt") as f:
+        f.write("utt1 abc\nutt2 bcd\nutt3\n")
+    with (tmp_path / "tokens.txt").open("w") as f:
+        f.write("<blank>\n<unk>\na\nb\nc\n<sos/eos>\n")
+    main(
+        [
+            "--input",
+            str(tmp_path / "text.gz"),
+            "--output",
+            str(tmp_path / "corpus"),
+            "--token_type",
+            "char",
+            "--token_list",
+            str(tmp_path / "tokens.txt"),
+            "--batch_size",
+            "2",
+        ]
+    )
+    corpus = TokenCorpus(tmp_path / "corpus")
+    assert len(corpus) == 3
+    np.testing.assert_array_equal(corpus[1], [3, 4, 1])
+    np.testing.assert_array_equal(corpus[2], [])
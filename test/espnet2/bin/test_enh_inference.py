@@ -2,7 +2,9 @@ from argparse import ArgumentParser
 from distutils.version import LooseVersion
 from pathlib import Path
 
+import numpy as np
 import pytest
+import soundfile
 import torch
 
 from espnet2.bin.enh_inference import get_parser
@@ -50,3 +52,164 @@ def test_SeparateSpeech(config_file, batch_size, input_size, segment_size, hop_s
     )
     wav = torch.rand(batch_size, input_size)
     separate_speech(wav, fs=8000)
+
+
+def _legacy_segment_wise(separate_speech, speech_mix, fs):
+    # The former implementation stitching the segments one by one
+    lengths = speech_mix.size(1)
+    segment_size, hop_size = separate_speech.segment_size, separate_speech.hop_size
+    overlap_length = int(np.round(fs * (segment_size - hop_size)))
+    num_segments = int(np.ceil((lengths - overlap_length) / (hop_size * fs)))
+    t = T = int(segment_size * fs)
+    enh_waves = []
+    for i in range(num_segments):
+        st = int(i * hop_size * fs)
+        en = st + T
+        if en >= lengths:
+            en = lengths
+            speech_seg = speech_mix.new_zeros(speech_mix[:, :T].shape)
+            t = en - st
+            speech_seg[:, :t] = speech_mix[:, st:en]
+        else:
+            t = T
+            speech_seg = speech_mix[:, st:en]
+        lengths_seg = speech_mix.new_full(
+            [len(speech_mix)], dtype=torch.long, fill_value=T
+        )
+        model = separate_speech.enh_model
+        feats, f_lens = model.encoder(speech_seg, lengths_seg)
+        feats, _, _ = model.separator(feats, f_lens)
+        enh_waves.append(torch.stack([model.decoder(f, lengths_seg)[0] for f in feats]))
+
+    waves = enh_waves[0]
+    for i in range(1, num_segments):
+        perm = separate_speech.cal_permumation(
+            waves[:, :, -overlap_length:], enh_waves[i][:, :, :overlap_length]
+        )
+        for batch in range(len(speech_mix)):
+            enh_waves[i][:, batch] = enh_waves[i][perm[batch], batch]
+        if i == num_segments - 1:
+            enh_waves[i][:, :, t:] = 0
+            enh_waves_res_i = enh_waves[i][:, :, overlap_length:t]
+        else:
+            enh_waves_res_i = enh_waves[i][:, :, overlap_length:]
+        waves[:, :, -overlap_length:] = (
+            waves[:, :, -overlap_length:] + enh_waves[i][:, :, :overlap_length]
+        ) / 2
+        waves = torch.cat([waves, enh_waves_res_i], dim=2)
+    return waves
+
+
+@pytest.mark.execution_timeout(10)
+@pytest.mark.parametrize("segment_batch_size", [1, 3, 100])
+@pytest.mark.parametrize(
+    "input_size, segment_size, hop_size", [(35000, 1.6, 0.8), (20000, 1.0, 0.8)]
+)
+def test_SeparateSpeech_segment_batch(
+    config_file, segment_batch_size, input_size, segment_size, hop_size
+):
+    separate_speech = SeparateSpeech(
+        enh_train_config=config_file,
+        segment_size=segment_size,
+        hop_size=hop_size,
+        segment_batch_size=segment_batch_size,
+    )
+    wav = torch.rand(2, input_size)
+    waves = separate_speech(wav, fs=8000)
+    with torch.no_grad():
+        desired = _legacy_segment_wise(separate_speech, wav, 8000)
+    for w, d in zip(waves, desired):
+        np.testing.assert_allclose(w, d.numpy(), atol=1e-5)
+
+
+@pytest.mark.execution_timeout(10)
+def test_SeparateSpeech_separate_blocks(config_file):
+    separate_speech = SeparateSpeech(
+        enh_train_config=config_file,
+        segment_size=1.6,
+        hop_size=0.8,
+        segment_batch_size=2,
+    )
+    wav = torch.rand(1, 50000)
+    desired = separate_speech(wav, fs=8000)
+    blocks = list(
+        separate_speech.separate_blocks(lambda st, en: wav[:, st:en], 50000, 8000)
+    )
+    assert len(blocks) > 1
+    for spk, d in enumerate(desired):
+        np.testing.assert_allclose(np.concatenate([b[spk] for b in blocks], 1), d)
+
+
+def test_SeparateSpeech_align_permutations(config_file):
+    separate_speech = SeparateSpeech(
+        enh_train_config=config_file, segment_size=1.0, hop_size=0.5
+    )
+    # 5 segments of length 8 with the hop of 4 from 2 sources in 2 batches
+    sources = torch.randn(2, 2, 24)
+    swaps = torch.tensor([[0, 1], [1, 1], [0, 0], [1, 0], [1, 1]])
+    segments = torch.stack([sources[:, :, 4 * i : 4 * i + 8] for i in range(5)], 1)
+    for i in range(5):
+        for b in range(2):
+            if swaps[i, b]:
+                segments[:, i, b] = segments.flip(0)[:, i, b]
+
+    perms = separate_speech._align_permutations(segments, None, None, 4, 4)
+    aligned = segments.gather(
+        0, perms.permute(2, 0, 1).unsqueeze(-1).expand(-1, -1, -1, 8)
+    )
+    # The streams are aligned with the first segment
+    for b in range(2):
+        desired = sources[:, b] if swaps[0, b] == 0 else sources.flip(0)[:, b]
+        for i in range(5):
+            torch.testing.assert_allclose(
+                aligned[:, i, b], desired[:, 4 * i : 4 * i + 8]
+            )
+
+    # The alignment continues from the previous mini-batch
+    perms1 = separate_speech._align_permutations(segments[:, :2], None, None, 4, 4)
+    perms2 = separate_speech._align_permutations(
+        segments[:, 2:], segments[:, 1], perms1[-1], 4, 4
+    )
+    assert torch.equal(torch.cat([perms1, perms2]), perms)
+
+
+@pytest.mark.execution_timeout(30)
+def test_main_block_io(tmp_path: Path, config_file):
+    model, _ = EnhancementTask.build_model_from_file(config_file, None)
+    torch.save(model.state_dict(), tmp_path / "model.pth")
+    rng = np.random.RandomState(0)
+    with (tmp_path / "wav.scp").open("w") as f:
+        for key, length in [("utt1", 50000), ("utt2", 8000)]:
+            soundfile.write(
+                tmp_path / f"{key}.wav", rng.uniform(-0.5, 0.5, length), 8000
+            )
+            f.write(f"{key} {tmp_path / key}.wav\n")
+
+    for block_io in ["false", "true"]:
+        main(
+            cmd=[
+                "--output_dir",
+                str(tmp_path / f"output_{block_io}"),
+                "--enh_train_config",
+                str(config_file),
+                "--enh_model_file",
+                str(tmp_path / "model.pth"),
+                "--data_path_and_name_and_type",
+                f"{tmp_path / 'wav.scp'},speech_mix,sound",
+                "--segment_size",
+                "1.6",
+                "--hop_size",
+                "0.8",
+                "--segment_batch_size",
+                "2",
+                "--block_io",
+                block_io,
+            ]
+        )
+    for spk in [1, 2]:
+        for key in ["utt1", "utt2"]:
+            desired, _ = soundfile.read(tmp_path / f"output_false/wavs/{spk}/{key}.wav")
+            wav, _ = soundfile.read(tmp_path / f"output_true/wavs/{spk}/{key}.wav")
+            np.testing.assert_array_equal(wav, desired)
+        with (tmp_path / f"output_true/spk{spk}.scp").open() as f:
+            assert [line.split()[0] for line in f] == ["utt1", "utt2"]
@@ -1,9 +1,13 @@
 from argparse import ArgumentParser
+from pathlib import Path
 
+import numpy as np
 import pytest
+import soundfile
 
 from espnet2.bin.enh_scoring import get_parser
 from espnet2.bin.enh_scoring import main
+from espnet2.bin.enh_scoring import scoring
 
 
 def test_get_parser():
@@ -13,3 +17,53 @@ def test_get_parser():
 def test_main():
     with pytest.raises(SystemExit):
         main()
+
+
+@pytest.fixture()
+def scp_files(tmp_path: Path):
+    rng = np.random.RandomState(0)
+    num_spk = 2
+    keys = [f"utt{i}" for i in range(5)]
+    for s in range(num_spk):
+        with (tmp_path / f"ref{s}.scp").open("w") as fref, (
+            tmp_path / f"inf{s}.scp"
+        ).open("w") as finf:
+            for i, key in enumerate(keys):
+                ref = rng.randn(8000 + 10 * i) * 0.1
+                inf = ref * 0.5 + rng.randn(len(ref)) * 0.05
+                soundfile.write(tmp_path / f"ref{s}_{key}.wav", ref, 8000)
+                soundfile.write(tmp_path / f"inf{s}_{key}.wav", inf, 8000)
+                fref.write(f"{key} {tmp_path / f'ref{s}_{key}.wav'}\n")
+                # The speakers are swapped in the odd utterances
+                t = num_spk - 1 - s if i % 2 == 1 else s
+                finf.write(f"{key} {tmp_path / f'inf{t}_{key}.wav'}\n")
+    return (
+        [str(tmp_path / f"ref{s}.scp") for s in range(num_spk)],
+        [str(tmp_path / f"inf{s}.scp") for s in range(num_spk)],
+    )
+
+
+@pytest.mark.execution_timeout(30)
+@pytest.mark.parametrize("nj", [1, 2])
+def test_scoring(tmp_path: Path, scp_files, nj):
+    ref_scp, inf_scp = scp_files
+    scoring(
+        output_dir=str(tmp_path / "output"),
+        dtype="float32",
+        log_level="INFO",
+        key_file=ref_scp[0],
+        ref_scp=ref_scp,
+        inf_scp=inf_scp,
+        ref_channel=0,
+        batch_size=2,
+        nj=nj,
+    )
+    for s in range(2):
+        with (tmp_path / "output" / f"wav_spk{s + 1}").open() as f:
+            lines = [line.split() for line in f]
+        # The scores are written in the order of the keys
+        assert [k for k, _ in lines] == [f"utt{i}" for i in range(5)]
+        # The permutations are solved
+        assert all(Path(v).name == f"inf{s}_{k}.wav" for k, v in lines)
+        with (tmp_path / "output" / f"SI_SNR_spk{s + 1}").open() as f:
+            assert all(float(line.split()[1]) > -3 for line in f)
@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# The modules which take long time to import and must be imported lazily
+HEAVY_MODULES = [
+    "chainer",
+    "g2p_en",
+    "h5py",
+    "librosa",
+    "matplotlib",
+    "tacotron_cleaner",
+    "wandb",
+]
+
+ENTRY_POINTS = [
+    "asr_inference",
+    "asr_train",
+    "enh_inference",
+    "enh_train",
+    "lm_calc_perplexity",
+    "lm_train",
+    "tts_inference",
+    "tts_train",
+]
+
+# The wall-clock time depends on the machine and the load,
+# so the budget in seconds to import each entry point, excluding
+# the interpreter startup, is checked only if it's given, e.g.
+# ESPNET_IMPORT_TIME_BUDGET=3.0 pytest test/espnet2/bin/test_import_time.py
+BUDGET = os.environ.get("ESPNET_IMPORT_TIME_BUDGET")
+
+SCRIPT = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import espnet2.bin.{name}  # noqa
+
+elapsed = time.perf_counter() - start
+print(json.dumps(dict(elapsed=elapsed, modules=list(sys.modules))))
+"""
+
+
+@pytest.mark.execution_timeout(60)
+@pytest.mark.parametrize("name", ENTRY_POINTS)
+def test_import_time(name):
+    # Import in a new process because the modules are cached in this process
+    out = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(name=name)],
+        check=True,
+        stdout=subprocess.PIPE,
+    ).stdout
+    result = json.loads(out.decode().strip().split("\n")[-1])
+
+    imported = [m for m in HEAVY_MODULES if m in result["modules"]]
+    assert len(imported) == 0, f"{name} imports {imported}"
+    if BUDGET is not None:
+        assert result["elapsed"] < float(BUDGET), (
+            f"Importing espnet2.bin.{name} took {result['elapsed']:.2f} sec "
+            f"(budget: {BUDGET} sec)"
+        )
@@ -1,4 +1,5 @@
 from argparse import ArgumentParser
+import gzip
 
 import pytest
 
@@ -13,3 +14,69 @@ def test_get_parser():
 def test_main():
     with pytest.raises(SystemExit):
         main()
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 1000])
+def test_tokenize_batch(tmp_path, batch_size):
+    with (tmp_path / "text").open("w") as f:
+        f.write("a ab\nb c\nabc\n")
+    main(
+        [
+            "--input",
+            str(tmp_path / "text"),
+            "--output",
+            str(tmp_path / "tokens"),
+            "--field",
+            "2-",
+            "--token_type",
+            "char",
+            "--batch_size",
+            str(batch_size),
+        ]
+    )
+    with (tmp_path / "tokens").open() as f:
+        assert f.read() == "a b\nc\n\n"
+
+
+def _write_text(path, lines):
+    if path.suffix == ".gz":
+        f = gzip.open(path, "wt", encoding="utf-8")
+    else:
+        f = path.open("w", encoding="utf-8")
+    with f:
+        f.writelines(line + "\n" for line in lines)
+
+
+def _tokenize(input, output, *args):
+    main(
+        [
+            "--input",
+            str(input),
+            "--output",
+            str(output),
+            "--field",
+            "2-",
+            "--token_type",
+            "char",
+            "--batch_size",
+            "3",
+            *args,
+        ]
+    )
+    with output.open("r", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.execution_timeout(30)
+@pytest.mark.parametrize("suffix", ["", ".gz"])
+@pytest.mark.parametrize("write_vocabulary", ["false", "true"])
+def test_tokenize_parallel(tmp_path, suffix, write_vocabulary):
+    lines = [f"utt{i} " + "ab c d e"[: i % 9] for i in range(50)]
+    _write_text(tmp_path / "text", lines)
+    _write_text(tmp_path / f"text{suffix}", lines)
+    args = ["--write_vocabulary", write_vocabulary]
+    expected = _tokenize(tmp_path / "text", tmp_path / "expected", *args)
+    output = _tokenize(tmp_path / f"text{suffix}", tmp_path / "out", "--nj", "2", *args)
+    assert output == expected
+    if write_vocabulary == "false":
+        assert expected.split("\n")[4] == "a b <space> c"
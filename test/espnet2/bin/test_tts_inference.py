@@ -3,6 +3,7 @@ from pathlib import Path
 import string
 
 import pytest
+import torch
 
 from espnet2.bin.tts_inference import get_parser
 from espnet2.bin.tts_inference import main
@@ -59,3 +60,145 @@ def test_Text2Speech(config_file):
     text2speech = Text2Speech(train_config=config_file)
     text = "aiueo"
     text2speech(text)
+
+
+@pytest.fixture()
+def fastspeech_config_file(tmp_path: Path, token_list):
+    TTSTask.main(
+        cmd=[
+            "--dry_run",
+            "true",
+            "--output_dir",
+            str(tmp_path / "fastspeech"),
+            "--token_list",
+            str(token_list),
+            "--token_type",
+            "char",
+            "--cleaner",
+            "none",
+            "--g2p",
+            "none",
+            "--normalize",
+            "none",
+            "--tts",
+            "fastspeech",
+            "--tts_conf",
+            "{adim: 4, aheads: 2, eunits: 4, dunits: 4, postnet_chans: 4}",
+        ]
+    )
+    return tmp_path / "fastspeech" / "config.yaml"
+
+
+@pytest.mark.execution_timeout(10)
+def test_Text2Speech_batch(fastspeech_config_file):
+    text2speech = Text2Speech(train_config=fastspeech_config_file)
+    assert text2speech.supports_batch
+    texts = ["aiueo", "ab", "abcdefg"]
+    for text, (wav, outs, outs_denorm, *_) in zip(texts, text2speech.batch(texts)):
+        _wav, _outs, _outs_denorm, *_ = text2speech(text)
+        torch.testing.assert_allclose(outs, _outs)
+        torch.testing.assert_allclose(outs_denorm, _outs_denorm)
+        assert wav.shape == _wav.shape
+
+
+@pytest.mark.execution_timeout(10)
+def test_Text2Speech_stream(fastspeech_config_file):
+    text2speech = Text2Speech(train_config=fastspeech_config_file)
+    wav, *_ = text2speech("aiueo")
+    wavs = list(text2speech.stream("aiueo", chunk_size=2))
+    assert len(wavs) > 1
+    assert torch.cat(wavs).shape == wav.shape
+
+
+@pytest.mark.execution_timeout(5)
+def test_Text2Speech_batch_not_supported(config_file):
+    # Tacotron2 synthesizes the sentences one by one
+    text2speech = Text2Speech(train_config=config_file)
+    assert not text2speech.supports_batch
+    assert len(text2speech.batch(["aiueo", "ab"])) == 2
+
+
+@pytest.mark.execution_timeout(30)
+def test_main_batch(tmp_path: Path, fastspeech_config_file):
+    with (tmp_path / "text").open("w") as f:
+        f.write("utt1 aiueo\nutt2 ab\nutt3 abcdefg\n")
+    main(
+        cmd=[
+            "--output_dir",
+            str(tmp_path / "output"),
+            "--train_config",
+            str(fastspeech_config_file),
+            "--data_path_and_name_and_type",
+            f"{tmp_path / 'text'},text,text",
+            "--batch_size",
+            "2",
+        ]
+    )
+    with (tmp_path / "output/speech_shape/speech_shape").open() as f:
+        assert [line.split()[0] for line in f] == ["utt1", "utt2", "utt3"]
+    for key in ["utt1", "utt2", "utt3"]:
+        assert (tmp_path / f"output/wav/{key}.wav").exists()
+
+
+@pytest.mark.execution_timeout(60)
+@pytest.mark.parametrize("num_writers", [0, 2])
+def test_main_outputs(tmp_path: Path, config_file, num_writers):
+    with (tmp_path / "text").open("w") as f:
+        f.write("utt1 aiueo\nutt2 ab\nutt3 abcdefg\n")
+    main(
+        cmd=[
+            "--output_dir",
+            str(tmp_path / "output"),
+            "--train_config",
+            str(config_file),
+            "--data_path_and_name_and_type",
+            f"{tmp_path / 'text'},text,text",
+            "--maxlenratio",
+            "2.0",
+            "--num_writers",
+            str(num_writers),
+        ]
+    )
+    keys = ["utt1", "utt2", "utt3"]
+    for name in ["norm", "denorm"]:
+        with (tmp_path / f"output/{name}/feats.scp").open() as f:
+            assert [line.split()[0] for line in f] == keys
+    for name in ["durations/durations", "focus_rates/focus_rates"]:
+        with (tmp_path / f"output/{name}").open() as f:
+            assert [line.split()[0] for line in f] == keys
+    for key in keys:
+        assert (tmp_path / f"output/norm/{key}.npy").exists()
+        assert (tmp_path / f"output/wav/{key}.wav").exists()
+        assert (tmp_path / f"output/att_ws/{key}.png").exists()
+        assert (tmp_path / f"output/probs/{key}.png").exists()
+
+
+@pytest.mark.execution_timeout(30)
+def test_main_outputs_disabled(tmp_path: Path, config_file):
+    with (tmp_path / "text").open("w") as f:
+        f.write("utt1 aiueo\nutt2 ab\n")
+    main(
+        cmd=[
+            "--output_dir",
+            str(tmp_path / "output"),
+            "--train_config",
+            str(config_file),
+            "--data_path_and_name_and_type",
+            f"{tmp_path / 'text'},text,text",
+            "--maxlenratio",
+            "2.0",
+            "--write_norm_feats",
+            "false",
+            "--write_durations",
+            "false",
+            "--plot_att_ws",
+            "false",
+            "--plot_probs",
+            "false",
+        ]
+    )
+    assert (tmp_path / "output/speech_shape/speech_shape").exists()
+    assert (tmp_path / "output/denorm/feats.scp").exists()
+    assert (tmp_path / "output/wav/utt1.wav").exists()
+    for name in ["norm", "durations", "focus_rates", "att_ws", "probs"]:
+        assert not (tmp_path / f"output/{name}").exists()
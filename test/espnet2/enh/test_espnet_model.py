@@ -253,3 +253,72 @@ def test_forward_with_beamformer_net(
         "dereverb_ref1": dereverb_ref1,
     }
     loss, stats, weight = enh_model(**kwargs)
+
+
+def _brute_force_permutation_loss(ref, inf, criterion):
+    from itertools import permutations
+
+    best_loss, best_perm = None, None
+    for p in permutations(range(len(ref))):
+        loss = sum(criterion(ref[s], inf[t]) for s, t in enumerate(p)) / len(p)
+        if best_loss is None:
+            best_loss = loss
+            best_perm = torch.tensor([p] * loss.size(0))
+        else:
+            better = loss < best_loss
+            best_perm[better] = torch.tensor(p)
+            best_loss = torch.where(better, loss, best_loss)
+    return best_loss.mean(), best_perm
+
+
+@pytest.mark.execution_timeout(10)
+@pytest.mark.parametrize("num_spk", [1, 2, 3, 6])
+@pytest.mark.parametrize(
+    "criterion",
+    [
+        ESPnetEnhancementModel.si_snr_loss,
+        ESPnetEnhancementModel.si_snr_loss_zeromean,
+        ESPnetEnhancementModel.tf_mse_loss,
+        ESPnetEnhancementModel.tf_l1_loss,
+    ],
+)
+def test_permutation_loss(num_spk, criterion):
+    torch.manual_seed(0)
+    ref = [torch.randn(4, 8, 3) for _ in range(num_spk)]
+    inf = [torch.randn(4, 8, 3) for _ in range(num_spk)]
+    if criterion.__name__.startswith("si_snr"):
+        ref = [r.view(4, -1) for r in ref]
+        inf = [i.view(4, -1) for i in inf]
+
+    loss, perm = ESPnetEnhancementModel._permutation_loss(ref, inf, criterion)
+    loss_bf, perm_bf = _brute_force_permutation_loss(ref, inf, criterion)
+    torch.testing.assert_allclose(loss, loss_bf)
+    assert torch.equal(perm, perm_bf)
+
+    # The loss with the given permutation
+    loss2, perm2 = ESPnetEnhancementModel._permutation_loss(
+        ref, inf, criterion, perm=perm
+    )
+    torch.testing.assert_allclose(loss2, loss)
+    assert perm2 is perm
+
+
+@pytest.mark.parametrize("num_spk", [2, 4, 5])
+def test_solve_permutation_hungarian(num_spk, monkeypatch):
+    import espnet2.enh.espnet_model
+
+    losses = torch.randn(8, num_spk, num_spk)
+    perm = ESPnetEnhancementModel._solve_permutation(losses)
+    monkeypatch.setattr(espnet2.enh.espnet_model, "MAX_NUM_SPK_EXHAUSTIVE_PIT", 0)
+    perm_hungarian = ESPnetEnhancementModel._solve_permutation(losses)
+    assert torch.equal(perm, perm_hungarian)
+
+
+def test_permutation_loss_backward():
+    ref = [torch.randn(2, 16) for _ in range(6)]
+    inf = [torch.randn(2, 16, requires_grad=True) for _ in range(6)]
+    loss, _ = ESPnetEnhancementModel._permutation_loss(
+        ref, inf, ESPnetEnhancementModel.si_snr_loss
+    )
+    loss.backward()
+    assert all(i.grad is not None for i in inf)
@@ -0,0 +1,63 @@
+import pickle
+
+import numpy as np
+import soundfile
+
+from espnet2.fileio.audio_bank import AudioBank
+
+
+def _make_wavs(tmp_path):
+    rng = np.random.RandomState(0)
+    paths = []
+    signals = []
+    for i, (frames, channels) in enumerate([(100, 1), (50, 2), (30, 1)]):
+        signal = rng.uniform(-0.5, 0.5, (frames, channels))
+        path = str(tmp_path / f"{i}.wav")
+        soundfile.write(path, signal, 16000, subtype="FLOAT")
+        paths.append(path)
+        signals.append(signal.astype(np.float32))
+    return paths, signals
+
+
+def test_AudioBank(tmp_path):
+    paths, signals = _make_wavs(tmp_path)
+    bank = AudioBank(paths, tmp_path / "bank")
+    assert len(bank) == 3
+    for i, signal in enumerate(signals):
+        np.testing.assert_array_equal(bank[i], signal)
+    np.testing.assert_array_equal(bank.read(1, 10, 20), signals[1][10:20])
+
+
+def test_AudioBank_reuse(tmp_path):
+    paths, signals = _make_wavs(tmp_path)
+    bank = AudioBank(paths, tmp_path / "bank")
+    mtime = bank.data_path.stat().st_mtime_ns
+
+    bank2 = pickle.loads(pickle.dumps(AudioBank(paths, tmp_path / "bank")))
+    assert bank2.data_path.stat().st_mtime_ns == mtime
+    np.testing.assert_array_equal(bank2[2], signals[2])
+
+    # The bank is built again if the list is changed
+    bank3 = AudioBank(paths[:2], tmp_path / "bank")
+    assert bank3.data_path != bank.data_path
+    assert len(bank3) == 2
+
+
+def test_AudioBank_read_segment(tmp_path):
+    paths, signals = _make_wavs(tmp_path)
+    bank = AudioBank(paths, tmp_path / "bank")
+    rng = np.random.RandomState(0)
+
+    # Longer than the segment
+    segment = bank.read_segment(0, 40, rng)
+    assert segment.shape == (40, 1)
+    start = int(np.where(signals[0][:, 0] == segment[0, 0])[0][0])
+    np.testing.assert_array_equal(segment, signals[0][start : start + 40])
+
+    # Equal to the segment
+    np.testing.assert_array_equal(bank.read_segment(1, 50, rng), signals[1])
+
+    # Shorter than the segment: Repeated
+    segment = bank.read_segment(2, 70, rng)
+    assert segment.shape == (70, 1)
+    assert set(segment[:, 0]) == set(signals[2][:, 0])
@@ -101,3 +101,16 @@ def test_SoundScpWriter_normalize(tmp_path: Path):
         rate2, d = desired[k]
         assert rate1 == rate2
         np.testing.assert_array_equal(t, d)
+
+
+def test_SoundScpWriter_open(tmp_path: Path):
+    audio = np.random.randint(-100, 100, 32, dtype=np.int16)
+    with SoundScpWriter(tmp_path, tmp_path / "wav.scp", dtype=np.int16) as writer:
+        with writer.open("abc", 16) as f:
+            for block in np.split(audio, 4):
+                f.write(block)
+    target = SoundScpReader(tmp_path / "wav.scp", normalize=False, dtype=np.int16)
+    rate, t = target["abc"]
+    assert rate == 16
+    np.testing.assert_array_equal(t, audio)
+    assert writer.get_path("abc") == str(tmp_path / "abc.wav")
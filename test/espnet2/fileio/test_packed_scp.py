@@ -0,0 +1,70 @@
+import pickle
+from pathlib import Path
+
+import numpy as np
+
+from espnet2.fileio.packed_scp import PackedScpReader
+from espnet2.fileio.packed_scp import PackedScpWriter
+
+
+def test_PackedScpWriter(tmp_path: Path):
+    array1 = np.random.randn(1).astype(np.float32)
+    array2 = np.random.randn(1, 1, 10)
+    array3 = np.random.randint(0, 10, (3, 2), dtype=np.int64)
+    with PackedScpWriter(tmp_path / "data.bin", tmp_path / "feats.scp") as writer:
+        writer["abc"] = array1
+        writer["def"] = array2
+        writer["ghi"] = array3
+    target = PackedScpReader(tmp_path / "feats.scp")
+    desired = {"abc": array1, "def": array2, "ghi": array3}
+
+    for k in desired:
+        t = target[k]
+        d = desired[k]
+        assert t.dtype == d.dtype
+        np.testing.assert_array_equal(t, d)
+
+    assert len(target) == len(desired)
+    assert "abc" in target
+    assert tuple(target.keys()) == tuple(desired)
+    assert tuple(target) == tuple(desired)
+    assert writer.get_path("abc") == f"{tmp_path / 'data.bin'}:0:<f4:1"
+    assert target.get_path("abc") == writer.get_path("abc")
+
+
+def test_PackedScpReader_concatenated(tmp_path: Path):
+    desired = {}
+    lines = []
+    for i in range(2):
+        with PackedScpWriter(
+            tmp_path / f"data.{i}.bin", tmp_path / f"feats.{i}.scp"
+        ) as writer:
+            for j in range(3):
+                desired[f"utt{i}{j}"] = np.random.randn(j + 1, 2)
+                writer[f"utt{i}{j}"] = desired[f"utt{i}{j}"]
+        lines += (tmp_path / f"feats.{i}.scp").read_text().splitlines(True)
+    (tmp_path / "feats.scp").write_text("".join(lines))
+
+    target = PackedScpReader(tmp_path / "feats.scp")
+    for k in desired:
+        np.testing.assert_array_equal(target[k], desired[k])
+
+
+def test_PackedScpReader_empty(tmp_path: Path):
+    with PackedScpWriter(tmp_path / "data.bin", tmp_path / "feats.scp") as writer:
+        writer["abc"] = np.zeros((0, 3), dtype=np.float32)
+    target = PackedScpReader(tmp_path / "feats.scp")
+    assert target["abc"].shape == (0, 3)
+    assert target["abc"].dtype == np.float32
+
+
+def test_PackedScpReader_pickle(tmp_path: Path):
+    array = np.random.randn(4, 2)
+    with PackedScpWriter(tmp_path / "data.bin", tmp_path / "feats.scp") as writer:
+        writer["abc"] = array
+    target = PackedScpReader(tmp_path / "feats.scp")
+    np.testing.assert_array_equal(target["abc"], array)
+    # The mapped file is not pickled, but mapped again
+    target = pickle.loads(pickle.dumps(target))
+    assert len(target.mmaps) == 0
+    np.testing.assert_array_equal(target["abc"], array)
@@ -0,0 +1,37 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from espnet2.fileio.token_corpus import token_dtype
+from espnet2.fileio.token_corpus import TokenCorpus
+from espnet2.fileio.token_corpus import TokenCorpusWriter
+
+
+def test_token_dtype():
+    assert token_dtype(65536) == np.uint16
+    assert token_dtype(65537) == np.uint32
+
+
+def test_TokenCorpus(tmp_path):
+    with TokenCorpusWriter(tmp_path / "corpus", vocab_size=10) as writer:
+        writer.write([1, 2, 3])
+        writer.write([])
+        writer.write(np.array([4, 5]))
+
+    corpus = pickle.loads(pickle.dumps(TokenCorpus(tmp_path / "corpus")))
+    assert len(corpus) == 3
+    assert corpus.dtype == np.uint16
+    np.testing.assert_array_equal(corpus[0], [1, 2, 3])
+    np.testing.assert_array_equal(corpus[1], [])
+    np.testing.assert_array_equal(corpus[2], [4, 5])
+    # The sentences are separated by <sos/eos>
+    np.testing.assert_array_equal(corpus.tokens, [9, 1, 2, 3, 9, 9, 4, 5, 9])
+
+
+def test_TokenCorpusWriter_out_of_vocabulary(tmp_path):
+    with pytest.raises(ValueError):
+        with TokenCorpusWriter(tmp_path / "corpus", vocab_size=10) as writer:
+            writer.write([10])
+    # The incomplete corpus is not left
+    assert list(tmp_path.iterdir()) == []
@@ -1,6 +1,10 @@
+from distutils.version import LooseVersion
+
+import numpy as np
 import pytest
 import torch
 
+from espnet2.iterators.sequence_iter_factory import BackgroundIterator
 from espnet2.iterators.sequence_iter_factory import SequenceIterFactory
 
 
@@ -67,3 +71,102 @@ def test_SequenceIterFactory_deterministic(collate, num_iters_per_epoch):
     for i in range(1, 10):
         for v, v2 in zip(iter_factory.build_iter(i), iter_factory.build_iter(i)):
             assert (v == v2).all()
+
+
+@pytest.mark.skipif(
+    LooseVersion(torch.__version__) < LooseVersion("1.7.0"),
+    reason="require pytorch>=1.7",
+)
+@pytest.mark.execution_timeout(10)
+def test_SequenceIterFactory_persistent_workers():
+    dataset = Dataset()
+    batches = [[0, 1], [2, 3], [4, 5], [6, 7], [8, 9]]
+    kwargs = dict(
+        dataset=dataset,
+        batches=batches,
+        num_iters_per_epoch=3,
+        shuffle=True,
+        collate_fn=collate_func,
+        num_workers=1,
+    )
+    iter_factory = SequenceIterFactory(**kwargs, persistent_workers=True)
+    ref_factory = SequenceIterFactory(**kwargs)
+
+    loader = iter_factory.build_iter(1)
+    for i in range(1, 5):
+        it = iter_factory.build_iter(i)
+        # The same DataLoader is reused in all epochs
+        assert it is loader
+        assert len(it) == 3
+        assert [v.tolist() for v in it] == [
+            v.tolist() for v in ref_factory.build_iter(i)
+        ]
+
+
+@pytest.mark.parametrize("num_prefetch_batches", [1, 3])
+def test_SequenceIterFactory_prefetch(num_prefetch_batches):
+    dataset = Dataset()
+    batches = [[0, 1], [2, 3], [4, 5], [6, 7], [8, 9]]
+    kwargs = dict(
+        dataset=dataset,
+        batches=batches,
+        num_iters_per_epoch=3,
+        shuffle=True,
+        collate_fn=collate_func,
+    )
+    iter_factory = SequenceIterFactory(
+        **kwargs, num_prefetch_batches=num_prefetch_batches
+    )
+    ref_factory = SequenceIterFactory(**kwargs)
+
+    for i in range(1, 5):
+        it = iter_factory.build_iter(i)
+        assert isinstance(it, BackgroundIterator)
+        assert len(it) == 3
+        assert [v.tolist() for v in it] == [
+            v.tolist() for v in ref_factory.build_iter(i)
+        ]
+
+
+def test_BackgroundIterator_break():
+    it = BackgroundIterator(range(100), num_prefetch=2)
+    for i, v in enumerate(it):
+        if i == 3:
+            break
+    assert list(it) == list(range(100))
+
+
+def test_BackgroundIterator_exception():
+    def gen():
+        yield 0
+        raise ValueError("foo")
+
+    with pytest.raises(ValueError, match="foo"):
+        list(BackgroundIterator(gen(), num_prefetch=1))
+
+
+def test_BackgroundIterator_invalid_num_prefetch():
+    with pytest.raises(ValueError):
+        BackgroundIterator([], num_prefetch=0)
+
+
+@pytest.mark.parametrize(
+    "device",
+    [
+        "cpu",
+        pytest.param(
+            "cuda",
+            marks=pytest.mark.skipif(
+                not torch.cuda.is_available(), reason="Require cuda"
+            ),
+        ),
+    ],
+)
+def test_BackgroundIterator_device(device):
+    data = [(["a"], dict(x=np.arange(3), y=torch.ones(2)))]
+    it = BackgroundIterator(data, num_prefetch=1, device=device)
+    for uttids, batch in it:
+        assert uttids == ["a"]
+        assert batch["x"].device.type == device
+        assert batch["y"].device.type == device
+        assert batch["x"].tolist() == [0, 1, 2]
@@ -0,0 +1,32 @@
+import pytest
+import torch
+
+from espnet2.lm.espnet_model import ESPnetLanguageModel
+from espnet2.lm.seq_rnn_lm import SequentialRNNLM
+from espnet2.lm.transformer_lm import TransformerLM
+
+
+def test_ESPnetLanguageModel_packed_equals_padded():
+    lm = TransformerLM(10, unit=10, dropout_rate=0.0)
+    model = ESPnetLanguageModel(lm, vocab_size=10)
+    # <sos/eos>=9
+    packed_text = torch.tensor([[9, 1, 2, 9, 3, 4, 5, 9]])
+    nll = model.nll_packed(packed_text)
+    assert nll.shape == (1, 7)
+
+    # The attention doesn't cross the sentences in the block
+    text = torch.tensor([[1, 2, 0], [3, 4, 5]])
+    nll2, _ = model.nll(text, torch.tensor([2, 3]))
+    torch.testing.assert_allclose(nll[0, :3], nll2[0, :3])
+    torch.testing.assert_allclose(nll[0, 3:], nll2[1])
+
+
+@pytest.mark.parametrize(
+    "lm", [TransformerLM(10, unit=10), SequentialRNNLM(10, unit=10, nlayers=1)]
+)
+def test_ESPnetLanguageModel_forward_packed(lm):
+    model = ESPnetLanguageModel(lm, vocab_size=10)
+    packed_text = torch.randint(1, 10, (2, 9))
+    loss, stats, weight = model(packed_text=packed_text)
+    loss.backward()
+    assert weight == 16
@@ -83,3 +83,13 @@ def test_TransformerLM_batch_beam_search(pos_enc, dtype):
             maxlenratio=0.0,
             minlenratio=0.0,
         )
+
+
+def test_TransformerLM_segments():
+    model = TransformerLM(10, unit=10, dropout_rate=0.0)
+    input = torch.randint(1, 9, [2, 6])
+    # The outputs of the second sentence don't depend on the first one
+    segments = torch.tensor([[0, 0, 0, 1, 1, 1]] * 2)
+    out, _ = model(input, None, segments=segments)
+    out2, _ = model(input[:, 3:], None)
+    torch.testing.assert_allclose(out[:, 3:], out2)
@@ -0,0 +1,289 @@
+import functools
+
+import numpy as np
+import pytest
+
+from espnet2.fileio.npy_scp import NpyScpReader
+from espnet2.fileio.packed_scp import PackedScpReader
+from espnet2.main_funcs.collect_stats import collect_stats
+from espnet2.main_funcs.collect_stats import collect_stats_sharded
+from espnet2.main_funcs.collect_stats import CollectStatsCache
+from espnet2.main_funcs.collect_stats import compute_utt2hash
+from espnet2.torch_utils.device_funcs import force_gatherable
+from espnet2.train.abs_espnet_model import AbsESPnetModel
+from espnet2.train.collate_fn import common_collate_fn
+
+
+class DummyModel(AbsESPnetModel):
+    def forward(self, x, x_lengths, y):
+        loss = x.sum()
+        return force_gatherable((loss, dict(loss=loss), 1), loss.device)
+
+    def collect_feats(self, x, x_lengths, y):
+        return dict(feats=x * 2, feats_lengths=x_lengths, spk=y)
+
+
+def _make_data(n):
+    rng = np.random.RandomState(0)
+    return [
+        (
+            f"utt{i}",
+            dict(
+                x=rng.randn(rng.randint(1, 10), 3).astype(np.float32),
+                y=rng.randn(4).astype(np.float32),
+            ),
+        )
+        for i in range(n)
+    ]
+
+
+def _make_iter(data, batch_size):
+    return [
+        common_collate_fn(data[i : i + batch_size], not_sequence=["y"])
+        for i in range(0, len(data), batch_size)
+    ]
+
+
+def _build_iters(data, train_key_file, valid_key_file):
+    iters = []
+    for key_file in [train_key_file, valid_key_file]:
+        with open(key_file, encoding="utf-8") as f:
+            keys = {line.split()[0] for line in f}
+        iters.append(_make_iter([d for d in data if d[0] in keys], 3))
+    return iters
+
+
+def _check_outputs(output_dir, data):
+    for mode in ["train", "valid"]:
+        with (output_dir / mode / "x_shape").open() as f:
+            shapes = dict(line.split() for line in f)
+        assert shapes == {k: f"{len(d['x'])},3" for k, d in data}
+
+        stats = np.load(output_dir / mode / "feats_stats.npz")
+        feats = np.concatenate([d["x"] * 2 for _, d in data]).astype(np.float64)
+        assert stats["count"] == len(feats)
+        np.testing.assert_allclose(stats["sum"], feats.sum(0))
+        np.testing.assert_allclose(stats["sum_square"], (feats ** 2).sum(0))
+
+        stats = np.load(output_dir / mode / "spk_stats.npz")
+        spk = np.stack([d["y"] for _, d in data]).astype(np.float64)
+        assert stats["count"] == len(spk)
+        np.testing.assert_allclose(stats["sum"], spk.sum(0), rtol=1e-6)
+
+        with (output_dir / mode / "stats_keys").open() as f:
+            assert set(f.read().split()) == {"feats", "feats_lengths", "spk"}
+
+
+@pytest.mark.parametrize("write_collected_feats", [False, True])
+def test_collect_stats(tmp_path, write_collected_feats):
+    data = _make_data(7)
+    collect_stats(
+        model=DummyModel(),
+        train_iter=_make_iter(data, 3),
+        valid_iter=_make_iter(data, 2),
+        output_dir=tmp_path,
+        ngpu=0,
+        log_interval=None,
+        write_collected_feats=write_collected_feats,
+    )
+    _check_outputs(tmp_path, data)
+    if write_collected_feats:
+        assert (tmp_path / "train" / "collect_feats" / "feats.scp").exists()
+
+
+@pytest.mark.parametrize("collected_feats_format", ["npy", "packed"])
+def test_collect_stats_collected_feats_format(tmp_path, collected_feats_format):
+    data = _make_data(7)
+    collect_stats(
+        model=DummyModel(),
+        train_iter=_make_iter(data, 3),
+        valid_iter=_make_iter(data, 2),
+        output_dir=tmp_path,
+        ngpu=0,
+        log_interval=None,
+        write_collected_feats=True,
+        collected_feats_format=collected_feats_format,
+    )
+    reader_class = dict(npy=NpyScpReader, packed=PackedScpReader)
+    for mode in ["train", "valid"]:
+        reader = reader_class[collected_feats_format](
+            tmp_path / mode / "collect_feats" / "feats.scp"
+        )
+        assert len(reader) == len(data)
+        for k, d in data:
+            np.testing.assert_allclose(reader[k], d["x"] * 2)
+
+
+def test_collect_stats_invalid_collected_feats_format(tmp_path):
+    with pytest.raises(ValueError):
+        collect_stats(
+            model=DummyModel(),
+            train_iter=[],
+            valid_iter=[],
+            output_dir=tmp_path,
+            ngpu=0,
+            log_interval=None,
+            write_collected_feats=True,
+            collected_feats_format="foo",
+        )
+
+
+@pytest.mark.execution_timeout(30)
+def test_collect_stats_sharded(tmp_path):
+    data = _make_data(7)
+    with (tmp_path / "keys").open("w") as f:
+        for k, _ in data:
+            f.write(f"{k} dummy\n")
+
+    collect_stats_sharded(
+        model=DummyModel(),
+        build_iters=functools.partial(_build_iters, data),
+        train_key_file=str(tmp_path / "keys"),
+        valid_key_file=str(tmp_path / "keys"),
+        output_dir=tmp_path / "out",
+        ngpu=0,
+        log_interval=None,
+        write_collected_feats=False,
+        num_jobs=2,
+    )
+    _check_outputs(tmp_path / "out", data)
+    assert len(list((tmp_path / "out" / "shards").iterdir())) == 2
+
+
+def _run_with_cache(cache_path, output_dir, data, fingerprint="a", num_jobs=1):
+    cache = CollectStatsCache(cache_path, fingerprint)
+    utt2hash = {k: str(d["x"].sum()) for k, d in data}
+    cache.set_utt2hash("train", utt2hash)
+    cache.set_utt2hash("valid", utt2hash)
+    train_keys = set(cache.missing_keys("train"))
+    valid_keys = set(cache.missing_keys("valid"))
+    if num_jobs > 1:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for mode, keys in [("train", train_keys), ("valid", valid_keys)]:
+            with (output_dir / f"{mode}.keys").open("w") as f:
+                f.writelines(f"{k}\n" for k, _ in data if k in keys)
+        collect_stats_sharded(
+            model=DummyModel(),
+            build_iters=functools.partial(_build_iters, data),
+            train_key_file=str(output_dir / "train.keys"),
+            valid_key_file=str(output_dir / "valid.keys"),
+            output_dir=output_dir,
+            ngpu=0,
+            log_interval=None,
+            write_collected_feats=False,
+            num_jobs=num_jobs,
+            cache=cache,
+        )
+    else:
+        collect_stats(
+            model=DummyModel(),
+            train_iter=_make_iter([d for d in data if d[0] in train_keys], 3),
+            valid_iter=_make_iter([d for d in data if d[0] in valid_keys], 2),
+            output_dir=output_dir,
+            ngpu=0,
+            log_interval=None,
+            write_collected_feats=False,
+            cache=cache,
+        )
+    return train_keys
+
+
+def test_collect_stats_cache(tmp_path):
+    data = _make_data(7)
+    processed = _run_with_cache(tmp_path / "cache.db", tmp_path / "out1", data[:5])
+    assert len(processed) == 5
+    _check_outputs(tmp_path / "out1", data[:5])
+
+    # Only the new utterances are processed
+    processed = _run_with_cache(tmp_path / "cache.db", tmp_path / "out2", data)
+    assert processed == {"utt5", "utt6"}
+    _check_outputs(tmp_path / "out2", data)
+
+    # The changed utterances are processed
+    data[0][1]["x"] += 1
+    processed = _run_with_cache(tmp_path / "cache.db", tmp_path / "out3", data)
+    assert processed == {"utt0"}
+    _check_outputs(tmp_path / "out3", data)
+
+    # The cache is discarded if the configuration is changed
+    processed = _run_with_cache(tmp_path / "cache.db", tmp_path / "out4", data, "b")
+    assert len(processed) == 7
+
+
+@pytest.mark.execution_timeout(30)
+def test_collect_stats_sharded_cache(tmp_path):
+    data = _make_data(7)
+    _run_with_cache(tmp_path / "cache.db", tmp_path / "out1", data[:4], num_jobs=2)
+    _check_outputs(tmp_path / "out1", data[:4])
+    processed = _run_with_cache(
+        tmp_path / "cache.db", tmp_path / "out2", data, num_jobs=2
+    )
+    assert processed == {"utt4", "utt5", "utt6"}
+    _check_outputs(tmp_path / "out2", data)
+    # All utterances are cached
+    processed = _run_with_cache(
+        tmp_path / "cache.db", tmp_path / "out3", data, num_jobs=2
+    )
+    assert processed == set()
+    _check_outputs(tmp_path / "out3", data)
+
+
+def test_collect_stats_cache_with_write_collected_feats(tmp_path):
+    with pytest.raises(RuntimeError):
+        collect_stats(
+            model=DummyModel(),
+            train_iter=[],
+            valid_iter=[],
+            output_dir=tmp_path,
+            ngpu=0,
+            log_interval=None,
+            write_collected_feats=True,
+            cache=CollectStatsCache(tmp_path / "cache.db", "a"),
+        )
+
+
+def test_compute_utt2hash(tmp_path):
+    wav = tmp_path / "a.wav"
+    wav.write_bytes(b"foo")
+    with (tmp_path / "wav.scp").open("w") as f:
+        f.write(f"utt1 {wav}\nutt2 {wav}:10\n")
+    with (tmp_path / "text").open("w") as f:
+        f.write("utt1 hello\nutt2 world\n")
+    data_path_and_name_and_type = [
+        (str(tmp_path / "wav.scp"), "speech", "sound"),
+        (str(tmp_path / "text"), "text", "text"),
+    ]
+    utt2hash = compute_utt2hash(data_path_and_name_and_type)
+    assert list(utt2hash) == ["utt1", "utt2"]
+    assert utt2hash["utt1"] != utt2hash["utt2"]
+    assert compute_utt2hash(data_path_and_name_and_type) == utt2hash
+
+    # The modification of the file changes the hash
+    wav.write_bytes(b"foobar")
+    utt2hash2 = compute_utt2hash(data_path_and_name_and_type)
+    assert utt2hash2["utt1"] != utt2hash["utt1"]
+    assert utt2hash2["utt2"] != utt2hash["utt2"]
+
+
+def test_collect_stats_sharded_empty_valid(tmp_path):
+    data = _make_data(4)
+    with (tmp_path / "train.keys").open("w") as f:
+        for k, _ in data:
+            f.write(f"{k} dummy\n")
+    (tmp_path / "valid.keys").write_text("")
+
+    # Performed in the process without sub-processes
+    collect_stats_sharded(
+        model=DummyModel(),
+        build_iters=functools.partial(_build_iters, data),
+        train_key_file=str(tmp_path / "train.keys"),
+        valid_key_file=str(tmp_path / "valid.keys"),
+        output_dir=tmp_path / "out",
+        ngpu=0,
+        log_interval=None,
+        write_collected_feats=False,
+        num_jobs=2,
+    )
+    stats = np.load(tmp_path / "out" / "train" / "feats_stats.npz")
+    assert stats["count"] == sum(len(d["x"]) for _, d in data)
+    assert not (tmp_path / "out" / "shards").exists()
@@ -0,0 +1,120 @@
+from concurrent.futures.process import ProcessPoolExecutor
+from distutils.version import LooseVersion
+import multiprocessing
+
+import pytest
+import torch
+
+from espnet2.optimizers.sharded_optimizer import ShardedOptimizer
+from espnet2.train.distributed_utils import DistributedOption
+
+pytestmark = pytest.mark.skipif(
+    LooseVersion(torch.__version__) < LooseVersion("1.8.0"),
+    reason="require pytorch>=1.8",
+)
+
+
+def _build_model():
+    torch.manual_seed(0)
+    return torch.nn.Sequential(torch.nn.Linear(3, 4), torch.nn.Linear(4, 2))
+
+
+def _get_data(nsteps, world_size):
+    torch.manual_seed(1)
+    return [torch.randn(world_size, 2, 3) for _ in range(nsteps)]
+
+
+def _train(rank, world_size, init_method, nsteps, resume_state):
+    option = DistributedOption(
+        distributed=True,
+        dist_backend="gloo",
+        dist_init_method=init_method,
+        dist_world_size=world_size,
+        dist_rank=rank,
+        ngpu=0,
+    )
+    option.init()
+
+    model = _build_model()
+    dp_model = torch.nn.parallel.DistributedDataParallel(model)
+    optim = ShardedOptimizer(model.parameters(), torch.optim.Adam, lr=0.1)
+    if resume_state is not None:
+        optim.load_state_dict(resume_state)
+    for xs in _get_data(nsteps, world_size):
+        optim.zero_grad()
+        dp_model(xs[rank]).sum().backward()
+        optim.step()
+    state = optim.state_dict()
+    torch.distributed.destroy_process_group()
+    return [p.detach().clone() for p in model.parameters()], state
+
+
+def _run(tmp_path, nsteps, resume_state=None):
+    with ProcessPoolExecutor(
+        max_workers=2, mp_context=multiprocessing.get_context("spawn")
+    ) as e:
+        futures = [
+            e.submit(_train, rank, 2, f"file://{tmp_path}/init", nsteps, resume_state)
+            for rank in range(2)
+        ]
+        return [f.result() for f in futures]
+
+
+def _reference(nsteps, resume_state=None):
+    model = _build_model()
+    optim = torch.optim.Adam(model.parameters(), lr=0.1)
+    if resume_state is not None:
+        optim.load_state_dict(resume_state)
+    for xs in _get_data(nsteps, 2):
+        optim.zero_grad()
+        # DistributedDataParallel averages the gradients over the ranks
+        sum(model(x).sum() for x in xs).div(2).backward()
+        optim.step()
+    return [p.detach().clone() for p in model.parameters()], optim
+
+
+def test_ShardedOptimizer_requires_distributed():
+    model = _build_model()
+    with pytest.raises(RuntimeError):
+        ShardedOptimizer(model.parameters(), torch.optim.Adam)
+
+
+@pytest.mark.execution_timeout(30)
+def test_ShardedOptimizer_step_and_state_dict(tmp_path):
+    results = _run(tmp_path, 3)
+    ref_params, ref_optim = _reference(3)
+    ref_state = ref_optim.state_dict()
+
+    for params, state in results:
+        for p, ref_p in zip(params, ref_params):
+            torch.testing.assert_allclose(p, ref_p)
+        assert state["param_groups"] == ref_state["param_groups"]
+
+    # The state gathered to rank 0 has the same format as the non-sharded optimizer
+    state = results[0][1]
+    assert state["state"].keys() == ref_state["state"].keys()
+    for k, v in state["state"].items():
+        for k2, v2 in v.items():
+            torch.testing.assert_allclose(
+                torch.as_tensor(v2), torch.as_tensor(ref_state["state"][k][k2])
+            )
+    # The other ranks don't hold the states of the other partitions
+    assert results[1][1]["state"] == {}
+
+    # Loadable by the non-sharded optimizer
+    model = _build_model()
+    optim = torch.optim.Adam(model.parameters(), lr=0.1)
+    optim.load_state_dict(results[0][1])
+
+
+@pytest.mark.execution_timeout(30)
+def test_ShardedOptimizer_load_state_dict(tmp_path):
+    # Resume from the state of the non-sharded optimizer
+    _, ref_optim = _reference(2)
+    resume_state = ref_optim.state_dict()
+    results = _run(tmp_path, 2, resume_state)
+
+    ref_params, _ = _reference(2, resume_state)
+    for params, _ in results:
+        for p, ref_p in zip(params, ref_params):
+            torch.testing.assert_allclose(p, ref_p)
@@ -0,0 +1,43 @@
+import pytest
+
+from espnet2.samplers.packed_block_sampler import PackedBlockSampler
+
+
+def test_PackedBlockSampler():
+    # 10 blocks from 41 tokens
+    sampler = PackedBlockSampler(num_tokens=41, block_length=4, batch_size=3)
+    assert list(sampler) == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+    assert len(sampler) == 4
+    print(sampler)
+
+
+def test_PackedBlockSampler_shuffle():
+    sampler = PackedBlockSampler(
+        num_tokens=41, block_length=4, batch_size=3, shuffle=True
+    )
+    batches = sampler.generate(1)
+    assert batches == sampler.generate(1)
+    assert batches != sampler.generate(2)
+    assert sorted(sum(batches, [])) == list(range(10))
+
+
+def test_PackedBlockSampler_distributed():
+    kwargs = dict(num_tokens=41, block_length=4, batch_size=4, world_size=2)
+    batches0 = PackedBlockSampler(rank=0, **kwargs).generate(0)
+    batches1 = PackedBlockSampler(rank=1, **kwargs).generate(0)
+    assert batches0 == [[0, 2], [4, 6], [8]]
+    assert batches1 == [[1, 3], [5, 7], [9]]
+
+    # The last mini-batch is dropped if it's smaller than world_size
+    kwargs.update(batch_size=3, world_size=3)
+    assert PackedBlockSampler(rank=0, **kwargs).generate(0) == [[0], [3], [6]]
+
+
+def test_PackedBlockSampler_too_short():
+    with pytest.raises(RuntimeError):
+        PackedBlockSampler(num_tokens=4, block_length=4, batch_size=3)
+
+
+def test_PackedBlockSampler_batch_size_smaller_than_world_size():
+    with pytest.raises(RuntimeError):
+        PackedBlockSampler(num_tokens=41, block_length=4, batch_size=1, world_size=2)
@@ -1,6 +1,7 @@
 import pytest
 
 from espnet2.tasks.asr import ASRTask
+from espnet2.train.distributed_utils import DistributedOption
 
 
 def test_add_arguments():
@@ -34,3 +35,44 @@ def test_print_config_and_load_it(tmp_path):
         ASRTask.print_config(f)
     parser = ASRTask.get_parser()
     parser.parse_args(["--config", str(config_file)])
+
+
+@pytest.mark.parametrize("mode, batch_bins", [("train", 900), ("valid", 1000)])
+def test_build_iter_options_speed_perturb(mode, batch_bins):
+    parser = ASRTask.get_parser()
+    args = parser.parse_args(
+        [
+            "--batch_bins",
+            "1000",
+            "--speed_perturb_factors",
+            "0.9",
+            "1.0",
+            "1.1",
+            "--use_preprocessor",
+            "false",
+        ]
+    )
+    args.train_data_path_and_name_and_type = []
+    args.valid_data_path_and_name_and_type = []
+    iter_options = ASRTask.build_iter_options(args, DistributedOption(), mode)
+    assert iter_options.batch_bins == batch_bins
+
+
+def test_build_collect_stats_cache_fingerprint(tmp_path):
+    parser = ASRTask.get_parser()
+
+    def _fingerprint(*cmd):
+        args = parser.parse_args(
+            ["--collect_stats_cache", str(tmp_path / "cache.db")] + list(cmd)
+        )
+        return ASRTask.build_collect_stats_cache(args).fingerprint
+
+    fingerprint = _fingerprint()
+    # The options only for training don't invalidate the cache
+    assert _fingerprint("--optim", "sgd", "--max_epoch", "3") == fingerprint
+    # Neither do the options only for the speed up
+    assert _fingerprint("--feats_cache_dir", str(tmp_path / "feats")) == fingerprint
+    assert _fingerprint("--rir_cache_size", "10") == fingerprint
+    # The frontend and the preprocessing do
+    assert _fingerprint("--frontend_conf", "n_fft=256") != fingerprint
+    assert _fingerprint("--speech_volume_normalize", "0.5") != fingerprint
@@ -1,6 +1,9 @@
 import pytest
+import torch
 
+from espnet2.fileio.token_corpus import TokenCorpusWriter
 from espnet2.tasks.lm import LMTask
+from espnet2.train.distributed_utils import DistributedOption
 
 
 def test_add_arguments():
@@ -34,3 +37,59 @@ def test_print_config_and_load_it(tmp_path):
         LMTask.print_config(f)
     parser = LMTask.get_parser()
     parser.parse_args(["--config", str(config_file)])
+
+
+def test_build_task_iter_factory(tmp_path):
+    with TokenCorpusWriter(tmp_path / "corpus", vocab_size=10) as writer:
+        for _ in range(10):
+            writer.write([1, 2, 3])
+    with (tmp_path / "tokens").open("w") as f:
+        f.write("<blank>\n<unk>\na\nb\nc\nd\ne\nf\ng\n<sos/eos>\n")
+    corpus = f"{tmp_path / 'corpus'},packed_text,token_corpus"
+    args = LMTask.get_parser().parse_args(
+        [
+            "--token_list",
+            str(tmp_path / "tokens"),
+            "--token_type",
+            "char",
+            "--iterator_type",
+            "task",
+            "--train_data_path_and_name_and_type",
+            corpus,
+            "--valid_data_path_and_name_and_type",
+            corpus,
+            "--packed_block_length",
+            "8",
+            "--batch_size",
+            "2",
+        ]
+    )
+    iter_factory = LMTask.build_iter_factory(args, DistributedOption(), "train")
+    batches = list(iter_factory.build_iter(1))
+    # 41 tokens -> 5 blocks
+    assert len(batches) == 3
+    blocks = torch.cat([batch["packed_text"] for _, batch in batches])
+    assert blocks.shape == (5, 9)
+    assert "packed_text_lengths" not in batches[0][1]
+
+    model = LMTask.build_model(args)
+    model(**batches[0][1])
+
+
+def test_build_task_iter_factory_without_corpus(tmp_path):
+    with (tmp_path / "tokens").open("w") as f:
+        f.write("<blank>\n<unk>\na\n<sos/eos>\n")
+    args = LMTask.get_parser().parse_args(
+        [
+            "--token_list",
+            str(tmp_path / "tokens"),
+            "--token_type",
+            "char",
+            "--iterator_type",
+            "task",
+            "--train_data_path_and_name_and_type",
+            "text,text,text",
+        ]
+    )
+    with pytest.raises(RuntimeError):
+        LMTask.build_iter_factory(args, DistributedOption(), "train")
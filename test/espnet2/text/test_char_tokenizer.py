@@ -25,3 +25,9 @@ def test_text2tokens(char_tokenizer: CharTokenizer):
 
 def test_token2text(char_tokenizer: CharTokenizer):
     assert char_tokenizer.tokens2text(["a", "b", "c"]) == "abc"
+
+
+def test_batch_text2tokens(char_tokenizer: CharTokenizer):
+    tokens_list = char_tokenizer.batch_text2tokens(["a[foo]", "b c"])
+    assert tokens_list == [["a", "[foo]"], ["b", "<space>", "c"]]
+    assert char_tokenizer.batch_tokens2text(tokens_list) == ["a[foo]", "b c"]
@@ -54,3 +54,11 @@ def test_repr(spm_tokenizer: SentencepiecesTokenizer):
 
 def test_text2tokens(spm_tokenizer: SentencepiecesTokenizer):
     assert spm_tokenizer.tokens2text(spm_tokenizer.text2tokens("Hello")) == "Hello"
+
+
+def test_batch_text2tokens(spm_tokenizer: SentencepiecesTokenizer):
+    lines = ["Hello", "", "world"]
+    tokens_list = spm_tokenizer.batch_text2tokens(lines)
+    assert tokens_list == [spm_tokenizer.text2tokens(line) for line in lines]
+    assert spm_tokenizer.batch_tokens2text(tokens_list) == lines
+    assert spm_tokenizer.batch_text2tokens([]) == []
@@ -0,0 +1,84 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from espnet2.text.token_cache import TokenCache
+
+
+class CountingText2Ids:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, text):
+        self.count += 1
+        return np.array([len(w) for w in text.split()])
+
+    def batch(self, texts):
+        return [self(text) for text in texts]
+
+
+def test_TokenCache_lru():
+    text2ids = CountingText2Ids()
+    cache = TokenCache("a", max_size=2)
+    for text in ["a bb", "ccc", "a bb", "dddd", "ccc"]:
+        ids = cache(text, text2ids)
+        np.testing.assert_array_equal(ids, [len(w) for w in text.split()])
+        assert ids.dtype == np.int64
+    # "a bb" hits the cache
+    assert text2ids.count == 4
+    assert list(cache.lru) == ["dddd", "ccc"]
+
+
+def test_TokenCache_returns_copy():
+    cache = TokenCache("a")
+    cache("a bb", CountingText2Ids())[:] = 0
+    np.testing.assert_array_equal(cache.get("a bb"), [1, 2])
+
+
+def test_TokenCache_persistent(tmp_path):
+    text2ids = CountingText2Ids()
+    cache = TokenCache("a", tmp_path / "cache.db", max_size=0)
+    cache("a bb", text2ids)
+    cache.commit()
+
+    # Reopened e.g. in a DataLoader worker
+    cache = pickle.loads(pickle.dumps(cache))
+    np.testing.assert_array_equal(cache("a bb", text2ids), [1, 2])
+    assert text2ids.count == 1
+
+    # The different fingerprint doesn't share the entries
+    assert TokenCache("b", tmp_path / "cache.db").get("a bb") is None
+
+
+def test_TokenCache_precompute(tmp_path):
+    text2ids = CountingText2Ids()
+    cache = TokenCache("a", tmp_path / "cache.db")
+    texts = ["a bb", "ccc", "a bb", "dddd", "e"]
+    assert cache.precompute(texts, text2ids.batch, batch_size=2) == 4
+    assert text2ids.count == 4
+    cache = TokenCache("a", tmp_path / "cache.db")
+    assert cache.precompute(["ccc"], text2ids.batch) == 0
+    np.testing.assert_array_equal(
+        TokenCache("a", tmp_path / "cache.db").get("ccc"), [3]
+    )
+
+
+def test_TokenCache_precompute_without_path():
+    with pytest.raises(RuntimeError):
+        TokenCache("a").precompute(["a"], CountingText2Ids().batch)
+
+
+def test_TokenCache_doesnt_hold_lock(tmp_path):
+    text2ids = CountingText2Ids()
+    cache = TokenCache("a", tmp_path / "cache.db", commit_interval=10)
+    cache("a bb", text2ids)
+    assert len(cache.pending) == 1
+    # Another connection can write while the first one has pending entries
+    cache2 = TokenCache("a", tmp_path / "cache.db", commit_interval=1)
+    cache2.conn.execute("PRAGMA busy_timeout = 100")
+    cache2("ccc", text2ids)
+    assert len(cache2.pending) == 0
+
+    cache.commit()
+    assert TokenCache("a", tmp_path / "cache.db").get("a bb") is not None
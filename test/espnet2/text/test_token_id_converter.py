@@ -16,6 +16,27 @@ def test_idstokens():
     assert converter.ids2tokens([0, 1, 2]) == ["a", "b", "c"]
 
 
+def test_idstokens_ndarray():
+    converter = TokenIDConverter(["a", "b", "c", "<unk>"])
+    assert converter.ids2tokens(np.array([2, 0])) == ["c", "a"]
+    assert converter.ids2tokens([]) == []
+
+
+def test_batch_tokens2ids():
+    converter = TokenIDConverter(["a", "b", "c", "<unk>"])
+    assert converter.batch_tokens2ids(["abc", "", "ad"]) == [[0, 1, 2], [], [0, 3]]
+
+
+def test_batch_idstokens():
+    converter = TokenIDConverter(["a", "b", "c", "<unk>"])
+    assert converter.batch_ids2tokens([[0, 1], np.array([], dtype=int), [2]]) == [
+        ["a", "b"],
+        [],
+        ["c"],
+    ]
+    assert converter.batch_ids2tokens([]) == []
+
+
 def test_get_num_vocabulary_size():
     converter = TokenIDConverter(["a", "b", "c", "<unk>"])
     assert converter.get_num_vocabulary_size() == 4
@@ -45,3 +66,9 @@ def test_input_2dim_array():
     converter = TokenIDConverter(["a", "b", "c", "<unk>"])
     with pytest.raises(ValueError):
         converter.ids2tokens(np.random.randn(2, 2))
+
+
+def test_batch_input_2dim_array():
+    converter = TokenIDConverter(["a", "b", "c", "<unk>"])
+    with pytest.raises(ValueError):
+        converter.batch_ids2tokens([[0], np.zeros((2, 2), dtype=int)])
@@ -0,0 +1,28 @@
+import torch
+
+from espnet2.torch_utils.mask_conv_inputs import mask_conv_inputs
+
+
+def test_mask_conv_inputs():
+    conv = torch.nn.Sequential(
+        torch.nn.Conv1d(2, 2, 3, padding=1),
+        torch.nn.ReLU(),
+        torch.nn.Conv1d(2, 2, 3, padding=1),
+    )
+    x = torch.randn(2, 2, 5)
+    lengths = torch.tensor([5, 3])
+    with mask_conv_inputs([conv, None], lengths):
+        y = conv(x)
+    torch.testing.assert_allclose(y[0], conv(x[:1])[0])
+    torch.testing.assert_allclose(y[1, :, :3], conv(x[1:, :, :3])[0])
+
+    # The hooks are removed
+    assert all(len(m._forward_pre_hooks) == 0 for m in conv.modules())
+
+
+def test_mask_conv_inputs_none():
+    conv = torch.nn.Conv1d(2, 2, 3, padding=1)
+    x = torch.randn(2, 2, 5)
+    with mask_conv_inputs([conv], None):
+        y = conv(x)
+    torch.testing.assert_allclose(y, conv(x))
@@ -0,0 +1,54 @@
+import sys
+
+import pytest
+
+from espnet2.asr.encoder.abs_encoder import AbsEncoder
+from espnet2.asr.encoder.rnn_encoder import RNNEncoder
+from espnet2.layers.abs_normalize import AbsNormalize
+from espnet2.train.class_choices import ClassChoices
+
+
+def test_ClassChoices_get_class():
+    choices = ClassChoices("encoder", dict(rnn=RNNEncoder), default="rnn")
+    assert choices.get_class("rnn") is RNNEncoder
+    assert choices.get_class("RNN") is RNNEncoder
+    assert choices.get_class(None) is None
+
+
+def test_ClassChoices_lazy():
+    choices = ClassChoices(
+        "normalize",
+        dict(global_mvn="espnet2.layers.global_mvn:GlobalMVN"),
+        type_check=AbsNormalize,
+    )
+    assert choices.choices() == ("global_mvn", None)
+    class_obj = choices.get_class("global_mvn")
+    assert class_obj is sys.modules["espnet2.layers.global_mvn"].GlobalMVN
+    # The class is cached
+    assert choices.classes["global_mvn"] is class_obj
+
+
+def test_ClassChoices_lazy_type_check():
+    choices = ClassChoices(
+        "encoder",
+        dict(mvn="espnet2.layers.global_mvn:GlobalMVN"),
+        type_check=AbsEncoder,
+    )
+    with pytest.raises(ValueError):
+        choices.get_class("mvn")
+
+
+def test_ClassChoices_invalid_name():
+    with pytest.raises(ValueError):
+        ClassChoices("encoder", dict(rnn="espnet2.asr.encoder.rnn_encoder"))
+
+
+def test_ClassChoices_type_check():
+    with pytest.raises(ValueError):
+        ClassChoices("encoder", dict(rnn=RNNEncoder), type_check=AbsNormalize)
+
+
+def test_ClassChoices_unknown():
+    choices = ClassChoices("encoder", dict(rnn=RNNEncoder), default="rnn")
+    with pytest.raises(ValueError):
+        choices.get_class("transformer")
@@ -1,6 +1,10 @@
+import pickle
+
 import numpy as np
 import pytest
+import torch
 
+from espnet2.train.collate_fn import BufferPool
 from espnet2.train.collate_fn import common_collate_fn
 from espnet2.train.collate_fn import CommonCollateFn
 
@@ -121,3 +125,78 @@ def test_CommonCollateFn_repr(float_pad_value, int_pad_value, not_sequence):
             not_sequence=not_sequence,
         )
     )
+
+
+@pytest.mark.parametrize("num_buffers", [1, 2])
+def test_CommonCollateFn_buffer_pool(num_buffers):
+    _common_collate_fn = CommonCollateFn(
+        float_pad_value=-1.0, int_pad_value=-1, num_buffers=num_buffers
+    )
+    ptrs = []
+    for lengths in [(4, 3), (3, 2), (4, 1), (2, 2)]:
+        data = [
+            (
+                f"id{i}",
+                dict(
+                    a=np.random.randn(n, 5).astype(np.float32),
+                    b=np.random.randint(0, 10, n),
+                ),
+            )
+            for i, n in enumerate(lengths)
+        ]
+        t = _common_collate_fn(data)
+        desired = common_collate_fn(data, float_pad_value=-1.0, int_pad_value=-1)
+        for k, v in desired[1].items():
+            assert t[1][k].dtype == v.dtype
+            np.testing.assert_array_equal(t[1][k].numpy(), v.numpy())
+        ptrs.append(t[1]["a"].data_ptr())
+
+    # The buffer allocated for the first mini-batch is reused
+    assert ptrs[num_buffers] == ptrs[0]
+
+
+def test_BufferPool_pickle():
+    pool = BufferPool(2)
+    pool.get("a", (2, 3), torch.float32)
+    pool2 = pickle.loads(pickle.dumps(pool))
+    assert pool2.buffers == {}
+    assert pool2.num_buffers == 2
+
+
+def test_BufferPool_invalid_num_buffers():
+    with pytest.raises(ValueError):
+        BufferPool(0)
+
+
+def test_common_collate_fn_sort_key():
+    data = [
+        ("id", dict(a=np.random.randn(2, 5), b=np.random.randn(4))),
+        ("id2", dict(a=np.random.randn(3, 5), b=np.random.randn(3))),
+    ]
+    uttids, t = CommonCollateFn(sort_key="a")(data)
+    assert uttids == ["id2", "id"]
+    np.testing.assert_array_equal(t["a_lengths"].numpy(), [3, 2])
+    np.testing.assert_array_equal(t["b_lengths"].numpy(), [3, 4])
+    np.testing.assert_array_equal(t["b"][0].numpy(), data[1][1]["b"].tolist() + [0])
+
+
+class _CollateDataset(torch.utils.data.Dataset):
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, i):
+        return str(i), dict(a=np.full((i + 1, 2), i, dtype=np.float32))
+
+
+def test_CommonCollateFn_buffer_pool_ignored_in_workers():
+    collate_fn = CommonCollateFn(num_buffers=1)
+    loader = torch.utils.data.DataLoader(
+        _CollateDataset(),
+        batch_sampler=[[0, 1], [2, 3]],
+        num_workers=1,
+        collate_fn=collate_fn,
+    )
+    batches = [b for _, b in loader]
+    # The first batch is not overwritten by the second one
+    np.testing.assert_array_equal(batches[0]["a"][1].numpy(), np.ones((2, 2)))
+    np.testing.assert_array_equal(batches[1]["a"][0, :3].numpy(), np.full((3, 2), 2))
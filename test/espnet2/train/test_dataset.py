@@ -4,8 +4,11 @@ import numpy as np
 import pytest
 
 from espnet2.fileio.npy_scp import NpyScpWriter
+from espnet2.fileio.packed_scp import PackedScpWriter
 from espnet2.fileio.sound_scp import SoundScpWriter
+from espnet2.fileio.token_corpus import TokenCorpusWriter
 from espnet2.train.dataset import ESPnetDataset
+from espnet2.train.dataset import PackedTokenDataset
 
 
 def preprocess(id: str, data):
@@ -106,6 +109,28 @@ def test_ESPnetDataset_npy_scp(npy_scp):
     )
 
 
+@pytest.fixture
+def packed_scp(tmp_path):
+    p = tmp_path / "packed.scp"
+    with PackedScpWriter(tmp_path / "data.bin", p) as w:
+        w["a"] = np.random.randn(100, 1).astype(np.float32)
+        w["b"] = np.random.randn(150, 1).astype(np.float32)
+    return str(p)
+
+
+def test_ESPnetDataset_packed_scp(packed_scp):
+    dataset = ESPnetDataset(
+        path_name_type_list=[(packed_scp, "pitch", "packed")],
+        preprocess=preprocess,
+    )
+
+    _, data = dataset["a"]
+    assert data["pitch"].shape == (100, 1)
+
+    _, data = dataset["b"]
+    assert data["pitch"].shape == (150, 1)
+
+
 @pytest.fixture
 def h5file_1(tmp_path):
     p = tmp_path / "file.h5"
@@ -289,3 +314,20 @@ def test_ESPnetDataset_csv_int(csv_int):
 
     _, data = dataset["b"]
     assert tuple(data["data8"]) == (2, 3, 4)
+
+
+def test_PackedTokenDataset(tmp_path):
+    with TokenCorpusWriter(tmp_path / "corpus", vocab_size=10) as writer:
+        writer.write([1, 2, 3])
+        writer.write([4, 5])
+    dataset = PackedTokenDataset(str(tmp_path / "corpus"), block_length=3)
+    assert len(dataset) == 2
+    assert dataset.names() == ("packed_text",)
+    assert dataset.has_name("packed_text")
+    print(dataset)
+
+    # The blocks overlap by one token for the target
+    key, data = dataset["1"]
+    assert key == "1"
+    assert data["packed_text"].dtype == np.int64
+    np.testing.assert_array_equal(data["packed_text"], [3, 9, 4, 5])
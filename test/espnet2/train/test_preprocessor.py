@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+import scipy.signal
+import soundfile
+
+from espnet2.train.preprocessor import CommonPreprocessor
+from espnet2.train.preprocessor import overlap_add_convolve
+from espnet2.train.preprocessor import rir_spectrum
+from espnet2.train.preprocessor import speed_perturb
+from espnet2.train.preprocessor import speed_perturb_kernel
+
+
+@pytest.mark.parametrize(
+    "x_shape, rir_shape",
+    [
+        ((1, 1000), (1, 100)),
+        ((1, 50), (1, 300)),
+        ((2, 1000), (1, 33)),
+        ((1, 700), (3, 64)),
+    ],
+)
+def test_overlap_add_convolve(x_shape, rir_shape):
+    rng = np.random.RandomState(0)
+    x = rng.randn(*x_shape)
+    rir = rng.randn(*rir_shape)
+    y = overlap_add_convolve(x, rir_spectrum(rir), rir.shape[-1])
+    desired = scipy.signal.convolve(x, rir, mode="full")[:, : x.shape[-1]]
+    np.testing.assert_allclose(y, desired, atol=1e-10)
+
+
+@pytest.fixture()
+def scps(tmp_path):
+    rng = np.random.RandomState(0)
+    for name, lengths in [("rir", [100, 200]), ("noise", [500, 3000])]:
+        with (tmp_path / f"{name}.scp").open("w") as f:
+            for i, length in enumerate(lengths):
+                path = tmp_path / f"{name}{i}.wav"
+                signal = rng.uniform(-0.1, 0.1, length)
+                soundfile.write(str(path), signal, 16000, subtype="FLOAT")
+                f.write(f"{name}{i} {path}\n")
+    return str(tmp_path / "rir.scp"), str(tmp_path / "noise.scp")
+
+
+@pytest.mark.parametrize("use_bank", [False, True])
+def test_CommonPreprocessor_augmentation(tmp_path, scps, use_bank):
+    rir_scp, noise_scp = scps
+    preprocessor = CommonPreprocessor(
+        train=True,
+        rir_scp=rir_scp,
+        noise_scp=noise_scp,
+        augmentation_bank_dir=tmp_path / "bank" if use_bank else None,
+    )
+    speech = np.random.RandomState(1).uniform(-0.5, 0.5, 1000)
+    for _ in range(5):
+        data = preprocessor("utt", dict(speech=speech.copy()))
+        assert data["speech"].shape == (1000, 1)
+        assert not np.allclose(data["speech"][:, 0], speech)
+    assert 1 <= len(preprocessor.rir_cache) <= 2
+
+
+def test_CommonPreprocessor_augmentation_same_as_bank(tmp_path, scps):
+    rir_scp, noise_scp = scps
+    speech = np.random.RandomState(1).uniform(-0.5, 0.5, 1000)
+    outputs = []
+    for bank_dir in [None, tmp_path / "bank"]:
+        preprocessor = CommonPreprocessor(
+            train=True,
+            rir_scp=rir_scp,
+            noise_scp=noise_scp,
+            augmentation_bank_dir=bank_dir,
+        )
+        np.random.seed(0)
+        outputs.append(preprocessor("utt", dict(speech=speech.copy()))["speech"])
+    # The noise is stored as float32 in the bank
+    np.testing.assert_allclose(outputs[0], outputs[1], atol=1e-6)
+
+
+def test_CommonPreprocessor_rir_cache_size(scps):
+    rir_scp, noise_scp = scps
+    preprocessor = CommonPreprocessor(
+        train=True, rir_scp=rir_scp, noise_scp=noise_scp, rir_cache_size=1
+    )
+    for _ in range(5):
+        preprocessor("utt", dict(speech=np.random.randn(1000)))
+    assert len(preprocessor.rir_cache) == 1
+
+
+@pytest.mark.parametrize("factor, length", [(0.9, 1113), (1.0, 1001), (1.1, 910)])
+def test_speed_perturb(factor, length):
+    x = np.random.RandomState(0).randn(1001, 2)
+    kernel = speed_perturb_kernel(factor)
+    y = speed_perturb(x, kernel)
+    assert y.shape == (length, 2)
+    if factor != 1.0:
+        np.testing.assert_allclose(
+            y, scipy.signal.resample_poly(x, kernel[0], kernel[1], axis=0)
+        )
+
+
+def test_speed_perturb_kernel_invalid_factor():
+    with pytest.raises(ValueError):
+        CommonPreprocessor(train=True, speed_perturb_factors=[0.0, 1.0])
+
+
+@pytest.mark.parametrize("train", [True, False])
+def test_CommonPreprocessor_speed_perturb(train):
+    preprocessor = CommonPreprocessor(
+        train=train, speed_perturb_factors=[0.9, 1.0, 1.1]
+    )
+    speech = np.random.RandomState(0).randn(1001).astype(np.float32)
+    lengths = set()
+    for _ in range(30):
+        lengths.add(len(preprocessor("utt", dict(speech=speech))["speech"]))
+    assert lengths == ({1113, 1001, 910} if train else {1001})
+
+
+def test_CommonPreprocessor_token_cache(tmp_path):
+    token_list = ["<blank>", "<unk>", "a", "b", "c"]
+    preprocessor = CommonPreprocessor(
+        train=True,
+        token_type="char",
+        token_list=token_list,
+        token_cache_size=10,
+        token_cache_path=tmp_path / "cache.db",
+    )
+    data = preprocessor("utt", dict(text="abd"))
+    np.testing.assert_array_equal(data["text"], [2, 3, 1])
+    assert "abd" in preprocessor.token_cache.lru
+    np.testing.assert_array_equal(
+        preprocessor("utt", dict(text="abd"))["text"], [2, 3, 1]
+    )
+
+    # The fingerprint depends on the token list
+    preprocessor2 = CommonPreprocessor(
+        train=True,
+        token_type="char",
+        token_list=token_list[::-1],
+        token_cache_path=tmp_path / "cache.db",
+    )
+    assert preprocessor2.token_cache.fingerprint != preprocessor.token_cache.fingerprint
+    np.testing.assert_array_equal(
+        preprocessor2("utt", dict(text="abd"))["text"], [2, 1, 3]
+    )
@@ -1,6 +1,7 @@
 from distutils.version import LooseVersion
 import logging
 from pathlib import Path
+import time
 import uuid
 
 import numpy as np
@@ -464,3 +465,18 @@ def test_measure_iter_time():
     with reporter.observe("train", 2) as sub:
         for _ in sub.measure_iter_time(range(3), "foo"):
             sub.next()
+
+
+def test_measure_iter_time_includes_iter_start():
+    class SlowStart:
+        def __iter__(self):
+            time.sleep(0.05)
+            return iter(range(3))
+
+    reporter = Reporter()
+    with reporter.observe("train", 1) as sub:
+        for _ in sub.measure_iter_time(SlowStart(), "foo"):
+            sub.next()
+    values = [v.value for v in sub.stats["foo"]]
+    assert values[0] >= 0.05
+    assert all(v < 0.05 for v in values[1:])
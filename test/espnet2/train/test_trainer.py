@@ -0,0 +1,176 @@
+from concurrent.futures.process import ProcessPoolExecutor
+import multiprocessing
+
+import pytest
+import torch
+
+from espnet2.torch_utils.device_funcs import force_gatherable
+from espnet2.train.abs_espnet_model import AbsESPnetModel
+from espnet2.train.distributed_utils import DistributedOption
+from espnet2.train.reporter import Reporter
+from espnet2.train.trainer import Trainer
+from espnet2.train.trainer import TrainerOptions
+
+
+class DummyModel(AbsESPnetModel):
+    def __init__(self):
+        super().__init__()
+        self.linear = torch.nn.Linear(3, 1)
+
+    def forward(self, x, y):
+        loss = ((self.linear(x).squeeze(-1) - y) ** 2).mean()
+        stats = dict(loss=loss.detach())
+        return force_gatherable((loss, stats, x.size(0)), loss.device)
+
+    def collect_feats(self, x, y):
+        return {}
+
+
+def _train_one_epoch(rank, world_size, init_method, accum_grad, niter):
+    option = DistributedOption(
+        distributed=True,
+        dist_backend="gloo",
+        dist_init_method=init_method,
+        dist_world_size=world_size,
+        dist_rank=rank,
+        ngpu=0,
+    )
+    option.init()
+
+    torch.manual_seed(0)
+    model = DummyModel()
+    dp_model = torch.nn.parallel.DistributedDataParallel(model)
+
+    counter = []
+
+    def counting_hook(state, bucket):
+        # Count the number of all-reduce calls.
+        # NOTE: Work.get_future() is not implemented for gloo in some versions,
+        # so perform all_reduce synchronously and return a completed future.
+        counter.append(1)
+        if hasattr(bucket, "buffer"):
+            tensor = bucket.buffer()
+        else:
+            tensor = bucket.get_tensors()[0]
+        torch.distributed.all_reduce(tensor)
+        tensor /= world_size
+        fut = torch.futures.Future()
+        fut.set_result(tensor if hasattr(bucket, "buffer") else [tensor])
+        return fut
+
+    dp_model.register_comm_hook(None, counting_hook)
+
+    # Give different data to each rank
+    torch.manual_seed(rank + 1)
+    iterator = [
+        ([f"{rank}_{i}"], dict(x=torch.randn(2, 3), y=torch.randn(2)))
+        for i in range(niter)
+    ]
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.1)
+    options = TrainerOptions(
+        ngpu=0,
+        train_dtype="float32",
+        grad_noise=False,
+        accum_grad=accum_grad,
+        grad_clip=1000.0,
+        grad_clip_type=2.0,
+        log_interval=None,
+        no_forward_run=False,
+        use_tensorboard=False,
+        use_wandb=False,
+    )
+    reporter = Reporter()
+    reporter.set_epoch(1)
+    with reporter.observe("train") as sub_reporter:
+        Trainer.train_one_epoch(
+            model=dp_model,
+            iterator=iterator,
+            optimizers=[optimizer],
+            schedulers=[None],
+            scaler=None,
+            reporter=sub_reporter,
+            summary_writer=None,
+            options=options,
+        )
+    torch.distributed.destroy_process_group()
+    return (
+        len(counter),
+        [p.detach().clone() for p in model.parameters()],
+        reporter.get_value("train", "loss"),
+    )
+
+
+@pytest.mark.execution_timeout(30)
+@pytest.mark.parametrize("accum_grad", [1, 2, 4])
+def test_train_one_epoch_all_reduce_only_at_accum_boundary(tmp_path, accum_grad):
+    if not hasattr(torch.nn.parallel.DistributedDataParallel, "register_comm_hook"):
+        pytest.skip("Require DistributedDataParallel.register_comm_hook")
+    niter = 8
+    init_method = f"file://{tmp_path}/init"
+    with ProcessPoolExecutor(
+        max_workers=2, mp_context=multiprocessing.get_context("spawn")
+    ) as e:
+        futures = [
+            e.submit(_train_one_epoch, rank, 2, init_method, accum_grad, niter)
+            for rank in range(2)
+        ]
+        results = [f.result() for f in futures]
+
+    for count, params, loss in results:
+        # One bucket for this small model
+        assert count == niter // accum_grad
+    # The models are updated with the same gradients in all ranks
+    for p0, p1 in zip(results[0][1], results[1][1]):
+        torch.testing.assert_allclose(p0, p1)
+    # The stats are averaged over all ranks
+    assert results[0][2] == pytest.approx(results[1][2])
+
+
+class UttIdModel(DummyModel):
+    requires_utt_id = True
+
+    def __init__(self):
+        super().__init__()
+        self.utt_ids = []
+
+    def forward(self, x, y, utt_id):
+        self.utt_ids.append(utt_id)
+        return super().forward(x, y)
+
+
+def test_train_one_epoch_pass_utt_id():
+    model = UttIdModel()
+    iterator = [
+        ([f"a{i}", f"b{i}"], dict(x=torch.randn(2, 3), y=torch.randn(2)))
+        for i in range(2)
+    ]
+    options = TrainerOptions(
+        ngpu=0,
+        train_dtype="float32",
+        grad_noise=False,
+        accum_grad=1,
+        grad_clip=1000.0,
+        grad_clip_type=2.0,
+        log_interval=None,
+        no_forward_run=False,
+        use_tensorboard=False,
+        use_wandb=False,
+    )
+    reporter = Reporter()
+    reporter.set_epoch(1)
+    with reporter.observe("train") as sub_reporter:
+        Trainer.train_one_epoch(
+            model=model,
+            iterator=iterator,
+            optimizers=[torch.optim.SGD(model.parameters(), lr=0.1)],
+            schedulers=[None],
+            scaler=None,
+            reporter=sub_reporter,
+            summary_writer=None,
+            options=options,
+        )
+    with reporter.observe("valid") as sub_reporter:
+        Trainer.validate_one_epoch(
+            model=model, iterator=iterator, reporter=sub_reporter, options=options
+        )
+    assert model.utt_ids == [["a0", "b0"], ["a1", "b1"]] * 2
@@ -100,3 +100,75 @@ def test_fastspeech2(
         inputs.update(pitch=torch.tensor([2, 2, 0], dtype=torch.float).unsqueeze(-1))
         inputs.update(energy=torch.tensor([2, 2, 0], dtype=torch.float).unsqueeze(-1))
         model.inference(**inputs, use_teacher_forcing=True)
+
+
+@pytest.mark.parametrize("reduction_factor", [1, 3])
+@pytest.mark.parametrize("encoder_type", ["transformer", "conformer"])
+@pytest.mark.parametrize("decoder_type", ["transformer", "conformer"])
+@pytest.mark.parametrize("alpha", [1.0, 1.3])
+def test_fastspeech2_batch_inference(
+    reduction_factor, encoder_type, decoder_type, alpha
+):
+    torch.manual_seed(0)
+    model = FastSpeech2(
+        idim=10,
+        odim=5,
+        adim=4,
+        aheads=2,
+        elayers=1,
+        eunits=4,
+        dlayers=1,
+        dunits=4,
+        postnet_layers=2,
+        postnet_chans=4,
+        postnet_filts=5,
+        positionwise_conv_kernel_size=3,
+        duration_predictor_chans=4,
+        pitch_embed_kernel_size=9,
+        energy_embed_kernel_size=9,
+        reduction_factor=reduction_factor,
+        encoder_type=encoder_type,
+        decoder_type=decoder_type,
+        conformer_pos_enc_layer_type="abs_pos",
+        conformer_self_attn_layer_type="selfattn",
+        spk_embed_dim=2,
+    )
+    model.eval()
+    assert model.supports_batch_inference
+    # Predict the durations of 2 or 3 frames
+    torch.nn.init.constant_(model.duration_predictor.linear.bias, 1.3)
+
+    texts = [torch.randint(1, 9, (n,)) for n in [5, 2, 4]]
+    text = torch.zeros(3, 5, dtype=torch.long)
+    for i, t in enumerate(texts):
+        text[i, : len(t)] = t
+    text_lengths = torch.tensor([len(t) for t in texts])
+    spembs = torch.randn(3, 2)
+    with torch.no_grad():
+        outs, olens = model.batch_inference(text, text_lengths, spembs, alpha=alpha)
+        for i, t in enumerate(texts):
+            out, _, _ = model.inference(t, spembs=spembs[i], alpha=alpha)
+            assert olens[i] == len(out)
+            torch.testing.assert_allclose(outs[i, : olens[i]], out)
+
+
+def test_fastspeech2_batch_inference_rel_pos():
+    model = FastSpeech2(
+        idim=10,
+        odim=5,
+        adim=4,
+        aheads=2,
+        elayers=1,
+        eunits=4,
+        dlayers=1,
+        dunits=4,
+        encoder_type="conformer",
+        decoder_type="conformer",
+        conformer_pos_enc_layer_type="rel_pos",
+        conformer_self_attn_layer_type="rel_selfattn",
+    )
+    assert not model.supports_batch_inference
+    with pytest.raises(NotImplementedError):
+        model.batch_inference(
+            torch.randint(1, 9, (2, 3)), torch.tensor([3, 2], dtype=torch.long)
+        )
@@ -79,6 +79,14 @@ def test_tacotron2(
             inputs.update(spembs=torch.randn(spk_embed_dim))
         model.inference(**inputs, maxlenratio=1.0)
 
+        # attention constraint
+        model.inference(
+            **inputs,
+            maxlenratio=1.0,
+            use_att_constraint=True,
+            windowed_att_constraint=True,
+        )
+
         # teacher forcing
         inputs.update(speech=torch.randn(5, 5))
         model.inference(**inputs, use_teacher_forcing=True)
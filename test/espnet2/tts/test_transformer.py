@@ -96,3 +96,79 @@ def test_tranformer(
         # teacher forcing
         inputs.update(speech=torch.randn(5, 5))
         model.inference(**inputs, use_teacher_forcing=True)
+
+
+def _inference_without_cache(model, text, maxlen):
+    # The step-by-step decoding which recomputes all the previous frames
+    from espnet.nets.pytorch_backend.transformer.mask import subsequent_mask
+
+    x = torch.nn.functional.pad(text, [0, 1], "constant", model.eos)
+    hs, _ = model.encoder(x.unsqueeze(0), None)
+    ys = hs.new_zeros(1, 1, model.odim)
+    outs, att_ws = [], []
+    for idx in range(1, maxlen + 1):
+        y_masks = subsequent_mask(idx).unsqueeze(0)
+        z, _ = model.decoder.forward_one_step(ys, y_masks, hs)
+        outs += [model.feat_out(z).view(model.reduction_factor, model.odim)]
+        ys = torch.cat((ys, outs[-1][-1].view(1, 1, model.odim)), dim=1)
+        att_ws += [
+            torch.stack([m.src_attn.attn[0, :, -1] for m in model.decoder.decoders])
+        ]
+    return torch.cat(outs, dim=0), torch.stack(att_ws, dim=2)
+
+
+@pytest.mark.parametrize("use_scaled_pos_enc", [True, False])
+@pytest.mark.parametrize("decoder_normalize_before", [True, False])
+@pytest.mark.parametrize("decoder_concat_after", [True, False])
+@pytest.mark.parametrize("reduction_factor", [1, 3])
+def test_transformer_cached_inference(
+    use_scaled_pos_enc,
+    decoder_normalize_before,
+    decoder_concat_after,
+    reduction_factor,
+):
+    model = Transformer(
+        idim=10,
+        odim=5,
+        embed_dim=4,
+        eprenet_conv_layers=0,
+        dprenet_layers=1,
+        dprenet_units=4,
+        elayers=1,
+        eunits=6,
+        adim=4,
+        aheads=2,
+        dlayers=2,
+        dunits=4,
+        postnet_layers=0,
+        use_scaled_pos_enc=use_scaled_pos_enc,
+        decoder_normalize_before=decoder_normalize_before,
+        decoder_concat_after=decoder_concat_after,
+        reduction_factor=reduction_factor,
+        dprenet_dropout_rate=0.0,
+    )
+    model.eval()
+    text = torch.randint(0, 9, (4,))
+    with torch.no_grad():
+        # threshold > 1 never stops the generation until maxlen
+        outs, probs, att_ws = model.inference(text, threshold=1.1, maxlenratio=2.0)
+        maxlen = int(5 * 2.0 / reduction_factor)
+        expected_outs, expected_att_ws = _inference_without_cache(model, text, maxlen)
+        assert outs.shape == (maxlen * reduction_factor, 5)
+        assert probs.shape == (maxlen * reduction_factor,)
+        assert att_ws.shape == (2, 2, maxlen, 5)
+        torch.testing.assert_allclose(outs, expected_outs)
+        torch.testing.assert_allclose(att_ws, expected_att_ws)
+
+        outs2, _, att_ws2 = model.inference(
+            text, threshold=1.1, maxlenratio=2.0, return_att_ws=False
+        )
+        assert att_ws2 is None
+        torch.testing.assert_allclose(outs2, outs)
+        _, _, att_ws2 = model.inference(
+            text,
+            speech=torch.randn(3, 5),
+            use_teacher_forcing=True,
+            return_att_ws=False,
+        )
+        assert att_ws2 is None
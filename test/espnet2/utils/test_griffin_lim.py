@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+import torch
+
+from espnet.nets.pytorch_backend.nets_utils import pad_list
+from espnet2.utils.griffin_lim import GriffinLim
+from espnet2.utils.griffin_lim import inv_mel_basis
+from espnet2.utils.griffin_lim import Spectrogram2Waveform
+
+
+def _spectrogram(n_frames, n_fft=64, n_shift=16):
+    # Magnitude of STFT of a chirp (T, n_fft // 2 + 1)
+    t = np.arange((n_frames - 1) * n_shift) / 8000
+    wav = np.sin(2 * np.pi * (200 + 1000 * t) * t).astype(np.float32)
+    spc = torch.stft(
+        torch.tensor(wav),
+        n_fft,
+        n_shift,
+        window=torch.hann_window(n_fft),
+        return_complex=True,
+    )
+    return spc.abs().T.numpy()
+
+
+def _spectral_convergence(spc, wav, n_fft=64, n_shift=16):
+    rebuilt = torch.stft(
+        torch.as_tensor(wav),
+        n_fft,
+        n_shift,
+        window=torch.hann_window(n_fft),
+        return_complex=True,
+    )
+    rebuilt = rebuilt.abs().T.numpy()
+    return np.linalg.norm(rebuilt - spc) / np.linalg.norm(spc)
+
+
+@pytest.mark.execution_timeout(5)
+def test_inv_mel_basis_cached():
+    assert inv_mel_basis(8000, 64, 10, 0, 4000) is inv_mel_basis(8000, 64, 10, 0, 4000)
+
+
+@pytest.mark.parametrize("backend", ["torch", "librosa"])
+@pytest.mark.parametrize("n_mels", [None, 10])
+def test_Spectrogram2Waveform(backend, n_mels):
+    spc2wav = Spectrogram2Waveform(
+        n_fft=64, n_shift=16, fs=8000, n_mels=n_mels, backend=backend
+    )
+    spc = _spectrogram(30)
+    if n_mels is not None:
+        # Log Mel filterbank (T, n_mels)
+        mel_basis = np.linalg.pinv(inv_mel_basis(8000, 64, n_mels, 0, 4000))
+        spc = np.log10(np.maximum(spc @ mel_basis.T, 1e-10))
+    wav = spc2wav(spc)
+    assert isinstance(wav, np.ndarray)
+    assert wav.shape == (29 * 16,)
+    wav = spc2wav(torch.tensor(spc))
+    assert isinstance(wav, torch.Tensor)
+    assert wav.shape == (29 * 16,)
+
+
+def test_GriffinLim_converges():
+    torch.manual_seed(0)
+    spc = _spectrogram(50)
+    griffin_lim = GriffinLim(n_fft=64, n_shift=16, n_iter=100)
+    wavs, wav_lengths = griffin_lim(torch.tensor(spc).unsqueeze(0))
+    assert wav_lengths.tolist() == [49 * 16]
+    assert _spectral_convergence(spc, wavs[0]) < 0.2
+
+
+def test_GriffinLim_batch():
+    spcs = [_spectrogram(n) for n in [30, 10, 20]]
+    griffin_lim = GriffinLim(n_fft=64, n_shift=16)
+    wavs, wav_lengths = griffin_lim(
+        pad_list([torch.tensor(spc) for spc in spcs], 0.0),
+        torch.tensor([30, 10, 20]),
+    )
+    assert wavs.shape == (3, 29 * 16)
+    assert wav_lengths.tolist() == [29 * 16, 9 * 16, 19 * 16]
+    for spc, wav, length in zip(spcs, wavs, wav_lengths):
+        assert _spectral_convergence(spc, wav[:length]) < 0.5
+
+
+def test_Spectrogram2Waveform_batch():
+    spcs = [_spectrogram(n) for n in [30, 10, 20]]
+    spc2wav = Spectrogram2Waveform(n_fft=64, n_shift=16)
+    wavs = spc2wav.batch(spcs)
+    assert [len(w) for w in wavs] == [29 * 16, 9 * 16, 19 * 16]
+
+
+@pytest.mark.parametrize("n_context", [None, 10])
+def test_GriffinLim_stream(n_context):
+    torch.manual_seed(0)
+    spc = _spectrogram(50)
+    spc2wav = Spectrogram2Waveform(n_fft=64, n_shift=16, griffin_lim_iters=64)
+    wavs = list(spc2wav.stream(np.array_split(spc, 7), n_context))
+    assert len(wavs) > 1
+    wav = np.concatenate(wavs)
+    assert wav.shape == (49 * 16,)
+    assert _spectral_convergence(spc, wav) < 0.3
+
+
+def test_GriffinLim_stream_empty():
+    spc2wav = Spectrogram2Waveform(n_fft=64, n_shift=16)
+    assert list(spc2wav.stream([])) == []
+
+
+def test_Spectrogram2Waveform_invalid_backend():
+    with pytest.raises(ValueError):
+        Spectrogram2Waveform(n_fft=64, n_shift=16, backend="foo")
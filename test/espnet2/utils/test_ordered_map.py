@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+import random
+import time
+
+import pytest
+
+from espnet2.utils.ordered_map import ordered_map
+
+
+def _sleep_and_square(x):
+    time.sleep(random.random() * 0.01)
+    return x * x
+
+
+@pytest.mark.parametrize("max_pending", [1, 3, 100])
+def test_ordered_map(max_pending):
+    with ThreadPoolExecutor(4) as e:
+        results = list(ordered_map(e, _sleep_and_square, range(20), max_pending))
+    assert results == [x * x for x in range(20)]
+
+
+def test_ordered_map_max_pending():
+    submitted = []
+
+    def _items():
+        for i in range(10):
+            submitted.append(i)
+            yield i
+
+    with ThreadPoolExecutor(2) as e:
+        for i, result in enumerate(ordered_map(e, _sleep_and_square, _items(), 3)):
+            assert result == i * i
+            # The items are submitted lazily
+            assert len(submitted) <= i + 3
+
+
+def test_ordered_map_invalid_max_pending():
+    with ThreadPoolExecutor(1) as e, pytest.raises(ValueError):
+        list(ordered_map(e, _sleep_and_square, range(3), 0))
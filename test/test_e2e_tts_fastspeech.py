@@ -583,21 +583,49 @@ def test_length_regulator():
     assert int(xs_expand.shape[1]) == int(ds.sum(dim=-1).max())
 
 
+def test_length_regulator_all_zero_durations():
+    xs = torch.randn(2, 4, 3)
+    ds = torch.tensor([[0, 0, 0, 0], [1, 2, 0, 0]])
+    masks = torch.tensor([[False, False, True, True], [False, False, True, True]])
+    length_regulator = LengthRegulator()
+
+    # The all-0 sequence is filled with 1 except for the padded part
+    ds_adjusted = length_regulator.adjust_durations(ds, masks=masks)
+    assert ds_adjusted.tolist() == [[1, 1, 0, 0], [1, 2, 0, 0]]
+    xs_expand = length_regulator(xs, ds, masks=masks)
+    assert xs_expand.shape == (2, 3, 3)
+    assert torch.equal(xs_expand[0, :2], xs[0, :2])
+
+    # Without masks, all the durations of the all-0 sequence are filled
+    ds_adjusted = length_regulator.adjust_durations(ds)
+    assert ds_adjusted.tolist() == [[1, 1, 1, 1], [1, 2, 0, 0]]
+    # The given durations are not modified
+    assert ds[0].sum() == 0
+
+
 @pytest.mark.skipif(not is_torch_1_1_plus, reason="torch 1.1+ is required.")
-def test_legacy_length_regulator():
+@pytest.mark.parametrize("alpha", [1.0, 0.7, 1.3])
+def test_legacy_length_regulator(alpha):
     # prepare inputs
     idim = 5
     ilens = [10, 5, 3]
     xs = pad_list([torch.randn((ilen, idim)) for ilen in ilens], 0.0)
     ds = pad_list([torch.arange(ilen) for ilen in ilens], 0)
 
+    def legacy_length_regulator(xs, ds):
+        if alpha != 1.0:
+            ds = torch.round(ds.float() * alpha).long()
+        return pad_list(
+            [
+                length_regulator._legacy_repeat_one_sequence(x, d)
+                for x, d in zip(xs, ds)
+            ],
+            0.0,
+        )
+
     # test with non-zero durations
     length_regulator = LengthRegulator()
-    legacy_length_regulator = LengthRegulator()
-    legacy_length_regulator.repeat_fn = (
-        legacy_length_regulator._legacy_repeat_one_sequence
-    )
-    xs_expand_1 = length_regulator(xs, ds)
+    xs_expand_1 = length_regulator(xs, ds, alpha)
     xs_expand_2 = legacy_length_regulator(xs, ds)
     np.testing.assert_array_equal(
         xs_expand_1.numpy(),
@@ -606,7 +634,7 @@ def test_legacy_length_regulator():
 
     # test with duration including zero
     ds[:, 2] = 0
-    xs_expand_1 = length_regulator(xs, ds)
+    xs_expand_1 = length_regulator(xs, ds, alpha)
     xs_expand_2 = legacy_length_regulator(xs, ds)
     np.testing.assert_array_equal(
         xs_expand_1.numpy(),
@@ -614,6 +642,14 @@ def test_legacy_length_regulator():
     )
 
 
+def test_length_regulator_grad():
+    xs = torch.randn(2, 3, 4, requires_grad=True)
+    ds = torch.tensor([[1, 2, 0], [3, 0, 0]])
+    LengthRegulator()(xs, ds).sum().backward()
+    expected = ds.unsqueeze(-1).float().expand_as(xs)
+    np.testing.assert_array_equal(xs.grad.numpy(), expected.numpy())
+
+
 def test_duration_calculator():
     # define duration calculator
     idim, odim = 10, 25
@@ -152,6 +152,7 @@ def prepare_inputs(
         ({}, {"use_att_constraint": True}),
         ({"atype": "forward"}, {"use_att_constraint": True}),
         ({"atype": "forward_ta"}, {"use_att_constraint": True}),
+        ({}, {"use_att_constraint": True, "windowed_att_constraint": True}),
     ],
 )
 def test_tacotron2_trainable_and_decodable(model_dict, inference_dict):
@@ -199,6 +200,46 @@ def test_tacotron2_trainable_and_decodable(model_dict, inference_dict):
         model.calculate_all_attentions(**batch)
 
 
+@pytest.mark.parametrize(
+    "model_dict, inference_dict",
+    [
+        ({}, {}),
+        ({"cumulate_att_w": False}, {}),
+        ({"reduction_factor": 2}, {}),
+        ({}, {"backward_window": 0, "forward_window": 1}),
+        ({}, {"backward_window": 3, "forward_window": 8}),
+    ],
+)
+def test_tacotron2_windowed_att_constraint(model_dict, inference_dict):
+    model_args = make_taco2_args(**model_dict)
+    inference_args = make_inference_args(
+        use_att_constraint=True, maxlenratio=3.0, threshold=1.1, **inference_dict
+    )
+    torch.manual_seed(0)
+    model = Tacotron2(5, 10, Namespace(**model_args))
+    model.eval()
+    x = torch.randint(0, 5, (20,))
+
+    results = []
+    for windowed in [False, True]:
+        inference_args["windowed_att_constraint"] = windowed
+        # The dropout of prenet is applied in inference as well
+        torch.manual_seed(1)
+        with torch.no_grad():
+            results.append(model.inference(x, Namespace(**inference_args)))
+    for masked, windowed in zip(*results):
+        np.testing.assert_allclose(masked.numpy(), windowed.numpy(), atol=1e-5)
+
+
+def test_tacotron2_windowed_att_constraint_unsupported():
+    model = Tacotron2(5, 10, Namespace(**make_taco2_args(atype="forward")))
+    inference_args = make_inference_args(
+        use_att_constraint=True, windowed_att_constraint=True
+    )
+    with pytest.raises(NotImplementedError):
+        model.inference(torch.randint(0, 5, (10,)), Namespace(**inference_args))
+
+
 @pytest.mark.skipif(not torch.cuda.is_available(), reason="gpu required")
 @pytest.mark.parametrize(
     "model_dict, inference_dict",
@@ -3,6 +3,8 @@ import pytest
 import torch
 
 from espnet.nets.pytorch_backend.transformer.decoder import Decoder
+from espnet.nets.pytorch_backend.transformer.embedding import PositionalEncoding
+from espnet.nets.pytorch_backend.transformer.embedding import ScaledPositionalEncoding
 from espnet.nets.pytorch_backend.transformer.encoder import Encoder
 from espnet.nets.pytorch_backend.transformer.mask import subsequent_mask
 
@@ -142,3 +144,64 @@ if __name__ == "__main__":
     plt.grid()
     plt.legend()
     plt.savefig(f"benchmark_{model}.png")
+
+
+@pytest.mark.parametrize("normalize_before", [True, False])
+@pytest.mark.parametrize("concat_after", [True, False])
+@pytest.mark.parametrize(
+    "pos_enc_class", [PositionalEncoding, ScaledPositionalEncoding]
+)
+def test_decoder_kv_cache(normalize_before, concat_after, pos_enc_class):
+    adim = 4
+    odim = 5
+    decoder = Decoder(
+        odim=odim,
+        attention_dim=adim,
+        linear_units=3,
+        num_blocks=2,
+        normalize_before=normalize_before,
+        concat_after=concat_after,
+        pos_enc_class=pos_enc_class,
+        dropout_rate=0.0,
+    )
+    memory = torch.randn(2, 5, adim)
+    memory_mask = torch.tensor([[[1, 1, 1, 1, 1]], [[1, 1, 1, 0, 0]]]).bool()
+    decoder.eval()
+    with torch.no_grad():
+        # layer-level test: the new frames at once
+        dlayer = decoder.decoders[0]
+        x = torch.randn(2, 6, adim)
+        mask = subsequent_mask(x.shape[1]).unsqueeze(0)
+        y = dlayer(x, mask, memory, memory_mask)[0]
+        kv_cache = dlayer.init_kv_cache(memory, x.size(1))
+        y_fast = torch.cat(
+            [
+                dlayer.forward_kv_cached(x[:, :2], 0, kv_cache, memory_mask),
+                dlayer.forward_kv_cached(x[:, 2:], 2, kv_cache, memory_mask),
+            ],
+            dim=1,
+        )
+        numpy.testing.assert_allclose(y.numpy(), y_fast.numpy(), rtol=RTOL)
+
+        # decoder-level test: step by step
+        ys = torch.randint(0, odim, (2, 6))
+        kv_cache = decoder.init_kv_cache(memory, ys.size(1))
+        for i in range(ys.size(1)):
+            y, _ = decoder.forward_one_step(
+                ys[:, : i + 1], subsequent_mask(i + 1).unsqueeze(0), memory
+            )
+            y_fast = decoder.forward_one_step_kv_cached(ys[:, i : i + 1], i, kv_cache)
+            numpy.testing.assert_allclose(y.numpy(), y_fast.numpy(), rtol=RTOL)
+
+
+def test_decoder_kv_cache_unsupported():
+    decoder = Decoder(
+        odim=5,
+        selfattention_layer_type="lightconv",
+        conv_kernel_length="3",
+        attention_dim=4,
+        linear_units=3,
+        num_blocks=1,
+    )
+    with pytest.raises(NotImplementedError):
+        decoder.init_kv_cache(torch.randn(1, 3, 4), 5)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+
+#  Apache 2.0  (http://www.apache.org/licenses/LICENSE-2.0)
+
+# Benchmark peak memory and step time of espnet2 encoders
+# with gradient checkpointing (encoder_conf.checkpoint_layers) on CPU.
+
+import argparse
+import multiprocessing as mp
+import resource
+import time
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark activation checkpointing on CPU",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--encoder", choices=["transformer", "conformer"], default="conformer"
+    )
+    parser.add_argument("--num_blocks", type=int, default=12)
+    parser.add_argument("--output_size", type=int, default=256)
+    parser.add_argument("--linear_units", type=int, default=1024)
+    parser.add_argument("--batch_size", type=int, default=8)
+    parser.add_argument("--length", type=int, default=1000, help="Number of frames")
+    parser.add_argument("--idim", type=int, default=80)
+    parser.add_argument("--steps", type=int, default=3)
+    parser.add_argument(
+        "--num_checkpoint_layers",
+        type=int,
+        nargs="+",
+        default=None,
+        help="The numbers of the first encoder blocks to be checkpointed. "
+        "Default: 0, num_blocks // 2, num_blocks",
+    )
+    return parser
+
+
+def _max_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run(args, num_checkpoint_layers, queue):
+    import torch
+
+    from espnet2.asr.encoder.conformer_encoder import ConformerEncoder
+    from espnet2.asr.encoder.transformer_encoder import TransformerEncoder
+
+    torch.manual_seed(0)
+    torch.set_num_threads(1)
+    encoder_class = dict(transformer=TransformerEncoder, conformer=ConformerEncoder)[
+        args.encoder
+    ]
+    encoder = encoder_class(
+        args.idim,
+        output_size=args.output_size,
+        linear_units=args.linear_units,
+        num_blocks=args.num_blocks,
+        checkpoint_layers=list(range(num_checkpoint_layers)),
+    )
+    encoder.train()
+    xs = torch.randn(args.batch_size, args.length, args.idim)
+    ilens = torch.full((args.batch_size,), args.length, dtype=torch.long)
+
+    base_rss = _max_rss_mb()
+    elapsed = []
+    for _ in range(args.steps):
+        start = time.perf_counter()
+        ys, _, _ = encoder(xs, ilens)
+        ys.sum().backward()
+        elapsed.append(time.perf_counter() - start)
+        encoder.zero_grad()
+    queue.put((_max_rss_mb() - base_rss, min(elapsed)))
+
+
+def main(cmd=None):
+    args = get_parser().parse_args(cmd)
+    if args.num_checkpoint_layers is None:
+        args.num_checkpoint_layers = [0, args.num_blocks // 2, args.num_blocks]
+
+    # Use a fresh process for each setting because the peak RSS can't be reset
+    ctx = mp.get_context("spawn")
+    print("checkpointed_blocks\tpeak_memory_increase[MB]\tstep_time[sec]")
+    for n in args.num_checkpoint_layers:
+        queue = ctx.Queue()
+        p = ctx.Process(target=_run, args=(args, n, queue))
+        p.start()
+        peak, step_time = queue.get()
+        p.join()
+        print(f"{n}/{args.num_blocks}\t{peak:.1f}\t{step_time:.3f}")
+
+
+if __name__ == "__main__":
+    main()
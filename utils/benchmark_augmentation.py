@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+
+#  Apache 2.0  (http://www.apache.org/licenses/LICENSE-2.0)
+
+# Benchmark the RIR convolution and noise addition of
+# espnet2.train.preprocessor.CommonPreprocessor in augmented samples per second
+# for a single worker using randomly generated speech, RIRs and noises.
+
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+import numpy as np
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the noise and RIR augmentation",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--num_samples", type=int, default=200)
+    parser.add_argument("--fs", type=int, default=16000)
+    parser.add_argument("--min_duration", type=float, default=2.0)
+    parser.add_argument("--max_duration", type=float, default=15.0)
+    parser.add_argument("--num_rirs", type=int, default=20)
+    parser.add_argument("--rir_duration", type=float, default=0.5)
+    parser.add_argument("--num_noises", type=int, default=20)
+    parser.add_argument("--noise_duration", type=float, default=30.0)
+    parser.add_argument(
+        "--audio_format",
+        default="flac",
+        help="The format of the RIR and noise files",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def _write_scp(name, num, duration, fs, rng, outdir: Path, audio_format) -> str:
+    import soundfile
+
+    scp = outdir / f"{name}.scp"
+    with scp.open("w") as f:
+        for i in range(num):
+            path = outdir / f"{name}{i}.{audio_format}"
+            signal = rng.uniform(-0.1, 0.1, int(duration * fs))
+            soundfile.write(str(path), signal, fs)
+            f.write(f"{name}{i} {path}\n")
+    return str(scp)
+
+
+class _ScipyConvolvePreprocessor:
+    """The former implementation: scipy.signal.convolve() for each sample"""
+
+    def __init__(self, preprocessor):
+        self.preprocessor = preprocessor
+
+    def __call__(self, uid, data):
+        import scipy.signal
+        import soundfile
+
+        from espnet2.train.preprocessor import detect_non_silence
+
+        p = self.preprocessor
+        speech = data["speech"][None, :]
+        nsamples = speech.shape[1]
+        power = (speech[detect_non_silence(speech)] ** 2).mean()
+        rir, _ = soundfile.read(
+            np.random.choice(p.rirs), dtype=np.float64, always_2d=True
+        )
+        speech = scipy.signal.convolve(speech, rir.T, mode="full")[:, :nsamples]
+        power2 = (speech[detect_non_silence(speech)] ** 2).mean()
+        speech = np.sqrt(power / max(power2, 1e-10)) * speech
+        noise = p._read_noise(np.random.randint(len(p.noises)), nsamples).T
+        noise_db = np.random.uniform(p.noise_db_low, p.noise_db_high)
+        scale = 10 ** (-noise_db / 20) * np.sqrt(power / (noise ** 2).mean())
+        data["speech"] = (speech + scale * noise).T
+        return data
+
+
+def main(cmd=None):
+    args = get_parser().parse_args(cmd)
+
+    from espnet2.train.preprocessor import CommonPreprocessor
+
+    rng = np.random.RandomState(args.seed)
+    speeches = [
+        rng.uniform(
+            -0.5,
+            0.5,
+            int(rng.uniform(args.min_duration, args.max_duration) * args.fs),
+        )
+        for _ in range(args.num_samples)
+    ]
+    with tempfile.TemporaryDirectory() as d:
+        rir_scp = _write_scp(
+            "rir",
+            args.num_rirs,
+            args.rir_duration,
+            args.fs,
+            rng,
+            Path(d),
+            args.audio_format,
+        )
+        noise_scp = _write_scp(
+            "noise",
+            args.num_noises,
+            args.noise_duration,
+            args.fs,
+            rng,
+            Path(d),
+            args.audio_format,
+        )
+
+        start = time.perf_counter()
+        bank_preprocessor = CommonPreprocessor(
+            train=True,
+            rir_scp=rir_scp,
+            noise_scp=noise_scp,
+            augmentation_bank_dir=Path(d) / "bank",
+        )
+        print(f"Building the bank: {time.perf_counter() - start:.2f} sec")
+
+        preprocessor = CommonPreprocessor(
+            train=True, rir_scp=rir_scp, noise_scp=noise_scp
+        )
+        preprocessors = {
+            "scipy.signal.convolve": _ScipyConvolvePreprocessor(preprocessor),
+            "CommonPreprocessor": preprocessor,
+            "CommonPreprocessor(augmentation_bank_dir)": bank_preprocessor,
+        }
+        for name, preprocessor in preprocessors.items():
+            np.random.seed(args.seed)
+            start = time.perf_counter()
+            for i, speech in enumerate(speeches):
+                preprocessor(f"utt{i}", dict(speech=speech))
+            elapsed = time.perf_counter() - start
+            print(f"{name}: {args.num_samples / elapsed:.1f} samples/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+
+#  Apache 2.0  (http://www.apache.org/licenses/LICENSE-2.0)
+
+# Benchmark the throughput of espnet2.train.collate_fn.CommonCollateFn
+# in samples per second using "rand_float" data (random feature sequences).
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the collation of mini-batches",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--num_samples", type=int, default=2000)
+    parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--min_length", type=int, default=100)
+    parser.add_argument("--max_length", type=int, default=1500)
+    parser.add_argument("--dim", type=int, default=80)
+    parser.add_argument("--num_buffers", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def _pad_list_collate(data):
+    """The former implementation: convert to tensors and then pad_list()"""
+    import torch
+
+    from espnet.nets.pytorch_backend.nets_utils import pad_list
+
+    output = {}
+    for key in data[0][1]:
+        tensor_list = [torch.from_numpy(d[key]) for _, d in data]
+        output[key] = pad_list(tensor_list, 0.0)
+        output[key + "_lengths"] = torch.tensor(
+            [d[key].shape[0] for _, d in data], dtype=torch.long
+        )
+    return [u for u, _ in data], output
+
+
+def main(cmd=None):
+    args = get_parser().parse_args(cmd)
+
+    from espnet2.fileio.rand_gen_dataset import FloatRandomGenerateDataset
+    from espnet2.train.collate_fn import CommonCollateFn
+
+    rng = np.random.RandomState(args.seed)
+    with tempfile.NamedTemporaryFile("w", suffix=".txt") as f:
+        for i in range(args.num_samples):
+            length = rng.randint(args.min_length, args.max_length + 1)
+            f.write(f"utt{i} {length},{args.dim}\n")
+        f.flush()
+        dataset = FloatRandomGenerateDataset(f.name)
+        samples = [(k, dict(speech=dataset[k])) for k in dataset]
+    batches = [
+        samples[i : i + args.batch_size]
+        for i in range(0, len(samples), args.batch_size)
+    ]
+
+    collate_fns = {
+        "pad_list": _pad_list_collate,
+        "CommonCollateFn": CommonCollateFn(),
+        f"CommonCollateFn(num_buffers={args.num_buffers})": CommonCollateFn(
+            num_buffers=args.num_buffers
+        ),
+    }
+    for name, collate_fn in collate_fns.items():
+        elapsed = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for batch in batches:
+                collate_fn(batch)
+            elapsed.append(time.perf_counter() - start)
+        print(f"{name}: {args.num_samples / min(elapsed):.1f} samples/sec")
+
+
+if __name__ == "__main__":
+    main()
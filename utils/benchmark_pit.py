@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+
+#  Apache 2.0  (http://www.apache.org/licenses/LICENSE-2.0)
+
+# Benchmark the permutation invariant loss of ESPnetEnhancementModel.
+# The forward and backward time of the loss is measured for each number of speakers
+# 1. "loop": The loss is computed for each permutation (the former implementation)
+# 2. "exhaustive": The permutations are searched on the pairwise loss matrix
+# 3. "hungarian": The assignment is solved by the Hungarian algorithm
+#    on the pairwise loss matrix
+
+import argparse
+from itertools import permutations
+import time
+
+import torch
+from torch_complex.tensor import ComplexTensor
+
+import espnet2.enh.espnet_model
+from espnet2.enh.espnet_model import ESPnetEnhancementModel
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the permutation invariant loss",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--batch_size", type=int, default=8)
+    parser.add_argument(
+        "--num_samples", type=int, default=32000, help="The samples of a waveform"
+    )
+    parser.add_argument("--num_frames", type=int, default=250)
+    parser.add_argument("--num_freqs", type=int, default=257)
+    parser.add_argument(
+        "--num_spk", type=int, nargs="+", default=[2, 3, 4, 5, 6], help="The speakers"
+    )
+    parser.add_argument("--num_iters", type=int, default=5)
+    parser.add_argument(
+        "--max_loop_num_spk",
+        type=int,
+        default=5,
+        help="The loop over the permutations is skipped for more speakers",
+    )
+    parser.add_argument("--device", default="cpu")
+    return parser
+
+
+def _loop_permutation_loss(ref, inf, criterion):
+    # The implementation before computing the pairwise loss matrix
+    num_spk = len(ref)
+
+    def pair_loss(permutation):
+        return sum(
+            [criterion(ref[s], inf[t]) for s, t in enumerate(permutation)]
+        ) / len(permutation)
+
+    all_permutations = list(permutations(range(num_spk)))
+    losses = torch.stack([pair_loss(p) for p in all_permutations], dim=1)
+    loss, perm = torch.min(losses, dim=1)
+    perm = torch.index_select(
+        torch.tensor(all_permutations, device=ref[0].device, dtype=torch.long),
+        0,
+        perm,
+    )
+    return loss.mean(), perm
+
+
+def _make_inputs(args, loss_type, num_spk):
+    device = args.device
+    if loss_type == "si_snr":
+        shape = (args.batch_size, args.num_samples)
+    else:
+        shape = (args.batch_size, args.num_frames, args.num_freqs)
+
+    def rand():
+        if loss_type == "spectrum":
+            return ComplexTensor(
+                torch.randn(shape, device=device), torch.randn(shape, device=device)
+            )
+        elif loss_type == "mask":
+            return torch.rand(shape, device=device)
+        return torch.randn(shape, device=device)
+
+    ref = [rand() for _ in range(num_spk)]
+    inf = [rand() for _ in range(num_spk)]
+    for i in inf:
+        if isinstance(i, ComplexTensor):
+            i.real.requires_grad_(True)
+            i.imag.requires_grad_(True)
+        else:
+            i.requires_grad_(True)
+    return ref, inf
+
+
+def _measure(func, ref, inf, criterion, num_iters, device):
+    times = []
+    for i in range(num_iters + 1):
+        start = time.perf_counter()
+        loss, perm = func(ref, inf, criterion)
+        loss.backward()
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+        # The first iteration is the warm-up
+        if i > 0:
+            times.append(time.perf_counter() - start)
+    return sum(times) / len(times), loss.item()
+
+
+def main(cmd=None):
+    args = get_parser().parse_args(cmd)
+    torch.manual_seed(0)
+
+    criteria = {
+        "si_snr": ESPnetEnhancementModel.si_snr_loss,
+        "spectrum": ESPnetEnhancementModel.tf_mse_loss,
+        "mask": ESPnetEnhancementModel.tf_mse_loss,
+    }
+    exhaustive = espnet2.enh.espnet_model.MAX_NUM_SPK_EXHAUSTIVE_PIT
+
+    print("loss\tnum_spk\tloop[ms]\texhaustive[ms]\thungarian[ms]")
+    for loss_type, criterion in criteria.items():
+        for num_spk in args.num_spk:
+            ref, inf = _make_inputs(args, loss_type, num_spk)
+            if num_spk <= args.max_loop_num_spk:
+                results = [
+                    _measure(
+                        _loop_permutation_loss,
+                        ref,
+                        inf,
+                        criterion,
+                        args.num_iters,
+                        args.device,
+                    )
+                ]
+            else:
+                results = [(None, None)]
+            for max_num_spk in [num_spk, 0]:
+                espnet2.enh.espnet_model.MAX_NUM_SPK_EXHAUSTIVE_PIT = max_num_spk
+                results.append(
+                    _measure(
+                        ESPnetEnhancementModel._permutation_loss,
+                        ref,
+                        inf,
+                        criterion,
+                        args.num_iters,
+                        args.device,
+                    )
+                )
+            espnet2.enh.espnet_model.MAX_NUM_SPK_EXHAUSTIVE_PIT = exhaustive
+            # The three methods find the same minimum
+            losses = [loss for _, loss in results if loss is not None]
+            assert max(losses) - min(losses) <= 1e-4 * max(abs(losses[0]), 1), results
+            print(
+                f"{loss_type}\t{num_spk}\t"
+                + "\t".join("-" if t is None else f"{t * 1000:.1f}" for t, _ in results)
+            )
+
+
+if __name__ == "__main__":
+    main()
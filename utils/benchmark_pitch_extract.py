@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+
+#  Apache 2.0  (http://www.apache.org/licenses/LICENSE-2.0)
+
+# Benchmark the pitch extraction of FastSpeech2 on CPU.
+# 1. The throughput of Dio (pyworld.dio + stonemask) with the process pool
+#    of 1..N jobs, as done by "collect_stats --collect_stats_num_jobs N".
+# 2. The throughput of loading the extracted pitch in the training,
+#    from a npy file per utterance or from a packed binary file.
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from pathlib import Path
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from espnet2.fileio.npy_scp import NpyScpReader
+from espnet2.fileio.npy_scp import NpyScpWriter
+from espnet2.fileio.packed_scp import PackedScpReader
+from espnet2.fileio.packed_scp import PackedScpWriter
+from espnet2.tts.feats_extract.dio import Dio
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pitch extraction and loading on CPU",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--fs", type=int, default=22050)
+    parser.add_argument("--hop_length", type=int, default=256)
+    parser.add_argument("--num_utts", type=int, default=32)
+    parser.add_argument(
+        "--duration", type=float, default=5.0, help="The seconds of an utterance"
+    )
+    parser.add_argument(
+        "--num_jobs",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4],
+        help="The numbers of the processes",
+    )
+    parser.add_argument(
+        "--num_load_utts",
+        type=int,
+        default=2000,
+        help="The number of the utterances for the loading benchmark",
+    )
+    return parser
+
+
+def _extract(fs: int, hop_length: int, wavs):
+    torch.set_num_threads(1)
+    dio = Dio(fs=fs, hop_length=hop_length, use_token_averaged_f0=False)
+    return [dio(torch.from_numpy(w)[None])[0][0].numpy() for w in wavs]
+
+
+def _benchmark_extract(args, wavs):
+    print("num_jobs\tsec\tutt/sec\trealtime factor")
+    for num_jobs in args.num_jobs:
+        chunks = [wavs[i::num_jobs] for i in range(num_jobs)]
+        # The processes are started before the timer as the sharded jobs
+        with ProcessPoolExecutor(
+            num_jobs, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            list(executor.map(_extract, [args.fs], [args.hop_length], [wavs[:1]]))
+            start = time.perf_counter()
+            futures = [
+                executor.submit(_extract, args.fs, args.hop_length, c) for c in chunks
+            ]
+            [f.result() for f in futures]
+            elapsed = time.perf_counter() - start
+        print(
+            f"{num_jobs}\t{elapsed:.2f}\t{len(wavs) / elapsed:.1f}\t"
+            f"{elapsed / (len(wavs) * args.duration):.4f}"
+        )
+
+
+def _benchmark_load(args, pitch):
+    print("format\tsec\tutt/sec")
+    with tempfile.TemporaryDirectory() as d:
+        d = Path(d)
+        with NpyScpWriter(d / "npy", d / "npy.scp") as writer:
+            for i in range(args.num_load_utts):
+                writer[f"utt{i}"] = pitch
+        with PackedScpWriter(d / "pitch.bin", d / "packed.scp") as writer:
+            for i in range(args.num_load_utts):
+                writer[f"utt{i}"] = pitch
+
+        for name, reader in [
+            ("npy", NpyScpReader(d / "npy.scp")),
+            ("packed", PackedScpReader(d / "packed.scp")),
+        ]:
+            start = time.perf_counter()
+            for k in reader:
+                reader[k]
+            elapsed = time.perf_counter() - start
+            print(f"{name}\t{elapsed:.3f}\t{len(reader) / elapsed:.0f}")
+
+
+def main(cmd=None):
+    args = get_parser().parse_args(cmd)
+    rng = np.random.RandomState(0)
+    n = int(args.fs * args.duration)
+    t = np.arange(n) / args.fs
+    # A harmonic signal with a varying F0 and noise
+    wavs = [
+        (
+            np.sin(2 * np.pi * (120 + 40 * rng.rand()) * t * (1 + 0.1 * np.sin(t)))
+            + 0.01 * rng.randn(n)
+        ).astype(np.float32)
+        for _ in range(args.num_utts)
+    ]
+    _benchmark_extract(args, wavs)
+    pitch = _extract(args.fs, args.hop_length, wavs[:1])[0]
+    _benchmark_load(args, pitch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+
+#  Apache 2.0  (http://www.apache.org/licenses/LICENSE-2.0)
+
+# Benchmark the autoregressive decoding speed of espnet2 Transformer-TTS
+# (frames per second against the output length) on CPU.
+# The cached incremental decoding of Transformer.inference is compared with
+# the step-by-step decoding which recomputes all the previous frames
+# by decoder.forward_one_step().
+
+import argparse
+import time
+
+import torch
+
+from espnet.nets.pytorch_backend.transformer.mask import subsequent_mask
+from espnet2.tts.transformer import Transformer
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark Transformer-TTS inference on CPU",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--idim", type=int, default=80)
+    parser.add_argument("--odim", type=int, default=80)
+    parser.add_argument("--adim", type=int, default=384)
+    parser.add_argument("--aheads", type=int, default=4)
+    parser.add_argument("--elayers", type=int, default=6)
+    parser.add_argument("--dlayers", type=int, default=6)
+    parser.add_argument("--units", type=int, default=1536)
+    parser.add_argument("--reduction_factor", type=int, default=1)
+    parser.add_argument("--text_length", type=int, default=50)
+    parser.add_argument(
+        "--output_lengths",
+        type=int,
+        nargs="+",
+        default=[100, 200, 400, 800],
+        help="The numbers of the decoder steps",
+    )
+    parser.add_argument(
+        "--skip_no_cache",
+        action="store_true",
+        help="Skip the decoding without the cache, which is slow for long outputs",
+    )
+    return parser
+
+
+def _inference_without_cache(model, x, maxlen):
+    hs, _ = model.encoder(x.unsqueeze(0), None)
+    ys = hs.new_zeros(1, 1, model.odim)
+    for idx in range(1, maxlen + 1):
+        y_masks = subsequent_mask(idx).unsqueeze(0)
+        z, _ = model.decoder.forward_one_step(ys, y_masks, hs)
+        out = model.feat_out(z).view(model.reduction_factor, model.odim)
+        ys = torch.cat((ys, out[-1].view(1, 1, model.odim)), dim=1)
+        # Collect the attention weights as the former implementation
+        [m.src_attn.attn[0, :, -1] for m in model.decoder.decoders]
+
+
+def main(cmd=None):
+    args = get_parser().parse_args(cmd)
+    torch.manual_seed(0)
+    torch.set_num_threads(1)
+    model = Transformer(
+        idim=args.idim,
+        odim=args.odim,
+        adim=args.adim,
+        aheads=args.aheads,
+        elayers=args.elayers,
+        eunits=args.units,
+        dlayers=args.dlayers,
+        dunits=args.units,
+        reduction_factor=args.reduction_factor,
+    )
+    model.eval()
+    text = torch.randint(0, args.idim - 1, (args.text_length,))
+    # +1 for <eos> added in inference()
+    text_length = args.text_length + 1
+
+    print("steps\tcached[frames/s]\tcached_no_att_ws[frames/s]\tno_cache[frames/s]")
+    with torch.no_grad():
+        for length in args.output_lengths:
+            # threshold > 1 never stops the generation until maxlen
+            maxlenratio = length * args.reduction_factor / text_length
+            frames = length * args.reduction_factor
+            results = []
+            for return_att_ws in [True, False]:
+                start = time.perf_counter()
+                model.inference(
+                    text,
+                    threshold=1.1,
+                    maxlenratio=maxlenratio,
+                    return_att_ws=return_att_ws,
+                )
+                results.append(frames / (time.perf_counter() - start))
+            if args.skip_no_cache:
+                results.append(float("nan"))
+            else:
+                x = torch.nn.functional.pad(text, [0, 1], "constant", model.eos)
+                maxlen = int(text_length * maxlenratio / args.reduction_factor)
+                start = time.perf_counter()
+                _inference_without_cache(model, x, maxlen)
+                results.append(frames / (time.perf_counter() - start))
+            print(f"{length}\t" + "\t".join(f"{r:.1f}" for r in results))
+
+
+if __name__ == "__main__":
+    main()